@@ -114,7 +114,7 @@ async def vinted_auto_login(
 
             # Create a new browser context
             logger.info("[VINTED LOGIN] Creating browser context...")
-            context = await client.browser.new_context(
+            context = await client.new_context(
                 viewport={'width': 1280, 'height': 720},
                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             )
@@ -504,3 +504,33 @@ async def reset_job_statistics(
         "success": True,
         "message": f"Reset statistics for {job_name or 'all jobs'}"
     }
+
+
+@router.get("/debug/publish/slowest")
+async def get_slowest_publish_runs(
+    hours: int = Query(24, ge=1, le=24 * 30),
+    limit: int = Query(20, ge=1, le=200),
+    flow: Optional[str] = Query(None, regex="^(direct|two_phase|dry_run)$"),
+    admin: dict = Depends(require_super_admin)
+):
+    """
+    Slowest recent publish runs with their per-step timeline (super-admin only)
+
+    Args:
+        hours: Look-back window
+        limit: Number of runs returned
+        flow: Restrict to one publish flow (direct / two_phase / dry_run)
+
+    Returns:
+        - runs: slowest first, each with its stored timeline
+        - steps: per-step count / total / max / avg over those runs
+    """
+    from backend.core.publish_trace import summarize_steps
+
+    runs = get_store().get_slowest_publish_runs(hours=hours, limit=limit, flow=flow)
+
+    return {
+        "hours": hours,
+        "runs": runs,
+        "steps": summarize_steps([r["timeline"] for r in runs if r.get("timeline")])
+    }
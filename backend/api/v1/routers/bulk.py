@@ -5,6 +5,7 @@ Handles mass photo uploads, automatic analysis, and draft creation
 import os
 import uuid
 import asyncio
+import time
 import json
 import zipfile
 from datetime import datetime
@@ -23,6 +24,7 @@ from backend.core.ai_analyzer import (
 )
 from backend.core.storage import get_store
 from backend.core.auth import get_current_user, User
+from backend.services.photo_edits import edited_photo_urls, load_edits, render_edited_paths, thumbnail_urls
 from backend.middleware.quota_checker import check_and_consume_quota, check_storage_quota
 from backend.schemas.bulk import (
     BulkUploadResponse,
@@ -170,6 +172,31 @@ def normalize_draft_for_frontend(draft: Dict) -> Dict:
     return draft
 
 
+def with_edited_photo_urls(drafts: List[DraftItem], user_id: str, thumbnails: bool = False) -> List[DraftItem]:
+    """
+    Point photos that have non-destructive edits at their rendered derivative
+    and optionally add thumbnail variant URLs (one photo_edits query for the
+    whole page, the owner's edits only; drafts are copied, not mutated)
+    """
+    all_photos = [photo for draft in drafts for photo in draft.photos]
+    edits = load_edits(all_photos, user_id)
+    urls = edited_photo_urls(all_photos, user_id, edits)
+    thumbs = thumbnail_urls(all_photos, user_id, edits) if thumbnails else None
+    if urls == all_photos and thumbs is None:
+        return drafts
+
+    decorated = []
+    offset = 0
+    for draft in drafts:
+        count = len(draft.photos)
+        update = {"photos": urls[offset:offset + count]}
+        if thumbs is not None:
+            update["thumbnails"] = thumbs[offset:offset + count]
+        decorated.append(draft.model_copy(update=update))
+        offset += count
+    return decorated
+
+
 def save_uploaded_photos(files: List[UploadFile], job_id: str) -> List[str]:
     """Save uploaded photos and return file paths (converts HEIC to JPEG)"""
     from backend.settings import settings as bulk_settings
@@ -240,6 +267,7 @@ def save_uploaded_photos(files: List[UploadFile], job_id: str) -> List[str]:
         
         saved_paths.append(str(filepath))
     
+    get_store().record_temp_photos(job_id, len(saved_paths), sum(os.path.getsize(p) for p in saved_paths))
     return saved_paths
 
 
@@ -1000,7 +1028,7 @@ async def list_drafts(
         total = len(unique_drafts)
         start = (page - 1) * page_size
         end = start + page_size
-        page_drafts = unique_drafts[start:end]
+        page_drafts = with_edited_photo_urls(unique_drafts[start:end], str(current_user.id), thumbnails=True)
         
         return DraftListResponse(
             drafts=page_drafts,
@@ -1067,7 +1095,7 @@ async def get_draft(
             missing_fields=[]
         )
 
-        return draft
+        return with_edited_photo_urls([draft], str(current_user.id))[0]
 
     except HTTPException:
         raise
@@ -1364,6 +1392,9 @@ async def publish_draft(
     **dry_run=true**: Simulate without real publication (for testing)
     **dry_run=false**: REAL publication to Vinted (default)
     """
+    from backend.core.publish_trace import PublishTrace, TRACE_HEADER, span
+
+    trace = PublishTrace("dry_run" if dry_run else "two_phase", draft_id=draft_id, user_id=str(current_user.id))
     try:
         # Get draft from SQLite (with user ownership check)
         draft_data = get_store().get_draft(draft_id)
@@ -1392,6 +1423,9 @@ async def publish_draft(
             await check_and_consume_quota(current_user, "publications", amount=1)
         
         print(f"{'[DRY-RUN]' if dry_run else '[PUBLISH]'} User {current_user.id} publishing draft {draft_id}")
+
+        # Per-step timeline of the run (stored with the publish log)
+        trace.begin()
         
         # Extract draft fields
         item_json = draft_data.get("item_json", {})
@@ -1407,8 +1441,12 @@ async def publish_draft(
             else:
                 print(f"[WARNING] Photo introuvable après résolution: {photo_path} (tried {resolved})")
         
+        # Publish the edited versions (rendered derivatives) of edited photos
+        photos = await render_edited_paths(photos, str(current_user.id))
+
         if not photos:
             print(f"[ERROR] [PUBLISH] Aucune photo valide trouvée pour draft {draft_id}")
+            trace.finish("failed")
             return {
                 "ok": False,
                 "draft_id": draft_id,
@@ -1506,15 +1544,21 @@ async def publish_draft(
             print(f"[DRAFT] Creating Vinted draft (no publish)...")
 
             async with httpx.AsyncClient(timeout=60.0) as client:
-                draft_response_raw = await client.post(
-                    f"http://localhost:{settings.PORT}/vinted/listings/draft",
-                    json=request_payload,
-                    headers={"Authorization": f"Bearer {access_token}"}
-                )
+                with span("create_vinted_draft"):
+                    started = time.monotonic()
+                    draft_response_raw = await client.post(
+                        f"http://localhost:{settings.PORT}/vinted/listings/draft",
+                        json=request_payload,
+                        headers={"Authorization": f"Bearer {access_token}", TRACE_HEADER: trace.trace_id}
+                    )
+                    # Playwright steps of the handler, below this span
+                    if draft_response_raw.status_code == 200:
+                        trace.merge(draft_response_raw.json().get("timeline"), started)
                 
                 if draft_response_raw.status_code != 200:
                     error_detail = draft_response_raw.json().get("detail", "Unknown error")
                     print(f"[ERROR] Draft creation failed: {error_detail}")
+                    trace.finish("failed")
                     return {
                         "ok": False,
                         "draft_id": draft_id,
@@ -1528,6 +1572,7 @@ async def publish_draft(
             if not draft_response.get("ok"):
                 reason = draft_response.get("reason", "Unknown error")
                 print(f"[ERROR] Draft creation failed: {reason}")
+                trace.finish("failed")
                 return {
                     "ok": False,
                     "draft_id": draft_id,
@@ -1539,6 +1584,8 @@ async def publish_draft(
             vinted_draft_url = draft_response.get("vinted_draft_url")
             vinted_draft_id = draft_response.get("vinted_draft_id")
             print(f"[SUCCESS] Vinted draft created: {vinted_draft_url}")
+            trace.listing_url = vinted_draft_url
+            trace.finish("ok")
             
             # Update draft in DB with Vinted draft info
             if not dry_run:
@@ -1559,15 +1606,20 @@ async def publish_draft(
         print(f"[PHASE_A] Phase A: Preparing listing '{draft_data['title'][:50]}...'")
 
         async with httpx.AsyncClient(timeout=60.0) as client:
-            prepare_response_raw = await client.post(
-                f"http://localhost:{settings.PORT}/vinted/listings/prepare",
-                json=request_payload,
-                headers={"Authorization": f"Bearer {access_token}"}
-            )
+            with span("prepare"):
+                started = time.monotonic()
+                prepare_response_raw = await client.post(
+                    f"http://localhost:{settings.PORT}/vinted/listings/prepare",
+                    json=request_payload,
+                    headers={"Authorization": f"Bearer {access_token}", TRACE_HEADER: trace.trace_id}
+                )
+                if prepare_response_raw.status_code == 200:
+                    trace.merge(prepare_response_raw.json().get("timeline"), started)
             
             if prepare_response_raw.status_code != 200:
                 error_detail = prepare_response_raw.json().get("detail", "Unknown error")
                 print(f"[ERROR] Phase A failed: {error_detail}")
+                trace.finish("failed")
                 return {
                     "ok": False,
                     "draft_id": draft_id,
@@ -1581,6 +1633,7 @@ async def publish_draft(
         if not prepare_response.get("ok"):
             reason = prepare_response.get("reason", "Unknown error")
             print(f"[ERROR] Phase A failed: {reason}")
+            trace.finish("failed")
             return {
                 "ok": False,
                 "draft_id": draft_id,
@@ -1598,6 +1651,7 @@ async def publish_draft(
         # Generate idempotency key
         import hashlib
         idempotency_key = hashlib.sha256(f"{draft_id}:{confirm_token}".encode()).hexdigest()
+        trace.idempotency_key = idempotency_key
         
         # Build publish request payload
         publish_payload = {
@@ -1607,17 +1661,23 @@ async def publish_draft(
         
         # Call publish endpoint via internal HTTP request
         async with httpx.AsyncClient(timeout=60.0) as client:  # 60s timeout for Playwright
-            publish_response_raw = await client.post(
-                f"http://localhost:{settings.PORT}/vinted/listings/publish",
-                json=publish_payload,
-                headers={
-                    "Authorization": f"Bearer {access_token}",
-                    "Idempotency-Key": idempotency_key
-                }
-            )
+            with span("publish"):
+                started = time.monotonic()
+                publish_response_raw = await client.post(
+                    f"http://localhost:{settings.PORT}/vinted/listings/publish",
+                    json=publish_payload,
+                    headers={
+                        "Authorization": f"Bearer {access_token}",
+                        "Idempotency-Key": idempotency_key,
+                        TRACE_HEADER: trace.trace_id
+                    }
+                )
+                if publish_response_raw.status_code == 200:
+                    trace.merge(publish_response_raw.json().get("timeline"), started)
             
             if publish_response_raw.status_code == 409:
                 print(f"[WARNING] Duplicate publish attempt blocked (idempotency key already used)")
+                trace.finish("duplicate")
                 raise HTTPException(
                     status_code=409,
                     detail="Cette annonce a déjà été publiée (clé d'idempotence utilisée)"
@@ -1626,6 +1686,7 @@ async def publish_draft(
             if publish_response_raw.status_code != 200:
                 error_detail = publish_response_raw.json().get("detail", "Unknown error")
                 print(f"[ERROR] Phase B failed: {error_detail}")
+                trace.finish("failed")
                 return {
                     "ok": False,
                     "draft_id": draft_id,
@@ -1639,6 +1700,7 @@ async def publish_draft(
         if not publish_response.get("ok"):
             reason = publish_response.get("reason", "Unknown error")
             print(f"[ERROR] Phase B failed: {reason}")
+            trace.finish("failed")
             return {
                 "ok": False,
                 "draft_id": draft_id,
@@ -1650,6 +1712,8 @@ async def publish_draft(
         listing_url = publish_response.get("listing_url")
         vinted_id = publish_response.get("listing_id")
         print(f"[SUCCESS] Phase B complete: {listing_url}")
+        trace.listing_url = listing_url
+        trace.finish("ok")
         
         # Update draft status in SQLite
         if not dry_run:
@@ -1682,6 +1746,8 @@ async def publish_draft(
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Failed to publish draft: {str(e)}")
+    finally:
+        trace.end()
 
 
 @router.post("/drafts/{draft_id}/publish-direct")
@@ -1711,6 +1777,9 @@ async def publish_draft_direct(
     - 'auto': Direct publish to Vinted (default)
     - 'draft': Save as Vinted draft for manual review
     """
+    from backend.core.publish_trace import PublishTrace
+
+    trace = PublishTrace("direct", draft_id=draft_id, user_id=str(current_user.id))
     try:
         from backend.core.vinted_client import VintedClient
         from backend.core.session import get_vinted_session
@@ -1756,6 +1825,9 @@ async def publish_draft_direct(
             else:
                 print(f"[WARNING] Photo not found: {photo_path}")
 
+        # Publish the edited versions (rendered derivatives) of edited photos
+        photos = await render_edited_paths(photos, str(current_user.id))
+
         if not photos:
             print(f"[ERROR] No valid photos for draft {draft_id}")
             return {
@@ -1788,6 +1860,9 @@ async def publish_draft_direct(
 
         print(f"[INFO] Publishing: {title[:50]}... ({len(photos)} photos, {price}€)")
 
+        # Per-step timeline of the run (stored with the publish log)
+        trace.begin()
+
         # Initialize VintedClient with anti-detection
         async with VintedClient(headless=True) as client:
             await client.init()
@@ -1816,6 +1891,7 @@ async def publish_draft_direct(
 
             if not success:
                 print(f"[ERROR] Publish workflow failed: {error_message}")
+                trace.finish("failed")
                 return {
                     "ok": False,
                     "draft_id": draft_id,
@@ -1831,6 +1907,8 @@ async def publish_draft_direct(
                 get_store().update_draft_vinted_info(draft_id, vinted_draft_url, vinted_draft_id, publish_mode)
 
                 print(f"[SUCCESS] Vinted draft created: {vinted_draft_url}")
+                trace.listing_url = vinted_draft_url
+                trace.finish("ok")
 
                 return {
                     "ok": True,
@@ -1848,6 +1926,8 @@ async def publish_draft_direct(
                 get_store().update_draft_status(draft_id, "published")
 
                 print(f"[SUCCESS] Published to Vinted: {listing_url}")
+                trace.listing_url = listing_url
+                trace.finish("ok")
 
                 return {
                     "ok": True,
@@ -1866,6 +1946,8 @@ async def publish_draft_direct(
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Erreur lors de la publication: {str(e)}")
+    finally:
+        trace.end()
 
 
 @router.post("/photos/analyze")
@@ -3,6 +3,8 @@ from backend.settings import settings
 from backend.core.monitoring import get_system_health, get_system_metrics
 from backend.core.job_wrapper import get_job_stats
 from backend.core.circuit_breaker import get_all_circuit_states
+from backend.core.browser_pool import get_browser_pool
+from backend.core.resource_policy import get_resource_policy
 
 router = APIRouter(tags=["health"])
 
@@ -81,3 +83,73 @@ async def circuit_breaker_status():
     return {
         "circuit_breakers": get_all_circuit_states()
     }
+
+
+@router.get("/health/browser-pool")
+async def browser_pool_status():
+    """
+    Get status of the warm Chromium browser pool
+
+    Returns:
+        - Browsers (active leases, uses, warm contexts, RSS, age)
+        - Leases, queued acquires, warm context hits
+        - Launches and recycling counters
+        - Request interception totals (blocked requests, estimated bytes saved)
+    """
+    return {
+        **get_browser_pool(settings.PLAYWRIGHT_HEADLESS).get_stats(),
+        "resources": get_resource_policy().get_stats(),
+    }
+
+
+@router.get("/health/publish-queue")
+async def publish_queue_status():
+    """
+    Get status of the publish queue and worker
+
+    Returns:
+        - Queue depth and how long the oldest due job has waited
+        - Worker stats (slots, in-flight jobs, durations) when it runs in this process
+    """
+    import asyncio
+    from datetime import datetime
+    from backend.db import get_publish_queue_depth
+    from backend.playwright_worker import PUBLISH_WORKER_IN_APP, get_publish_worker
+
+    depth, oldest = await asyncio.to_thread(get_publish_queue_depth)
+    return {
+        "queue_depth": depth,
+        "oldest_wait_seconds": (
+            max(0, round((datetime.utcnow() - oldest).total_seconds())) if oldest else 0
+        ),
+        "worker": get_publish_worker().get_stats() if PUBLISH_WORKER_IN_APP else None,
+    }
+
+
+@router.get("/health/vinted-cache")
+async def vinted_cache_status():
+    """
+    Get status of the Vinted API HTTP cache
+
+    Returns:
+        - Entries in memory, disk store directory, per-endpoint TTLs
+        - Hits, 304 revalidations, misses, evictions, invalidations
+        - Hit rate (requests answered without downloading a body)
+    """
+    from backend.core.http_cache import get_http_cache
+
+    return get_http_cache().get_stats()
+
+
+@router.get("/health/http-clients")
+async def http_clients_status():
+    """
+    Get status of the shared HTTP client pools
+
+    Returns:
+        - Whether HTTP/2 is on (needs the `h2` package)
+        - Per upstream: requests, new connections, connection reuse ratio
+    """
+    from backend.core.http_clients import get_http_clients
+
+    return get_http_clients().get_stats()
@@ -2,20 +2,59 @@
 Bulk Image Editing API (Dotb feature)
 Handles batch photo operations: crop, rotate, brightness, watermark, background removal
 """
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form, Query, Request, Response
+from fastapi.responses import FileResponse
+from typing import Any, Dict, List, Optional, Union, Literal
 from backend.core.auth import get_current_user, User
+from backend.services.image_pipeline import run_chain, create_image_job, image_jobs
+from backend.services.photo_edits import (
+    allowed_photo_file,
+    get_edits,
+    set_edits,
+    make_edit_handler,
+    photo_version,
+    render_edited,
+    render_variant
+)
+from backend.services.derivative_cache import get_derivative_cache
+from backend.services.background_removal import (
+    get_background_removal_worker,
+    rembg_available
+)
 from pydantic import BaseModel, Field
 from datetime import datetime
 import os
 import uuid
 from pathlib import Path
-from PIL import Image, ImageEnhance, ImageDraw, ImageFont
+from PIL import Image
 import traceback
 
+from backend.api.v1.routers.bulk import resolve_photo_path
+
 router = APIRouter(prefix="/images", tags=["images"])
 
 
+def _resolve_paths(image_paths: List[str]) -> List[str]:
+    """Resolve photo URLs/paths as stored in drafts to files on disk"""
+    return [resolve_photo_path(path) for path in image_paths]
+
+
+def _resolve_upload_photo(photo_path: str) -> str:
+    """
+    Resolve a photo reference to an uploaded image under DATA_DIR/temp_photos
+    (404 for anything else: database, logs, session files...)
+    """
+    resolved = allowed_photo_file(resolve_photo_path(photo_path))
+    if resolved is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    try:
+        with Image.open(resolved) as img:
+            img.verify()
+    except Exception:
+        raise HTTPException(status_code=404, detail="Photo not found")
+    return resolved
+
+
 # Pydantic models for image editing operations
 class BulkCropRequest(BaseModel):
     """Request to crop multiple images"""
@@ -55,6 +94,244 @@ class BulkRemoveBackgroundRequest(BaseModel):
     mode: str = Field("auto", description="Mode: auto, white, transparent")
 
 
+class CropOperation(BaseModel):
+    """Crop step of an image operation chain"""
+    op: Literal["crop"] = "crop"
+    x: int = Field(..., ge=0, description="X coordinate of crop start")
+    y: int = Field(..., ge=0, description="Y coordinate of crop start")
+    width: int = Field(..., gt=0, description="Width of crop area")
+    height: int = Field(..., gt=0, description="Height of crop area")
+
+
+class RotateOperation(BaseModel):
+    """Rotate step of an image operation chain"""
+    op: Literal["rotate"] = "rotate"
+    angle: int = Field(..., description="Rotation angle in degrees (90, 180, 270, or custom)")
+
+
+class AdjustOperation(BaseModel):
+    """Brightness/contrast/saturation step of an image operation chain"""
+    op: Literal["adjust"] = "adjust"
+    brightness: float = Field(1.0, ge=0.0, le=2.0, description="Brightness factor (1.0 = no change)")
+    contrast: float = Field(1.0, ge=0.0, le=2.0, description="Contrast factor (1.0 = no change)")
+    saturation: Optional[float] = Field(None, ge=0.0, le=2.0, description="Saturation factor (optional)")
+
+
+class WatermarkOperation(BaseModel):
+    """Watermark step of an image operation chain"""
+    op: Literal["watermark"] = "watermark"
+    text: str = Field(..., max_length=100, description="Watermark text")
+    position: str = Field("bottom-right", description="Position: top-left, top-right, bottom-left, bottom-right, center")
+    opacity: float = Field(0.5, ge=0.0, le=1.0, description="Watermark opacity (0.0 to 1.0)")
+    font_size: int = Field(24, gt=0, le=200, description="Font size in pixels")
+
+
+ImageOperation = Union[CropOperation, RotateOperation, AdjustOperation, WatermarkOperation]
+
+
+class PhotoEditsRequest(BaseModel):
+    """Replace the whole edit list of one photo"""
+    path: str
+    operations: List[ImageOperation] = Field(default_factory=list, description="Operations applied in order (empty = original)")
+
+
+class ImagePipelineRequest(BaseModel):
+    """Request to apply an ordered chain of edits to multiple images"""
+    image_paths: List[str] = Field(..., min_length=1)
+    operations: List[ImageOperation] = Field(..., min_length=1, description="Operations applied in order")
+
+
+@router.post("/pipeline")
+async def run_image_pipeline(
+    request: ImagePipelineRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Apply an ordered chain of edits to multiple images in the background
+
+    Edits are non-destructive: the operations are appended to each photo's
+    edit list and the result is rendered once as a cached derivative
+    (original decoded once, encoded once). Images are processed in
+    parallel on a process pool.
+
+    Request body:
+    - image_paths: List of image paths to edit
+    - operations: Ordered list of {"op": "crop"|"rotate"|"adjust"|"watermark", ...}
+
+    Returns: job_id to poll with GET /images/jobs/{job_id}
+    """
+    try:
+        operations = [op.model_dump() for op in request.operations]
+        job_id = create_image_job(
+            str(current_user.id),
+            _resolve_paths(request.image_paths),
+            operations,
+            handler=make_edit_handler(str(current_user.id))
+        )
+
+        print(f"[IMAGE] Job {job_id} queued: {len(request.image_paths)} images, chain={[op['op'] for op in operations]}")
+
+        return {
+            "ok": True,
+            "job_id": job_id,
+            "status": "queued",
+            "total": len(request.image_paths)
+        }
+
+    except Exception as e:
+        print(f"[ERROR] Image pipeline failed: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Image pipeline failed: {str(e)}")
+
+
+@router.get("/jobs/{job_id}")
+async def get_image_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get progress of a background image job
+
+    Returns status, processed/failed counts, progress percentage and,
+    once completed, per-image results
+    """
+    job = image_jobs.get(job_id)
+    if not job or job["user_id"] != str(current_user.id):
+        raise HTTPException(status_code=404, detail="Image job not found")
+
+    return {key: value for key, value in job.items() if key != "user_id" and not key.startswith("_")}
+
+
+@router.get("/photo")
+async def get_edited_photo(
+    request: Request,
+    path: str = Query(..., description="Photo URL or path as stored in the draft"),
+    w: Optional[int] = Query(None, ge=16, le=4096, description="Max width (rounded up to a variant width)"),
+    fmt: Optional[Literal["webp", "jpeg", "png"]] = Query(None, description="Output format"),
+    v: Optional[str] = Query(None, description="Content version (cache buster)"),
+    u: Optional[str] = Query(None, description="Owner whose edits are applied")
+):
+    """
+    Serve a photo with its edits applied, optionally as a resized variant
+
+    Variants (e.g. ?w=320&fmt=webp) are rendered once into the derivative
+    cache. Responses carry a strong ETag (content-addressed) and support
+    Range requests; URLs whose `v` matches the current content version are
+    marked immutable. Like the /temp_photos static mount, this endpoint is
+    public so it can be used directly in <img> tags: it only serves images
+    from the upload folders.
+    """
+    original = _resolve_upload_photo(path)
+    operations = get_edits(original, u)
+    try:
+        rendered = await render_variant(original, operations, w, fmt)
+        if rendered == original:
+            etag = await get_derivative_cache().original_hash(original)
+        else:
+            etag = Path(rendered).stem
+    except Exception as e:
+        print(f"[ERROR] Failed to render {path}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to render photo: {str(e)}")
+
+    if v is not None and v == photo_version(path, operations):
+        cache_control = "public, max-age=31536000, immutable"
+    else:
+        cache_control = "public, no-cache"
+    headers = {"ETag": f'"{etag}"', "Cache-Control": cache_control}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(rendered, headers=headers)
+
+
+@router.get("/edits")
+async def get_photo_edits(
+    path: str = Query(..., description="Photo URL or path"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get the edit operations recorded for a photo (the current user's edits)
+    """
+    operations = get_edits(_resolve_upload_photo(path), str(current_user.id))
+    return {
+        "path": path,
+        "operations": operations,
+        "version": photo_version(path, operations) if operations else None
+    }
+
+
+@router.put("/edits")
+async def replace_photo_edits(
+    request: PhotoEditsRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Replace the whole edit list of a photo and render the result once
+
+    Send an empty list to revert to the original.
+    """
+    original = _resolve_upload_photo(request.path)
+
+    operations = [op.model_dump() for op in request.operations]
+    try:
+        await render_edited(original, operations)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid edits: {str(e)}")
+
+    set_edits(original, operations, str(current_user.id))
+    return {
+        "ok": True,
+        "path": request.path,
+        "operations": operations,
+        "version": photo_version(request.path, operations) if operations else None
+    }
+
+
+@router.post("/edits/undo")
+async def undo_photo_edit(
+    path: str = Query(..., description="Photo URL or path"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Remove the last edit operation of a photo (no re-upload needed)
+    """
+    original = _resolve_upload_photo(path)
+    operations = get_edits(original, str(current_user.id))
+    if not operations:
+        raise HTTPException(status_code=400, detail="Photo has no edits to undo")
+
+    operations = operations[:-1]
+    set_edits(original, operations, str(current_user.id))
+    return {
+        "ok": True,
+        "path": path,
+        "operations": operations,
+        "version": photo_version(path, operations) if operations else None
+    }
+
+
+@router.delete("/edits")
+async def revert_photo_edits(
+    path: str = Query(..., description="Photo URL or path"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Drop all edits of a photo and go back to the original
+    """
+    set_edits(_resolve_upload_photo(path), [], str(current_user.id))
+    return {"ok": True, "path": path, "operations": []}
+
+
+@router.get("/derivatives/stats")
+async def get_derivative_cache_stats(current_user: User = Depends(get_current_user)):
+    """
+    Derivative cache stats: entries, size, hits/misses, renders, evictions
+    """
+    return get_derivative_cache().get_stats()
+
+
 @router.post("/bulk/crop")
 async def bulk_crop_images(
     request: BulkCropRequest,
@@ -72,60 +349,21 @@ async def bulk_crop_images(
     - width, height: Dimensions of crop area
     """
     try:
-        results = {
-            "success": [],
-            "failed": [],
-            "total": len(request.image_paths)
-        }
-
-        for path in request.image_paths:
-            try:
-                # Validate file exists
-                if not os.path.exists(path):
-                    results["failed"].append({
-                        "path": path,
-                        "error": "File not found"
-                    })
-                    continue
-
-                # Open image
-                img = Image.open(path)
-
-                # Validate crop dimensions
-                img_width, img_height = img.size
-                if request.x + request.width > img_width or request.y + request.height > img_height:
-                    results["failed"].append({
-                        "path": path,
-                        "error": f"Crop area exceeds image dimensions ({img_width}x{img_height})"
-                    })
-                    continue
-
-                # Crop image
-                cropped = img.crop((
-                    request.x,
-                    request.y,
-                    request.x + request.width,
-                    request.y + request.height
-                ))
-
-                # Save cropped image (overwrite original)
-                cropped.save(path, quality=95, optimize=True)
-
-                results["success"].append({
-                    "path": path,
-                    "operation": "crop",
-                    "dimensions": f"{request.width}x{request.height}",
-                    "original_size": f"{img_width}x{img_height}"
-                })
-
-                print(f"[IMAGE] Cropped {path} to {request.width}x{request.height}")
-
-            except Exception as e:
-                results["failed"].append({
-                    "path": path,
-                    "error": str(e)
-                })
-                print(f"[ERROR] Failed to crop {path}: {e}")
+        results = await run_chain(_resolve_paths(request.image_paths), [{
+            "op": "crop",
+            "x": request.x,
+            "y": request.y,
+            "width": request.width,
+            "height": request.height
+        }], handler=make_edit_handler(str(current_user.id)))
+
+        for entry in results["success"]:
+            entry.update({
+                "operation": "crop",
+                "dimensions": f"{request.width}x{request.height}"
+            })
+
+        print(f"[IMAGE] Cropped {len(results['success'])} images to {request.width}x{request.height}")
 
         return {
             "ok": True,
@@ -151,49 +389,16 @@ async def bulk_rotate_images(
     Useful for correcting photo orientation in batch.
     """
     try:
-        results = {
-            "success": [],
-            "failed": [],
-            "total": len(request.image_paths)
-        }
+        results = await run_chain(
+            _resolve_paths(request.image_paths),
+            [{"op": "rotate", "angle": request.angle}],
+            handler=make_edit_handler(str(current_user.id))
+        )
 
-        for path in request.image_paths:
-            try:
-                # Validate file exists
-                if not os.path.exists(path):
-                    results["failed"].append({
-                        "path": path,
-                        "error": "File not found"
-                    })
-                    continue
-
-                # Open image
-                img = Image.open(path)
-                original_size = img.size
-
-                # Rotate image (negative angle for clockwise rotation)
-                # expand=True ensures the entire rotated image is visible
-                rotated = img.rotate(-request.angle, expand=True, resample=Image.BICUBIC)
-
-                # Save rotated image (overwrite original)
-                rotated.save(path, quality=95, optimize=True)
-
-                results["success"].append({
-                    "path": path,
-                    "operation": "rotate",
-                    "angle": request.angle,
-                    "original_size": f"{original_size[0]}x{original_size[1]}",
-                    "new_size": f"{rotated.size[0]}x{rotated.size[1]}"
-                })
-
-                print(f"[IMAGE] Rotated {path} by {request.angle}°")
-
-            except Exception as e:
-                results["failed"].append({
-                    "path": path,
-                    "error": str(e)
-                })
-                print(f"[ERROR] Failed to rotate {path}: {e}")
+        for entry in results["success"]:
+            entry.update({"operation": "rotate", "angle": request.angle})
+
+        print(f"[IMAGE] Rotated {len(results['success'])} images by {request.angle}°")
 
         return {
             "ok": True,
@@ -224,69 +429,23 @@ async def bulk_adjust_images(
     - > 1.0 = increase
     """
     try:
-        results = {
-            "success": [],
-            "failed": [],
-            "total": len(request.image_paths)
+        adjustments = {
+            "brightness": request.brightness,
+            "contrast": request.contrast
         }
+        if request.saturation is not None:
+            adjustments["saturation"] = request.saturation
+
+        results = await run_chain(
+            _resolve_paths(request.image_paths),
+            [{"op": "adjust", **adjustments}],
+            handler=make_edit_handler(str(current_user.id))
+        )
 
-        for path in request.image_paths:
-            try:
-                # Validate file exists
-                if not os.path.exists(path):
-                    results["failed"].append({
-                        "path": path,
-                        "error": "File not found"
-                    })
-                    continue
-
-                # Open image
-                img = Image.open(path)
-                original_mode = img.mode
-
-                # Convert to RGB if necessary (some formats don't support enhancement)
-                if img.mode not in ('RGB', 'RGBA'):
-                    img = img.convert('RGB')
-
-                # Apply brightness adjustment
-                if request.brightness != 1.0:
-                    enhancer = ImageEnhance.Brightness(img)
-                    img = enhancer.enhance(request.brightness)
-
-                # Apply contrast adjustment
-                if request.contrast != 1.0:
-                    enhancer = ImageEnhance.Contrast(img)
-                    img = enhancer.enhance(request.contrast)
-
-                # Apply saturation adjustment if specified
-                if request.saturation is not None and request.saturation != 1.0:
-                    enhancer = ImageEnhance.Color(img)
-                    img = enhancer.enhance(request.saturation)
-
-                # Save adjusted image (overwrite original)
-                img.save(path, quality=95, optimize=True)
-
-                adjustments = {
-                    "brightness": request.brightness,
-                    "contrast": request.contrast
-                }
-                if request.saturation is not None:
-                    adjustments["saturation"] = request.saturation
-
-                results["success"].append({
-                    "path": path,
-                    "operation": "adjust",
-                    **adjustments
-                })
-
-                print(f"[IMAGE] Adjusted {path}: brightness={request.brightness}, contrast={request.contrast}, saturation={request.saturation}")
-
-            except Exception as e:
-                results["failed"].append({
-                    "path": path,
-                    "error": str(e)
-                })
-                print(f"[ERROR] Failed to adjust {path}: {e}")
+        for entry in results["success"]:
+            entry.update({"operation": "adjust", **adjustments})
+
+        print(f"[IMAGE] Adjusted {len(results['success'])} images: brightness={request.brightness}, contrast={request.contrast}, saturation={request.saturation}")
 
         return {
             "ok": True,
@@ -314,100 +473,23 @@ async def bulk_watermark_images(
     Positions: top-left, top-right, bottom-left, bottom-right, center
     """
     try:
-        results = {
-            "success": [],
-            "failed": [],
-            "total": len(request.image_paths)
-        }
-
-        for path in request.image_paths:
-            try:
-                # Validate file exists
-                if not os.path.exists(path):
-                    results["failed"].append({
-                        "path": path,
-                        "error": "File not found"
-                    })
-                    continue
-
-                # Open image
-                img = Image.open(path)
-
-                # Convert to RGBA for transparency support
-                if img.mode != 'RGBA':
-                    img = img.convert('RGBA')
-
-                # Create a transparent overlay
-                overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
-                draw = ImageDraw.Draw(overlay)
-
-                # Try to load a font, fallback to default if not available
-                try:
-                    font = ImageFont.truetype("arial.ttf", request.font_size)
-                except:
-                    try:
-                        # Try common Windows font path
-                        font = ImageFont.truetype("C:\\Windows\\Fonts\\arial.ttf", request.font_size)
-                    except:
-                        # Fallback to default font
-                        font = ImageFont.load_default()
-
-                # Get text bounding box to calculate position
-                bbox = draw.textbbox((0, 0), request.text, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-
-                # Calculate position based on request
-                margin = 20
-                if request.position == "top-left":
-                    position = (margin, margin)
-                elif request.position == "top-right":
-                    position = (img.width - text_width - margin, margin)
-                elif request.position == "bottom-left":
-                    position = (margin, img.height - text_height - margin)
-                elif request.position == "bottom-right":
-                    position = (img.width - text_width - margin, img.height - text_height - margin)
-                elif request.position == "center":
-                    position = ((img.width - text_width) // 2, (img.height - text_height) // 2)
-                else:
-                    position = (img.width - text_width - margin, img.height - text_height - margin)
-
-                # Calculate opacity (0-255 from 0.0-1.0)
-                opacity = int(request.opacity * 255)
-
-                # Draw text with shadow for better visibility
-                shadow_offset = 2
-                draw.text((position[0] + shadow_offset, position[1] + shadow_offset),
-                         request.text, font=font, fill=(0, 0, 0, opacity // 2))
-                draw.text(position, request.text, font=font, fill=(255, 255, 255, opacity))
-
-                # Composite overlay onto image
-                watermarked = Image.alpha_composite(img, overlay)
-
-                # Convert back to RGB for JPEG compatibility
-                if path.lower().endswith(('.jpg', '.jpeg')):
-                    watermarked = watermarked.convert('RGB')
-
-                # Save watermarked image (overwrite original)
-                watermarked.save(path, quality=95, optimize=True)
-
-                results["success"].append({
-                    "path": path,
-                    "operation": "watermark",
-                    "text": request.text,
-                    "position": request.position,
-                    "opacity": request.opacity
-                })
-
-                print(f"[IMAGE] Added watermark to {path}: '{request.text}' at {request.position}")
-
-            except Exception as e:
-                results["failed"].append({
-                    "path": path,
-                    "error": str(e)
-                })
-                print(f"[ERROR] Failed to add watermark to {path}: {e}")
-                traceback.print_exc()
+        results = await run_chain(_resolve_paths(request.image_paths), [{
+            "op": "watermark",
+            "text": request.text,
+            "position": request.position,
+            "opacity": request.opacity,
+            "font_size": request.font_size
+        }], handler=make_edit_handler(str(current_user.id)))
+
+        for entry in results["success"]:
+            entry.update({
+                "operation": "watermark",
+                "text": request.text,
+                "position": request.position,
+                "opacity": request.opacity
+            })
+
+        print(f"[IMAGE] Added watermark to {len(results['success'])} images: '{request.text}' at {request.position}")
 
         return {
             "ok": True,
@@ -436,14 +518,14 @@ async def bulk_remove_background(
     - auto: AI detects and removes background (requires rembg)
     - white: Replace background with white
     - transparent: Make background transparent (PNG)
+
+    Only uploaded photos are accepted; each result `path` is a rendered
+    derivative, the original is never modified.
     """
     try:
         # Check if rembg is available
-        try:
-            from rembg import remove as rembg_remove
-            rembg_available = True
-        except ImportError:
-            rembg_available = False
+        available = rembg_available()
+        if not available:
             print("[WARNING] rembg not installed. Install with: pip install rembg")
             if request.mode == "auto":
                 raise HTTPException(
@@ -451,127 +533,54 @@ async def bulk_remove_background(
                     detail="Background removal with 'auto' mode requires rembg library. Install with: pip install rembg"
                 )
 
-        results = {
-            "success": [],
-            "failed": [],
-            "total": len(request.image_paths)
-        }
-
-        for path in request.image_paths:
-            try:
-                # Validate file exists
-                if not os.path.exists(path):
-                    results["failed"].append({
-                        "path": path,
-                        "error": "File not found"
-                    })
-                    continue
-
-                # Open image
-                img = Image.open(path)
-                original_format = img.format
-
-                if request.mode == "auto" and rembg_available:
-                    # AI-powered background removal with rembg
-                    with open(path, 'rb') as input_file:
-                        input_data = input_file.read()
-
-                    output_data = rembg_remove(input_data)
-
-                    # Save as PNG to preserve transparency
-                    output_path = path
-                    if not path.lower().endswith('.png'):
-                        output_path = path.rsplit('.', 1)[0] + '.png'
-
-                    with open(output_path, 'wb') as output_file:
-                        output_file.write(output_data)
-
-                    results["success"].append({
-                        "path": output_path,
-                        "operation": "remove_background",
-                        "mode": request.mode,
-                        "method": "rembg_ai"
-                    })
-
-                elif request.mode == "white":
-                    # Replace with white background
-                    if img.mode == 'RGBA':
-                        # Create white background
-                        white_bg = Image.new('RGB', img.size, (255, 255, 255))
-                        white_bg.paste(img, mask=img.split()[3])  # Use alpha channel as mask
-                        img = white_bg
-                    else:
-                        # Convert to RGB if not already
-                        img = img.convert('RGB')
-
-                    img.save(path, quality=95, optimize=True)
-
-                    results["success"].append({
-                        "path": path,
-                        "operation": "remove_background",
-                        "mode": request.mode,
-                        "method": "white_replacement"
-                    })
-
-                elif request.mode == "transparent":
-                    # Make background transparent (simple threshold-based method)
-                    # Note: This is a simple implementation. For better results, use rembg with mode='auto'
-
-                    if img.mode != 'RGBA':
-                        img = img.convert('RGBA')
-
-                    # Get pixel data
-                    pixels = img.load()
-                    width, height = img.size
-
-                    # Simple threshold: make white/light pixels transparent
-                    # This works best for products on white backgrounds
-                    threshold = 240
-                    for y in range(height):
-                        for x in range(width):
-                            r, g, b, a = pixels[x, y]
-                            # If pixel is close to white, make it transparent
-                            if r > threshold and g > threshold and b > threshold:
-                                pixels[x, y] = (r, g, b, 0)
-
-                    # Save as PNG
-                    output_path = path
-                    if not path.lower().endswith('.png'):
-                        output_path = path.rsplit('.', 1)[0] + '.png'
-
-                    img.save(output_path, 'PNG', quality=95, optimize=True)
-
-                    results["success"].append({
-                        "path": output_path,
-                        "operation": "remove_background",
-                        "mode": request.mode,
-                        "method": "threshold_transparency",
-                        "note": "For better results, use mode='auto' with rembg installed"
-                    })
-
-                else:
-                    results["failed"].append({
-                        "path": path,
-                        "error": f"Invalid mode: {request.mode}"
-                    })
-                    continue
-
-                print(f"[IMAGE] Removed background from {path} using mode={request.mode}")
-
-            except Exception as e:
-                results["failed"].append({
-                    "path": path,
-                    "error": str(e)
-                })
-                print(f"[ERROR] Failed to remove background from {path}: {e}")
-                traceback.print_exc()
+        if request.mode == "auto":
+            # AI-powered background removal on the shared rembg session
+            worker = get_background_removal_worker()
+            job_id = await worker.submit(str(current_user.id), _resolve_paths(request.image_paths))
+            results = await worker.wait(job_id)
+
+            print(f"[IMAGE] Removed background from {len(results['success'])} images using mode=auto")
+
+            return {
+                "ok": True,
+                "message": f"Processed {len(results['success'])} images ({len(results['failed'])} failed)",
+                "results": results,
+                "rembg_available": True,
+                "note": None
+            }
+
+        if request.mode not in ("white", "transparent"):
+            raise HTTPException(status_code=400, detail=f"Invalid mode: {request.mode}")
+
+        # Rendered as a derivative (PNG for transparency): the original is untouched
+        operations = [{"op": "background", "mode": request.mode}]
+        ext = ".png" if request.mode == "transparent" else None
+
+        async def handler(path: str, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+            original = allowed_photo_file(path)
+            if original is None:
+                raise FileNotFoundError("File not found")
+            derivative = await get_derivative_cache().get_or_render(original, ops, ext=ext)
+            entry = {
+                "path": derivative,
+                "original": original,
+                "operation": "remove_background",
+                "mode": request.mode,
+                "method": "white_replacement" if request.mode == "white" else "threshold_transparency"
+            }
+            if request.mode == "transparent":
+                entry["note"] = "For better results, use mode='auto' with rembg installed"
+            return entry
+
+        results = await run_chain(_resolve_paths(request.image_paths), operations, handler=handler)
+        print(f"[IMAGE] Removed background from {len(results['success'])} images using mode={request.mode}")
 
         return {
             "ok": True,
             "message": f"Processed {len(results['success'])} images ({len(results['failed'])} failed)",
             "results": results,
-            "rembg_available": rembg_available,
-            "note": "For AI-powered background removal, install rembg: pip install rembg" if not rembg_available else None
+            "rembg_available": available,
+            "note": "For AI-powered background removal, install rembg: pip install rembg" if not available else None
         }
 
     except HTTPException:
@@ -582,6 +591,51 @@ async def bulk_remove_background(
         raise HTTPException(status_code=500, detail=f"Bulk background removal failed: {str(e)}")
 
 
+@router.post("/remove-background/jobs")
+async def queue_background_removal(
+    request: BulkRemoveBackgroundRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue AI background removal (rembg) as a background job
+
+    Images go through the shared rembg worker in batches; poll progress
+    with GET /images/jobs/{job_id}. Only mode 'auto' is supported here.
+    """
+    if request.mode != "auto":
+        raise HTTPException(status_code=400, detail="Queued background removal only supports mode 'auto'")
+    if not rembg_available():
+        raise HTTPException(
+            status_code=400,
+            detail="Background removal with 'auto' mode requires rembg library. Install with: pip install rembg"
+        )
+
+    try:
+        worker = get_background_removal_worker()
+        job_id = await worker.submit(str(current_user.id), _resolve_paths(request.image_paths))
+
+        return {
+            "ok": True,
+            "job_id": job_id,
+            "status": image_jobs[job_id]["status"],
+            "total": len(request.image_paths),
+            "queue_depth": worker.get_stats()["queue_depth"]
+        }
+
+    except Exception as e:
+        print(f"[ERROR] Failed to queue background removal: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Failed to queue background removal: {str(e)}")
+
+
+@router.get("/remove-background/stats")
+async def get_background_removal_stats(current_user: User = Depends(get_current_user)):
+    """
+    Get rembg worker stats: queue depth, images processed, images/second
+    """
+    return get_background_removal_worker().get_stats()
+
+
 @router.get("/presets")
 async def get_editing_presets(current_user: User = Depends(get_current_user)):
     """
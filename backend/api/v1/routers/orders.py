@@ -2,14 +2,15 @@
 Orders management and export endpoints
 Handles order tracking, status management, and CSV export for accounting
 """
-from typing import List, Optional
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterator
+from datetime import datetime, time
 from fastapi import APIRouter, HTTPException, Depends, Response, Body
 from fastapi.responses import StreamingResponse
 from backend.core.auth import get_current_user, User
 from pydantic import BaseModel, Field
 import csv
 import io
+import json
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -36,78 +37,203 @@ class FeedbackTemplate(BaseModel):
 from backend.core.storage import get_store
 
 
-@router.get("/export/csv")
-async def export_orders_csv(
+# Columns written by the accounting exports (header label, order key)
+EXPORT_COLUMNS = [
+    ("Order ID", "id"),
+    ("Date", "order_date"),
+    ("Item Title", "item_title"),
+    ("Price (€)", "price"),
+    ("Buyer", "buyer_name"),
+    ("Status", "status"),
+    ("Tracking Number", "tracking_number"),
+    ("Notes", "notes"),
+]
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Rows buffered before a chunk is handed to the response
+EXPORT_CHUNK_ROWS = 500
+
+
+def _parse_export_date(value: Optional[str], name: str, end_of_day: bool = False) -> Optional[str]:
+    """
+    Validate an ISO date filter and normalize it for comparison in SQL
+    (a bare date as upper bound covers that whole day)
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: expected ISO format (YYYY-MM-DD)")
+    if end_of_day and len(value) == 10:
+        parsed = datetime.combine(parsed.date(), time.max)
+    return parsed.isoformat()
+
+
+def _iter_csv(orders: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode orders as CSV, yielding one chunk every EXPORT_CHUNK_ROWS rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([label for label, _ in EXPORT_COLUMNS])
+
+    rows = 0
+    for order in orders:
+        writer.writerow([order.get(key) for _, key in EXPORT_COLUMNS])
+        rows += 1
+        if rows % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _iter_jsonl(orders: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode orders as JSON Lines, one object per order"""
+    lines = []
+    for order in orders:
+        lines.append(json.dumps({key: order.get(key) for _, key in EXPORT_COLUMNS}, ensure_ascii=False))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file object that lets the Parquet writer be drained chunk by chunk"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _iter_parquet(orders: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode orders as Parquet, one row group per EXPORT_CHUNK_ROWS orders"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("id", pa.string()),
+        ("order_date", pa.string()),
+        ("item_title", pa.string()),
+        ("price", pa.float64()),
+        ("buyer_name", pa.string()),
+        ("status", pa.string()),
+        ("tracking_number", pa.string()),
+        ("notes", pa.string()),
+    ])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def write_batch(batch: List[Dict[str, Any]]):
+        columns = {name: [order.get(name) for order in batch] for name in schema.names}
+        writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+
+    batch: List[Dict[str, Any]] = []
+    for order in orders:
+        batch.append(order)
+        if len(batch) >= EXPORT_CHUNK_ROWS:
+            write_batch(batch)
+            batch = []
+            yield sink.drain()
+
+    if batch:
+        write_batch(batch)
+    writer.close()
+    yield sink.drain()
+
+
+@router.get("/export")
+async def export_orders(
     current_user: User = Depends(get_current_user),
+    format: str = "csv",
     status: Optional[str] = None,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None
 ):
     """
-    Export user orders to CSV format for accounting/record keeping
+    Export user orders for accounting/record keeping
+
+    Orders are filtered in SQL and streamed straight from the database
+    cursor, so exports are complete and memory does not grow with the
+    number of orders.
 
     Query parameters:
+    - format: csv (default), jsonl or parquet
     - status: Filter by order status (pending, shipped, completed, cancelled)
     - from_date: Start date filter (ISO format: YYYY-MM-DD)
     - to_date: End date filter (ISO format: YYYY-MM-DD)
 
-    Returns: CSV file with order details
+    Returns: Streamed file with order details
     """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    if format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(
+                status_code=400,
+                detail="Parquet export requires pyarrow library. Install with: pip install pyarrow"
+            )
+
+    from_iso = _parse_export_date(from_date, "from_date")
+    to_iso = _parse_export_date(to_date, "to_date", end_of_day=True)
+
     try:
-        # Get orders for current user from database
         store = get_store()
-        orders = store.get_user_orders(str(current_user.id), limit=10000)  # Get all orders for export
+        orders = store.iter_user_orders(
+            str(current_user.id),
+            status=status,
+            from_date=from_iso,
+            to_date=to_iso
+        )
 
-        # Apply filters
-        if status:
-            orders = [o for o in orders if o.get("status") == status]
-
-        if from_date:
-            from_dt = datetime.fromisoformat(from_date)
-            orders = [o for o in orders if o.get("order_date") and datetime.fromisoformat(o["order_date"]) >= from_dt]
-
-        if to_date:
-            to_dt = datetime.fromisoformat(to_date)
-            orders = [o for o in orders if o.get("order_date") and datetime.fromisoformat(o["order_date"]) <= to_dt]
-
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header
-        writer.writerow([
-            "Order ID",
-            "Date",
-            "Item Title",
-            "Price (€)",
-            "Buyer",
-            "Status",
-            "Tracking Number",
-            "Notes"
-        ])
-
-        # Write data rows
-        for order in orders:
-            writer.writerow([
-                order.get("id", ""),
-                order.get("order_date", ""),
-                order.get("item_title", ""),
-                order.get("price", 0),
-                order.get("buyer_name", ""),
-                order.get("status", ""),
-                order.get("tracking_number", ""),
-                order.get("notes", "")
-            ])
+        encoders = {"csv": _iter_csv, "jsonl": _iter_jsonl, "parquet": _iter_parquet}
+        media_type, extension = EXPORT_FORMATS[format]
 
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"vinted_orders_{timestamp}.csv"
+        filename = f"vinted_orders_{timestamp}.{extension}"
 
-        # Return CSV as downloadable file
-        csv_content = output.getvalue()
-        return Response(
-            content=csv_content.encode('utf-8'),
-            media_type="text/csv",
+        # Sync generator: Starlette drives it in the threadpool, keeping
+        # SQLite reads off the event loop
+        return StreamingResponse(
+            encoders[format](orders),
+            media_type=media_type,
             headers={
                 "Content-Disposition": f"attachment; filename={filename}"
             }
@@ -120,6 +246,32 @@ async def export_orders_csv(
         raise HTTPException(status_code=500, detail=f"Failed to export orders: {str(e)}")
 
 
+@router.get("/export/csv")
+async def export_orders_csv(
+    current_user: User = Depends(get_current_user),
+    status: Optional[str] = None,
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None
+):
+    """
+    Export user orders to CSV format for accounting/record keeping
+
+    Query parameters:
+    - status: Filter by order status (pending, shipped, completed, cancelled)
+    - from_date: Start date filter (ISO format: YYYY-MM-DD)
+    - to_date: End date filter (ISO format: YYYY-MM-DD)
+
+    Returns: CSV file with order details
+    """
+    return await export_orders(
+        current_user=current_user,
+        format="csv",
+        status=status,
+        from_date=from_date,
+        to_date=to_date
+    )
+
+
 @router.get("/list")
 async def list_orders(
     current_user: User = Depends(get_current_user),
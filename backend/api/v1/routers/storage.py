@@ -2,9 +2,10 @@
 Multi-Tier Storage API
 Handles photo storage across TEMP/HOT/COLD tiers with automatic lifecycle management
 """
-from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form
+from fastapi import APIRouter, HTTPException, Depends, File, UploadFile, Form, Query
 from typing import Optional, Dict, Any
 from backend.core.auth import get_current_user, User
+from backend.api.v1.routers.admin import require_super_admin
 from pydantic import BaseModel, Field
 from datetime import datetime
 import traceback
@@ -40,6 +41,11 @@ class PublishDraftRequest(BaseModel):
     photo_ids: list[str] = Field(..., description="List of photo IDs in this draft")
 
 
+class PhotoURLsRequest(BaseModel):
+    """Request for the URLs of several photos"""
+    photo_ids: list[str] = Field(..., description="Photo IDs (e.g. all photos of a drafts page)")
+
+
 class StorageStatsResponse(BaseModel):
     """Storage statistics response"""
     temp_count: int
@@ -245,6 +251,52 @@ async def get_lifecycle_metrics(
         raise HTTPException(status_code=500, detail=f"Failed to get lifecycle metrics: {str(e)}")
 
 
+@router.get("/metrics/dedup")
+async def get_dedup_metrics(current_user: User = Depends(get_current_user)):
+    """
+    Get storage deduplication metrics
+
+    Identical photos (same content) share one stored blob:
+    dedup ratio and bytes saved
+    """
+    try:
+        metrics = await storage_metrics.get_dedup_metrics()
+
+        logger.info(f"📊 Dedup: {metrics['photos']} photos in {metrics['blobs']} blobs (ratio {metrics['dedup_ratio']}, {metrics['saved_gb']} GB saved)")
+
+        return {
+            "ok": True,
+            "metrics": metrics
+        }
+
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to get dedup metrics: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Failed to get dedup metrics: {str(e)}")
+
+
+@router.get("/metrics/cache")
+async def get_read_cache_metrics(current_user: User = Depends(get_current_user)):
+    """
+    Get the local HOT/COLD read cache metrics
+
+    Hit rate, coalesced fills and egress avoided since startup, plus the
+    photo URL cache hit rate
+    """
+    try:
+        metrics = storage_metrics.get_read_cache_metrics()
+
+        return {
+            "ok": True,
+            "metrics": metrics
+        }
+
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to get read cache metrics: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Failed to get read cache metrics: {str(e)}")
+
+
 @router.get("/metrics/recommendations")
 async def get_optimization_recommendations(current_user: User = Depends(get_current_user)):
     """
@@ -304,6 +356,33 @@ async def get_photo_url(
         raise HTTPException(status_code=500, detail=f"Failed to get photo URL: {str(e)}")
 
 
+@router.post("/photos/urls")
+async def get_photo_urls(
+    request: PhotoURLsRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get CDN URLs for many photos at once
+
+    One metadata query for the whole list; URLs come from the in-process
+    URL cache (signed URLs are refreshed before they expire).
+    Unknown photo IDs are listed in `missing`.
+    """
+    try:
+        urls = await storage_manager.get_photo_urls(request.photo_ids)
+
+        return {
+            "ok": True,
+            "urls": urls,
+            "missing": [photo_id for photo_id in request.photo_ids if photo_id not in urls]
+        }
+
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to get photo URLs: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Failed to get photo URLs: {str(e)}")
+
+
 @router.get("/photo/{photo_id}/metadata")
 async def get_photo_metadata(
     photo_id: str,
@@ -409,8 +488,28 @@ async def get_user_storage_usage(current_user: User = Depends(get_current_user))
         raise HTTPException(status_code=500, detail=f"Failed to get user storage usage: {str(e)}")
 
 
+@router.get("/lifecycle/plan")
+async def get_lifecycle_plan(current_user: User = Depends(get_current_user)):
+    """
+    Dry run of the lifecycle job: photos (and bytes) due per step right now
+
+    Nothing is deleted or moved.
+    """
+    try:
+        plan = await lifecycle_manager.plan()
+        return {"ok": True, "plan": plan}
+
+    except Exception as e:
+        logger.error(f"[ERROR] Failed to plan lifecycle job: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Failed to plan lifecycle job: {str(e)}")
+
+
 @router.post("/lifecycle/run-now")
-async def run_lifecycle_now(current_user: User = Depends(get_current_user)):
+async def run_lifecycle_now(
+    dry_run: bool = Query(False, description="Only report what would be done"),
+    current_user: User = Depends(get_current_user)
+):
     """
     Manually trigger lifecycle job (admin only)
 
@@ -428,9 +527,9 @@ async def run_lifecycle_now(current_user: User = Depends(get_current_user)):
         # if not current_user.is_admin:
         #     raise HTTPException(status_code=403, detail="Admin access required")
 
-        logger.info(f"[PROCESS] Running lifecycle job manually (triggered by {current_user.user_id})")
+        logger.info(f"[PROCESS] Running lifecycle job manually (triggered by {current_user.user_id}, dry_run={dry_run})")
 
-        stats = await lifecycle_manager.run_daily_lifecycle()
+        stats = await lifecycle_manager.run_daily_lifecycle(dry_run=dry_run)
 
         logger.success(f"[OK] Lifecycle job completed: {stats}")
 
@@ -446,6 +545,35 @@ async def run_lifecycle_now(current_user: User = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=f"Lifecycle job failed: {str(e)}")
 
 
+@router.post("/usage/reconcile")
+async def reconcile_storage_usage(
+    fix: bool = Query(True, description="Rebuild the counters if drift is found"),
+    admin: dict = Depends(require_super_admin)
+):
+    """
+    Verify the storage usage counters against a full scan (super admin only)
+
+    Reports every counter that drifted from the actual photo_metadata /
+    photo_blobs contents. Normally runs automatically at 4 AM daily.
+    """
+    try:
+        from backend.storage.usage import reconcile_usage
+
+        logger.info(f"[PROCESS] Reconciling storage usage counters (triggered by {admin['email']}, fix={fix})")
+
+        report = reconcile_usage(fix=fix)
+
+        return {
+            "ok": True,
+            "report": report
+        }
+
+    except Exception as e:
+        logger.error(f"[ERROR] Storage usage reconciliation failed: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Storage usage reconciliation failed: {str(e)}")
+
+
 @router.get("/tiers/info")
 async def get_tier_info(current_user: User = Depends(get_current_user)):
     """
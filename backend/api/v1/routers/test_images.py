@@ -0,0 +1,169 @@
+"""
+Tests des chemins photo de /images : l'endpoint public /images/photo et le
+détourage ne touchent qu'aux images des dossiers d'upload, jamais à la base,
+aux logs ou à la session, et n'écrasent jamais l'original
+"""
+import os
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from backend.settings import settings
+
+if not hasattr(settings, "OPENAI_API_KEY"):
+    # Importer le router charge l'analyseur IA, qui exige une clé
+    object.__setattr__(settings, "OPENAI_API_KEY", "sk-test")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api.v1.routers import images
+from backend.core.auth import User, get_current_user
+from backend.services import derivative_cache
+from backend.services.background_removal import BackgroundRemovalWorker
+from backend.services import image_pipeline
+from backend.services.image_pipeline import image_jobs, prune_image_jobs
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """DATA_DIR (backend/data, relatif) pointe dans un dossier temporaire"""
+    monkeypatch.chdir(tmp_path)
+    data_dir = tmp_path / "backend" / "data"
+    (data_dir / "temp_photos" / "job1").mkdir(parents=True)
+    Image.new("RGB", (64, 48), "red").save(data_dir / "temp_photos" / "job1" / "photo_000.jpg")
+    (data_dir / "vbs.db").write_bytes(b"SQLite format 3\x00secret")
+    (data_dir / "app.log").write_text("token=secret\n")
+    (data_dir / "session.enc").write_bytes(b"encrypted-session")
+    monkeypatch.setattr(derivative_cache, "_cache", derivative_cache.DerivativeCache(str(data_dir / "derivatives")))
+    # Rendus sur un thread plutôt que sur le process pool
+    monkeypatch.setattr(derivative_cache, "run_in_pool", lambda fn, *args: asyncio.to_thread(fn, *args))
+
+    app = FastAPI()
+    app.include_router(images.router)
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="seller@example.com")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", [
+    "vbs.db",
+    "/vbs.db",
+    "backend/data/vbs.db",
+    "app.log",
+    "session.enc",
+    "temp_photos/../vbs.db",
+])
+def test_photo_endpoint_refuses_data_files(client, path):
+    """Les fichiers de DATA_DIR hors temp_photos renvoient 404"""
+    response = client.get("/images/photo", params={"path": path})
+    assert response.status_code == 404
+    assert b"secret" not in response.content
+
+
+def test_photo_endpoint_refuses_non_image_in_upload_folder(client):
+    """Un fichier non-image déposé dans temp_photos n'est pas servi"""
+    fake = os.path.join(settings.DATA_DIR, "temp_photos", "job1", "photo_001.jpg")
+    with open(fake, "wb") as f:
+        f.write(b"not an image")
+    response = client.get("/images/photo", params={"path": "/temp_photos/job1/photo_001.jpg"})
+    assert response.status_code == 404
+
+
+def test_photo_endpoint_serves_uploaded_photo(client):
+    """Une photo uploadée est servie"""
+    response = client.get("/images/photo", params={"path": "/temp_photos/job1/photo_000.jpg"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("image/")
+
+
+def test_white_background_writes_a_derivative(client, monkeypatch):
+    """Le mode white rend un dérivé : l'original reste intact, les fichiers hors upload échouent"""
+    # rembg (optionnel) n'est pas utile au mode white
+    monkeypatch.setattr(images, "rembg_available", lambda: False)
+    original = os.path.join(settings.DATA_DIR, "temp_photos", "job1", "photo_000.jpg")
+    before = open(original, "rb").read()
+    Image.new("RGBA", (8, 8), (0, 0, 0, 0)).save(os.path.join(settings.DATA_DIR, "stolen.png"))
+
+    response = client.post("/images/bulk/remove-background", json={
+        "image_paths": ["/temp_photos/job1/photo_000.jpg", "stolen.png"],
+        "mode": "white"
+    })
+
+    results = response.json()["results"]
+    assert [r["original"] for r in results["success"]] == [os.path.realpath(original)]
+    assert "/derivatives/" in results["success"][0]["path"]
+    assert [r["error"] for r in results["failed"]] == ["File not found"]
+    assert open(original, "rb").read() == before
+
+
+def fake_worker(remove) -> BackgroundRemovalWorker:
+    """Worker rembg sans modèle : `remove` remplace rembg.remove"""
+    worker = BackgroundRemovalWorker(batch_size=2)
+    worker.session = object()
+    worker._remove = lambda data, session: remove(data)
+    return worker
+
+
+def test_rembg_worker_keeps_originals_and_rejects_other_files(client):
+    """Le worker refuse les fichiers hors upload et écrit son PNG dans le cache de dérivés"""
+    original = os.path.join(settings.DATA_DIR, "temp_photos", "job1", "photo_000.jpg")
+    outside = os.path.join(settings.DATA_DIR, "other.png")
+    Image.new("RGB", (8, 8), "blue").save(outside)
+    before = open(outside, "rb").read()
+
+    async def run():
+        worker = fake_worker(lambda data: b"cutout")
+        job_id = await worker.submit("1", [original, outside])
+        results = await worker.wait(job_id)
+        await worker.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert [r["path"] for r in results["failed"]] == [outside]
+    assert open(outside, "rb").read() == before
+    derivative = results["success"][0]["path"]
+    assert open(derivative, "rb").read() == b"cutout"
+    assert derivative != original and os.path.exists(original)
+
+
+def test_rembg_worker_stop_fails_queued_jobs(client):
+    """stop() fait échouer les images en attente : wait() rend la main, le job n'est pas bloqué"""
+    original = os.path.join(settings.DATA_DIR, "temp_photos", "job1", "photo_000.jpg")
+
+    async def run():
+        worker = fake_worker(lambda data: b"cutout")
+        job_id = await worker.submit("1", [original] * 5)
+        await worker.stop()
+        return job_id, await asyncio.wait_for(worker.wait(job_id), timeout=5)
+
+    job_id, results = asyncio.run(run())
+
+    assert len(results["success"]) + len(results["failed"]) == 5
+    assert results["failed"][-1]["error"] == "Worker stopped"
+    assert image_jobs[job_id]["status"] == "failed"
+
+
+def test_finished_image_jobs_are_pruned(monkeypatch):
+    """Jobs terminés supprimés après le TTL puis au-delà du plafond ; jamais un job en cours"""
+    monkeypatch.setattr(image_pipeline, "image_jobs", {})
+    monkeypatch.setattr(image_pipeline, "IMAGE_JOB_TTL_SECONDS", 3600)
+    monkeypatch.setattr(image_pipeline, "IMAGE_JOBS_MAX", 2)
+    now = datetime.utcnow()
+    for job_id, age in [("old", 7200), ("done1", 60), ("done2", 30), ("running", None)]:
+        image_pipeline.image_jobs[job_id] = {
+            "job_id": job_id,
+            "completed_at": now - timedelta(seconds=age) if age is not None else None,
+        }
+
+    # "old" expiré, puis "done1" (le plus ancien terminé) pour revenir à 2 jobs
+    assert prune_image_jobs(now) == 2
+    assert sorted(image_pipeline.image_jobs) == ["done2", "running"]
+
+    monkeypatch.setattr(image_pipeline, "IMAGE_JOBS_MAX", 0)
+    assert prune_image_jobs(now) == 1
+    assert list(image_pipeline.image_jobs) == ["running"]
@@ -7,7 +7,7 @@ import secrets
 import io
 from datetime import datetime, timedelta
 from typing import Optional, Any, Dict, List
-from fastapi import APIRouter, HTTPException, UploadFile, File, Header, Depends, Body
+from fastapi import APIRouter, HTTPException, UploadFile, File, Header, Depends, Body, Query
 from fastapi.responses import JSONResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -21,7 +21,9 @@ register_heif_opener()
 from backend.settings import settings
 from backend.core.session import SessionVault, VintedSession
 from backend.core.vinted_client import VintedClient, CaptchaDetected
+from backend.core.publish_trace import PublishTrace, TRACE_HEADER
 from backend.core.storage import get_store
+from backend.services.photo_edits import allowed_photo_file
 from backend.core.auth import get_current_user, User
 from backend.middleware.quota_checker import check_and_consume_quota
 from backend.schemas.vinted import (
@@ -310,6 +312,8 @@ async def upload_photos(
                 "filename": file.filename
             })
         
+        get_store().record_temp_photos(job_id, len(photo_paths), sum(os.path.getsize(p) for p in photo_paths))
+        
         # If auto_analyze enabled, trigger AI analysis
         if auto_analyze:
             from backend.api.v1.routers.bulk import process_bulk_job, bulk_jobs
@@ -354,6 +358,7 @@ async def upload_photos(
 @router.post("/listings/prepare", response_model=ListingPrepareResponse)
 async def prepare_listing(
     request: ListingPrepareRequest,
+    publish_trace: Optional[str] = Header(None, alias=TRACE_HEADER),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -369,6 +374,7 @@ async def prepare_listing(
     
     Default: dry_run=true (simulation only)
     """
+    trace = PublishTrace("prepare", user_id=str(current_user.id), parent_id=publish_trace)
     try:
         print(f"\n{'='*60}")
         print(f"[START] DÉBUT PUBLICATION - PHASE A (PREPARE)")
@@ -485,6 +491,8 @@ async def prepare_listing(
         if not session:
             raise HTTPException(status_code=500, detail="Internal error: session not found")
         
+        # Per-step timeline of the Playwright run
+        trace.begin()
         async with VintedClient(headless=settings.PLAYWRIGHT_HEADLESS) as client:
             # Create context with session
             await client.create_context(session)
@@ -505,10 +513,14 @@ async def prepare_listing(
                 from pathlib import Path
                 import os
                 
+                photo_paths = []
                 for idx, photo_ref in enumerate(request.photos):
                     # [OK] SMART PATH RESOLUTION - handles all formats
+                    # Case 0: Upload folder or rendered derivative path
+                    if allowed_photo_file(photo_ref, derivatives=True):
+                        photo_path = photo_ref
                     # Case 1: Absolute path (starts with /)
-                    if photo_ref.startswith('/'):
+                    elif photo_ref.startswith('/'):
                         photo_path = f"{settings.DATA_DIR}{photo_ref}"
                     # Case 2: Already has DATA_DIR prefix
                     elif photo_ref.startswith(f'{settings.DATA_DIR}/'):
@@ -523,34 +535,36 @@ async def prepare_listing(
                     else:
                         photo_path = f"{settings.DATA_DIR}/temp_photos/{photo_ref}"
                     
-                    # Verify file exists before upload
-                    if not os.path.exists(photo_path):
+                    # Verify it is an uploaded photo before upload (never any server file)
+                    if not allowed_photo_file(photo_path, derivatives=True):
                         print(f"[ERROR] Photo [{idx}] NOT FOUND: {photo_ref}")
                         print(f"   Resolved path: {photo_path}")
-                        print(f"   File exists: {os.path.exists(photo_path)}")
                         raise HTTPException(
                             status_code=404,
-                            detail=f"Photo not found: {photo_ref} (resolved to {photo_path})"
+                            detail=f"Photo not found: {photo_ref}"
                         )
                     
-                    print(f"[PHOTO] Uploading photo [{idx+1}/{len(request.photos)}]: {os.path.basename(photo_path)}")
-                    upload_success = await client.upload_photo(page, photo_path)
-                    
-                    if not upload_success:
-                        # Check if we were redirected to login/session page
-                        current_url = page.url
-                        if 'session-refresh' in current_url or 'session/new' in current_url or 'member/login' in current_url:
-                            print(f"[ERROR] Session Vinted expirée (redirigé vers {current_url})")
-                            raise HTTPException(
-                                status_code=401,
-                                detail=f"SESSION_EXPIRED: Votre session Vinted a expiré. Veuillez actualiser votre cookie dans Settings. Testez votre session avec le bouton 'Tester ma session'."
-                            )
-                        
-                        print(f"[WARN] Photo upload failed: {photo_ref}")
+                    photo_paths.append(photo_path)
+                
+                # Upload the whole batch in one file-chooser action
+                print(f"[PHOTO] Uploading {len(photo_paths)} photos: {', '.join(os.path.basename(p) for p in photo_paths)}")
+                uploaded = await client.upload_photos(page, photo_paths)
+                
+                if uploaded < len(photo_paths):
+                    # Check if we were redirected to login/session page
+                    current_url = page.url
+                    if 'session-refresh' in current_url or 'session/new' in current_url or 'member/login' in current_url:
+                        print(f"[ERROR] Session Vinted expirée (redirigé vers {current_url})")
                         raise HTTPException(
-                            status_code=500,
-                            detail=f"Failed to upload photo: {photo_ref}. Vérifiez votre connexion ou testez votre session Vinted."
+                            status_code=401,
+                            detail=f"SESSION_EXPIRED: Votre session Vinted a expiré. Veuillez actualiser votre cookie dans Settings. Testez votre session avec le bouton 'Tester ma session'."
                         )
+                    
+                    print(f"[WARN] Photo upload failed: {uploaded}/{len(photo_paths)} uploaded")
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to upload photos ({uploaded}/{len(photo_paths)}). Vérifiez votre connexion ou testez votre session Vinted."
+                    )
             
             # Fill form
             fill_result = await client.fill_listing_form(
@@ -587,7 +601,8 @@ async def prepare_listing(
                 confirm_token=confirm_token,
                 preview_url=page.url,
                 screenshot_b64=screenshot_b64,
-                draft_context=draft_context
+                draft_context=draft_context,
+                timeline=trace.handoff()
             )
             
     except HTTPException:
@@ -595,6 +610,8 @@ async def prepare_listing(
     except Exception as e:
         print(f"[ERROR] Prepare error: {e}")
         raise HTTPException(status_code=500, detail=f"Prepare failed: {str(e)}")
+    finally:
+        trace.end()
 
 
 @router.post("/listings/publish", response_model=ListingPublishResponse)
@@ -602,6 +619,7 @@ async def prepare_listing(
 async def publish_listing(
     request: ListingPublishRequest,
     idempotency_key: str = Header(..., alias="Idempotency-Key"),
+    publish_trace: Optional[str] = Header(None, alias=TRACE_HEADER),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -619,6 +637,8 @@ async def publish_listing(
     
     **Required Header:** Idempotency-Key (prevents duplicate publications)
     """
+    trace = PublishTrace("publish", user_id=str(current_user.id), parent_id=publish_trace)
+    trace.idempotency_key = idempotency_key
     try:
         # Check publications quota before publishing
         if not request.dry_run:
@@ -675,6 +695,8 @@ async def publish_listing(
         # Real execution
         print(f"[START] [REAL] Publishing: {draft_context.get('title', 'unknown')}")
         
+        # Per-step timeline of the Playwright run
+        trace.begin()
         async with VintedClient(headless=settings.PLAYWRIGHT_HEADLESS) as client:
             await client.create_context(session)
             page = await client.new_page()
@@ -685,13 +707,15 @@ async def publish_listing(
             # Detect challenge before publish
             if await client.detect_challenge(page):
                 print("[WARN] Challenge/Captcha detected - manual action needed")
+                trace.finish("captcha")
                 return ListingPublishResponse(
                     ok=True,
                     dry_run=False,
                     listing_id=None,
                     listing_url=None,
                     needs_manual=True,
-                    reason="captcha_or_verification"
+                    reason="captcha_or_verification",
+                    timeline=trace.handoff()
                 )
             
             # Click publish button
@@ -700,13 +724,15 @@ async def publish_listing(
             if not success:
                 error_lower = (error or "").lower()
                 if "captcha" in error_lower or "challenge" in error_lower:
+                    trace.finish("captcha")
                     return ListingPublishResponse(
                         ok=True,
                         dry_run=False,
                         listing_id=None,
                         listing_url=None,
                         needs_manual=True,
-                        reason="captcha_or_verification"
+                        reason="captcha_or_verification",
+                        timeline=trace.handoff()
                     )
                 raise HTTPException(status_code=500, detail=error or "Unknown error")
             
@@ -718,6 +744,7 @@ async def publish_listing(
             listing_url = page.url if listing_id else None
             
             print(f"[OK] Published: ID={listing_id}, URL={listing_url}")
+            trace.listing_url = listing_url
             
             # Log successful publish to SQLite
             draft_id = draft_context.get("draft_id")
@@ -755,29 +782,35 @@ async def publish_listing(
                 listing_id=listing_id,
                 listing_url=listing_url,
                 needs_manual=False,
-                reason=None
+                reason=None,
+                timeline=trace.handoff()
             )
             
     except HTTPException:
         raise
     except CaptchaDetected as e:
         print(f"[WARN] Captcha detected: {e}")
+        trace.finish("captcha")
         return ListingPublishResponse(
             ok=True,
             dry_run=False,
             listing_id=None,
             listing_url=None,
             needs_manual=True,
-            reason="captcha_or_verification"
+            reason="captcha_or_verification",
+            timeline=trace.handoff()
         )
     except Exception as e:
         print(f"[ERROR] Publish error: {e}")
         raise HTTPException(status_code=500, detail=f"Publish failed: {str(e)}")
+    finally:
+        trace.end()
 
 
 @router.post("/listings/draft", response_model=ListingPrepareResponse)
 async def create_draft(
     request: ListingPrepareRequest,
+    publish_trace: Optional[str] = Header(None, alias=TRACE_HEADER),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -799,6 +832,7 @@ async def create_draft(
         - vinted_draft_id: ID of the draft
         - dry_run: whether this was a simulation
     """
+    trace = PublishTrace("draft", user_id=str(current_user.id), parent_id=publish_trace)
     try:
         print(f"\n{'='*60}")
         print(f"📝 CRÉATION BROUILLON VINTED")
@@ -850,6 +884,8 @@ async def create_draft(
         if not session:
             raise HTTPException(status_code=500, detail="Internal error: session not found")
         
+        # Per-step timeline of the Playwright run
+        trace.begin()
         async with VintedClient(headless=settings.PLAYWRIGHT_HEADLESS) as client:
             # Create context with session
             await client.create_context(session)
@@ -870,9 +906,12 @@ async def create_draft(
                 from pathlib import Path
                 import os
                 
+                photo_paths = []
                 for idx, photo_ref in enumerate(request.photos):
                     # Smart path resolution
-                    if photo_ref.startswith('/'):
+                    if allowed_photo_file(photo_ref, derivatives=True):
+                        photo_path = photo_ref
+                    elif photo_ref.startswith('/'):
                         photo_path = f"backend/data{photo_ref}"
                     elif photo_ref.startswith('backend/data/'):
                         photo_path = photo_ref
@@ -881,32 +920,35 @@ async def create_draft(
                     else:
                         photo_path = f"backend/data/temp_photos/{photo_ref}"
                     
-                    # Verify file exists
-                    if not os.path.exists(photo_path):
+                    # Verify it is an uploaded photo (never any server file)
+                    if not allowed_photo_file(photo_path, derivatives=True):
                         print(f"[ERROR] Photo [{idx}] NOT FOUND: {photo_ref}")
                         raise HTTPException(
                             status_code=404,
                             detail=f"Photo not found: {photo_ref}"
                         )
                     
-                    print(f"[PHOTO] Uploading photo [{idx+1}/{len(request.photos)}]: {os.path.basename(photo_path)}")
-                    upload_success = await client.upload_photo(page, photo_path)
-                    
-                    if not upload_success:
-                        # Check if redirected to login
-                        current_url = page.url
-                        if 'session-refresh' in current_url or 'session/new' in current_url or 'member/login' in current_url:
-                            print(f"[ERROR] Session Vinted expirée (redirigé vers {current_url})")
-                            raise HTTPException(
-                                status_code=401,
-                                detail=f"SESSION_EXPIRED: Votre session Vinted a expiré."
-                            )
-                        
-                        print(f"[WARN] Photo upload failed: {photo_ref}")
+                    photo_paths.append(photo_path)
+                
+                # Upload the whole batch in one file-chooser action
+                print(f"[PHOTO] Uploading {len(photo_paths)} photos: {', '.join(os.path.basename(p) for p in photo_paths)}")
+                uploaded = await client.upload_photos(page, photo_paths)
+                
+                if uploaded < len(photo_paths):
+                    # Check if redirected to login
+                    current_url = page.url
+                    if 'session-refresh' in current_url or 'session/new' in current_url or 'member/login' in current_url:
+                        print(f"[ERROR] Session Vinted expirée (redirigé vers {current_url})")
                         raise HTTPException(
-                            status_code=500,
-                            detail=f"Failed to upload photo: {photo_ref}"
+                            status_code=401,
+                            detail=f"SESSION_EXPIRED: Votre session Vinted a expiré."
                         )
+                    
+                    print(f"[WARN] Photo upload failed: {uploaded}/{len(photo_paths)} uploaded")
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to upload photos ({uploaded}/{len(photo_paths)})"
+                    )
             
             # Fill form
             fill_result = await client.fill_listing_form(
@@ -951,6 +993,7 @@ async def create_draft(
             screenshot_b64 = await client.take_screenshot(page)
             
             print(f"[OK] Brouillon créé: ID={draft_id}, URL={draft_url}")
+            trace.listing_url = draft_url
             
             return ListingPrepareResponse(
                 ok=True,
@@ -959,13 +1002,15 @@ async def create_draft(
                 vinted_draft_id=draft_id,
                 publish_mode="draft",
                 preview_url=draft_url,
-                screenshot_b64=screenshot_b64
+                screenshot_b64=screenshot_b64,
+                timeline=trace.handoff()
             )
             
     except HTTPException:
         raise
     except CaptchaDetected as e:
         print(f"[WARN] Captcha detected: {e}")
+        trace.finish("captcha")
         raise HTTPException(
             status_code=403,
             detail="Captcha/Verification detected. Please complete manually."
@@ -973,6 +1018,8 @@ async def create_draft(
     except Exception as e:
         print(f"[ERROR] Create draft error: {e}")
         raise HTTPException(status_code=500, detail=f"Create draft failed: {str(e)}")
+    finally:
+        trace.end()
 
 
 @router.post("/session/test")
@@ -1060,6 +1107,7 @@ async def test_session(current_user: User = Depends(get_current_user)):
 @router.post("/sync/pull")
 async def sync_pull_from_vinted(
     listing_ids: Optional[List[str]] = Body(default=None),
+    mode: str = Query("delta", regex="^(delta|full)$"),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -1071,12 +1119,15 @@ async def sync_pull_from_vinted(
     Args:
         listing_ids: Optional list of specific Vinted listing IDs to sync
                     (None = sync all published listings)
+        mode: "delta" (listing pages + fingerprints, only changed listings
+              fetched in detail) or "full" (every listing fetched)
 
     Returns:
         {
             "ok": bool,
             "status": "success" | "conflict" | "error",
             "pulled_changes": int,
+            "remote_calls": int,
             "conflicts": [SyncChange],
             "errors": [str],
             "synced_at": datetime
@@ -1089,12 +1140,15 @@ async def sync_pull_from_vinted(
         sync_service = get_sync_service(current_user.id)
 
         # Pull changes from Vinted
-        result = await sync_service.pull_changes(listing_ids=listing_ids)
+        result = await sync_service.pull_changes(listing_ids=listing_ids, mode=mode)
 
         return {
-            "ok": result.status in ["success", "conflict"],
+            "ok": result.status.value in ["success", "conflict"],
             "status": result.status.value,
+            "mode": result.mode,
             "pulled_changes": result.pulled_changes,
+            "remote_calls": result.remote_calls,
+            "duration_seconds": result.duration_seconds,
             "conflicts": [
                 {
                     "listing_id": c.listing_id,
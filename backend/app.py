@@ -24,8 +24,18 @@ os.environ["TMPDIR"] = str(TEMP_DIR)
 from backend.db import create_tables
 from backend.database import init_db
 from backend.jobs import start_scheduler, stop_scheduler
+from backend.core.http_clients import get_http_clients
+from backend.core.browser_pool import BROWSER_POOL_PRELAUNCH, get_browser_pool, shutdown_browser_pools
+from backend.playwright_worker import PUBLISH_WORKER_IN_APP, get_publish_worker
+from backend.services.image_pipeline import shutdown_pool as shutdown_image_pool
+from backend.services.background_removal import (
+    REMBG_PRELOAD,
+    get_background_removal_worker,
+    rembg_available
+)
+from backend.storage.access_tracker import get_access_tracker
 from backend.utils.logger import logger, log_request
-from backend.routes import auth, messages, publish, listings, offers, orders, health, ws, feedback
+from backend.routes import auth, messages, publish, listings, price_drops, offers, orders, health, ws, feedback
 from backend.api.v1.routers import (
     ingest, health as health_v1, vinted, bulk, ai, auth as auth_v1, billing,
     analytics, automation, accounts, admin, orders as orders_v1, images, storage
@@ -56,9 +66,27 @@ async def lifespan(app: FastAPI):
     # init_db()  # PostgreSQL database - DISABLED: causes MissingGreenlet error in async context
     # Tables should be created via migrations or manually
 
+    # Shared keep-alive HTTP pools (Vinted, Telegram, Discord...)
+    await get_http_clients().start()
+
     # Start scheduler
     start_scheduler()
 
+    # Optionally load the rembg model now instead of on the first request
+    if REMBG_PRELOAD and rembg_available():
+        await get_background_removal_worker().start()
+
+    # Optionally launch the pooled Chromium browsers now instead of on the first publish
+    if BROWSER_POOL_PRELAUNCH:
+        try:
+            await get_browser_pool(settings.PLAYWRIGHT_HEADLESS).start()
+        except Exception as e:
+            logger.warning(f"[WARN] Browser pool prelaunch failed: {e}")
+
+    # Consume the publish queue in this process (otherwise run playwright_worker.py)
+    if PUBLISH_WORKER_IN_APP:
+        await get_publish_worker(settings.PLAYWRIGHT_HEADLESS).start()
+
     logger.info("Backend ready on port 5000")
 
     yield
@@ -66,6 +94,13 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down VintedBot Connector...")
     stop_scheduler()
+    shutdown_image_pool()
+    await get_background_removal_worker().stop()
+    await get_access_tracker().stop()
+    if PUBLISH_WORKER_IN_APP:
+        await get_publish_worker(settings.PLAYWRIGHT_HEADLESS).stop()
+    await shutdown_browser_pools()
+    await get_http_clients().aclose()
 
 
 # Create FastAPI app
@@ -162,6 +197,7 @@ app.include_router(health.router)
 app.include_router(messages.router)
 app.include_router(publish.router)
 app.include_router(listings.router)
+app.include_router(price_drops.router)
 app.include_router(offers.router)
 app.include_router(orders.router)
 app.include_router(ws.router)
@@ -0,0 +1,482 @@
+"""
+Warm Chromium browser pool
+Keeps a fixed number of Chromium processes alive for the whole process and
+leases them to VintedClient / the Playwright worker, instead of paying a
+cold launch (seconds, ~200 MB) on every publish. Each browser hosts
+isolated contexts, kept warm per Vinted account between leases.
+"""
+import os
+import time
+import shutil
+import asyncio
+import weakref
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+# Chromium processes kept alive
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+# Concurrent leases per browser (beyond that, callers queue)
+BROWSER_CONTEXTS_PER_BROWSER = int(os.getenv("BROWSER_CONTEXTS_PER_BROWSER", "4"))
+# Idle account contexts kept warm per browser (least recently used closed first)
+BROWSER_WARM_CONTEXTS = int(os.getenv("BROWSER_WARM_CONTEXTS", "8"))
+BROWSER_CONTEXT_IDLE_SECONDS = int(os.getenv("BROWSER_CONTEXT_IDLE_SECONDS", "900"))
+# Recycling: a browser is relaunched after N leases or above this RSS
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "200"))
+BROWSER_MAX_RSS_MB = int(os.getenv("BROWSER_MAX_RSS_MB", "1024"))
+BROWSER_HEALTH_INTERVAL_SECONDS = int(os.getenv("BROWSER_HEALTH_INTERVAL_SECONDS", "60"))
+# Max wait for a free browser seat
+BROWSER_ACQUIRE_TIMEOUT = int(os.getenv("BROWSER_ACQUIRE_TIMEOUT", "120"))
+BROWSER_POOL_PRELAUNCH = os.getenv("BROWSER_POOL_PRELAUNCH", "false").lower() == "true"
+
+
+@lru_cache(maxsize=1)
+def chromium_executable() -> Optional[str]:
+    """System Chromium if installed (NixOS / Replit), else Playwright's bundled one"""
+    return shutil.which("chromium")
+
+
+def chromium_launch_kwargs(headless: bool = True) -> Dict[str, Any]:
+    """Launch options shared by every pooled browser"""
+    launch_kwargs = {
+        'headless': headless,
+        'args': [
+            '--no-sandbox',
+            '--disable-setuid-sandbox',
+            '--disable-dev-shm-usage',
+            '--disable-blink-features=AutomationControlled',  # Hide automation
+            '--disable-features=IsolateOrigins,site-per-process',  # Performance
+            '--disable-web-security',  # Allow cross-origin
+            '--disable-features=VizDisplayCompositor',  # Better stability
+            '--disable-gpu',  # GPU not needed in headless
+            '--no-first-run',
+            '--no-default-browser-check',
+            '--disable-infobars',
+            '--window-size=1280,720',
+            '--disable-backgrounding-occluded-windows',
+            '--disable-renderer-backgrounding',
+            '--disable-background-timer-throttling',
+            '--disable-hang-monitor',
+            '--disable-prompt-on-repost',
+            '--disable-sync',
+            '--disable-translate',
+            '--metrics-recording-only',
+            '--mute-audio',
+            '--safebrowsing-disable-auto-update',
+            '--password-store=basic',
+            '--use-mock-keychain',
+            '--disable-extensions',
+            '--disable-plugins',
+        ],
+        'timeout': 60000,  # 60 seconds browser launch timeout
+    }
+
+    # Use system Chromium if available (fixes libgbm1 dependency issue on NixOS)
+    if chromium_executable():
+        launch_kwargs['executable_path'] = chromium_executable()
+
+    return launch_kwargs
+
+
+async def _close_quietly(target):
+    """Close a context or browser that may already be gone"""
+    try:
+        await target.close()
+    except Exception:
+        pass
+
+
+class _BrowserSlot:
+    """One pooled Chromium process"""
+
+    def __init__(self, browser, number: int):
+        self.browser = browser
+        self.number = number
+        self.active = 0
+        self.uses = 0
+        self.retiring = False
+        self.rss_mb: Optional[float] = None
+        self.launched_at = time.monotonic()
+        # account key -> (idle context, idle since)
+        self.warm: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+    @property
+    def connected(self) -> bool:
+        try:
+            return self.browser.is_connected()
+        except Exception:
+            return False
+
+    @property
+    def available(self) -> bool:
+        return not self.retiring and self.connected
+
+
+class BrowserLease:
+    """
+    One seat on a pooled browser
+
+    Usage:
+        lease = await get_browser_pool().acquire()
+        context = await lease.bind(account_key)   # warm context or None
+        if context is None:
+            context = await lease.browser.new_context(...)
+            lease.context = context                # kept warm on release
+        ...
+        await lease.release()
+    """
+
+    def __init__(self, pool: "BrowserPool", slot: _BrowserSlot):
+        self.pool = pool
+        self.slot = slot
+        self.account_key: Optional[str] = None
+        # Account context, returned to the warm set on release
+        self.context = None
+        # Throwaway contexts, closed on release
+        self.ephemeral: List[Any] = []
+        self.acquired_at = time.monotonic()
+        self.released = False
+        self._account_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def browser(self):
+        return self.slot.browser
+
+    async def bind(self, account_key: str):
+        """Attach the lease to a Vinted account; returns its warm context, if any"""
+        return await self.pool._bind(self, account_key)
+
+    async def release(self, keep_context: bool = True):
+        """Give the seat back (the account context stays warm unless keep_context=False)"""
+        await self.pool._release(self, keep_context)
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of warm Chromium browsers
+
+    - At most `size` browsers, each serving up to `per_browser` leases at
+      once; further acquire() calls queue (bounded memory under load)
+    - Contexts are isolated per Vinted account and kept warm between
+      leases (cookies, fingerprint and loaded origin survive), at most
+      one lease per account at a time
+    - Health: crashed browsers are dropped and relaunched on demand; a
+      browser is recycled after `max_uses` leases or above `max_rss_mb`
+      once its current leases are done
+    """
+
+    def __init__(
+        self,
+        headless: bool = True,
+        size: int = BROWSER_POOL_SIZE,
+        per_browser: int = BROWSER_CONTEXTS_PER_BROWSER,
+        warm_per_browser: int = BROWSER_WARM_CONTEXTS,
+        max_uses: int = BROWSER_MAX_USES,
+        max_rss_mb: int = BROWSER_MAX_RSS_MB,
+        health_interval: int = BROWSER_HEALTH_INTERVAL_SECONDS
+    ):
+        self.headless = headless
+        self.size = max(1, size)
+        self.per_browser = max(1, per_browser)
+        self.warm_per_browser = warm_per_browser
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.health_interval = health_interval
+        self._playwright = None
+        self._slots: List[_BrowserSlot] = []
+        self._launched = 0
+        self._seats = asyncio.Semaphore(self.size * self.per_browser)
+        self._slot_lock = asyncio.Lock()
+        self._account_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._waiting = 0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "leases": 0,
+            "queued": 0,
+            "wait_seconds": 0.0,
+            "warm_hits": 0,
+            "launches": 0,
+            "launch_seconds": 0.0,
+            "recycled": 0,
+            "crashed": 0,
+        }
+
+    # ------------------------------------------------------------------ browsers
+
+    async def _launch(self) -> _BrowserSlot:
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+
+        started = time.monotonic()
+        browser = await self._playwright.chromium.launch(**chromium_launch_kwargs(self.headless))
+        self._launched += 1
+        slot = _BrowserSlot(browser, self._launched)
+        self._slots.append(slot)
+
+        elapsed = time.monotonic() - started
+        self.stats["launches"] += 1
+        self.stats["launch_seconds"] += elapsed
+        logger.info(f"[BROWSER] Launched pooled Chromium #{slot.number} in {elapsed:.1f}s")
+        return slot
+
+    async def _close_slot(self, slot: _BrowserSlot, reason: str):
+        if slot in self._slots:
+            self._slots.remove(slot)
+        for context, _ in slot.warm.values():
+            await _close_quietly(context)
+        slot.warm.clear()
+        await _close_quietly(slot.browser)
+        logger.info(f"[BROWSER] Closed pooled Chromium #{slot.number} ({reason}, {slot.uses} leases)")
+
+    async def _drop_crashed(self):
+        for slot in [s for s in self._slots if not s.connected]:
+            self.stats["crashed"] += 1
+            logger.warning(f"[BROWSER] Pooled Chromium #{slot.number} disconnected, dropping it")
+            slot.retiring = True
+            if slot.active == 0:
+                await self._close_slot(slot, "crashed")
+
+    async def start(self):
+        """Launch all browsers now instead of on first use"""
+        async with self._slot_lock:
+            while sum(1 for s in self._slots if s.available) < self.size:
+                await self._launch()
+        self._ensure_health_loop()
+
+    # ------------------------------------------------------------------ leases
+
+    async def acquire(self, timeout: float = BROWSER_ACQUIRE_TIMEOUT) -> BrowserLease:
+        """
+        Reserve a seat on a browser, waiting if they are all busy
+
+        Raises:
+            asyncio.TimeoutError: No seat freed within `timeout` seconds
+        """
+        self._ensure_health_loop()
+        started = time.monotonic()
+        if not self._seats.locked():
+            # Free seat: taken without yielding
+            await self._seats.acquire()
+        else:
+            self.stats["queued"] += 1
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._seats.acquire(), timeout)
+            finally:
+                self._waiting -= 1
+
+        try:
+            async with self._slot_lock:
+                await self._drop_crashed()
+                candidates = [s for s in self._slots if s.available and s.active < self.per_browser]
+                idle = [s for s in candidates if s.active == 0]
+                if idle:
+                    slot = idle[0]
+                elif sum(1 for s in self._slots if s.available) < self.size:
+                    slot = await self._launch()
+                elif candidates:
+                    slot = min(candidates, key=lambda s: s.active)
+                else:
+                    # Every browser is retiring with leases still running
+                    slot = await self._launch()
+                slot.active += 1
+        except BaseException:
+            self._seats.release()
+            raise
+
+        self.stats["leases"] += 1
+        self.stats["wait_seconds"] += time.monotonic() - started
+        return BrowserLease(self, slot)
+
+    async def _bind(self, lease: BrowserLease, account_key: str):
+        # One lease per account at a time: the warm context is not shared
+        lock = self._account_locks.get(account_key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._account_locks[account_key] = lock
+        await lock.acquire()
+        lease._account_lock = lock
+        lease.account_key = account_key
+
+        async with self._slot_lock:
+            for slot in self._slots:
+                if account_key not in slot.warm:
+                    continue
+                context, _ = slot.warm[account_key]
+                if slot is lease.slot or (slot.available and slot.active < self.per_browser):
+                    del slot.warm[account_key]
+                    if slot is not lease.slot:
+                        # Follow the account to the browser holding its context
+                        lease.slot.active -= 1
+                        slot.active += 1
+                        lease.slot = slot
+                    lease.context = context
+                    self.stats["warm_hits"] += 1
+                    return context
+                # Its browser is full or retiring: start over on ours
+                del slot.warm[account_key]
+                await _close_quietly(context)
+        return None
+
+    async def _release(self, lease: BrowserLease, keep_context: bool):
+        if lease.released:
+            return
+        lease.released = True
+        slot = lease.slot
+
+        for context in lease.ephemeral:
+            await _close_quietly(context)
+
+        context = lease.context
+        if context is not None:
+            if keep_context and lease.account_key and slot.available:
+                try:
+                    for page in list(context.pages):
+                        await page.close()
+                    slot.warm[lease.account_key] = (context, time.monotonic())
+                    slot.warm.move_to_end(lease.account_key)
+                except Exception:
+                    await _close_quietly(context)
+                while len(slot.warm) > self.warm_per_browser:
+                    _, (oldest, _) = slot.warm.popitem(last=False)
+                    await _close_quietly(oldest)
+            else:
+                await _close_quietly(context)
+
+        async with self._slot_lock:
+            slot.active -= 1
+            slot.uses += 1
+            if slot.uses >= self.max_uses and not slot.retiring:
+                slot.retiring = True
+                self.stats["recycled"] += 1
+            if slot.retiring and slot.active == 0:
+                await self._close_slot(slot, "recycled")
+
+        if lease._account_lock is not None and lease._account_lock.locked():
+            lease._account_lock.release()
+        self._seats.release()
+
+    # ------------------------------------------------------------------ health
+
+    def _ensure_health_loop(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"[ERROR] Browser pool health check failed: {e}")
+
+    async def _measure_rss_mb(self, slot: _BrowserSlot) -> Optional[float]:
+        """RSS of the browser and its renderers (None if it can't be measured)"""
+        try:
+            import psutil
+
+            session = await slot.browser.new_browser_cdp_session()
+            try:
+                info = await session.send("SystemInfo.getProcessInfo")
+            finally:
+                await session.detach()
+
+            total = 0
+            for process in info.get("processInfo", []):
+                try:
+                    total += psutil.Process(process["id"]).memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except Exception:
+            return None
+
+    async def check_health(self):
+        """Drop crashed browsers, expire idle contexts, recycle oversized browsers"""
+        now = time.monotonic()
+        async with self._slot_lock:
+            await self._drop_crashed()
+
+            for slot in list(self._slots):
+                for account_key, (context, idle_since) in list(slot.warm.items()):
+                    if now - idle_since > BROWSER_CONTEXT_IDLE_SECONDS:
+                        del slot.warm[account_key]
+                        await _close_quietly(context)
+
+                slot.rss_mb = await self._measure_rss_mb(slot)
+                if slot.rss_mb is not None and slot.rss_mb > self.max_rss_mb and not slot.retiring:
+                    logger.info(f"[BROWSER] Chromium #{slot.number} uses {slot.rss_mb:.0f} MB, recycling")
+                    slot.retiring = True
+                    self.stats["recycled"] += 1
+
+                if slot.retiring and slot.active == 0:
+                    await self._close_slot(slot, "recycled")
+
+    async def stop(self):
+        """Close every browser and the Playwright driver (app shutdown)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        async with self._slot_lock:
+            for slot in list(self._slots):
+                await self._close_slot(slot, "shutdown")
+
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+            self._playwright = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool occupancy, queueing and recycling counters"""
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "headless": self.headless,
+            "size": self.size,
+            "seats": self.size * self.per_browser,
+            "waiting": self._waiting,
+            "avg_launch_seconds": (
+                round(self.stats["launch_seconds"] / self.stats["launches"], 2)
+                if self.stats["launches"] else 0.0
+            ),
+            "browsers": [
+                {
+                    "number": slot.number,
+                    "active": slot.active,
+                    "uses": slot.uses,
+                    "warm_contexts": len(slot.warm),
+                    "retiring": slot.retiring,
+                    "rss_mb": round(slot.rss_mb, 1) if slot.rss_mb is not None else None,
+                    "age_seconds": round(now - slot.launched_at),
+                }
+                for slot in self._slots
+            ],
+        }
+
+
+# One pool per headless mode
+_pools: Dict[bool, BrowserPool] = {}
+
+
+def get_browser_pool(headless: bool = True) -> BrowserPool:
+    """Get or create the browser pool for a headless mode"""
+    pool = _pools.get(headless)
+    if pool is None:
+        pool = _pools[headless] = BrowserPool(headless=headless)
+    return pool
+
+
+async def shutdown_browser_pools():
+    """Stop every pool (called from the app lifespan)"""
+    for pool in list(_pools.values()):
+        await pool.stop()
+    _pools.clear()
@@ -0,0 +1,317 @@
+"""
+HTTP response cache for VintedAPIClient
+Profiles, listings and search results are read again and again (pricing
+engine, automations, sync); this layer keeps GET responses and only asks
+Vinted again when needed.
+
+- In-memory LRU, plus an optional disk store (VINTED_HTTP_CACHE_DIR) that
+  survives restarts
+- Freshness from Cache-Control (max-age, no-cache, no-store); responses
+  without it use the per-endpoint TTL, if the endpoint has one
+- Stale entries with an ETag / Last-Modified are revalidated with a
+  conditional request: a 304 costs no body
+- Entries are scoped to the session cookie (responses are per account)
+
+Writes through the client invalidate the resource they touched.
+"""
+import os
+import re
+import json
+import time
+import base64
+import asyncio
+import hashlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+
+VINTED_HTTP_CACHE = os.getenv("VINTED_HTTP_CACHE", "true").lower() == "true"
+VINTED_HTTP_CACHE_SIZE = int(os.getenv("VINTED_HTTP_CACHE_SIZE", "2048"))  # entries in memory
+VINTED_HTTP_CACHE_DIR = os.getenv("VINTED_HTTP_CACHE_DIR", "")  # empty = memory only
+# Entries not used for this long are dropped from the disk store
+VINTED_HTTP_CACHE_DISK_MAX_AGE = int(os.getenv("VINTED_HTTP_CACHE_DISK_MAX_AGE", "86400"))
+
+# Seconds an endpoint's response stays fresh when Vinted sends no Cache-Control
+DEFAULT_ENDPOINT_TTLS = {
+    "current_user": 300,
+    "user": 600,
+    "listing": 60,
+    "search_items": 300,
+    "search_users": 300,
+}
+
+
+def _endpoint_ttls() -> Dict[str, int]:
+    """DEFAULT_ENDPOINT_TTLS overridden by VINTED_HTTP_CACHE_TTLS ("listing=30,user=0")"""
+    ttls = dict(DEFAULT_ENDPOINT_TTLS)
+    for pair in os.getenv("VINTED_HTTP_CACHE_TTLS", "").split(","):
+        name, _, seconds = pair.partition("=")
+        if name.strip() and seconds.strip().isdigit():
+            ttls[name.strip()] = int(seconds)
+    return ttls
+
+
+ENDPOINT_TTLS = _endpoint_ttls()
+
+# Only these response headers are kept with an entry
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "date")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CacheEntry:
+    """One cached GET response"""
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    stored_at: float
+    expires_at: float
+    used_at: float = field(default_factory=time.time)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    @property
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def freshness(headers: Dict[str, str], endpoint: Optional[str]) -> Optional[int]:
+    """
+    Seconds a response stays fresh, or None if it must not be stored
+
+    no-store -> None; no-cache -> 0 (stored, always revalidated);
+    max-age -> its value; otherwise the endpoint TTL, else 0 when the
+    response has a validator, else None.
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        return int(match.group(1))
+    if endpoint in ENDPOINT_TTLS:
+        return ENDPOINT_TTLS[endpoint]
+    if headers.get("etag") or headers.get("last-modified"):
+        return 0
+    return None
+
+
+class DiskStore:
+    """One JSON file per entry (blocking: called through asyncio.to_thread)"""
+
+    def __init__(self, directory: str, max_age: int = VINTED_HTTP_CACHE_DISK_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        data["content"] = base64.b64decode(data["content"])
+        return CacheEntry(**data)
+
+    def put(self, key: str, entry: CacheEntry):
+        data = asdict(entry)
+        data["content"] = base64.b64encode(entry.content).decode("ascii")
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def prune(self) -> int:
+        """Drop files not written for max_age seconds"""
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+class HTTPCache:
+    """
+    LRU of GET responses with an optional disk store behind it
+
+    Usage (see VintedAPIClient._get):
+        entry, fresh = await cache.lookup(key)
+        if fresh: serve entry
+        elif entry: conditional request, then cache.refresh(...) on 304
+        else: plain request, then cache.store(...)
+    """
+
+    PRUNE_EVERY = 500  # disk writes between two prunes
+
+    def __init__(self, max_entries: int = VINTED_HTTP_CACHE_SIZE, disk: Optional[DiskStore] = None):
+        self.max_entries = max_entries
+        self.disk = disk
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._writes = 0
+        self.stats = {
+            "hits": 0,          # served fresh, no request
+            "disk_hits": 0,     # of which loaded from disk
+            "revalidated": 0,   # conditional request answered 304
+            "misses": 0,        # full request
+            "stores": 0,
+            "not_cacheable": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def key(scope: str, url: str) -> str:
+        return f"{scope}|{url}"
+
+    async def lookup(self, key: str, revalidate: bool = False) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        (entry, fresh) for a key; entry is None when nothing usable is cached
+
+        revalidate=True never reports an entry as fresh: the caller wants
+        Vinted's current state, at the cost of a conditional request at best
+        """
+        entry = self._entries.get(key)
+        from_disk = False
+        if entry is None and self.disk:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            from_disk = entry is not None
+            if entry:
+                self._remember(key, entry)
+        if entry is None:
+            return None, False
+
+        self._entries.move_to_end(key)
+        entry.used_at = time.time()
+        if entry.is_fresh() and not revalidate:
+            self.stats["hits"] += 1
+            if from_disk:
+                self.stats["disk_hits"] += 1
+            return entry, True
+        if not entry.revalidatable:
+            if not entry.is_fresh():
+                # Expired and nothing to revalidate with
+                await self.invalidate(key, count=False)
+            return None, False
+        return entry, False
+
+    async def store(self, key: str, status_code: int, headers: Dict[str, str], content: bytes, endpoint: Optional[str]) -> bool:
+        """Keep a 200 response if its headers (or endpoint TTL) allow it"""
+        kept = {name: headers[name] for name in KEPT_HEADERS if name in headers}
+        ttl = freshness(kept, endpoint) if status_code == 200 else None
+        if ttl is None:
+            self.stats["not_cacheable"] += 1
+            return False
+
+        now = time.time()
+        entry = CacheEntry(status_code, kept, content, stored_at=now, expires_at=now + ttl)
+        self._remember(key, entry)
+        self.stats["stores"] += 1
+        await self._write_disk(key, entry)
+        return True
+
+    async def refresh(self, key: str, entry: CacheEntry, headers: Dict[str, str], endpoint: Optional[str]) -> CacheEntry:
+        """Entry confirmed by a 304: take the new validators and restart its freshness"""
+        for name in KEPT_HEADERS:
+            if name in headers:
+                entry.headers[name] = headers[name]
+        ttl = freshness(entry.headers, endpoint) or 0
+        now = time.time()
+        entry.stored_at, entry.expires_at = now, now + ttl
+        self.stats["revalidated"] += 1
+        await self._write_disk(key, entry)
+        return entry
+
+    def miss(self):
+        self.stats["misses"] += 1
+
+    async def invalidate(self, key: str, count: bool = True):
+        """Drop one entry (after a write to the resource)"""
+        if self._entries.pop(key, None) is not None and count:
+            self.stats["invalidations"] += 1
+        if self.disk:
+            await asyncio.to_thread(self.disk.delete, key)
+
+    def clear(self):
+        self._entries.clear()
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def _write_disk(self, key: str, entry: CacheEntry):
+        if not self.disk:
+            return
+        try:
+            await asyncio.to_thread(self.disk.put, key, entry)
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                removed = await asyncio.to_thread(self.disk.prune)
+                if removed:
+                    logger.debug(f"[CACHE] Pruned {removed} stale disk entries")
+        except OSError as e:
+            logger.warning(f"[WARN] HTTP cache disk write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["revalidated"] + self.stats["misses"]
+        return {
+            "enabled": VINTED_HTTP_CACHE,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "disk": self.disk.directory if self.disk else None,
+            "endpoint_ttls": ENDPOINT_TTLS,
+            **self.stats,
+            # Requests answered without downloading a body
+            "hit_rate": round((self.stats["hits"] + self.stats["revalidated"]) / lookups, 3) if lookups else 0.0,
+        }
+
+
+# Global instance
+_cache: Optional[HTTPCache] = None
+
+
+def get_http_cache() -> HTTPCache:
+    """Get or create the HTTPCache singleton"""
+    global _cache
+    if _cache is None:
+        disk = DiskStore(VINTED_HTTP_CACHE_DIR) if VINTED_HTTP_CACHE_DIR else None
+        _cache = HTTPCache(disk=disk)
+    return _cache
@@ -0,0 +1,219 @@
+"""
+Process-wide HTTP client registry
+One keep-alive connection pool per upstream (Vinted, Telegram, Discord...)
+instead of an httpx.AsyncClient per call or per session object, which paid
+a TCP + TLS handshake every time.
+
+- Pools are created in the app lifespan (start) and closed on shutdown
+  (aclose); outside the app (scripts, workers) they are created on first use
+- HTTP/2 where the upstream supports it and `h2` is installed
+- Explicit pool limits and timeouts per upstream
+- Pooled clients never store cookies: several Vinted accounts share the
+  pool, each request carries its own session cookie
+- Connection reuse (new vs reused connection per response) is exported as
+  http_client_requests_total / http_client_connection_reuse_ratio
+"""
+import os
+import asyncio
+import weakref
+from dataclasses import dataclass
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Any, Dict, Optional
+import httpx
+from loguru import logger
+
+from backend.core.metrics import track_http_connection
+
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))  # per upstream
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+
+@dataclass(frozen=True)
+class Upstream:
+    """Pool settings of one upstream"""
+    base_url: str = ""
+    timeout: float = 30.0
+    http2: bool = True
+    follow_redirects: bool = False
+
+
+UPSTREAMS: Dict[str, Upstream] = {
+    # Follows redirects (VintedAPIClient); requests that judge a session by a
+    # 200 pass follow_redirects=False, an expired cookie redirects to login
+    "vinted": Upstream("https://www.vinted.com", timeout=30.0, follow_redirects=True),
+    "telegram": Upstream("https://api.telegram.org", timeout=30.0),
+    "discord": Upstream("https://discord.com", timeout=10.0),
+    # Anything else (OAuth providers...)
+    "default": Upstream(timeout=30.0, http2=False),
+}
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (pip install "httpx[http2]")"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class ReuseStats:
+    """New vs reused connections of one upstream"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self._seen: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+    def observe(self, upstream: str, response: httpx.Response):
+        stream = response.extensions.get("network_stream")
+        if stream is None:
+            return
+        try:
+            reused = stream in self._seen
+            self._seen.add(stream)
+        except TypeError:
+            return
+        self.requests += 1
+        if not reused:
+            self.new_connections += 1
+        track_http_connection(upstream, reused, self.reuse_ratio)
+
+    @property
+    def reuse_ratio(self) -> float:
+        return (self.requests - self.new_connections) / self.requests if self.requests else 0.0
+
+
+class HTTPClientRegistry:
+    """
+    Shared httpx.AsyncClient per upstream
+
+    Usage:
+        client = get_http_clients().get("telegram")
+        await client.post(url, json=payload)
+    """
+
+    def __init__(self, upstreams: Dict[str, Upstream] = UPSTREAMS):
+        self.upstreams = upstreams
+        self.http2 = HTTP2_ENABLED and http2_available()
+        # httpx pools are bound to the event loop that opened them
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._reuse: Dict[str, ReuseStats] = {}
+
+    def _build(self, name: str) -> httpx.AsyncClient:
+        upstream = self.upstreams.get(name, self.upstreams["default"])
+        stats = self._reuse.setdefault(name, ReuseStats())
+
+        async def on_response(response: httpx.Response):
+            stats.observe(name, response)
+
+        return httpx.AsyncClient(
+            base_url=upstream.base_url,
+            http2=self.http2 and upstream.http2,
+            limits=httpx.Limits(
+                max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(upstream.timeout, connect=HTTP_CONNECT_TIMEOUT),
+            follow_redirects=upstream.follow_redirects,
+            # Reject every Set-Cookie: the pool is shared between accounts
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+            event_hooks={"response": [on_response]}
+        )
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        """Pooled client of an upstream (created on first use in this event loop)"""
+        clients = self._clients.setdefault(asyncio.get_running_loop(), {})
+        client = clients.get(name)
+        if client is None or client.is_closed:
+            client = clients[name] = self._build(name)
+        return client
+
+    async def start(self):
+        """Open the pools of every known upstream (app lifespan)"""
+        for name in self.upstreams:
+            self.get(name)
+        logger.info(
+            f"[HTTP] Shared client pools ready: {', '.join(self.upstreams)} "
+            f"(http2={'on' if self.http2 else 'off'}, max {HTTP_POOL_MAX_CONNECTIONS} connections each)"
+        )
+
+    async def aclose(self):
+        """Close the pools of the current event loop (app shutdown)"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"[WARN] Failed to close HTTP client: {e}")
+        if clients:
+            logger.info(f"[HTTP] Closed {len(clients)} shared client pools")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "upstreams": {
+                name: {
+                    "requests": stats.requests,
+                    "new_connections": stats.new_connections,
+                    "reuse_ratio": round(stats.reuse_ratio, 3),
+                }
+                for name, stats in self._reuse.items()
+            },
+        }
+
+
+class SessionClient:
+    """
+    A pooled client with per-session default headers (VintedAPIClient)
+
+    Same request API as httpx.AsyncClient for what the callers use; closing
+    it leaves the shared pool open.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, headers: Dict[str, str]):
+        self._client = client
+        self.headers = headers
+
+    def build_request(self, method: str, url: str, **kwargs) -> httpx.Request:
+        headers = {**self.headers, **(kwargs.pop("headers", None) or {})}
+        return self._client.build_request(method, url, headers=headers, **kwargs)
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await self._client.send(request, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.send(self.build_request(method, url, **kwargs))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def aclose(self):
+        """No-op: the pool belongs to the registry"""
+
+
+# Global instance
+_registry: Optional[HTTPClientRegistry] = None
+
+
+def get_http_clients() -> HTTPClientRegistry:
+    """Get or create the HTTPClientRegistry singleton"""
+    global _registry
+    if _registry is None:
+        _registry = HTTPClientRegistry()
+    return _registry
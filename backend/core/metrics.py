@@ -103,6 +103,90 @@ captcha_detected_total = Counter(
     registry=registry
 )
 
+publish_queue_depth = Gauge(
+    'vinted_publish_queue_depth',
+    'Publish jobs waiting in the queue',
+    registry=registry
+)
+
+publish_jobs_in_flight = Gauge(
+    'vinted_publish_jobs_in_flight',
+    'Publish jobs currently run by the worker',
+    registry=registry
+)
+
+publish_job_duration_seconds = Histogram(
+    'vinted_publish_job_duration_seconds',
+    'Publish job duration in seconds (lease to final status)',
+    ['status'],  # status: completed/failed/blocked/requeued
+    buckets=[1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0],
+    registry=registry
+)
+
+publish_job_wait_seconds = Histogram(
+    'vinted_publish_job_wait_seconds',
+    'Time between a publish job becoming due and the worker leasing it',
+    buckets=[0.1, 0.5, 1.0, 2.0, 5.0, 30.0, 60.0, 300.0],
+    registry=registry
+)
+
+publish_step_duration_seconds = Histogram(
+    'vinted_publish_step_duration_seconds',
+    'Duration of one publish pipeline step in seconds',
+    ['step', 'status'],  # step: create_context/navigate/upload_photo/fill_form/click_publish/...
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0],
+    registry=registry
+)
+
+publish_run_duration_seconds = Histogram(
+    'vinted_publish_run_duration_seconds',
+    'Duration of a whole publish run in seconds',
+    ['flow', 'status'],  # flow: direct/two_phase
+    buckets=[5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0, 120.0, 180.0, 300.0],
+    registry=registry
+)
+
+vinted_http_cache_requests_total = Counter(
+    'vinted_http_cache_requests_total',
+    'Vinted API GET requests by cache outcome',
+    ['endpoint', 'result'],  # result: hit/revalidated/miss
+    registry=registry
+)
+
+http_client_requests_total = Counter(
+    'http_client_requests_total',
+    'Outgoing HTTP requests through the shared client pools',
+    ['upstream', 'connection'],  # connection: new/reused
+    registry=registry
+)
+
+http_client_connection_reuse_ratio = Gauge(
+    'http_client_connection_reuse_ratio',
+    'Share of outgoing requests served on an already open connection',
+    ['upstream'],
+    registry=registry
+)
+
+inbox_sync_session_duration_seconds = Histogram(
+    'inbox_sync_session_duration_seconds',
+    'Inbox sync time of one Vinted session in seconds',
+    ['status'],  # status: synced/invalid/timeout/error
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0],
+    registry=registry
+)
+
+inbox_sync_run_duration_seconds = Gauge(
+    'inbox_sync_run_duration_seconds',
+    'Duration of the last inbox sync run in seconds',
+    registry=registry
+)
+
+inbox_sync_overruns_total = Counter(
+    'inbox_sync_overruns_total',
+    'Inbox sync runs that took longer than their interval',
+    registry=registry
+)
+
 # ============================================================================
 # DATABASE METRICS
 # ============================================================================
@@ -200,6 +284,51 @@ def track_captcha_detection():
     captcha_detected_total.inc()
 
 
+def track_publish_job(status: str, duration: float):
+    """Track a finished publish job"""
+    publish_job_duration_seconds.labels(status=status).observe(duration)
+
+
+def track_publish_queue(depth: int, in_flight: Optional[int] = None):
+    """Track publish queue depth (and worker occupancy)"""
+    publish_queue_depth.set(depth)
+    if in_flight is not None:
+        publish_jobs_in_flight.set(in_flight)
+
+
+def track_publish_step(step: str, status: str, duration: float):
+    """Track one publish pipeline step"""
+    publish_step_duration_seconds.labels(step=step, status=status).observe(duration)
+
+
+def track_publish_run(flow: str, status: str, duration: float):
+    """Track a whole publish run"""
+    publish_run_duration_seconds.labels(flow=flow, status=status).observe(duration)
+
+
+def track_http_cache(endpoint: Optional[str], result: str):
+    """Track a Vinted API GET served (or not) by the HTTP cache"""
+    vinted_http_cache_requests_total.labels(endpoint=endpoint or "other", result=result).inc()
+
+
+def track_http_connection(upstream: str, reused: bool, reuse_ratio: float):
+    """Track an outgoing request on a new or reused pooled connection"""
+    http_client_requests_total.labels(upstream=upstream, connection="reused" if reused else "new").inc()
+    http_client_connection_reuse_ratio.labels(upstream=upstream).set(reuse_ratio)
+
+
+def track_inbox_sync_session(status: str, duration: float):
+    """Track the inbox sync of one session"""
+    inbox_sync_session_duration_seconds.labels(status=status).observe(duration)
+
+
+def track_inbox_sync_run(duration: float, overrun: bool):
+    """Track a whole inbox sync run"""
+    inbox_sync_run_duration_seconds.set(duration)
+    if overrun:
+        inbox_sync_overruns_total.inc()
+
+
 def track_db_query(operation: str, duration: float):
     """Track database query"""
     db_queries_total.labels(operation=operation).inc()
@@ -0,0 +1,255 @@
+"""
+Per-step latency tracing for the publish pipeline
+Each publish run gets a PublishTrace; the steps it goes through (context
+creation, navigation, one span per photo upload, form filling, publish
+click, listing id extraction...) are recorded as spans.
+
+- Every span is observed in the `vinted_publish_step_duration_seconds`
+  Prometheus histogram, trace or not
+- Inside a trace, spans also build a timeline that is stored with the
+  publish log (publish_log.timeline_json) for the slowest-runs view
+
+The active trace travels in a ContextVar, so VintedClient methods open
+spans without any extra argument. Runs split over internal HTTP calls
+(bulk publish -> /vinted/listings/*) pass the trace id in TRACE_HEADER: the
+handler opens a nested trace and hands its spans back in the response,
+where the caller merges them under its own span.
+"""
+import time
+import uuid
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+from backend.core.metrics import track_publish_run, track_publish_step
+
+# Internal requests of a publish run carry the caller's trace id
+TRACE_HEADER = "X-Publish-Trace"
+
+_current: ContextVar[Optional["PublishTrace"]] = ContextVar("publish_trace", default=None)
+
+
+def current_trace() -> Optional["PublishTrace"]:
+    """Trace of the publish run in progress, if any"""
+    return _current.get()
+
+
+@contextmanager
+def span(step: str, **attrs):
+    """
+    Time one publish step
+
+    Usage:
+        with span("upload_photo", index=i) as step:
+            if not await upload(...):
+                step["status"] = "failed"
+
+    Status is "ok" unless set by the caller, "error" if the block raises.
+    """
+    trace = _current.get()
+    depth = trace._enter() if trace else 0
+    started = time.monotonic()
+    result = {"status": "ok"}
+    try:
+        yield result
+    except BaseException:
+        result["status"] = "error"
+        raise
+    finally:
+        duration = time.monotonic() - started
+        track_publish_step(step, result["status"], duration)
+        if trace:
+            trace._exit()
+            trace._record(step, started, duration, result["status"], depth, attrs)
+
+
+def traced(step: str):
+    """
+    Span around an async method; a False result (or a (False, error) tuple,
+    the VintedClient convention) marks the step as failed
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(step) as result:
+                value = await func(*args, **kwargs)
+                if value is False or (isinstance(value, tuple) and value and value[0] is False):
+                    result["status"] = "failed"
+                return value
+        return wrapper
+    return decorator
+
+
+class PublishTrace:
+    """
+    Timeline of one publish run
+
+    Usage:
+        trace = PublishTrace("direct", draft_id=draft_id, user_id=user_id)
+        try:
+            trace.begin()
+            with span("create_context"):
+                ...
+            trace.finish("ok")
+        finally:
+            trace.end()   # "error" if never finished, timeline saved
+
+    (or `with PublishTrace(...) as trace:` when the run fits in one block)
+
+    With parent_id (the caller's TRACE_HEADER), the trace is nested: its
+    timeline goes back to the caller through handoff() instead of being
+    stored as a run of its own.
+    """
+
+    def __init__(self, flow: str, draft_id: Optional[str] = None, user_id: Optional[str] = None,
+                 parent_id: Optional[str] = None):
+        self.trace_id = parent_id or uuid.uuid4().hex[:12]
+        self.nested = parent_id is not None
+        self.flow = flow
+        self.draft_id = draft_id
+        self.user_id = user_id
+        self.started_at = datetime.utcnow().isoformat()
+        self.status: Optional[str] = None
+        self.duration: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        # Set by the caller, stored with the timeline
+        self.listing_url: Optional[str] = None
+        self.idempotency_key: Optional[str] = None
+        self._started = time.monotonic()
+        self._depth = 0
+        self._token = None
+        self._handed_off = False
+
+    def begin(self) -> "PublishTrace":
+        """Make this the current trace (spans opened from here on are recorded)"""
+        self._started = time.monotonic()
+        self.started_at = datetime.utcnow().isoformat()
+        self._token = _current.set(self)
+        return self
+
+    def end(self):
+        """Close the run ("error" unless finished) and store its timeline; no-op if never begun"""
+        if self._token is None:
+            return
+        if self.status is None:
+            self.finish("error")
+        _current.reset(self._token)
+        self._token = None
+        if not self._handed_off:
+            self.save()
+
+    def __enter__(self) -> "PublishTrace":
+        return self.begin()
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.status is None:
+            self.finish("error" if exc_type else "ok")
+        self.end()
+
+    def _enter(self) -> int:
+        self._depth += 1
+        return self._depth - 1
+
+    def _exit(self):
+        self._depth -= 1
+
+    def _record(self, step: str, started: float, duration: float, status: str, depth: int, attrs: Dict):
+        entry = {
+            "step": step,
+            "start_ms": round((started - self._started) * 1000),
+            "duration_ms": round(duration * 1000),
+            "status": status,
+            "depth": depth,
+        }
+        if attrs:
+            entry["attrs"] = attrs
+        self.spans.append(entry)
+
+    def handoff(self) -> Optional[Dict[str, Any]]:
+        """
+        Close a nested run as "ok" and return its timeline for the caller
+        to merge (None for a standalone run, which is stored by end())
+        """
+        self.finish("ok")
+        if not self.nested:
+            return None
+        self._handed_off = True
+        return self.timeline()
+
+    def merge(self, timeline: Optional[Dict[str, Any]], started: float):
+        """
+        Add the spans of a nested run handed back by an internal request,
+        below the span currently open (started: time.monotonic() at the call)
+        """
+        if not timeline:
+            return
+        offset = round((started - self._started) * 1000)
+        for s in timeline.get("spans", []):
+            self.spans.append({**s, "start_ms": s["start_ms"] + offset, "depth": s["depth"] + self._depth})
+
+    def finish(self, status: str):
+        """Close the run (ok / failed / error / captcha...) and observe its duration"""
+        if self.status is not None:
+            return
+        self.status = status
+        self.duration = time.monotonic() - self._started
+        if self.nested:
+            # Part of the caller's run, which is the one observed
+            return
+        track_publish_run(self.flow, status, self.duration)
+
+        slowest = max((s for s in self.spans if s["depth"] == 0), key=lambda s: s["duration_ms"], default=None)
+        logger.info(
+            f"[TRACE] publish {self.flow} {status} in {self.duration:.1f}s"
+            + (f" (slowest step: {slowest['step']} {slowest['duration_ms']}ms)" if slowest else "")
+        )
+
+    @property
+    def duration_ms(self) -> Optional[int]:
+        return round(self.duration * 1000) if self.duration is not None else None
+
+    def timeline(self) -> Dict[str, Any]:
+        """Serializable timeline, spans in start order"""
+        return {
+            "trace_id": self.trace_id,
+            "flow": self.flow,
+            "started_at": self.started_at,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "spans": sorted(self.spans, key=lambda s: (s["start_ms"], s["depth"])),
+        }
+
+    def save(self):
+        """Store the timeline with the publish log (never raises: tracing must not fail a publish)"""
+        try:
+            from backend.core.storage import get_store
+            get_store().record_publish_timeline(
+                log_id=str(uuid.uuid4()),
+                flow=self.flow,
+                status=self.status or "unknown",
+                duration_ms=self.duration_ms,
+                timeline=self.timeline(),
+                draft_id=self.draft_id,
+                user_id=self.user_id,
+                idempotency_key=self.idempotency_key,
+                listing_url=self.listing_url
+            )
+        except Exception as e:
+            logger.warning(f"[WARN] Failed to store publish timeline: {e}")
+
+
+def summarize_steps(timelines: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Per-step count / total / max over a set of timelines (slowest steps first)"""
+    steps: Dict[str, Dict[str, Any]] = {}
+    for timeline in timelines:
+        for s in timeline.get("spans", []):
+            entry = steps.setdefault(s["step"], {"count": 0, "total_ms": 0, "max_ms": 0})
+            entry["count"] += 1
+            entry["total_ms"] += s["duration_ms"]
+            entry["max_ms"] = max(entry["max_ms"], s["duration_ms"])
+    for entry in steps.values():
+        entry["avg_ms"] = round(entry["total_ms"] / entry["count"])
+    return dict(sorted(steps.items(), key=lambda item: item[1]["total_ms"], reverse=True))
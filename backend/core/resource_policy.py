@@ -0,0 +1,261 @@
+"""
+Request interception policy for Playwright contexts
+Vinted pages pull ads, analytics beacons, fonts and full-size images that
+the automation never looks at. They cost bandwidth and keep `networkidle`
+from settling; the policy aborts them at the context level.
+
+A safety allowlist always lets documents, scripts, XHR/fetch and anything
+from anti-bot / captcha providers through: blocking those would break the
+page or flag the session.
+"""
+import os
+import time
+import weakref
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+from loguru import logger
+
+BROWSER_BLOCK_RESOURCES = os.getenv("BROWSER_BLOCK_RESOURCES", "true").lower() == "true"
+
+
+def _env_list(name: str, default: str = "") -> Tuple[str, ...]:
+    return tuple(v.strip().lower() for v in os.getenv(name, default).split(",") if v.strip())
+
+
+# Playwright resource types aborted on every host
+BROWSER_BLOCKED_RESOURCE_TYPES = _env_list("BROWSER_BLOCKED_RESOURCE_TYPES", "image,media,font")
+# Extra third-party hosts to abort (added to DEFAULT_BLOCKED_HOSTS)
+BROWSER_BLOCKED_HOSTS = _env_list("BROWSER_BLOCKED_HOSTS")
+# Extra hosts never blocked (added to DEFAULT_ALLOWED_HOSTS)
+BROWSER_ALLOWED_HOSTS = _env_list("BROWSER_ALLOWED_HOSTS")
+
+# Ads, analytics and tracking (matched on the host and its subdomains)
+DEFAULT_BLOCKED_HOSTS = (
+    "google-analytics.com",
+    "analytics.google.com",
+    "googletagmanager.com",
+    "googletagservices.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "facebook.com",
+    "bat.bing.com",
+    "clarity.ms",
+    "hotjar.com",
+    "criteo.com",
+    "criteo.net",
+    "adnxs.com",
+    "amazon-adsystem.com",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "pinterest.com",
+    "snapchat.com",
+    "analytics.tiktok.com",
+    "sentry.io",
+    "nr-data.net",
+    "newrelic.com",
+)
+
+# Never blocked, whatever the type: anti-bot and captcha providers
+DEFAULT_ALLOWED_HOSTS = (
+    "captcha-delivery.com",
+    "datadome.co",
+    "recaptcha.net",
+    "www.google.com",
+    "www.gstatic.com",
+    "hcaptcha.com",
+    "arkoselabs.com",
+    "funcaptcha.com",
+    "challenges.cloudflare.com",
+)
+
+# Resource types the page cannot work without
+ESSENTIAL_RESOURCE_TYPES = ("document", "script", "xhr", "fetch", "websocket", "eventsource")
+
+# Typical transfer size per resource type, used to estimate what an aborted
+# request would have cost until real responses of that type have been seen
+DEFAULT_RESOURCE_BYTES = {
+    "image": 80 * 1024,
+    "media": 500 * 1024,
+    "font": 40 * 1024,
+    "stylesheet": 30 * 1024,
+    "script": 60 * 1024,
+    "other": 5 * 1024,
+}
+
+
+def _host_matches(host: str, suffixes: Iterable[str]) -> bool:
+    return any(host == s or host.endswith("." + s) for s in suffixes)
+
+
+class ResourceStats:
+    """Request counters of one page (or of a whole context)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.blocked = 0
+        self.blocked_bytes_est = 0
+        self.bytes_loaded = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        self.started_at = time.monotonic()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "bytes_loaded": self.bytes_loaded,
+            "blocked_bytes_est": self.blocked_bytes_est,
+            "age_seconds": round(time.monotonic() - self.started_at, 1),
+        }
+
+
+class ResourcePolicy:
+    """
+    Decides which requests a context aborts
+
+    Order: allowlisted host -> allowed; blocked host -> "host" (essential
+    types included); essential type -> allowed; blocked type ->
+    "type:<type>"; else allowed.
+    Allowed requests go through route.fallback(), so handlers registered
+    earlier (e.g. route_from_har in the benchmark) still serve them.
+    """
+
+    def __init__(
+        self,
+        blocked_types: Iterable[str] = BROWSER_BLOCKED_RESOURCE_TYPES,
+        blocked_hosts: Iterable[str] = DEFAULT_BLOCKED_HOSTS + BROWSER_BLOCKED_HOSTS,
+        allowed_hosts: Iterable[str] = DEFAULT_ALLOWED_HOSTS + BROWSER_ALLOWED_HOSTS
+    ):
+        self.blocked_types = frozenset(t for t in blocked_types if t not in ESSENTIAL_RESOURCE_TYPES)
+        self.blocked_hosts = tuple(blocked_hosts)
+        self.allowed_hosts = tuple(allowed_hosts)
+        # Per-context totals and per-page stats (dropped with the objects)
+        self._contexts: "weakref.WeakKeyDictionary[Any, ResourceStats]" = weakref.WeakKeyDictionary()
+        self._pages: "weakref.WeakKeyDictionary[Any, ResourceStats]" = weakref.WeakKeyDictionary()
+        # Observed bytes per resource type: (total, responses)
+        self._observed: Dict[str, Tuple[int, int]] = {}
+        self.totals = ResourceStats()
+
+    def decide(self, url: str, resource_type: str) -> Optional[str]:
+        """Block reason for a request, or None to let it through"""
+        host = (urlsplit(url).hostname or "").lower()
+        if not host or _host_matches(host, self.allowed_hosts):
+            return None
+        if resource_type in ESSENTIAL_RESOURCE_TYPES and not _host_matches(host, self.blocked_hosts):
+            return None
+        if _host_matches(host, self.blocked_hosts):
+            return "host"
+        if resource_type in self.blocked_types:
+            return f"type:{resource_type}"
+        return None
+
+    def estimated_bytes(self, resource_type: str) -> int:
+        total, count = self._observed.get(resource_type, (0, 0))
+        if count:
+            return total // count
+        return DEFAULT_RESOURCE_BYTES.get(resource_type, DEFAULT_RESOURCE_BYTES["other"])
+
+    # ------------------------------------------------------------------ wiring
+
+    async def install(self, context):
+        """Route every request of the context through the policy (once per context)"""
+        if context in self._contexts:
+            return
+        self._contexts[context] = ResourceStats()
+        await context.route("**/*", lambda route: self._handle(context, route))
+        context.on("response", lambda response: self._on_response(context, response))
+
+    def _page_stats(self, request) -> Optional[ResourceStats]:
+        try:
+            page = request.frame.page
+        except Exception:
+            # Service worker requests have no frame
+            return None
+        stats = self._pages.get(page)
+        if stats is None:
+            stats = self._pages[page] = ResourceStats()
+        return stats
+
+    def _targets(self, context, request):
+        targets = [self.totals, self._contexts.get(context), self._page_stats(request)]
+        return [t for t in targets if t is not None]
+
+    async def _handle(self, context, route):
+        request = route.request
+        reason = self.decide(request.url, request.resource_type)
+        targets = self._targets(context, request)
+        for stats in targets:
+            stats.requests += 1
+
+        if reason is None:
+            await route.fallback()
+            return
+
+        estimate = self.estimated_bytes(request.resource_type)
+        for stats in targets:
+            stats.blocked += 1
+            stats.blocked_bytes_est += estimate
+            stats.blocked_by_reason[reason] = stats.blocked_by_reason.get(reason, 0) + 1
+        try:
+            await route.abort("blockedbyclient")
+        except Exception:
+            # Page closed while the request was pending
+            pass
+
+    def _on_response(self, context, response):
+        try:
+            size = int(response.headers.get("content-length", 0))
+            request = response.request
+        except Exception:
+            return
+        if not size:
+            return
+        total, count = self._observed.get(request.resource_type, (0, 0))
+        self._observed[request.resource_type] = (total + size, count + 1)
+        for stats in self._targets(context, request):
+            stats.bytes_loaded += size
+
+    # ------------------------------------------------------------------ stats
+
+    def page_stats(self, page) -> Dict[str, Any]:
+        """Counters of one page"""
+        stats = self._pages.get(page)
+        return stats.as_dict() if stats else ResourceStats().as_dict()
+
+    def log_page(self, page, label: str = "page"):
+        stats = self._pages.get(page)
+        if not stats or not stats.requests:
+            return
+        logger.debug(
+            f"[ROUTE] {label}: {stats.blocked}/{stats.requests} requests blocked "
+            f"(~{stats.blocked_bytes_est / 1024:.0f} KB saved, {stats.bytes_loaded / 1024:.0f} KB loaded)"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": BROWSER_BLOCK_RESOURCES,
+            "blocked_types": sorted(self.blocked_types),
+            **self.totals.as_dict(),
+        }
+
+
+# Global instance
+_policy: Optional[ResourcePolicy] = None
+
+
+def get_resource_policy() -> ResourcePolicy:
+    """Get or create the ResourcePolicy singleton"""
+    global _policy
+    if _policy is None:
+        _policy = ResourcePolicy()
+    return _policy
+
+
+async def install_resource_policy(context):
+    """Apply the policy to a context if BROWSER_BLOCK_RESOURCES is on"""
+    if BROWSER_BLOCK_RESOURCES:
+        await get_resource_policy().install(context)
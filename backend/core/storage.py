@@ -5,8 +5,8 @@ Replaces PostgreSQL with file-based storage (data/vbs.db)
 import os
 import sqlite3
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 from pathlib import Path
 from contextlib import contextmanager
 import imagehash
@@ -19,6 +19,94 @@ TTL_DRAFTS_DAYS = int(os.getenv("TTL_DRAFTS_DAYS", "30"))
 TTL_PUBLISH_LOG_DAYS = int(os.getenv("TTL_PUBLISH_LOG_DAYS", "90"))
 DB_PATH = os.getenv("SQLITE_DB_PATH", "backend/data/vbs.db")
 
+# Draft columns a Vinted pull may overwrite (apply_sync_changes)
+SYNC_DRAFT_COLUMNS = ("title", "description", "price", "brand", "size", "color")
+
+
+def _order_timestamp(value: str) -> str:
+    """
+    order_date in its stored format, the one of CURRENT_TIMESTAMP
+    ('2024-01-05 10:00:00', UTC if the value has an offset): the bare column
+    then compares and sorts correctly, through idx_orders_user_date
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _usage_delta(user_id: str, tier: str, photos: str, logical: str, stored: str) -> str:
+    """Upsert adding deltas to one storage_usage row (trigger body statement)"""
+    return f"""
+        INSERT INTO storage_usage (user_id, tier, photo_count, logical_bytes, stored_bytes)
+        VALUES ({user_id}, {tier}, {photos}, {logical}, {stored})
+        ON CONFLICT(user_id, tier) DO UPDATE SET
+            photo_count = photo_count + excluded.photo_count,
+            logical_bytes = logical_bytes + excluded.logical_bytes,
+            stored_bytes = stored_bytes + excluded.stored_bytes;
+    """
+
+
+def _photo_usage(row: str, sign: str) -> str:
+    """Add (+) or remove (-) one photo_metadata row from its user and global counters"""
+    # Photos stored before dedup have no blob: their bytes are stored bytes
+    legacy = f"CASE WHEN {row}.content_hash IS NULL THEN {sign}{row}.compressed_size_bytes ELSE 0 END"
+    return (
+        _usage_delta(f"{row}.user_id", f"{row}.tier", f"{sign}1", f"{sign}{row}.compressed_size_bytes", "0")
+        + _usage_delta("'*'", f"{row}.tier", f"{sign}1", f"{sign}{row}.compressed_size_bytes", legacy)
+    )
+
+
+def _blob_usage(row: str, sign: str) -> str:
+    """Add (+) or remove (-) one photo_blobs row from the global stored bytes"""
+    return _usage_delta("'*'", f"{row}.tier", "0", "0", f"{sign}{row}.size_bytes")
+
+
+STORAGE_USAGE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS trg_usage_photo_insert AFTER INSERT ON photo_metadata
+        BEGIN {_photo_usage('NEW', '+')} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_usage_photo_delete AFTER DELETE ON photo_metadata
+        BEGIN {_photo_usage('OLD', '-')} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_usage_photo_update
+        AFTER UPDATE OF user_id, tier, compressed_size_bytes, content_hash ON photo_metadata
+        WHEN OLD.user_id IS NOT NEW.user_id OR OLD.tier IS NOT NEW.tier
+            OR OLD.compressed_size_bytes IS NOT NEW.compressed_size_bytes
+            OR OLD.content_hash IS NOT NEW.content_hash
+        BEGIN {_photo_usage('OLD', '-')} {_photo_usage('NEW', '+')} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_usage_blob_insert AFTER INSERT ON photo_blobs
+        BEGIN {_blob_usage('NEW', '+')} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_usage_blob_delete AFTER DELETE ON photo_blobs
+        BEGIN {_blob_usage('OLD', '-')} END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_usage_blob_update
+        AFTER UPDATE OF tier, size_bytes ON photo_blobs
+        WHEN OLD.tier IS NOT NEW.tier OR OLD.size_bytes IS NOT NEW.size_bytes
+        BEGIN {_blob_usage('OLD', '-')} {_blob_usage('NEW', '+')} END""",
+]
+
+# Full-scan values of every storage_usage row (used to seed and to reconcile)
+STORAGE_USAGE_SCAN = """
+    SELECT user_id, tier, SUM(photo_count) AS photo_count,
+           SUM(logical_bytes) AS logical_bytes, SUM(stored_bytes) AS stored_bytes
+    FROM (
+        SELECT user_id, tier, COUNT(*) AS photo_count,
+               SUM(compressed_size_bytes) AS logical_bytes, 0 AS stored_bytes
+        FROM photo_metadata GROUP BY user_id, tier
+        UNION ALL
+        SELECT '*', tier, COUNT(*), SUM(compressed_size_bytes),
+               SUM(CASE WHEN content_hash IS NULL THEN compressed_size_bytes ELSE 0 END)
+        FROM photo_metadata GROUP BY tier
+        UNION ALL
+        SELECT '*', tier, 0, 0, SUM(size_bytes) FROM photo_blobs GROUP BY tier
+    )
+    GROUP BY user_id, tier
+"""
+
+STORAGE_USAGE_REBUILD = [
+    "DELETE FROM storage_usage",
+    f"""INSERT INTO storage_usage (user_id, tier, photo_count, logical_bytes, stored_bytes)
+        {STORAGE_USAGE_SCAN}""",
+]
+
 
 class SQLiteStore:
     """
@@ -151,6 +239,13 @@ class SQLiteStore:
                     created_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+
+            # Migration: per-step publish timeline (backend/core/publish_trace.py)
+            for column in ("flow TEXT", "duration_ms INTEGER", "timeline_json TEXT"):
+                try:
+                    cursor.execute(f"ALTER TABLE publish_log ADD COLUMN {column}")
+                except sqlite3.OperationalError:
+                    pass
             
             # 4. Photo plans (migrated from PostgreSQL)
             cursor.execute("""
@@ -407,6 +502,13 @@ class SQLiteStore:
                 )
             """)
 
+            # Migration: order_date used to be written as Python ISO ('T',
+            # microseconds); one format for all rows, see _order_timestamp
+            cursor.execute("""
+                UPDATE orders SET order_date = datetime(order_date)
+                WHERE order_date != datetime(order_date)
+            """)
+
             # 18. Photo Metadata (Multi-tier storage tracking)
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS photo_metadata (
@@ -424,6 +526,7 @@ class SQLiteStore:
                     access_count INTEGER DEFAULT 0,
                     storage_path TEXT,
                     cdn_url TEXT,
+                    content_hash TEXT,
                     created_at TEXT DEFAULT CURRENT_TIMESTAMP,
                     updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
@@ -431,12 +534,125 @@ class SQLiteStore:
                 )
             """)
 
+            # Migration: content hash of the stored bytes (tier read cache key)
+            try:
+                cursor.execute("ALTER TABLE photo_metadata ADD COLUMN content_hash TEXT")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+
+            # 19. Photo edits (non-destructive operation list per photo and owner)
+            # Migration: the first version was keyed by photo_path alone
+            cursor.execute("PRAGMA table_info(photo_edits)")
+            edit_pk = {row["name"]: row["pk"] for row in cursor.fetchall()}
+            if edit_pk and not edit_pk.get("user_id"):
+                cursor.execute("ALTER TABLE photo_edits RENAME TO photo_edits_v1")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS photo_edits (
+                    user_id TEXT NOT NULL,
+                    photo_path TEXT NOT NULL,
+                    operations TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, photo_path)
+                )
+            """)
+            if edit_pk and not edit_pk.get("user_id"):
+                # Edits without an owner cannot be attributed: dropped
+                cursor.execute("""
+                    INSERT INTO photo_edits (user_id, photo_path, operations, created_at, updated_at)
+                    SELECT user_id, photo_path, operations, created_at, updated_at
+                    FROM photo_edits_v1 WHERE user_id IS NOT NULL
+                """)
+                cursor.execute("DROP TABLE photo_edits_v1")
+
+            # 20. Tier migration journal (objects copied + committed, source delete pending)
+            # photo_id holds the object key: content hash, or photo id for pre-dedup photos
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS tier_migrations (
+                    photo_id TEXT PRIMARY KEY,
+                    source_tier TEXT NOT NULL,
+                    target_tier TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # 21. Photo blobs (content-addressed objects, refcounted by photo_metadata)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS photo_blobs (
+                    content_hash TEXT PRIMARY KEY,
+                    tier TEXT NOT NULL CHECK(tier IN ('temp','hot','cold')),
+                    size_bytes INTEGER NOT NULL,
+                    refcount INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # 22. Blob deletion journal (refcount reached zero, object delete pending)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS blob_deletions (
+                    object_key TEXT NOT NULL,
+                    tier TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (object_key, tier)
+                )
+            """)
+
+            # 23. Storage usage counters, per user and tier (user_id '*' = all users)
+            # Maintained by the triggers below in the same transaction as the
+            # photo_metadata / photo_blobs writes; checked by the reconcile job
+            usage_is_new = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'storage_usage'"
+            ).fetchone() is None
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS storage_usage (
+                    user_id TEXT NOT NULL,
+                    tier TEXT NOT NULL,
+                    photo_count INTEGER NOT NULL DEFAULT 0,
+                    logical_bytes INTEGER NOT NULL DEFAULT 0,  -- sum of photo sizes
+                    stored_bytes INTEGER NOT NULL DEFAULT 0,   -- '*' only: bytes actually stored (once per blob)
+                    PRIMARY KEY (user_id, tier)
+                )
+            """)
+            for statement in STORAGE_USAGE_TRIGGERS:
+                cursor.execute(statement)
+            if usage_is_new:
+                # Existing photos: seed the counters once from a full scan
+                for statement in STORAGE_USAGE_REBUILD:
+                    cursor.execute(statement)
+
+            # 24. Manifest of the temp_photos/{job_id} upload folders, so the
+            # cleanup job never walks the folders to find or size them
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS temp_photo_dirs (
+                    job_id TEXT PRIMARY KEY,
+                    file_count INTEGER NOT NULL DEFAULT 0,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # 25. Delta sync state: fingerprint of each listing as last seen
+            # in the Vinted listing pages (backend/core/vinted_sync_service.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS vinted_sync_state (
+                    user_id TEXT NOT NULL,
+                    vinted_id TEXT NOT NULL,
+                    draft_id TEXT,
+                    fingerprint TEXT NOT NULL,
+                    synced_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, vinted_id)
+                )
+            """)
+
             # Create indexes for performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_user ON drafts(user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_status ON drafts(status)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_listings_user ON listings(user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_listings_vinted_id ON listings(vinted_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_publog_idem ON publish_log(idempotency_key)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_publog_created ON publish_log(created_at)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_plans_plan_id ON photo_plans(plan_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_job_id ON bulk_jobs(job_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
@@ -460,6 +676,7 @@ class SQLiteStore:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_vinted_id ON orders(vinted_order_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_date ON orders(order_date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_user_date ON orders(user_id, order_date)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_user ON photo_metadata(user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_tier ON photo_metadata(tier)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_draft ON photo_metadata(draft_id)")
@@ -467,6 +684,13 @@ class SQLiteStore:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_published ON photo_metadata(published_to_vinted)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_upload_date ON photo_metadata(upload_date)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_last_access ON photo_metadata(last_access_date)")
+            # Lifecycle keyset scans: (filter columns, date, photo_id)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_tier_deletion ON photo_metadata(tier, scheduled_deletion, photo_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_published_deletion ON photo_metadata(published_to_vinted, scheduled_deletion, photo_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_tier_upload ON photo_metadata(tier, upload_date, photo_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_tier_access ON photo_metadata(tier, last_access_date, photo_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_photos_content_hash ON photo_metadata(content_hash)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_temp_dirs_updated ON temp_photo_dirs(updated_at)")
 
             conn.commit()
     
@@ -893,6 +1117,78 @@ class SQLiteStore:
             ))
             conn.commit()
     
+    def record_publish_timeline(
+        self,
+        log_id: str,
+        flow: str,
+        status: str,
+        duration_ms: int,
+        timeline: Dict,
+        draft_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None,
+        listing_url: Optional[str] = None
+    ):
+        """
+        Store the timeline of a publish run in the publish log
+
+        Attached to the run's existing row when its idempotency key already
+        has one (two-phase publish), otherwise a row of its own is added
+        (without the key: a trace must never make a retry look like a
+        duplicate publish).
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            timeline_json = json.dumps(timeline)
+            if idempotency_key:
+                cursor.execute("""
+                    UPDATE publish_log
+                    SET flow = ?, duration_ms = ?, timeline_json = ?
+                    WHERE idempotency_key = ?
+                """, (flow, duration_ms, timeline_json, idempotency_key))
+                if cursor.rowcount:
+                    conn.commit()
+                    return
+
+            cursor.execute("""
+                INSERT INTO publish_log (id, user_id, draft_id, idempotency_key, confirm_token,
+                                        dry_run, status, listing_url, flow, duration_ms, timeline_json)
+                VALUES (?, ?, ?, NULL, '', 0, ?, ?, ?, ?, ?)
+            """, (
+                log_id, user_id, draft_id, status, listing_url,
+                flow, duration_ms, timeline_json
+            ))
+            conn.commit()
+
+    def get_slowest_publish_runs(
+        self,
+        hours: int = 24,
+        limit: int = 20,
+        flow: Optional[str] = None
+    ) -> List[Dict]:
+        """Slowest traced publish runs of the last `hours` hours, with their timelines"""
+        query = """
+            SELECT id, user_id, draft_id, flow, status, listing_url, duration_ms, timeline_json, created_at
+            FROM publish_log
+            WHERE timeline_json IS NOT NULL AND created_at >= datetime('now', ?)
+        """
+        params: List[Any] = [f"-{int(hours)} hours"]
+        if flow:
+            query += " AND flow = ?"
+            params.append(flow)
+        query += " ORDER BY duration_ms DESC LIMIT ?"
+        params.append(limit)
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            runs = []
+            for row in cursor.fetchall():
+                run = dict(row)
+                run["timeline"] = json.loads(run.pop("timeline_json"))
+                runs.append(run)
+            return runs
+
     def seen_idempotency(self, idempotency_key: str) -> bool:
         """Check if idempotency key was already used (prevents duplicate publishes)"""
         with self.get_connection() as conn:
@@ -2191,6 +2487,101 @@ class SQLiteStore:
                 "log_ttl_days": TTL_PUBLISH_LOG_DAYS
             }
 
+    # ==================== PHOTO EDITS ====================
+
+    def get_photo_edits(self, user_id: str, photo_path: str) -> List[Dict[str, Any]]:
+        """Get a user's ordered edit operations of a photo (empty list if unedited)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT operations FROM photo_edits WHERE user_id = ? AND photo_path = ?",
+                (user_id, photo_path)
+            )
+            row = cursor.fetchone()
+            return json.loads(row["operations"]) if row else []
+
+    def get_photo_edits_many(self, user_id: str, photo_paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Get a user's edit operations for several photos in one query (only edited photos are returned)"""
+        if not photo_paths:
+            return {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ",".join("?" * len(photo_paths))
+            cursor.execute(
+                f"SELECT photo_path, operations FROM photo_edits WHERE user_id = ? AND photo_path IN ({placeholders})",
+                [user_id, *photo_paths]
+            )
+            return {row["photo_path"]: json.loads(row["operations"]) for row in cursor.fetchall()}
+
+    def set_photo_edits(self, user_id: str, photo_path: str, operations: List[Dict[str, Any]]):
+        """Replace a user's edit operations of a photo (an empty list reverts to the original)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if not operations:
+                cursor.execute(
+                    "DELETE FROM photo_edits WHERE user_id = ? AND photo_path = ?",
+                    (user_id, photo_path)
+                )
+            else:
+                cursor.execute("""
+                    INSERT INTO photo_edits (user_id, photo_path, operations, updated_at)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(user_id, photo_path) DO UPDATE SET
+                        operations = excluded.operations,
+                        updated_at = CURRENT_TIMESTAMP
+                """, (user_id, photo_path, json.dumps(operations)))
+            conn.commit()
+
+    # ==================== TEMP PHOTOS MANIFEST ====================
+
+    def record_temp_photos(self, job_id: str, file_count: int, size_bytes: int):
+        """Add files written to temp_photos/{job_id} to the manifest"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO temp_photo_dirs (job_id, file_count, size_bytes)
+                VALUES (?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    file_count = file_count + excluded.file_count,
+                    size_bytes = size_bytes + excluded.size_bytes,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (job_id, file_count, size_bytes))
+            conn.commit()
+
+    def get_expired_temp_photo_dirs(self, max_age_hours: int = 24, limit: int = 500) -> List[Dict[str, Any]]:
+        """Upload folders not written to for max_age_hours, oldest first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT job_id, file_count, size_bytes FROM temp_photo_dirs
+                WHERE updated_at < datetime('now', ?)
+                ORDER BY updated_at
+                LIMIT ?
+            """, (f"-{int(max_age_hours)} hours", limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+    def delete_temp_photo_dirs(self, job_ids: List[str]):
+        """Forget deleted upload folders"""
+        if not job_ids:
+            return
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            placeholders = ",".join("?" * len(job_ids))
+            cursor.execute(f"DELETE FROM temp_photo_dirs WHERE job_id IN ({placeholders})", list(job_ids))
+            conn.commit()
+
+    def get_temp_photos_usage(self) -> Dict[str, int]:
+        """Folders, files and bytes currently in temp_photos (from the manifest)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COUNT(*) AS dirs,
+                       COALESCE(SUM(file_count), 0) AS files,
+                       COALESCE(SUM(size_bytes), 0) AS size_bytes
+                FROM temp_photo_dirs
+            """)
+            return dict(cursor.fetchone())
+
     # ==================== ORDERS (Dotb feature) ====================
 
     def save_order(
@@ -2241,7 +2632,7 @@ class SQLiteStore:
                 order_id, user_id, vinted_order_id, item_id, item_title, price,
                 buyer_id, buyer_name, status, tracking_number, shipping_carrier,
                 payment_method, shipping_address, notes, vinted_conversation_id,
-                order_date or datetime.now().isoformat(), paid_at, shipped_at
+                _order_timestamp(order_date or datetime.now().isoformat()), paid_at, shipped_at
             ))
             conn.commit()
             return order_id
@@ -2286,6 +2677,62 @@ class SQLiteStore:
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
 
+    def iter_user_orders(
+        self,
+        user_id: str,
+        status: Optional[str] = None,
+        from_date: Optional[str] = None,
+        to_date: Optional[str] = None,
+        batch_size: int = 500
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all orders of a user matching the filters (Dotb feature)
+
+        Filters are applied in SQL (idx_orders_user_date / idx_orders_status)
+        and rows are fetched in batches, so memory stays constant whatever
+        the number of orders.
+
+        Args:
+            user_id: User ID
+            status: Filter by status (optional)
+            from_date: Inclusive lower bound on order_date, ISO date or datetime (optional)
+            to_date: Inclusive upper bound on order_date, ISO date or datetime (optional)
+            batch_size: Number of rows fetched per round-trip
+
+        Yields:
+            Order dictionaries, newest first
+        """
+        conditions = ["user_id = ?"]
+        params: List[Any] = [user_id]
+
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+
+        # Bounds in the stored format, compared with the bare (indexed) column
+        if from_date:
+            conditions.append("order_date >= ?")
+            params.append(_order_timestamp(from_date))
+
+        if to_date:
+            conditions.append("order_date <= ?")
+            params.append(_order_timestamp(to_date))
+
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT * FROM orders
+                WHERE {' AND '.join(conditions)}
+                ORDER BY order_date DESC
+            """, params)
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+
     def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
         """Get order by ID (Dotb feature)"""
         with self.get_connection() as conn:
@@ -2540,6 +2987,75 @@ class SQLiteStore:
 
             return listings
 
+    def get_sync_fingerprints(self, user_id: int) -> Dict[str, str]:
+        """Stored delta-sync fingerprints of a user's listings: {vinted_id: fingerprint}"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT vinted_id, fingerprint FROM vinted_sync_state WHERE user_id = ?",
+                (str(user_id),)
+            )
+            return {row['vinted_id']: row['fingerprint'] for row in cursor.fetchall()}
+
+    def apply_sync_changes(
+        self,
+        user_id: int,
+        changes: Dict[str, Dict[str, Any]],
+        fingerprints: Optional[Dict[str, Tuple[str, str]]] = None
+    ) -> int:
+        """
+        Write pulled changes and sync fingerprints in one transaction
+
+        Args:
+            user_id: Owner of the listings
+            changes: {draft_id: {field: value}}; fields are draft columns
+                     (title, description, price, brand, size, color) or
+                     'condition' (kept in item_json)
+            fingerprints: {vinted_id: (draft_id, fingerprint)} to store
+
+        Returns:
+            Number of drafts updated
+        """
+        updated = 0
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+
+            for draft_id, fields in changes.items():
+                assignments = []
+                values = []
+                for field, value in fields.items():
+                    if field in SYNC_DRAFT_COLUMNS:
+                        assignments.append(f"{field} = ?")
+                        values.append(value)
+                    elif field == 'condition':
+                        assignments.append("item_json = json_set(COALESCE(item_json, '{}'), '$.condition', ?)")
+                        values.append(value)
+                if not assignments:
+                    continue
+                assignments.append("updated_at = CURRENT_TIMESTAMP")
+                values.extend([draft_id, str(user_id)])
+                cursor.execute(
+                    f"UPDATE drafts SET {', '.join(assignments)} WHERE id = ? AND user_id = ?",
+                    values
+                )
+                updated += cursor.rowcount
+
+            if fingerprints:
+                cursor.executemany("""
+                    INSERT INTO vinted_sync_state (user_id, vinted_id, draft_id, fingerprint, synced_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT(user_id, vinted_id) DO UPDATE SET
+                        draft_id = excluded.draft_id,
+                        fingerprint = excluded.fingerprint,
+                        synced_at = excluded.synced_at
+                """, [
+                    (str(user_id), vinted_id, draft_id, fingerprint)
+                    for vinted_id, (draft_id, fingerprint) in fingerprints.items()
+                ])
+
+            conn.commit()
+        return updated
+
     def mark_listing_synced(self, draft_id: str):
         """
         Mark a listing as synced (clear needs_sync flag)
@@ -0,0 +1,92 @@
+"""
+Tests du cache HTTP de VintedAPIClient : fraîcheur, revalidation 304,
+éviction LRU et invalidation
+"""
+import time
+
+import pytest
+
+from backend.core import http_cache
+from backend.core.http_cache import DiskStore, HTTPCache, freshness
+
+
+def test_freshness_rules(monkeypatch):
+    """Cache-Control d'abord, puis TTL de l'endpoint, sinon 0 si validateur"""
+    monkeypatch.setitem(http_cache.ENDPOINT_TTLS, "listing", 60)
+    assert freshness({"cache-control": "no-store", "etag": '"a"'}, "listing") is None
+    assert freshness({"cache-control": "no-cache"}, "listing") == 0
+    assert freshness({"cache-control": "private, max-age=30"}, "listing") == 30
+    assert freshness({}, "listing") == 60
+    assert freshness({"etag": '"a"'}, "unknown") == 0
+    assert freshness({}, "unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_is_served_until_it_expires():
+    """Entrée fraîche servie sans requête ; revalidate=True ne la sert jamais"""
+    cache = HTTPCache(max_entries=10)
+    assert await cache.store("k", 200, {"cache-control": "max-age=60"}, b"body", None)
+
+    entry, fresh = await cache.lookup("k")
+    assert fresh and entry.content == b"body"
+    # Sans validateur, revalider = requête complète
+    assert await cache.lookup("k", revalidate=True) == (None, False)
+
+    # Expirée sans validateur : rien à revalider, l'entrée disparaît
+    entry.expires_at = time.time() - 1
+    assert await cache.lookup("k") == (None, False)
+    assert cache.stats["hits"] == 1
+
+    # Une réponse non 200 ou no-store n'est jamais gardée
+    assert not await cache.store("e", 404, {"cache-control": "max-age=60"}, b"", None)
+    assert not await cache.store("n", 200, {"cache-control": "no-store"}, b"", None)
+    assert cache.stats["not_cacheable"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_is_refreshed_by_a_304():
+    """Entrée expirée avec ETag : requête conditionnelle puis 304 -> fraîche à nouveau"""
+    cache = HTTPCache(max_entries=10)
+    await cache.store("k", 200, {"etag": '"v1"', "cache-control": "max-age=0"}, b"body", None)
+
+    entry, fresh = await cache.lookup("k")
+    assert not fresh
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+
+    refreshed = await cache.refresh("k", entry, {"etag": '"v2"', "cache-control": "max-age=60"}, None)
+    assert refreshed.etag == '"v2"' and refreshed.content == b"body"
+    entry, fresh = await cache.lookup("k")
+    assert fresh and entry is refreshed
+    assert cache.stats["revalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used():
+    """Au-delà de max_entries, l'entrée la moins récemment lue sort"""
+    cache = HTTPCache(max_entries=2)
+    await cache.store("a", 200, {"cache-control": "max-age=60"}, b"a", None)
+    await cache.store("b", 200, {"cache-control": "max-age=60"}, b"b", None)
+    await cache.lookup("a")
+    await cache.store("c", 200, {"cache-control": "max-age=60"}, b"c", None)
+
+    assert (await cache.lookup("b"))[0] is None
+    assert (await cache.lookup("a"))[1] and (await cache.lookup("c"))[1]
+    assert cache.stats["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_memory_and_disk(tmp_path):
+    """Après une écriture, l'entrée n'est plus servie, ni de la mémoire ni du disque"""
+    cache = HTTPCache(max_entries=10, disk=DiskStore(str(tmp_path)))
+    await cache.store("k", 200, {"cache-control": "max-age=60"}, b"body", None)
+
+    # Redémarrage : l'entrée revient du disque
+    cache.clear()
+    entry, fresh = await cache.lookup("k")
+    assert fresh and entry.content == b"body"
+    assert cache.stats["disk_hits"] == 1
+
+    await cache.invalidate("k")
+    cache.clear()
+    assert await cache.lookup("k") == (None, False)
+    assert cache.stats["invalidations"] == 1
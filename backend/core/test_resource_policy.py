@@ -0,0 +1,52 @@
+"""
+Tests de ResourcePolicy.decide : priorité allowlist > hôte bloqué > type
+essentiel > type bloqué
+"""
+import pytest
+
+from backend.core.resource_policy import ResourcePolicy
+
+
+@pytest.fixture
+def policy():
+    return ResourcePolicy(
+        blocked_types=["image", "font", "script"],  # "script" est essentiel : ignoré
+        blocked_hosts=["doubleclick.net", "tracker.example"],
+        allowed_hosts=["captcha-delivery.com", "tracker.example"],
+    )
+
+
+@pytest.mark.parametrize("url, resource_type, reason", [
+    # Allowlist : passe toujours, même bloquée par hôte ou par type
+    ("https://geo.captcha-delivery.com/captcha.png", "image", None),
+    ("https://tracker.example/pixel.gif", "image", None),
+    ("https://tracker.example/tag.js", "script", None),
+    # Hôte bloqué (et ses sous-domaines), y compris pour un type essentiel
+    ("https://doubleclick.net/ad", "image", "host"),
+    ("https://stats.g.doubleclick.net/collect", "xhr", "host"),
+    ("https://securepubads.doubleclick.net/tag.js", "script", "host"),
+    ("https://securepubads.doubleclick.net/style.css", "stylesheet", "host"),
+    # Un hôte qui se termine seulement par le même texte n'est pas bloqué
+    ("https://notdoubleclick.net/app.js", "script", None),
+    # Types essentiels : jamais bloqués par type
+    ("https://www.vinted.fr/items/new", "document", None),
+    ("https://www.vinted.fr/app.js", "script", None),
+    ("https://www.vinted.fr/api/v2/items", "fetch", None),
+    # Types bloqués sur un hôte quelconque
+    ("https://images1.vinted.net/photo.jpg", "image", "type:image"),
+    ("https://www.vinted.fr/font.woff2", "font", "type:font"),
+    ("https://www.vinted.fr/style.css", "stylesheet", None),
+    # Pas d'hôte (data:, about:blank) : laissé passer
+    ("data:image/png;base64,AAAA", "image", None),
+    ("about:blank", "document", None),
+])
+def test_decide(policy, url, resource_type, reason):
+    assert policy.decide(url, resource_type) == reason
+
+
+def test_essential_types_cannot_be_blocked_by_type():
+    """Un type essentiel dans blocked_types est retiré de la politique"""
+    policy = ResourcePolicy(blocked_types=["script", "xhr", "media"], blocked_hosts=[], allowed_hosts=[])
+    assert policy.blocked_types == frozenset({"media"})
+    assert policy.decide("https://cdn.example/video.mp4", "media") == "type:media"
+    assert policy.decide("https://cdn.example/app.js", "script") is None
@@ -0,0 +1,58 @@
+"""
+Tests du filtre de dates de iter_user_orders : order_date est stocké dans un
+seul format (celui de CURRENT_TIMESTAMP), comparé sans datetime() pour l'index
+"""
+from backend.core.storage import SQLiteStore
+
+
+def test_iter_user_orders_same_day_bounds(tmp_path):
+    """Commandes du même jour écrites en ISO ou par CURRENT_TIMESTAMP, bornes sur ce jour"""
+    store = SQLiteStore(str(tmp_path / "vbs.db"))
+    store.save_order("iso", "1", "Robe", 10.0, order_date="2026-10-18T00:00:00")
+    store.save_order("iso_late", "1", "Jupe", 10.0, order_date="2026-10-18T23:30:00.250000")
+    store.save_order("before", "1", "Veste", 10.0, order_date="2026-10-17T23:59:59")
+    store.save_order("after", "1", "Pull", 10.0, order_date="2026-10-19T00:00:00")
+    store.save_order("offset", "1", "Gilet", 10.0, order_date="2026-10-19T01:00:00+02:00")
+    with store.get_connection() as conn:
+        # Lignes écrites par le DEFAULT CURRENT_TIMESTAMP de la table
+        conn.execute(
+            "INSERT INTO orders (id, user_id, item_title, price, order_date) VALUES "
+            "('space', '1', 'Sac', 10.0, '2026-10-18 09:15:00'), "
+            "('space_midnight', '1', 'Chapeau', 10.0, '2026-10-18 00:00:00')"
+        )
+        conn.commit()
+
+    assert store.get_order("iso_late")["order_date"] == "2026-10-18 23:30:00"
+    assert store.get_order("offset")["order_date"] == "2026-10-18 23:00:00"
+
+    orders = store.iter_user_orders(
+        "1", from_date="2026-10-18T00:00:00", to_date="2026-10-18T23:59:59.999999"
+    )
+    assert sorted(o["id"] for o in orders) == ["iso", "iso_late", "offset", "space", "space_midnight"]
+
+    # Borne haute à minuit : seules les commandes de 00:00:00 pile
+    orders = store.iter_user_orders("1", from_date="2026-10-18", to_date="2026-10-18T00:00:00")
+    assert sorted(o["id"] for o in orders) == ["iso", "space_midnight"]
+
+
+def test_legacy_iso_order_dates_are_normalized(tmp_path):
+    """Les anciennes lignes au format ISO sont réécrites à l'ouverture de la base"""
+    store = SQLiteStore(str(tmp_path / "vbs.db"))
+    with store.get_connection() as conn:
+        conn.execute(
+            "INSERT INTO orders (id, user_id, item_title, price, order_date) VALUES "
+            "('legacy', '1', 'Robe', 10.0, '2026-10-18T10:00:00.123456'), "
+            "('garbage', '1', 'Jupe', 10.0, 'hier')"
+        )
+        conn.commit()
+
+    store = SQLiteStore(str(tmp_path / "vbs.db"))
+    assert store.get_order("legacy")["order_date"] == "2026-10-18 10:00:00"
+    assert store.get_order("garbage")["order_date"] == "hier"
+
+    with store.get_connection() as conn:
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM orders WHERE user_id = ? AND order_date >= ? "
+            "ORDER BY order_date DESC", ("1", "2026-10-18 00:00:00")
+        ))
+    assert "idx_orders_user_date" in plan
@@ -0,0 +1,147 @@
+"""
+Tests de la synchro delta : seules les annonces dont l'empreinte a changé (ou
+absentes des pages) sont relues en détail, et tout est écrit en une transaction
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import backend.core.storage as core_storage
+from backend.core import vinted_sync_service as sync
+from backend.core.vinted_sync_service import (
+    MISSING_FINGERPRINT,
+    SyncConflictStrategy,
+    SyncStatus,
+    VintedSyncService,
+    listing_fingerprint,
+)
+
+USER_ID = 7
+
+
+def page_item(vinted_id, **fields):
+    item = {"id": vinted_id, "title": "Robe", "description": "Robe d'été", "price": "10.0"}
+    item.update(fields)
+    return item
+
+
+class FakeVintedAPIClient:
+    """Pages de get_user_listings et détails de get_listing, appels enregistrés"""
+
+    pages = []
+    details = {}
+    calls = []
+
+    def __init__(self, session=None):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_user_listings(self, user_id=None, status=None, per_page=100, page=1, fresh=False):
+        self.calls.append(("page", page, fresh))
+        return True, self.pages[page - 1] if page <= len(self.pages) else [], None
+
+    async def get_listing(self, item_id, fresh=False):
+        self.calls.append(("listing", item_id, fresh))
+        return self.details.get(item_id)
+
+
+class NoWait:
+    async def wait_if_needed(self):
+        pass
+
+    def record_request(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """SQLiteStore temporaire, client Vinted factice, 2 annonces par page"""
+    store = core_storage.SQLiteStore(str(tmp_path / "vbs.db"))
+    monkeypatch.setattr(core_storage, "_store", store)
+    monkeypatch.setattr(sync, "VintedAPIClient", FakeVintedAPIClient)
+    monkeypatch.setattr(sync, "get_vinted_session", lambda user_id: object())
+    monkeypatch.setattr(sync, "SYNC_PAGE_SIZE", 2)
+    FakeVintedAPIClient.calls = []
+
+    for draft_id, vinted_id in [("d1", "101"), ("d2", "102"), ("d3", "103"), ("d4", "104")]:
+        store.save_draft(
+            draft_id, "Robe", "Robe d'été", 10.0, user_id=str(USER_ID), status="published",
+            item_json={"vinted_id": vinted_id}, skip_duplicate_check=True
+        )
+    return store
+
+
+def service(strategy=SyncConflictStrategy.VINTED_WINS) -> VintedSyncService:
+    svc = VintedSyncService(USER_ID, conflict_strategy=strategy)
+    svc.rate_limiter = NoWait()
+    return svc
+
+
+def fetched() -> list:
+    return sorted(c[1] for c in FakeVintedAPIClient.calls if c[0] == "listing")
+
+
+@pytest.mark.asyncio
+async def test_delta_pull_fetches_changed_and_missing_listings_once(store, monkeypatch):
+    """101 inchangée : pas relue ; 102 modifiée : relue et écrite ; 103 absente : relue une seule fois"""
+    unchanged, changed = page_item("101"), page_item("102", price="15.0")
+    FakeVintedAPIClient.pages = [[unchanged, changed], [page_item("104")]]
+    FakeVintedAPIClient.details = {"102": changed}
+    store.apply_sync_changes(USER_ID, {}, {
+        "101": ("d1", listing_fingerprint(unchanged)),
+        "102": ("d2", "old"),
+        "104": ("d4", listing_fingerprint(page_item("104"))),
+    })
+
+    writes = []
+    apply = store.apply_sync_changes
+    monkeypatch.setattr(store, "apply_sync_changes", lambda *a, **kw: writes.append(a) or apply(*a, **kw))
+
+    result = await service().pull_changes()
+
+    assert result.status == SyncStatus.SUCCESS
+    assert fetched() == ["102", "103"]
+    # Pages et détails toujours revalidés auprès de Vinted
+    assert all(c[2] for c in FakeVintedAPIClient.calls)
+    assert result.remote_calls == 4  # 2 pages + 2 détails
+
+    # Une seule écriture pour les changements et les empreintes
+    assert len(writes) == 1
+    assert store.get_draft("d2")["price"] == 15.0
+    fingerprints = store.get_sync_fingerprints(USER_ID)
+    assert fingerprints["102"] == listing_fingerprint(changed)
+    assert fingerprints["103"] == MISSING_FINGERPRINT
+
+    # Synchro suivante : l'annonce absente n'est plus relue
+    FakeVintedAPIClient.calls = []
+    await service().pull_changes()
+    assert fetched() == []
+
+
+@pytest.mark.asyncio
+async def test_manual_conflict_keeps_the_old_fingerprint(store):
+    """Conflit laissé en résolution manuelle : brouillon et empreinte inchangés, relu à la prochaine synchro"""
+    conflicting = page_item("104", price="20.0", updated_at=datetime.utcnow() + timedelta(minutes=1))
+    FakeVintedAPIClient.pages = [[page_item("101"), page_item("102")], [page_item("103"), conflicting]]
+    FakeVintedAPIClient.details = {"104": conflicting}
+    store.apply_sync_changes(USER_ID, {}, {
+        "101": ("d1", listing_fingerprint(page_item("101"))),
+        "102": ("d2", listing_fingerprint(page_item("102"))),
+        "103": ("d3", listing_fingerprint(page_item("103"))),
+        "104": ("d4", "old"),
+    })
+
+    svc = service(SyncConflictStrategy.MANUAL)
+    svc.last_sync = datetime.utcnow() - timedelta(hours=1)
+    result = await svc.pull_changes()
+
+    assert result.status == SyncStatus.CONFLICT
+    assert [(c.listing_id, c.field) for c in result.conflicts] == [("104", "price")]
+    assert fetched() == ["104"]
+    assert store.get_draft("d4")["price"] == 10.0
+    assert store.get_sync_fingerprints(USER_ID)["104"] == "old"
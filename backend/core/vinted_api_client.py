@@ -6,9 +6,13 @@ import httpx
 import random
 import time
 import asyncio
+import hashlib
 from typing import Optional, Dict, Any, List, Tuple
 from loguru import logger
 from backend.core.session import VintedSession
+from backend.core.http_cache import VINTED_HTTP_CACHE, CacheEntry, get_http_cache
+from backend.core.http_clients import SessionClient, get_http_clients
+from backend.core.metrics import track_http_cache
 
 
 class VintedAPIClient:
@@ -28,11 +32,16 @@ class VintedAPIClient:
             session: VintedSession with cookie and user_agent
         """
         self.session = session
-        self.client = httpx.AsyncClient(
-            headers=self._get_headers(),
-            timeout=30.0,
-            follow_redirects=True
-        )
+        self.headers = self._get_headers()
+
+    @property
+    def client(self) -> SessionClient:
+        """
+        Shared keep-alive "vinted" pool (backend/core/http_clients.py) with
+        this session's headers; resolved on use, since the client can be
+        built outside an event loop
+        """
+        return SessionClient(get_http_clients().get("vinted"), self.headers)
 
     def _get_headers(self) -> Dict[str, str]:
         """Get HTTP headers with session cookies"""
@@ -42,17 +51,77 @@ class VintedAPIClient:
             'Accept': 'application/json, text/plain, */*',
             'Accept-Language': 'fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7',
             'Accept-Encoding': 'gzip, deflate, br',
+            # No 'Connection: keep-alive': the pool keeps connections open,
+            # and the header is illegal over HTTP/2
             'Origin': 'https://www.vinted.com',
             'Referer': 'https://www.vinted.com/',
             'X-Requested-With': 'XMLHttpRequest',
-            'Connection': 'keep-alive',
             'Sec-Fetch-Dest': 'empty',
             'Sec-Fetch-Mode': 'cors',
             'Sec-Fetch-Site': 'same-origin'
         }
 
+    @property
+    def _cache_scope(self) -> str:
+        """Cache partition of this session (responses are per account)"""
+        return hashlib.sha256(self.session.cookie.encode()).hexdigest()[:16]
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint: Optional[str] = None,
+        fresh: bool = False
+    ) -> httpx.Response:
+        """
+        GET through the shared HTTP cache (backend/core/http_cache.py)
+
+        Args:
+            url: Full URL
+            params: Query parameters
+            endpoint: Endpoint name for per-endpoint TTLs and stats
+            fresh: Skip fresh entries (at best a conditional request)
+
+        Returns:
+            The response, possibly rebuilt from the cache (always 200 then)
+        """
+        request = self.client.build_request("GET", url, params=params)
+        if not VINTED_HTTP_CACHE:
+            return await self.client.send(request)
+
+        cache = get_http_cache()
+        key = cache.key(self._cache_scope, str(request.url))
+        entry, is_fresh = await cache.lookup(key, revalidate=fresh)
+        if is_fresh:
+            track_http_cache(endpoint, "hit")
+            return self._cached_response(entry, request)
+
+        if entry:
+            request.headers.update(entry.conditional_headers())
+        response = await self.client.send(request)
+
+        if entry and response.status_code == 304:
+            entry = await cache.refresh(key, entry, dict(response.headers), endpoint)
+            track_http_cache(endpoint, "revalidated")
+            return self._cached_response(entry, request)
+
+        cache.miss()
+        track_http_cache(endpoint, "miss")
+        await cache.store(key, response.status_code, dict(response.headers), response.content, endpoint)
+        return response
+
+    @staticmethod
+    def _cached_response(entry: CacheEntry, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(entry.status_code, headers=entry.headers, content=entry.content, request=request)
+
+    async def _invalidate(self, url: str):
+        """Drop the cached GET of a resource after a write to it"""
+        if VINTED_HTTP_CACHE:
+            cache = get_http_cache()
+            await cache.invalidate(cache.key(self._cache_scope, str(httpx.URL(url))))
+
     async def close(self):
-        """Close HTTP client"""
+        """Release the HTTP client (the shared pool stays open)"""
         await self.client.aclose()
 
     async def __aenter__(self):
@@ -92,6 +161,7 @@ class VintedAPIClient:
 
             if response.status_code == 200:
                 logger.info(f"[OK] Successfully bumped item {item_id}")
+                await self._invalidate(f"{self.API_BASE}/items/{item_id}")
                 return (True, None)
             elif response.status_code == 402:
                 # Payment required - free bumps exhausted
@@ -121,7 +191,7 @@ class VintedAPIClient:
             url = f"{self.API_BASE}/users/{user_id}/items"
             params = {"per_page": per_page}
 
-            response = await self.client.get(url, params=params)
+            response = await self._get(url, params=params, endpoint="user_items")
 
             if response.status_code == 200:
                 data = response.json()
@@ -157,6 +227,7 @@ class VintedAPIClient:
 
             if response.status_code == 200:
                 logger.info(f"[OK] Successfully followed user {user_id}")
+                await self._invalidate(f"{self.API_BASE}/users/{user_id}")
                 return (True, None)
             elif response.status_code == 422:
                 return (False, "Already following this user")
@@ -190,6 +261,7 @@ class VintedAPIClient:
 
             if response.status_code == 200:
                 logger.info(f"[OK] Successfully unfollowed user {user_id}")
+                await self._invalidate(f"{self.API_BASE}/users/{user_id}")
                 return (True, None)
             elif response.status_code == 422:
                 return (False, "Not following this user")
@@ -216,7 +288,7 @@ class VintedAPIClient:
             url = f"{self.API_BASE}/users/{user_id}/followers"
             params = {"page": page, "per_page": 20}
 
-            response = await self.client.get(url, params=params)
+            response = await self._get(url, params=params, endpoint="followers")
 
             if response.status_code == 200:
                 data = response.json()
@@ -295,7 +367,7 @@ class VintedAPIClient:
             url = f"{self.API_BASE}/conversations"
             params = {"page": page, "per_page": per_page}
 
-            response = await self.client.get(url, params=params)
+            response = await self._get(url, params=params, endpoint="conversations")
 
             if response.status_code == 200:
                 data = response.json()
@@ -344,7 +416,7 @@ class VintedAPIClient:
         try:
             url = f"{self.API_BASE}/users/current"
 
-            response = await self.client.get(url)
+            response = await self._get(url, endpoint="current_user")
 
             if response.status_code == 200:
                 data = response.json()
@@ -369,7 +441,7 @@ class VintedAPIClient:
         try:
             url = f"{self.API_BASE}/users/{user_id}"
 
-            response = await self.client.get(url)
+            response = await self._get(url, endpoint="user")
 
             if response.status_code == 200:
                 data = response.json()
@@ -410,7 +482,7 @@ class VintedAPIClient:
                 "per_page": per_page
             }
 
-            response = await self.client.get(url, params=params)
+            response = await self._get(url, params=params, endpoint="search_users")
 
             if response.status_code == 200:
                 data = response.json()
@@ -470,7 +542,7 @@ class VintedAPIClient:
             if price_to is not None:
                 params["price_to"] = price_to
 
-            response = await self.client.get(url, params=params)
+            response = await self._get(url, params=params, endpoint="search_items")
 
             if response.status_code == 200:
                 data = response.json()
@@ -505,6 +577,7 @@ class VintedAPIClient:
 
             if response.status_code == 200:
                 logger.info(f"[OK] Successfully liked item {item_id}")
+                await self._invalidate(f"{self.API_BASE}/items/{item_id}")
                 return (True, None)
             elif response.status_code == 422:
                 return (False, "Already liked this item")
@@ -530,6 +603,7 @@ class VintedAPIClient:
             response = await self.client.delete(url)
 
             if response.status_code == 200:
+                await self._invalidate(f"{self.API_BASE}/items/{item_id}")
                 return (True, None)
             else:
                 return (False, f"Unlike failed: HTTP {response.status_code}")
@@ -541,12 +615,13 @@ class VintedAPIClient:
     # LISTING MANAGEMENT (Sprint 1 Feature 1B)
     # ======================
 
-    async def get_listing(self, item_id: str) -> Optional[Dict[str, Any]]:
+    async def get_listing(self, item_id: str, fresh: bool = False) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific listing
 
         Args:
             item_id: Vinted item ID
+            fresh: Bypass the cache TTL (revalidate with Vinted)
 
         Returns:
             Listing data dict or None if not found
@@ -556,7 +631,7 @@ class VintedAPIClient:
 
             url = f"{self.API_BASE}/items/{item_id}"
 
-            response = await self.client.get(url)
+            response = await self._get(url, endpoint="listing", fresh=fresh)
 
             if response.status_code == 200:
                 data = response.json()
@@ -619,6 +694,7 @@ class VintedAPIClient:
 
             if response.status_code == 200:
                 logger.info(f"[OK] Successfully updated listing {item_id}")
+                await self._invalidate(url)
                 return True
             elif response.status_code == 403:
                 logger.error(f"Forbidden to update listing {item_id} (not owner?)")
@@ -638,15 +714,19 @@ class VintedAPIClient:
         self,
         user_id: Optional[str] = None,
         status: Optional[str] = None,
-        per_page: int = 100
+        per_page: int = 100,
+        page: int = 1,
+        fresh: bool = False
     ) -> Tuple[bool, Optional[List[Dict]], Optional[str]]:
         """
-        Get all listings for a user (authenticated user or specific user_id)
+        Get one page of listings for a user (authenticated user or specific user_id)
 
         Args:
             user_id: User ID (None = authenticated user)
             status: Filter by status ('active', 'sold', 'inactive')
             per_page: Results per page
+            page: Page number (1-based; a short page is the last one)
+            fresh: Bypass the cache TTL (revalidate with Vinted)
 
         Returns:
             (success, items_list, error_message)
@@ -658,13 +738,14 @@ class VintedAPIClient:
                 url = f"{self.API_BASE}/items"  # Authenticated user's items
 
             params = {
-                "per_page": per_page
+                "per_page": per_page,
+                "page": page
             }
 
             if status:
                 params["status"] = status
 
-            response = await self.client.get(url, params=params)
+            response = await self._get(url, params=params, endpoint="user_listings", fresh=fresh)
 
             if response.status_code == 200:
                 data = response.json()
@@ -3,32 +3,105 @@ Vinted automation client using Playwright.
 Handles listing creation, photo uploads, and captcha detection.
 Enhanced with advanced anti-detection measures for Sprint 1.
 """
+import os
 import asyncio
 import base64
+import hashlib
 import random
 import re
 from typing import Optional, List, Dict, Any, Tuple
 from pathlib import Path
-from playwright.async_api import async_playwright, Browser, BrowserContext, Page, TimeoutError as PlaywrightTimeout
+from playwright.async_api import Browser, BrowserContext, Page, TimeoutError as PlaywrightTimeout
 from backend.core.session import VintedSession
 from backend.core.circuit_breaker import playwright_breaker, CircuitBreakerError
+from backend.core.browser_pool import BrowserLease, get_browser_pool
+from backend.core.resource_policy import get_resource_policy, install_resource_policy
+from backend.core.publish_trace import span, traced
 from backend.core.anti_detection import HumanBehavior, BrowserFingerprint, SelectorRotator
 from loguru import logger
 
 
+# Photos are re-encoded before upload: longest side in px (0 = upload originals) and JPEG quality
+VINTED_UPLOAD_MAX_PX = int(os.getenv("VINTED_UPLOAD_MAX_PX", "1600"))
+VINTED_UPLOAD_QUALITY = int(os.getenv("VINTED_UPLOAD_QUALITY", "85"))
+# Max wait for the uploaded photos to show up as thumbnails
+VINTED_UPLOAD_TIMEOUT_MS = int(os.getenv("VINTED_UPLOAD_TIMEOUT_MS", "60000"))
+# One element per uploaded photo in the listing form
+VINTED_PHOTO_THUMBNAIL_SELECTOR = os.getenv(
+    "VINTED_PHOTO_THUMBNAIL_SELECTOR",
+    '.media-item-list .media-item, [data-testid^="media-item"]'
+)
+# The first thumbnail must show up within this delay, otherwise the selector
+# is taken as stale and uploads fall back to a network-idle wait this long
+VINTED_THUMBNAIL_PROBE_MS = int(os.getenv("VINTED_THUMBNAIL_PROBE_MS", "10000"))
+
+
+async def prepare_upload_files(photo_paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Read and downsize photos for a browser upload
+
+    Returns Playwright file payloads ({"name", "mimeType", "buffer"}) in
+    input order, resized on the image process pool. A photo that cannot be
+    re-encoded is sent as is.
+    """
+    from backend.storage.compression import ImageCompressor
+
+    def read(path: str) -> bytes:
+        with open(path, "rb") as f:
+            return f.read()
+
+    originals = await asyncio.gather(*(asyncio.to_thread(read, path) for path in photo_paths))
+
+    if VINTED_UPLOAD_MAX_PX > 0:
+        results = await ImageCompressor().compress_many(
+            originals,
+            quality=VINTED_UPLOAD_QUALITY,
+            max_width=VINTED_UPLOAD_MAX_PX,
+            max_height=VINTED_UPLOAD_MAX_PX,
+            draft=True
+        )
+    else:
+        results = [{"ok": False} for _ in originals]
+
+    payloads = []
+    for path, data, result in zip(photo_paths, originals, results):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        if result["ok"] and len(result["data"]) < len(data):
+            payloads.append({"name": f"{stem}.jpg", "mimeType": "image/jpeg", "buffer": result["data"]})
+        else:
+            mime = {".png": "image/png", ".webp": "image/webp", ".gif": "image/gif"}.get(ext.lower(), "image/jpeg")
+            payloads.append({"name": os.path.basename(path), "mimeType": mime, "buffer": data})
+
+    before = sum(len(d) for d in originals)
+    after = sum(len(p["buffer"]) for p in payloads)
+    logger.info(f"[PHOTO] {len(payloads)} photos ready for upload: {before // 1024} KB -> {after // 1024} KB")
+    return payloads
+
+
 class CaptchaDetected(Exception):
     """Raised when captcha or verification is detected"""
     pass
 
 
+def session_account_key(session: VintedSession) -> str:
+    """Pool key of a session's warm browser context (a new cookie gets a new context)"""
+    return hashlib.sha256(f"{session.cookie}|{session.user_agent}".encode()).hexdigest()[:16]
+
+
 class VintedClient:
     """Playwright-based Vinted automation client"""
+
+    # Set when VINTED_PHOTO_THUMBNAIL_SELECTOR stopped matching (shared by all clients)
+    _thumbnail_selector_stale = False
     
     def __init__(self, headless: bool = True):
         self.headless = headless
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
+        self._lease: Optional[BrowserLease] = None
+        # Set when a challenge was seen: the context is not kept warm
+        self._discard_context = False
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -37,60 +110,16 @@ class VintedClient:
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        await self.close()
+        await self.close(keep_context=exc_type is None)
     
     async def init(self):
-        """Initialize browser and context"""
-        import subprocess
-
-        # Get Chromium path from Nix (fix for Replit NixOS)
-        try:
-            chromium_path = subprocess.check_output(['which', 'chromium']).decode().strip()
-        except:
-            chromium_path = None  # Fallback to Playwright's bundled browser
-
-        playwright = await async_playwright().start()
-
-        # Extended Chromium args for better performance and anti-detection
-        launch_kwargs = {
-            'headless': self.headless,
-            'args': [
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-blink-features=AutomationControlled',  # Hide automation
-                '--disable-features=IsolateOrigins,site-per-process',  # Performance
-                '--disable-web-security',  # Allow cross-origin
-                '--disable-features=VizDisplayCompositor',  # Better stability
-                '--disable-gpu',  # GPU not needed in headless
-                '--no-first-run',
-                '--no-default-browser-check',
-                '--disable-infobars',
-                '--window-size=1280,720',
-                '--disable-backgrounding-occluded-windows',
-                '--disable-renderer-backgrounding',
-                '--disable-background-timer-throttling',
-                '--disable-hang-monitor',
-                '--disable-prompt-on-repost',
-                '--disable-sync',
-                '--disable-translate',
-                '--metrics-recording-only',
-                '--mute-audio',
-                '--safebrowsing-disable-auto-update',
-                '--password-store=basic',
-                '--use-mock-keychain',
-                '--disable-extensions',
-                '--disable-plugins',
-            ],
-            'timeout': 60000,  # 60 seconds browser launch timeout
-        }
-
-        # Use system Chromium if available (fixes libgbm1 dependency issue on NixOS)
-        if chromium_path:
-            launch_kwargs['executable_path'] = chromium_path
-
-        self.browser = await playwright.chromium.launch(**launch_kwargs)
+        """Lease a warm browser from the shared pool (no Chromium launch per client)"""
+        if self._lease is not None:
+            return
+        self._lease = await get_browser_pool(self.headless).acquire()
+        self.browser = self._lease.browser
     
+    @traced("create_context")
     async def create_context(self, session: VintedSession) -> BrowserContext:
         """
         Create browser context with session cookies and anti-detection fingerprint
@@ -104,6 +133,15 @@ class VintedClient:
         if not self.browser:
             raise RuntimeError("Browser not initialized. Call init() first.")
 
+        # Same account as a previous client: reuse its warm context (cookies
+        # already set and verified, same fingerprint)
+        warm_context = await self._lease.bind(session_account_key(session))
+        self.browser = self._lease.browser
+        if warm_context is not None:
+            self.context = warm_context
+            logger.info("Reusing warm browser context for this account")
+            return self.context
+
         # Generate realistic browser fingerprint
         fingerprint = BrowserFingerprint.generate()
 
@@ -173,9 +211,28 @@ class VintedClient:
             }
         )
 
+        # Handed to the lease right away: a failure below must not leak it
+        self._lease.context = self.context
+        try:
+            await self._prepare_context(fingerprint, cookies)
+        except Exception:
+            # Half-prepared context: closed with the lease, never kept warm
+            self._discard_context = True
+            await self.close(keep_context=False)
+            raise
+
+        logger.info(f"Created context with fingerprint: {fingerprint['user_agent'][:60]}...")
+
+        return self.context
+    
+    async def _prepare_context(self, fingerprint: Dict[str, Any], cookies: List[Dict[str, Any]]):
+        """Anti-detection scripts, resource policy and session cookies of a new context"""
         # Apply advanced anti-detection scripts
         await BrowserFingerprint.apply_to_context(self.context, fingerprint)
 
+        # Abort ads, trackers, fonts and images (kept with the warm context)
+        await install_resource_policy(self.context)
+
         # Create a temporary page and navigate to Vinted before adding cookies
         # This ensures the domain context is set correctly
         temp_page = await self.context.new_page()
@@ -248,10 +305,7 @@ class VintedClient:
         
         await temp_page.close()
 
-        logger.info(f"Created context with fingerprint: {fingerprint['user_agent'][:60]}...")
-
-        return self.context
-    
+    @traced("new_page")
     async def new_page(self) -> Page:
         """Create new page in context"""
         if not self.context:
@@ -260,14 +314,28 @@ class VintedClient:
         self.page = await self.context.new_page()
         return self.page
     
-    async def close(self):
-        """Close browser and context"""
+    async def new_context(self, **kwargs) -> BrowserContext:
+        """Throwaway context on the leased browser (closed by close())"""
+        if not self._lease:
+            raise RuntimeError("Browser not initialized. Call init() first.")
+        context = await self.browser.new_context(**kwargs)
+        self._lease.ephemeral.append(context)
+        return context
+    
+    async def close(self, keep_context: bool = True):
+        """Close the page and return the browser to the pool (context kept warm)"""
         if self.page:
-            await self.page.close()
-        if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
+            get_resource_policy().log_page(self.page)
+            try:
+                await self.page.close()
+            except Exception:
+                pass
+        if self._lease:
+            await self._lease.release(keep_context=keep_context and not self._discard_context)
+            self._lease = None
+        self.browser = None
+        self.context = None
+        self.page = None
     
     async def human_delay(self, min_ms: int = 100, max_ms: int = 500):
         """
@@ -373,12 +441,14 @@ class VintedClient:
                 element = await page.query_selector(selector)
                 if element:
                     print(f"[WARN] Challenge detected: {selector}")
+                    self._discard_context = True
                     return True
             except:
                 pass
         
         return False
     
+    @traced("upload_photo")
     async def upload_photo(
         self, 
         page: Page, 
@@ -386,7 +456,7 @@ class VintedClient:
         upload_selector: str = 'input[type="file"]'
     ) -> bool:
         """
-        Upload photo to Vinted
+        Upload one photo to Vinted (see upload_photos)
         
         Args:
             page: Playwright page
@@ -396,36 +466,132 @@ class VintedClient:
         Returns:
             True if uploaded successfully
         """
+        return await self.upload_photos(page, [photo_path], upload_selector) == 1
+
+    @traced("upload_photos")
+    async def upload_photos(
+        self,
+        page: Page,
+        photo_paths: List[str],
+        upload_selector: str = 'input[type="file"]',
+        timeout_ms: int = VINTED_UPLOAD_TIMEOUT_MS
+    ) -> int:
+        """
+        Upload a batch of photos in one file-chooser action
+
+        Photos are downsized first (prepare_upload_files). When the input
+        accepts `multiple`, every file goes in a single set_input_files call;
+        otherwise they are set one by one. Completion is the thumbnail count
+        reaching its target, not `networkidle`, so the cost stays roughly
+        constant in the number of photos.
+
+        Args:
+            page: Playwright page on /items/new
+            photo_paths: Paths to photo files
+            upload_selector: CSS selector for file input
+            timeout_ms: Max wait for the thumbnails
+
+        Returns:
+            Number of photos uploaded (0 on failure)
+        """
+        if not photo_paths:
+            return 0
+
         try:
-            # Wait for page to be fully loaded
-            await page.wait_for_load_state('networkidle', timeout=10000)
-            
             # Check if redirected to login/session page
             current_url = page.url
             if 'session' in current_url or 'login' in current_url or 'member/login' in current_url:
                 print(f"[WARN] Redirected to session/login page: {current_url}")
                 print("   Session Vinted probablement expirée - veuillez actualiser votre cookie")
-                return False
-            
-            # Wait for file input with longer timeout (15s)
-            file_input = await page.wait_for_selector(upload_selector, timeout=15000)
-            
+                return 0
+
+            # The input is usually hidden behind the dropzone: attached is enough
+            file_input = await page.wait_for_selector(upload_selector, state="attached", timeout=15000)
             if not file_input:
                 print(f"[ERROR] File input not found with selector: {upload_selector}")
-                return False
-            
-            # Upload file
-            await file_input.set_input_files(photo_path)
-            
-            # Human delay
-            await self.human_delay(500, 1000)
-            
-            return True
+                return 0
+
+            with span("prepare_photos", count=len(photo_paths)):
+                files = await prepare_upload_files(photo_paths)
+
+            baseline = await page.locator(VINTED_PHOTO_THUMBNAIL_SELECTOR).count()
+            multiple = await file_input.evaluate("el => el.multiple")
+
+            with span("set_input_files", count=len(files), multiple=bool(multiple)):
+                if multiple:
+                    await file_input.set_input_files(files)
+                    matched = await self._thumbnails_match(page, baseline)
+                else:
+                    # Single-file input: one file per change event, each
+                    # waiting for its own thumbnail before the next one
+                    await file_input.set_input_files(files[0])
+                    matched = await self._thumbnails_match(page, baseline)
+                    for i, payload in enumerate(files[1:], start=1):
+                        if matched:
+                            await self._wait_for_thumbnails(page, baseline + i, timeout_ms)
+                        else:
+                            await self._settle_upload(page)
+                        await file_input.set_input_files(payload)
+
+            if not matched:
+                # Stale selector: no per-photo count to wait for, only a
+                # bounded settle instead of the full timeout
+                with span("wait_upload_settle", count=len(files)):
+                    await self._settle_upload(page)
+                return len(files)
+
+            with span("wait_thumbnails", count=len(files)):
+                shown = await self._wait_for_thumbnails(page, baseline + len(files), timeout_ms)
+
+            uploaded = min(shown - baseline, len(files))
+            if uploaded < len(files):
+                logger.warning(f"[WARN] Only {uploaded}/{len(files)} photos showed up after {timeout_ms}ms")
+            return uploaded
         except Exception as e:
             print(f"[ERROR] Upload failed: {e}")
             print(f"   Current URL: {page.url}")
-            return False
+            return 0
+
+    async def _thumbnails_match(self, page: Page, baseline: int) -> bool:
+        """
+        Whether the thumbnail selector tracks this upload: the first new
+        thumbnail shows up within VINTED_THUMBNAIL_PROBE_MS
+
+        A selector that never matches is reported once and then no longer
+        waited for, until a later upload sees thumbnails again.
+        """
+        if VintedClient._thumbnail_selector_stale:
+            matched = await page.locator(VINTED_PHOTO_THUMBNAIL_SELECTOR).count() > baseline
+        else:
+            matched = await self._wait_for_thumbnails(page, baseline + 1, VINTED_THUMBNAIL_PROBE_MS) > baseline
+            if not matched:
+                logger.warning(
+                    f"[WARN] No photo thumbnail matched '{VINTED_PHOTO_THUMBNAIL_SELECTOR}' "
+                    f"within {VINTED_THUMBNAIL_PROBE_MS}ms, falling back to a network-idle wait"
+                )
+        VintedClient._thumbnail_selector_stale = not matched
+        return matched
+
+    async def _settle_upload(self, page: Page):
+        """Bounded wait for the upload requests when thumbnails cannot be counted"""
+        try:
+            await page.wait_for_load_state("networkidle", timeout=VINTED_THUMBNAIL_PROBE_MS)
+        except PlaywrightTimeout:
+            pass
+
+    async def _wait_for_thumbnails(self, page: Page, target: int, timeout_ms: int) -> int:
+        """Wait until `target` thumbnails are shown; returns the count reached"""
+        try:
+            await page.wait_for_function(
+                "([selector, target]) => document.querySelectorAll(selector).length >= target",
+                arg=[VINTED_PHOTO_THUMBNAIL_SELECTOR, target],
+                timeout=timeout_ms
+            )
+        except PlaywrightTimeout:
+            pass
+        return await page.locator(VINTED_PHOTO_THUMBNAIL_SELECTOR).count()
     
+    @traced("fill_form")
     async def fill_listing_form(
         self,
         page: Page,
@@ -553,6 +719,7 @@ class VintedClient:
             print(f"[ERROR] Screenshot failed: {e}")
             return None
     
+    @traced("click_publish")
     async def click_publish(self, page: Page) -> Tuple[bool, Optional[str]]:
         """
         Click the publish button
@@ -598,6 +765,7 @@ class VintedClient:
         except Exception as e:
             return (False, f"Publish error: {e}")
     
+    @traced("extract_listing_id")
     async def extract_listing_id(self, page: Page) -> Optional[str]:
         """
         Extract listing ID from URL after publish
@@ -619,6 +787,7 @@ class VintedClient:
             print(f"[ERROR] Extract ID failed: {e}")
             return None
     
+    @traced("click_save_as_draft")
     async def click_save_as_draft(self, page: Page) -> Tuple[bool, Optional[str]]:
         """
         Click the save as draft button
@@ -667,6 +836,7 @@ class VintedClient:
         except Exception as e:
             return (False, f"Save draft error: {e}")
     
+    @traced("extract_draft_id")
     async def extract_draft_id(self, page: Page) -> Optional[str]:
         """
         Extract draft ID from URL after save as draft
@@ -1038,8 +1208,9 @@ class VintedClient:
 
             # STEP 1: Navigate to new listing page
             logger.info("Step 1: Navigating to /items/new")
-            await page.goto("https://www.vinted.com/items/new", wait_until='networkidle')
-            await self.human_delay(2000, 4000)  # Human reads the page
+            with span("navigate"):
+                await page.goto("https://www.vinted.com/items/new", wait_until='networkidle')
+                await self.human_delay(2000, 4000)  # Human reads the page
 
             # Check for login redirect
             if 'login' in page.url or 'session' in page.url:
@@ -1047,30 +1218,15 @@ class VintedClient:
                 return (False, "Session expirée - veuillez actualiser votre cookie Vinted", None)
 
             # Check for captcha
-            if await self.detect_challenge(page):
+            with span("detect_challenge"):
+                challenged = await self.detect_challenge(page)
+            if challenged:
                 logger.warning("Captcha detected on listing page")
                 return (False, "Captcha détecté - veuillez réessayer plus tard", None)
 
-            # STEP 2: Upload photos with realistic delays
+            # STEP 2: Upload photos (one file-chooser action for the whole batch)
             logger.info(f"Step 2: Uploading {len(photos)} photos")
-            photos_uploaded = 0
-
-            for i, photo_path in enumerate(photos):
-                logger.info(f"Uploading photo {i+1}/{len(photos)}: {photo_path}")
-
-                # Human-like delay between photo uploads (reviewing each photo)
-                if i > 0:
-                    await self.human_delay(1500, 3000)
-
-                success = await self.upload_photo(page, photo_path)
-                if success:
-                    photos_uploaded += 1
-                    logger.info(f"[OK] Photo {i+1} uploaded successfully")
-                else:
-                    logger.warning(f"[WARN] Photo {i+1} upload failed")
-
-                # Wait for upload to process (Vinted needs time to compress/optimize)
-                await self.human_delay(2000, 3000)
+            photos_uploaded = await self.upload_photos(page, photos)
 
             if photos_uploaded == 0:
                 return (False, "Aucune photo n'a pu être uploadée", None)
@@ -1083,74 +1239,76 @@ class VintedClient:
             # STEP 3: Fill form fields with human-like typing
             logger.info("Step 3: Filling listing form")
 
-            # Use the enhanced human_type method for realistic typing
-            title_selector = 'input[name="title"], input[placeholder*="Titre"], input[placeholder*="titre"]'
-            try:
-                await self.human_type(page, title_selector, title)
-                logger.info("[OK] Title filled")
-            except Exception as e:
-                logger.error(f"Failed to fill title: {e}")
-                return (False, f"Erreur lors de la saisie du titre: {e}", None)
-
-            # Description
-            desc_selector = 'textarea[name="description"], textarea[placeholder*="Description"], textarea[placeholder*="description"]'
-            try:
-                await self.human_type(page, desc_selector, description)
-                logger.info("[OK] Description filled")
-            except Exception as e:
-                logger.error(f"Failed to fill description: {e}")
-                return (False, f"Erreur lors de la saisie de la description: {e}", None)
-
-            # Price (humans pause before entering price, thinking)
-            await self.human_delay(1000, 2000)
-            price_selector = 'input[name="price"], input[type="number"], input[placeholder*="Prix"], input[placeholder*="prix"]'
-            try:
-                await page.fill(price_selector, str(price))
-                logger.info(f"[OK] Price filled: {price}€")
-                await self.human_delay(500, 1000)
-            except Exception as e:
-                logger.error(f"Failed to fill price: {e}")
-                return (False, f"Erreur lors de la saisie du prix: {e}", None)
-
-            # Optional fields (brand, size, condition, color)
-            if brand:
-                brand_selector = 'input[name="brand"], input[placeholder*="Marque"], input[placeholder*="marque"]'
+            with span("fill_fields"):
+                # Use the enhanced human_type method for realistic typing
+                title_selector = 'input[name="title"], input[placeholder*="Titre"], input[placeholder*="titre"]'
                 try:
-                    await self.human_type(page, brand_selector, brand)
-                    logger.info(f"[OK] Brand filled: {brand}")
+                    await self.human_type(page, title_selector, title)
+                    logger.info("[OK] Title filled")
                 except Exception as e:
-                    logger.warning(f"Failed to fill brand (optional): {e}")
+                    logger.error(f"Failed to fill title: {e}")
+                    return (False, f"Erreur lors de la saisie du titre: {e}", None)
 
-            if size:
-                size_selector = 'select[name="size"], input[name="size"]'
+                # Description
+                desc_selector = 'textarea[name="description"], textarea[placeholder*="Description"], textarea[placeholder*="description"]'
                 try:
-                    await page.fill(size_selector, size)
-                    await self.human_delay(500, 1000)
-                    logger.info(f"[OK] Size filled: {size}")
+                    await self.human_type(page, desc_selector, description)
+                    logger.info("[OK] Description filled")
                 except Exception as e:
-                    logger.warning(f"Failed to fill size (optional): {e}")
+                    logger.error(f"Failed to fill description: {e}")
+                    return (False, f"Erreur lors de la saisie de la description: {e}", None)
 
-            if condition:
-                condition_selector = 'select[name="condition"], select[name="status"]'
+                # Price (humans pause before entering price, thinking)
+                await self.human_delay(1000, 2000)
+                price_selector = 'input[name="price"], input[type="number"], input[placeholder*="Prix"], input[placeholder*="prix"]'
                 try:
-                    await page.select_option(condition_selector, label=condition)
+                    await page.fill(price_selector, str(price))
+                    logger.info(f"[OK] Price filled: {price}€")
                     await self.human_delay(500, 1000)
-                    logger.info(f"[OK] Condition filled: {condition}")
                 except Exception as e:
-                    logger.warning(f"Failed to fill condition (optional): {e}")
+                    logger.error(f"Failed to fill price: {e}")
+                    return (False, f"Erreur lors de la saisie du prix: {e}", None)
 
-            if color:
-                color_selector = 'select[name="color"], input[name="color"]'
-                try:
-                    await page.fill(color_selector, color)
-                    await self.human_delay(500, 1000)
-                    logger.info(f"[OK] Color filled: {color}")
-                except Exception as e:
-                    logger.warning(f"Failed to fill color (optional): {e}")
+                # Optional fields (brand, size, condition, color)
+                if brand:
+                    brand_selector = 'input[name="brand"], input[placeholder*="Marque"], input[placeholder*="marque"]'
+                    try:
+                        await self.human_type(page, brand_selector, brand)
+                        logger.info(f"[OK] Brand filled: {brand}")
+                    except Exception as e:
+                        logger.warning(f"Failed to fill brand (optional): {e}")
+
+                if size:
+                    size_selector = 'select[name="size"], input[name="size"]'
+                    try:
+                        await page.fill(size_selector, size)
+                        await self.human_delay(500, 1000)
+                        logger.info(f"[OK] Size filled: {size}")
+                    except Exception as e:
+                        logger.warning(f"Failed to fill size (optional): {e}")
+
+                if condition:
+                    condition_selector = 'select[name="condition"], select[name="status"]'
+                    try:
+                        await page.select_option(condition_selector, label=condition)
+                        await self.human_delay(500, 1000)
+                        logger.info(f"[OK] Condition filled: {condition}")
+                    except Exception as e:
+                        logger.warning(f"Failed to fill condition (optional): {e}")
+
+                if color:
+                    color_selector = 'select[name="color"], input[name="color"]'
+                    try:
+                        await page.fill(color_selector, color)
+                        await self.human_delay(500, 1000)
+                        logger.info(f"[OK] Color filled: {color}")
+                    except Exception as e:
+                        logger.warning(f"Failed to fill color (optional): {e}")
 
             # STEP 4: Human reviews the form (realistic pause)
             logger.info("Step 4: User reviewing form before submission...")
-            await self.human_delay(3000, 6000)  # User scrolls and reviews
+            with span("review_pause"):
+                await self.human_delay(3000, 6000)  # User scrolls and reviews
 
             # STEP 5: Click publish or save as draft
             if publish_mode == "draft":
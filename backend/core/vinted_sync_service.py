@@ -7,7 +7,11 @@ Handles real-time synchronization between VintedBot and Vinted:
 - Conflict resolution: Merge strategy for simultaneous changes
 - Intelligent polling: Rate-limited checks to avoid API abuse
 """
+import os
+import json
+import time
 import asyncio
+import hashlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -19,6 +23,32 @@ from backend.core.session import get_vinted_session
 from backend.core.storage import get_store
 from backend.core.smart_rate_limiter import SmartRateLimiter
 
+# Delta sync: listings per page of get_user_listings, and a safety cap on pages
+SYNC_PAGE_SIZE = int(os.getenv("VINTED_SYNC_PAGE_SIZE", "100"))
+SYNC_MAX_PAGES = int(os.getenv("VINTED_SYNC_MAX_PAGES", "100"))
+
+# Listing-page fields that make up a listing's content fingerprint
+FINGERPRINT_FIELDS = (
+    "title", "description", "price", "currency", "status", "brand_title", "size_title",
+    "color", "is_closed", "is_hidden", "is_reserved", "updated_at"
+)
+# Stored for a local listing absent from the listing pages (sold, deleted,
+# hidden): it is checked in detail once, not on every sync
+MISSING_FINGERPRINT = "missing"
+
+
+def listing_fingerprint(item: Dict[str, Any]) -> str:
+    """Content fingerprint of a listing as returned in the listing pages"""
+    content = {field: item.get(field) for field in FINGERPRINT_FIELDS}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _price_amount(value: Any) -> Optional[float]:
+    """Price as a float (Vinted sends either a number/string or {"amount", "currency_code"})"""
+    if isinstance(value, dict):
+        value = value.get("amount")
+    return float(value) if value else None
+
 
 class SyncConflictStrategy(Enum):
     """Strategy for resolving sync conflicts"""
@@ -58,6 +88,9 @@ class SyncResult:
     conflicts: List[SyncChange] = None
     errors: List[str] = None
     synced_at: datetime = None
+    mode: str = "delta"
+    remote_calls: int = 0
+    duration_seconds: float = 0.0
 
     def __post_init__(self):
         if self.conflicts is None:
@@ -92,27 +125,37 @@ class VintedSyncService:
         self.status = SyncStatus.IDLE
         self.last_sync: Optional[datetime] = None
         self.rate_limiter = SmartRateLimiter(
-            requests_per_minute=10,  # Conservative rate
-            burst_size=5
+            max_requests_per_minute=10  # Conservative rate
         )
 
     async def pull_changes(
         self,
-        listing_ids: Optional[List[str]] = None
+        listing_ids: Optional[List[str]] = None,
+        mode: str = "delta"
     ) -> SyncResult:
         """
         Pull changes from Vinted and update local database
 
+        Modes:
+        - delta: page through the user's listings (SYNC_PAGE_SIZE per call),
+          compare each one with its stored fingerprint and fetch only the
+          listings that differ (or are missing from the pages) in detail
+        - full: fetch every local listing in detail (one call per listing)
+
+        Either way, all changes are written in one transaction.
+
         Args:
             listing_ids: Specific listings to sync (None = sync all)
+            mode: "delta" (default) or "full"
 
         Returns:
             SyncResult with pulled changes and conflicts
         """
-        logger.info(f"[SYNC-PULL] Starting pull for user {self.user_id}")
+        logger.info(f"[SYNC-PULL] Starting {mode} pull for user {self.user_id}")
         self.status = SyncStatus.SYNCING
+        started = time.monotonic()
 
-        result = SyncResult(status=SyncStatus.SYNCING)
+        result = SyncResult(status=SyncStatus.SYNCING, mode=mode)
 
         try:
             # Get Vinted session
@@ -120,9 +163,6 @@ class VintedSyncService:
             if not session:
                 raise ValueError(f"No Vinted session found for user {self.user_id}")
 
-            # Get Vinted API client
-            vinted_client = VintedAPIClient(session=session)
-
             # Get local listings from database
             store = get_store()
             local_listings = store.get_published_listings(self.user_id)
@@ -132,47 +172,41 @@ class VintedSyncService:
 
             logger.info(f"[SYNC-PULL] Found {len(local_listings)} local listings to check")
 
-            # Fetch each listing from Vinted with rate limiting
-            for local_listing in local_listings:
-                vinted_id = local_listing.get('vinted_id')
-                if not vinted_id:
-                    continue
+            # {draft_id: {field: value}} and {vinted_id: (draft_id, fingerprint)}
+            updates: Dict[str, Dict[str, Any]] = {}
+            fingerprints: Dict[str, Tuple[str, str]] = {}
 
-                # Rate limit check
-                await self.rate_limiter.acquire()
+            async with VintedAPIClient(session=session) as vinted_client:
+                if mode == "full":
+                    to_fetch = [(l, None) for l in local_listings if l.get('vinted_id')]
+                else:
+                    to_fetch = await self._diff_listing_pages(vinted_client, local_listings, result)
 
-                try:
-                    # Fetch listing from Vinted API
-                    vinted_data = await vinted_client.get_listing(vinted_id)
-
-                    if not vinted_data:
-                        logger.warning(f"[SYNC-PULL] Listing {vinted_id} not found on Vinted")
-                        continue
-
-                    # Detect changes
-                    changes = self._detect_changes(local_listing, vinted_data)
-
-                    if changes:
-                        logger.info(f"[SYNC-PULL] Detected {len(changes)} changes for listing {vinted_id}")
-
-                        # Apply changes based on conflict strategy
-                        for change in changes:
-                            if change.conflict:
-                                # Handle conflict
-                                resolved_value = self._resolve_conflict(change)
-                                if resolved_value is not None:
-                                    self._apply_change(local_listing['draft_id'], change.field, resolved_value)
-                                    result.pulled_changes += 1
-                                else:
-                                    result.conflicts.append(change)
-                            else:
-                                # No conflict, apply Vinted value
-                                self._apply_change(local_listing['draft_id'], change.field, change.vinted_value)
-                                result.pulled_changes += 1
+                logger.info(f"[SYNC-PULL] Fetching {len(to_fetch)} listings in detail")
 
-                except Exception as e:
-                    logger.error(f"[SYNC-PULL] Error syncing listing {vinted_id}: {e}")
-                    result.errors.append(f"Listing {vinted_id}: {str(e)}")
+                for local_listing, fingerprint in to_fetch:
+                    vinted_id = str(local_listing['vinted_id'])
+
+                    try:
+                        # Fetch listing from Vinted API
+                        await self._throttle(result)
+                        vinted_data = await vinted_client.get_listing(vinted_id, fresh=True)
+
+                        if not vinted_data:
+                            logger.warning(f"[SYNC-PULL] Listing {vinted_id} not found on Vinted")
+                            if fingerprint:
+                                fingerprints[vinted_id] = (local_listing['draft_id'], MISSING_FINGERPRINT)
+                            continue
+
+                        if self._collect_changes(local_listing, vinted_data, result, updates) and fingerprint:
+                            fingerprints[vinted_id] = (local_listing['draft_id'], fingerprint)
+
+                    except Exception as e:
+                        logger.error(f"[SYNC-PULL] Error syncing listing {vinted_id}: {e}")
+                        result.errors.append(f"Listing {vinted_id}: {str(e)}")
+
+            # One transaction for every change and fingerprint
+            store.apply_sync_changes(self.user_id, updates, fingerprints)
 
             # Update sync result
             if result.conflicts:
@@ -184,10 +218,12 @@ class VintedSyncService:
 
             self.last_sync = datetime.utcnow()
             self.status = result.status
+            result.duration_seconds = round(time.monotonic() - started, 3)
 
             logger.info(
-                f"[SYNC-PULL] Complete: {result.pulled_changes} changes, "
-                f"{len(result.conflicts)} conflicts, {len(result.errors)} errors"
+                f"[SYNC-PULL] Complete ({mode}): {result.pulled_changes} changes, "
+                f"{len(result.conflicts)} conflicts, {len(result.errors)} errors, "
+                f"{result.remote_calls} remote calls in {result.duration_seconds:.1f}s"
             )
 
             return result
@@ -196,9 +232,107 @@ class VintedSyncService:
             logger.error(f"[SYNC-PULL] Failed: {e}")
             result.status = SyncStatus.ERROR
             result.errors.append(str(e))
+            result.duration_seconds = round(time.monotonic() - started, 3)
             self.status = SyncStatus.ERROR
             return result
 
+    async def _diff_listing_pages(
+        self,
+        vinted_client: VintedAPIClient,
+        local_listings: List[Dict[str, Any]],
+        result: SyncResult
+    ) -> List[Tuple[Dict[str, Any], str]]:
+        """
+        Page through the user's listings and pick the ones to fetch in detail
+
+        Returns:
+            [(local_listing, fingerprint)] for listings whose page content
+            differs from the stored fingerprint, plus local listings missing
+            from the pages (with MISSING_FINGERPRINT) not already checked
+        """
+        local_by_id = {str(l['vinted_id']): l for l in local_listings if l.get('vinted_id')}
+        stored = get_store().get_sync_fingerprints(self.user_id)
+
+        to_fetch = []
+        seen = set()
+        for page in range(1, SYNC_MAX_PAGES + 1):
+            await self._throttle(result)
+            # Authenticated /items route: session.user_id is the app user, not the Vinted member id.
+            # fresh: a cached page would hide the changes the sync is looking for
+            success, items, error = await vinted_client.get_user_listings(
+                user_id=None, per_page=SYNC_PAGE_SIZE, page=page, fresh=True
+            )
+            if not success:
+                raise RuntimeError(f"Listing page {page}: {error}")
+
+            for item in items:
+                vinted_id = str(item.get('id'))
+                local_listing = local_by_id.get(vinted_id)
+                if local_listing is None or vinted_id in seen:
+                    continue
+                seen.add(vinted_id)
+                fingerprint = listing_fingerprint(item)
+                if stored.get(vinted_id) != fingerprint:
+                    to_fetch.append((local_listing, fingerprint))
+
+            if len(items) < SYNC_PAGE_SIZE:
+                break
+        else:
+            logger.warning(f"[SYNC-PULL] Stopped after {SYNC_MAX_PAGES} listing pages")
+
+        for vinted_id, local_listing in local_by_id.items():
+            if vinted_id not in seen and stored.get(vinted_id) != MISSING_FINGERPRINT:
+                to_fetch.append((local_listing, MISSING_FINGERPRINT))
+
+        logger.info(
+            f"[SYNC-PULL] {len(seen)} listings seen in {page} pages, "
+            f"{len(to_fetch)} changed or missing"
+        )
+        return to_fetch
+
+    async def _throttle(self, result: SyncResult):
+        """Rate-limit one remote call and count it"""
+        await self.rate_limiter.wait_if_needed()
+        self.rate_limiter.record_request()
+        result.remote_calls += 1
+
+    def _collect_changes(
+        self,
+        local_listing: Dict[str, Any],
+        vinted_data: Dict[str, Any],
+        result: SyncResult,
+        updates: Dict[str, Dict[str, Any]]
+    ) -> bool:
+        """
+        Detect a listing's changes and queue the values to write
+
+        Returns:
+            False if a conflict was left for manual resolution
+        """
+        changes = self._detect_changes(local_listing, vinted_data)
+        if not changes:
+            return True
+
+        logger.info(f"[SYNC-PULL] Detected {len(changes)} changes for listing {local_listing['vinted_id']}")
+
+        resolved = True
+        fields = updates.setdefault(local_listing['draft_id'], {})
+        for change in changes:
+            if change.conflict:
+                # Handle conflict
+                resolved_value = self._resolve_conflict(change)
+                if resolved_value is not None:
+                    fields[change.field] = resolved_value
+                    result.pulled_changes += 1
+                else:
+                    result.conflicts.append(change)
+                    resolved = False
+            else:
+                # No conflict, apply Vinted value
+                fields[change.field] = change.vinted_value
+                result.pulled_changes += 1
+        return resolved
+
     async def push_changes(
         self,
         draft_ids: Optional[List[str]] = None
@@ -243,7 +377,7 @@ class VintedSyncService:
                     continue
 
                 # Rate limit check
-                await self.rate_limiter.acquire()
+                await self._throttle(result)
 
                 try:
                     # Build update payload
@@ -316,7 +450,9 @@ class VintedSyncService:
             pulled_changes=pull_result.pulled_changes,
             pushed_changes=push_result.pushed_changes,
             conflicts=pull_result.conflicts,
-            errors=pull_result.errors + push_result.errors
+            errors=pull_result.errors + push_result.errors,
+            mode=pull_result.mode,
+            remote_calls=pull_result.remote_calls + push_result.remote_calls
         )
 
         if combined.conflicts:
@@ -350,7 +486,7 @@ class VintedSyncService:
             'title': 'title',
             'description': 'description',
             'price': 'price',
-            'status': 'status',
+            'condition': 'status',  # Vinted's item "status" is the condition label
             'brand': 'brand_title',
             'size': 'size_title',
             'color': 'color'
@@ -360,13 +496,17 @@ class VintedSyncService:
         vinted_updated = vinted_data.get('updated_at')
 
         for local_field, vinted_field in fields_to_check.items():
+            if vinted_data.get(vinted_field) is None:
+                # Field not sent by Vinted: nothing to compare against
+                continue
+
             local_value = local_listing.get(local_field)
             vinted_value = vinted_data.get(vinted_field)
 
             # Normalize values for comparison
             if local_field == 'price':
-                local_value = float(local_value) if local_value else None
-                vinted_value = float(vinted_value) if vinted_value else None
+                local_value = _price_amount(local_value)
+                vinted_value = _price_amount(vinted_value)
 
             # Compare values
             if local_value != vinted_value:
@@ -422,16 +562,6 @@ class VintedSyncService:
 
         return None
 
-    def _apply_change(self, draft_id: str, field: str, value: Any):
-        """Apply a synced change to local database"""
-        try:
-            store = get_store()
-            update_data = {field: value}
-            store.update_draft(draft_id, update_data)
-            logger.info(f"[SYNC-APPLY] Updated {field} for draft {draft_id}")
-        except Exception as e:
-            logger.error(f"[SYNC-APPLY] Failed to apply change: {e}")
-
     async def start_polling(self):
         """Start continuous polling loop"""
         logger.info(f"[SYNC-POLL] Starting polling every {self.poll_interval}s")
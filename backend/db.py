@@ -1,9 +1,11 @@
 import os
+import time
 from sqlmodel import SQLModel, create_engine, Session as DBSession, select
-from typing import Optional, List
+from sqlalchemy import update, func, or_, case
+from typing import Any, Dict, Optional, List, Tuple
 from datetime import datetime
 from backend.models import (
-    User, Session, MessageThread, Message, PublishJob, Listing,
+    User, Session, MessageThread, Message, PublishJob, Listing, PriceDropRule,
     JobStatus, JobMode, ListingStatus
 )
 
@@ -20,9 +22,24 @@ engine = create_engine(DATABASE_URL, echo=False)
 def create_tables():
     """Initialize database tables"""
     SQLModel.metadata.create_all(engine)
+    _migrate()
     print("Database tables created successfully")
 
 
+def _migrate():
+    """Columns added after a table was first created (create_all skips existing tables)"""
+    statements = [
+        'ALTER TABLE listing ADD COLUMN user_id INTEGER REFERENCES "user" (id)',
+        "CREATE INDEX IF NOT EXISTS ix_listing_user_id ON listing (user_id)",
+    ]
+    for statement in statements:
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql(statement)
+        except Exception:
+            pass  # Already applied
+
+
 def get_db_session():
     """Get database session context manager"""
     return DBSession(engine)
@@ -34,6 +51,30 @@ def get_session(session_id: int) -> Optional[Session]:
         return db.get(Session, session_id)
 
 
+def get_sessions_for_sync() -> List[Tuple[int, str, Optional[datetime]]]:
+    """(id, encrypted_cookie, last_validated_at) of every stored session"""
+    with get_db_session() as db:
+        return [
+            tuple(row) for row in db.execute(
+                select(Session.id, Session.encrypted_cookie, Session.last_validated_at)
+            ).all()
+        ]
+
+
+def mark_sessions_validated(session_ids: List[int], validated_at: datetime) -> int:
+    """Set last_validated_at of several sessions in one statement"""
+    if not session_ids:
+        return 0
+    with get_db_session() as db:
+        result = db.execute(
+            update(Session)
+            .where(Session.id.in_(session_ids))
+            .values(last_validated_at=validated_at)
+        )
+        db.commit()
+        return result.rowcount
+
+
 def save_message(thread_id: str, sender: str, body: str, attachments: List[str] = None) -> Message:
     """Save a new message to a thread"""
     with get_db_session() as db:
@@ -97,6 +138,82 @@ def update_job_status(job_id: str, status: JobStatus, logs: List[dict] = None, s
             db.commit()
 
 
+def lease_next_publish_job() -> Optional[Tuple[str, datetime]]:
+    """
+    Atomically claim the oldest due queued job (queued -> running)
+
+    The row is flipped by a single UPDATE guarded on status='queued', so two
+    workers polling at once never run the same job.
+
+    Returns:
+        (job_id, due since) of the claimed job, or None if nothing is due
+    """
+    now = datetime.utcnow()
+    next_id = (
+        select(PublishJob.id)
+        .where(PublishJob.status == JobStatus.queued)
+        .where(or_(PublishJob.schedule_at.is_(None), PublishJob.schedule_at <= now))
+        .order_by(PublishJob.created_at)
+        .limit(1)
+        .scalar_subquery()
+    )
+    with get_db_session() as db:
+        row = db.execute(
+            update(PublishJob)
+            .where(PublishJob.id == next_id, PublishJob.status == JobStatus.queued)
+            .values(status=JobStatus.running, updated_at=now)
+            .returning(PublishJob.job_id, PublishJob.created_at, PublishJob.schedule_at)
+        ).first()
+        db.commit()
+        if row is None:
+            return None
+        job_id, created_at, schedule_at = row
+        return job_id, max(created_at, schedule_at or created_at)
+
+
+def get_publish_queue_depth() -> Tuple[int, Optional[datetime]]:
+    """Number of queued jobs and the earliest time one of them became due"""
+    with get_db_session() as db:
+        count, oldest = db.execute(
+            select(
+                func.count(PublishJob.id),
+                func.min(func.coalesce(PublishJob.schedule_at, PublishJob.created_at))
+            )
+            .where(PublishJob.status == JobStatus.queued)
+        ).one()
+        return count, oldest
+
+
+def requeue_publish_jobs(job_ids: Optional[List[str]] = None, stale_before: Optional[datetime] = None) -> int:
+    """
+    Put running jobs back in the queue
+
+    Args:
+        job_ids: Jobs interrupted by a worker shutdown
+        stale_before: Also requeue running jobs not updated since then
+            (left behind by a worker that was killed)
+
+    Returns:
+        Number of jobs requeued
+    """
+    conditions = []
+    if job_ids:
+        conditions.append(PublishJob.job_id.in_(job_ids))
+    if stale_before is not None:
+        conditions.append(PublishJob.updated_at < stale_before)
+    if not conditions:
+        return 0
+
+    with get_db_session() as db:
+        result = db.execute(
+            update(PublishJob)
+            .where(PublishJob.status == JobStatus.running, or_(*conditions))
+            .values(status=JobStatus.queued, updated_at=datetime.utcnow())
+        )
+        db.commit()
+        return result.rowcount
+
+
 def get_threads(limit: int = 50, offset: int = 0) -> List[MessageThread]:
     """Get message threads with pagination"""
     with get_db_session() as db:
@@ -152,3 +269,147 @@ def get_listing(listing_id: int) -> Optional[Listing]:
     """Get listing by ID"""
     with get_db_session() as db:
         return db.get(Listing, listing_id)
+
+
+def get_price_drop_rules() -> List[PriceDropRule]:
+    """All price drop rules (the default rule, user_id None, first)"""
+    with get_db_session() as db:
+        return db.exec(
+            select(PriceDropRule).order_by(PriceDropRule.user_id.is_not(None), PriceDropRule.user_id)
+        ).all()
+
+
+def get_price_drop_rule(user_id: Optional[int]) -> Optional[PriceDropRule]:
+    """Price drop rule of a user (user_id None = the default rule)"""
+    with get_db_session() as db:
+        return db.exec(_price_drop_rule_query(user_id)).first()
+
+
+def set_price_drop_rule(
+    user_id: Optional[int],
+    drop_percent: float,
+    min_price: float,
+    enabled: bool = True
+) -> PriceDropRule:
+    """Create or replace the price drop rule of a user (user_id None = the default rule)"""
+    with get_db_session() as db:
+        rule = db.exec(_price_drop_rule_query(user_id)).first()
+        if rule is None:
+            rule = PriceDropRule(user_id=user_id)
+        rule.drop_percent = drop_percent
+        rule.min_price = min_price
+        rule.enabled = enabled
+        rule.updated_at = datetime.utcnow()
+        db.add(rule)
+        db.commit()
+        db.refresh(rule)
+        return rule
+
+
+def delete_price_drop_rule(user_id: Optional[int]) -> bool:
+    """Remove a user's rule (they fall back to the default one); False if none"""
+    with get_db_session() as db:
+        rule = db.exec(_price_drop_rule_query(user_id)).first()
+        if rule is None:
+            return False
+        db.delete(rule)
+        db.commit()
+        return True
+
+
+def _price_drop_rule_query(user_id: Optional[int]):
+    if user_id is None:
+        return select(PriceDropRule).where(PriceDropRule.user_id.is_(None))
+    return select(PriceDropRule).where(PriceDropRule.user_id == user_id)
+
+
+def _price_drop_rule_value(column, default):
+    """
+    Rule setting of a listing's owner: their own rule, else the default
+    rule (user_id NULL), else `default` (correlated to the updated listing)
+    """
+    user_rule = select(column).where(PriceDropRule.user_id == Listing.user_id).scalar_subquery()
+    default_rule = select(column).where(PriceDropRule.user_id.is_(None)).scalar_subquery()
+    return func.coalesce(user_rule, default_rule, default)
+
+
+def apply_price_drops(
+    default_percent: float,
+    default_min_price: float,
+    chunk_size: int = 5000,
+    chunk_pause: float = 0.05,
+    now: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    Drop the price of every listed listing by its owner's PriceDropRule,
+    floored at the rule's min_price (listings already at the floor and
+    disabled rules are left alone)
+
+    Set-based: one UPDATE ... RETURNING per keyset chunk of `chunk_size`
+    listing ids, each in its own short transaction (chunk_size 0 = a single
+    UPDATE over the whole table). The `chunk_pause` seconds between chunks
+    let writers waiting on the SQLite lock in: their busy handler backs off
+    up to 100ms between tries and would miss an immediate re-lock.
+
+    Returns:
+        {"listed", "dropped", "unchanged", "chunks", "changed_ids"}
+    """
+    now = now or datetime.utcnow()
+    percent = _price_drop_rule_value(PriceDropRule.drop_percent, default_percent)
+    floor = _price_drop_rule_value(PriceDropRule.min_price, default_min_price)
+    enabled = _price_drop_rule_value(PriceDropRule.enabled, True)
+    dropped = func.round(Listing.price * (1 - percent / 100.0), 2)
+    new_price = case((dropped < floor, floor), else_=dropped)
+
+    with get_db_session() as db:
+        listed = db.execute(
+            select(func.count(Listing.id)).where(Listing.status == ListingStatus.listed)
+        ).scalar_one()
+
+    changed_ids: List[int] = []
+    chunks = 0
+    last_id = 0
+    while True:
+        with get_db_session() as db:
+            upper = None
+            if chunk_size:
+                # Last id of the next chunk (read before taking the write lock)
+                upper = db.execute(
+                    select(Listing.id)
+                    .where(Listing.status == ListingStatus.listed, Listing.id > last_id)
+                    .order_by(Listing.id)
+                    .offset(chunk_size - 1)
+                    .limit(1)
+                ).scalar()
+            conditions = [
+                Listing.status == ListingStatus.listed,
+                Listing.id > last_id,
+                enabled == True,  # noqa: E712
+                percent > 0,
+                Listing.price > floor,
+            ]
+            if upper is not None:
+                conditions.append(Listing.id <= upper)
+            rows = db.execute(
+                update(Listing)
+                .where(*conditions)
+                .values(price=new_price, updated_at=now)
+                .returning(Listing.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            db.commit()
+
+        changed_ids.extend(row[0] for row in rows)
+        chunks += 1
+        if upper is None:
+            break
+        last_id = upper
+        time.sleep(chunk_pause)
+
+    return {
+        "listed": listed,
+        "dropped": len(changed_ids),
+        "unchanged": listed - len(changed_ids),
+        "chunks": chunks,
+        "changed_ids": changed_ids,
+    }
@@ -1,115 +1,211 @@
 import os
+import time
+import asyncio
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime, timedelta
+from typing import Any, Dict
 from backend.utils.logger import logger
-from backend.db import get_db_session
-from backend.models import Session, Listing, ListingStatus
+from backend.db import get_sessions_for_sync, mark_sessions_validated, apply_price_drops
 from backend.vinted_connector import fetch_inbox, validate_session_cookie
 from backend.core.storage import get_store
-from sqlmodel import select
 
 scheduler = AsyncIOScheduler()
 
 SYNC_INTERVAL_MIN = int(os.getenv("SYNC_INTERVAL_MIN", "15"))
+INBOX_SYNC_CONCURRENCY = int(os.getenv("INBOX_SYNC_CONCURRENCY", "5"))  # sessions synced at once
+INBOX_SYNC_SESSION_TIMEOUT = int(os.getenv("INBOX_SYNC_SESSION_TIMEOUT", "60"))  # seconds per session
+# A session validated more recently than this is not validated again
+SESSION_REVALIDATE_MINUTES = int(os.getenv("SESSION_REVALIDATE_MINUTES", "60"))
 PRICE_DROP_CRON = os.getenv("PRICE_DROP_CRON", "0 3 * * *")
+# Used when no PriceDropRule applies to a listing
+PRICE_DROP_PERCENT = float(os.getenv("PRICE_DROP_PERCENT", "5"))
+PRICE_DROP_MIN_PRICE = float(os.getenv("PRICE_DROP_MIN_PRICE", "5"))
+PRICE_DROP_CHUNK_SIZE = int(os.getenv("PRICE_DROP_CHUNK_SIZE", "5000"))  # 0 = one UPDATE
+PRICE_DROP_CHUNK_PAUSE_MS = int(os.getenv("PRICE_DROP_CHUNK_PAUSE_MS", "50"))  # other writers' turn
+PUBLISH_STUCK_MINUTES = int(os.getenv("PUBLISH_STUCK_MINUTES", "5"))
 
 
-async def inbox_sync_job():
-    """Sync inbox for all active sessions"""
+async def _sync_session_inbox(session_id: int, encrypted_cookie: str, last_validated_at, now: datetime) -> Dict[str, Any]:
+    """
+    Inbox sync of one session: decrypt, validate unless validated in the
+    last SESSION_REVALIDATE_MINUTES, fetch the inbox
+
+    Returns {"status": synced/invalid/error, "validated": bool, "conversations": int}
+    """
+    from backend.utils.crypto import decrypt_blob
+
+    cookie = await asyncio.to_thread(decrypt_blob, encrypted_cookie)
+
+    validated = False
+    if last_validated_at is None or now - last_validated_at > timedelta(minutes=SESSION_REVALIDATE_MINUTES):
+        if not await validate_session_cookie(cookie):
+            logger.warning(f"Session {session_id} is no longer valid")
+            return {"status": "invalid", "validated": False, "conversations": 0}
+        validated = True
+
+    conversations = await fetch_inbox(cookie)
+    logger.debug(f"Fetched {len(conversations)} conversations for session {session_id}")
+    return {"status": "synced", "validated": validated, "conversations": len(conversations)}
+
+
+async def inbox_sync_job() -> Dict[str, Any]:
+    """
+    Sync inbox for all active sessions
+
+    Sessions are synced INBOX_SYNC_CONCURRENCY at a time, each bounded by
+    INBOX_SYNC_SESSION_TIMEOUT. No DB session is held during the network
+    calls: sessions are read up front and the validation timestamps written
+    in one batch at the end. Returns the run report (per-session latency,
+    overrun against SYNC_INTERVAL_MIN).
+    """
     logger.info("[INBOX] Running inbox sync job")
-    
+    started = time.monotonic()
+    now = datetime.utcnow()
+
     try:
-        with get_db_session() as db:
-            sessions = db.exec(select(Session)).all()
-            
-            for session in sessions:
+        from backend.core.metrics import track_inbox_sync_run, track_inbox_sync_session
+
+        sessions = await asyncio.to_thread(get_sessions_for_sync)
+        semaphore = asyncio.Semaphore(INBOX_SYNC_CONCURRENCY)
+
+        async def sync_one(session_id: int, encrypted_cookie: str, last_validated_at) -> Dict[str, Any]:
+            async with semaphore:
+                session_started = time.monotonic()
                 try:
-                    from backend.utils.crypto import decrypt_blob
-                    cookie = decrypt_blob(session.encrypted_cookie)
-                    
-                    # Validate session first
-                    is_valid = await validate_session_cookie(cookie)
-                    if not is_valid:
-                        logger.warning(f"Session {session.id} is no longer valid")
-                        continue
-                    
-                    # Fetch inbox
-                    conversations = await fetch_inbox(cookie)
-                    logger.info(f"Fetched {len(conversations)} conversations for session {session.id}")
-                    
-                    # Update last validated timestamp
-                    session.last_validated_at = datetime.utcnow()
-                    db.add(session)
-                
+                    result = await asyncio.wait_for(
+                        _sync_session_inbox(session_id, encrypted_cookie, last_validated_at, now),
+                        timeout=INBOX_SYNC_SESSION_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"Inbox sync timed out for session {session_id} after {INBOX_SYNC_SESSION_TIMEOUT}s")
+                    result = {"status": "timeout", "validated": False, "conversations": 0}
                 except Exception as e:
-                    logger.error(f"Error syncing inbox for session {session.id}: {e}")
-            
-            db.commit()
-        
-        logger.info("[OK] Inbox sync completed")
-    
+                    logger.error(f"Error syncing inbox for session {session_id}: {e}")
+                    result = {"status": "error", "validated": False, "conversations": 0}
+                result["session_id"] = session_id
+                result["seconds"] = round(time.monotonic() - session_started, 3)
+                track_inbox_sync_session(result["status"], result["seconds"])
+                return result
+
+        results = await asyncio.gather(*(sync_one(*row) for row in sessions))
+
+        # Update last validated timestamps (one short transaction)
+        validated_ids = [r["session_id"] for r in results if r["validated"]]
+        await asyncio.to_thread(mark_sessions_validated, validated_ids, datetime.utcnow())
+
+        duration = time.monotonic() - started
+        overrun = duration > SYNC_INTERVAL_MIN * 60
+        track_inbox_sync_run(duration, overrun)
+
+        latencies = sorted(r["seconds"] for r in results)
+        by_status: Dict[str, int] = {}
+        for r in results:
+            by_status[r["status"]] = by_status.get(r["status"], 0) + 1
+        report = {
+            "sessions": len(results),
+            "by_status": by_status,
+            "validated": len(validated_ids),
+            "validation_skipped": sum(1 for r in results if r["status"] == "synced" and not r["validated"]),
+            "conversations": sum(r["conversations"] for r in results),
+            "duration_seconds": round(duration, 3),
+            "p50_seconds": latencies[len(latencies) // 2] if latencies else 0.0,
+            "max_seconds": latencies[-1] if latencies else 0.0,
+            "slowest": sorted(results, key=lambda r: r["seconds"], reverse=True)[:5],
+            "overrun": overrun,
+        }
+
+        logger.info(
+            f"[OK] Inbox sync completed: {len(results)} sessions {by_status} in {duration:.1f}s "
+            f"(p50 {report['p50_seconds']:.2f}s, max {report['max_seconds']:.2f}s, "
+            f"{report['validation_skipped']} validations skipped)"
+        )
+        if overrun:
+            logger.warning(
+                f"[WARN] Inbox sync overran its {SYNC_INTERVAL_MIN} min interval ({duration:.0f}s): "
+                f"raise INBOX_SYNC_CONCURRENCY or SYNC_INTERVAL_MIN"
+            )
+        return report
+
     except Exception as e:
         logger.error(f"Inbox sync job error: {e}")
+        return {"error": str(e)}
 
 
 async def publish_poll_job():
-    """Poll publish queue and trigger worker tasks"""
-    logger.info("[PUBLISH] Checking publish queue")
-    
+    """
+    Publish queue watchdog (jobs are run by the PublishWorker)
+    - Refreshes the queue depth gauge
+    - Wakes the in-process worker when jobs are waiting
+    - Warns when a due job has waited more than PUBLISH_STUCK_MINUTES:
+      no worker is consuming the queue
+    """
     try:
-        from backend.models import PublishJob, JobStatus
-        
-        with get_db_session() as db:
-            queued_jobs = db.exec(
-                select(PublishJob)
-                .where(PublishJob.status == JobStatus.queued)
-            ).all()
-            
-            if queued_jobs:
-                logger.info(f"Found {len(queued_jobs)} queued jobs")
-                # Jobs will be picked up by the Playwright worker
-            
+        from backend.db import get_publish_queue_depth
+        from backend.core.metrics import track_publish_queue
+        from backend.playwright_worker import PUBLISH_WORKER_IN_APP, get_publish_worker
+
+        depth, oldest = await asyncio.to_thread(get_publish_queue_depth)
+        track_publish_queue(depth)
+        if not depth:
+            return
+
+        logger.info(f"[PUBLISH] {depth} jobs queued")
+        if PUBLISH_WORKER_IN_APP:
+            get_publish_worker().wake()
+
+        waited = datetime.utcnow() - oldest
+        if waited > timedelta(minutes=PUBLISH_STUCK_MINUTES):
+            logger.warning(
+                f"[WARN] Oldest publish job due for {waited.total_seconds() / 60:.0f} min: "
+                f"is a Playwright worker running?"
+            )
+
     except Exception as e:
         logger.error(f"Publish poll job error: {e}")
 
 
-async def price_drop_job():
-    """Scheduled price drop for listings"""
+async def price_drop_job() -> Dict[str, Any]:
+    """
+    Scheduled price drop for listings
+
+    Each listed listing loses its owner's PriceDropRule percentage, floored
+    at the rule's min_price (PRICE_DROP_PERCENT / PRICE_DROP_MIN_PRICE when
+    no rule applies). Runs as set-based UPDATEs in PRICE_DROP_CHUNK_SIZE
+    keyset chunks; returns the counts and the changed listing ids.
+    """
     logger.info("[PRICE] Running price drop job")
-    
+    started = time.monotonic()
+
     try:
-        with get_db_session() as db:
-            listings = db.exec(
-                select(Listing)
-                .where(Listing.status == ListingStatus.listed)
-            ).all()
-            
-            drop_percentage = 0.05  # 5% drop
-            
-            for listing in listings:
-                old_price = listing.price
-                new_price = round(old_price * (1 - drop_percentage), 2)
-                
-                # Don't drop below a minimum (e.g., $5)
-                if new_price >= 5.0:
-                    listing.price = new_price
-                    listing.updated_at = datetime.utcnow()
-                    db.add(listing)
-                    logger.info(f"Dropped price for listing {listing.id}: ${old_price} -> ${new_price}")
-            
-            db.commit()
-            logger.info(f"[OK] Price drop completed for {len(listings)} listings")
-    
+        result = await asyncio.to_thread(
+            apply_price_drops,
+            PRICE_DROP_PERCENT,
+            PRICE_DROP_MIN_PRICE,
+            PRICE_DROP_CHUNK_SIZE,
+            PRICE_DROP_CHUNK_PAUSE_MS / 1000
+        )
+        result["duration_seconds"] = round(time.monotonic() - started, 3)
+        logger.info(
+            f"[OK] Price drop completed: {result['dropped']}/{result['listed']} listings dropped "
+            f"in {result['chunks']} chunks ({result['duration_seconds']:.1f}s)"
+        )
+        return result
+
     except Exception as e:
         logger.error(f"Price drop job error: {e}")
+        return {"error": str(e)}
 
 
 async def clean_temp_photos_job():
     """
     Clean old temporary photos (runs every 6 hours)
-    - Deletes photo folders older than 24 hours from backend/data/temp_photos
+    - Deletes photo folders not written to for 24 hours from DATA_DIR/temp_photos
+    - Driven by the temp_photo_dirs manifest: folders and freed MB come from
+      the index, files are never walked or stat'ed one by one
+    - Folders unknown to the manifest (written before it existed) are
+      swept once by mtime, without sizing them
     """
     logger.info("[CLEAN] Cleaning old temporary photos...")
     
@@ -117,28 +213,43 @@ async def clean_temp_photos_job():
         import shutil
         from pathlib import Path
         import time
+        from backend.settings import settings
         
-        temp_dir = Path("backend/data/temp_photos")
+        temp_dir = Path(f"{settings.DATA_DIR}/temp_photos")
         if not temp_dir.exists():
             logger.info("  No temp_photos directory found")
             return
         
-        now = time.time()
-        cutoff = now - (24 * 3600)  # 24 hours ago
+        store = get_store()
         deleted_count = 0
-        freed_mb = 0
+        freed_bytes = 0
+        
+        while True:
+            expired = store.get_expired_temp_photo_dirs(max_age_hours=24, limit=500)
+            if not expired:
+                break
+            for folder in expired:
+                await asyncio.to_thread(shutil.rmtree, temp_dir / folder["job_id"], ignore_errors=True)
+                freed_bytes += folder["size_bytes"]
+            store.delete_temp_photo_dirs([folder["job_id"] for folder in expired])
+            deleted_count += len(expired)
         
-        for folder in temp_dir.iterdir():
-            if folder.is_dir():
-                folder_mtime = folder.stat().st_mtime
-                if folder_mtime < cutoff:
-                    # Calculate size before deletion
-                    folder_size = sum(f.stat().st_size for f in folder.rglob('*') if f.is_file()) / (1024 * 1024)
-                    shutil.rmtree(folder)
-                    deleted_count += 1
-                    freed_mb += folder_size
+        # Legacy folders: one top-level listing, no recursion
+        cutoff = time.time() - (24 * 3600)  # 24 hours ago
+        with store.get_connection() as conn:
+            indexed = {row["job_id"] for row in conn.execute("SELECT job_id FROM temp_photo_dirs")}
+        unindexed_count = 0
+        for entry in os.scandir(temp_dir):
+            if entry.is_dir() and entry.name not in indexed and entry.stat().st_mtime < cutoff:
+                await asyncio.to_thread(shutil.rmtree, entry.path, ignore_errors=True)
+                unindexed_count += 1
         
-        logger.info(f"[OK] Cleaned {deleted_count} old photo folders, freed {freed_mb:.2f} MB")
+        usage = store.get_temp_photos_usage()
+        logger.info(
+            f"[OK] Cleaned {deleted_count} old photo folders, freed {freed_bytes / (1024 * 1024):.2f} MB"
+            + (f" (+{unindexed_count} unindexed folders)" if unindexed_count else "")
+            + f"; {usage['dirs']} folders / {usage['size_bytes'] / (1024 * 1024):.2f} MB left"
+        )
     
     except Exception as e:
         logger.error(f"Clean temp photos job error: {e}")
@@ -264,6 +375,32 @@ async def storage_lifecycle_job():
         traceback.print_exc()
 
 
+async def storage_usage_reconcile_job():
+    """
+    Storage usage counters reconciliation
+    - Runs daily at 4 AM (after the lifecycle job)
+    - Compares the trigger-maintained storage_usage counters with a full
+      scan of photo_metadata / photo_blobs, reports drift and rebuilds them
+    """
+    logger.info("[STORAGE] Reconciling storage usage counters")
+
+    try:
+        from backend.storage.usage import reconcile_usage
+
+        report = reconcile_usage(fix=True)
+
+        if report["drift"]:
+            logger.warning(
+                f"[WARN] Storage usage drift: {len(report['drift'])} counters rebuilt "
+                f"({report['rows_checked']} rows checked in {report['seconds']}s)"
+            )
+
+    except Exception as e:
+        logger.error(f"Storage usage reconcile job error: {e}")
+        import traceback
+        traceback.print_exc()
+
+
 async def execute_auto_bump(rule, store):
     """
     Execute auto-bump for a rule.
@@ -491,15 +628,18 @@ def start_scheduler():
         trigger=IntervalTrigger(minutes=SYNC_INTERVAL_MIN),
         id="inbox_sync",
         name="Inbox Sync",
-        replace_existing=True
+        replace_existing=True,
+        # An overrunning run is never stacked with the next one
+        max_instances=1,
+        coalesce=True
     )
     
-    # Publish queue poll - every 30 seconds
+    # Publish queue watchdog - every 30 seconds
     scheduler.add_job(
         publish_poll_job,
         trigger=IntervalTrigger(seconds=30),
         id="publish_poll",
-        name="Publish Queue Poll",
+        name="Publish Queue Watchdog",
         replace_existing=True
     )
     
@@ -548,15 +688,25 @@ def start_scheduler():
         replace_existing=True
     )
 
+    # Storage usage counters reconciliation - daily at 4 AM
+    scheduler.add_job(
+        storage_usage_reconcile_job,
+        trigger=CronTrigger(hour=4, minute=0),
+        id="storage_usage_reconcile",
+        name="Storage Usage Reconciliation",
+        replace_existing=True
+    )
+
     scheduler.start()
     logger.info(f"Scheduler started with {len(scheduler.get_jobs())} jobs")
     logger.info(f"   - Inbox sync: every {SYNC_INTERVAL_MIN} minutes")
-    logger.info(f"   - Publish poll: every 30 seconds")
+    logger.info(f"   - Publish queue watchdog: every 30 seconds")
     logger.info(f"   - Price drop: {PRICE_DROP_CRON}")
     logger.info(f"   - Vacuum & Prune: 0 2 * * * (daily at 02:00)")
     logger.info(f"   - Clean temp photos: every 6 hours")
     logger.info(f"   - Automation Executor: every 5 minutes")
     logger.info(f"   - Storage Lifecycle: 0 3 * * * (daily at 03:00)")
+    logger.info(f"   - Storage Usage Reconciliation: 0 4 * * * (daily at 04:00)")
 
 
 def stop_scheduler():
@@ -81,6 +81,7 @@ class PublishJob(SQLModel, table=True):
 
 class Listing(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
     title: str
     description: str = Field(sa_column=Column(Text))
     category: Optional[str] = None # e.g. "Femme/Vêtements/Robes"
@@ -92,6 +93,22 @@ class Listing(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class PriceDropRule(SQLModel, table=True):
+    """
+    Scheduled price drop settings of one user (user_id None = default rule
+    for users without their own, and for listings without an owner)
+    """
+    __tablename__ = "price_drop_rule"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id", unique=True)
+    drop_percent: float = Field(default=5.0)  # % taken off per run
+    min_price: float = Field(default=5.0)  # never drop below this
+    enabled: bool = Field(default=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 class Media(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
@@ -1,9 +1,13 @@
 """
 Telegram Notifier
 Envoie des notifications Telegram quand des changements sont détectés sur Vinted
+
+The *_async methods go through the shared "telegram" pool
+(backend/core/http_clients.py); the sync ones stay for scripts and cron jobs.
 """
 import os
 import json
+import asyncio
 from typing import Dict, Any, Optional
 import requests
 from loguru import logger
@@ -83,6 +87,57 @@ class TelegramNotifier:
             logger.error(f"[ERROR] Failed to send Telegram photo: {e}")
             return False
 
+    async def send_message_async(self, message: str, parse_mode: str = "HTML") -> bool:
+        """send_message over the shared keep-alive pool (for async callers)"""
+        if not self.bot_token or not self.chat_id:
+            logger.error("[ERROR] Telegram not configured")
+            return False
+
+        try:
+            from backend.core.http_clients import get_http_clients
+            response = await get_http_clients().get("telegram").post(
+                f"/bot{self.bot_token}/sendMessage",
+                json={"chat_id": self.chat_id, "text": message, "parse_mode": parse_mode},
+                timeout=10
+            )
+            response.raise_for_status()
+
+            logger.info("[OK] Telegram notification sent")
+            return True
+
+        except Exception as e:
+            logger.error(f"[ERROR] Failed to send Telegram notification: {e}")
+            return False
+
+    async def send_photo_async(self, photo_path: str, caption: str = "") -> bool:
+        """send_photo over the shared keep-alive pool (for async callers)"""
+        if not self.bot_token or not self.chat_id:
+            logger.error("[ERROR] Telegram not configured")
+            return False
+
+        try:
+            from backend.core.http_clients import get_http_clients
+
+            def read_photo() -> bytes:
+                with open(photo_path, "rb") as photo_file:
+                    return photo_file.read()
+
+            photo = await asyncio.to_thread(read_photo)
+            response = await get_http_clients().get("telegram").post(
+                f"/bot{self.bot_token}/sendPhoto",
+                data={"chat_id": self.chat_id, "caption": caption},
+                files={"photo": (os.path.basename(photo_path), photo)},
+                timeout=30
+            )
+            response.raise_for_status()
+
+            logger.info("[OK] Telegram photo sent")
+            return True
+
+        except Exception as e:
+            logger.error(f"[ERROR] Failed to send Telegram photo: {e}")
+            return False
+
     def send_monitoring_alert(self, results: Dict[str, Any]) -> bool:
         """
         Send monitoring alert to Telegram
@@ -93,6 +148,15 @@ class TelegramNotifier:
         Returns:
             True if sent successfully
         """
+        return self.send_message(self._monitoring_message(results))
+
+    async def send_monitoring_alert_async(self, results: Dict[str, Any]) -> bool:
+        """send_monitoring_alert for async callers"""
+        return await self.send_message_async(self._monitoring_message(results))
+
+    @staticmethod
+    def _monitoring_message(results: Dict[str, Any]) -> str:
+        """HTML alert text of a monitoring run"""
         status = results.get("status", "unknown")
         changes = results.get("changes_detected", [])
         failed_tests = [t for t in results.get("tests", []) if t["status"] == "failed"]
@@ -143,7 +207,7 @@ class TelegramNotifier:
         # Add view details link (if you have a dashboard)
         # message += f"\n<a href='https://your-dashboard.com/monitoring'>📊 Voir les détails</a>"
 
-        return self.send_message(message)
+        return message
 
     def send_custom_alert(
         self,
@@ -162,6 +226,14 @@ class TelegramNotifier:
         Returns:
             True if sent successfully
         """
+        return self.send_message(self._custom_message(title, message, severity))
+
+    async def send_custom_alert_async(self, title: str, message: str, severity: str = "info") -> bool:
+        """send_custom_alert for async callers"""
+        return await self.send_message_async(self._custom_message(title, message, severity))
+
+    @staticmethod
+    def _custom_message(title: str, message: str, severity: str) -> str:
         emoji_map = {
             "critical": "🚨",
             "warning": "[WARN]",
@@ -169,9 +241,7 @@ class TelegramNotifier:
         }
 
         emoji = emoji_map.get(severity, "📢")
-        full_message = f"{emoji} <b>{title}</b>\n\n{message}"
-
-        return self.send_message(full_message)
+        return f"{emoji} <b>{title}</b>\n\n{message}"
 
     def test_connection(self) -> bool:
         """
@@ -1,18 +1,42 @@
 #!/usr/bin/env python3
 import os
 import sys
+import time
+import signal
 import asyncio
+import hashlib
 import argparse
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Any, Dict, Optional
 
 from backend.utils.logger import logger
 from backend.utils.crypto import decrypt_blob
-from backend.db import get_publish_job, update_job_status, get_session
+from backend.db import (
+    get_publish_job, update_job_status, get_session,
+    lease_next_publish_job, get_publish_queue_depth, requeue_publish_jobs
+)
 from backend.models import JobStatus
+from backend.core.browser_pool import get_browser_pool, shutdown_browser_pools
+from backend.core.resource_policy import install_resource_policy
+from backend.core.metrics import publish_job_wait_seconds, track_publish_job, track_publish_queue
 
 HEADLESS = os.getenv("PLAYWRIGHT_HEADLESS", "true").lower() == "true"
 
+# Publish jobs run concurrently (each holds one browser pool seat)
+PUBLISH_WORKER_SLOTS = int(os.getenv("PUBLISH_WORKER_SLOTS", "2"))
+# Idle queue polling; a queued job starts within this delay
+PUBLISH_POLL_INTERVAL = float(os.getenv("PUBLISH_POLL_INTERVAL", "0.5"))
+PUBLISH_DEPTH_INTERVAL = 5.0
+PUBLISH_ERROR_BACKOFF = 10.0
+# Shutdown: how long running jobs may take before being requeued
+PUBLISH_DRAIN_TIMEOUT = int(os.getenv("PUBLISH_DRAIN_TIMEOUT", "120"))
+# Running jobs untouched for this long are considered orphaned on startup
+PUBLISH_JOB_STALE_MINUTES = int(os.getenv("PUBLISH_JOB_STALE_MINUTES", "30"))
+# Run the worker inside the API process instead of a separate one
+PUBLISH_WORKER_IN_APP = os.getenv("PUBLISH_WORKER_IN_APP", "false").lower() == "true"
+PUBLISH_WORKER_METRICS_PORT = int(os.getenv("PUBLISH_WORKER_METRICS_PORT", "0"))
+
 CAPTCHA_SELECTORS = [
     "[data-testid='captcha']",
     "#captcha",
@@ -26,83 +50,83 @@ async def run_playwright_job(job_id: str, headless: bool = True):
     """Execute a Playwright automation job"""
     
     try:
-        from playwright.async_api import async_playwright
+        import playwright  # noqa: F401
     except ImportError:
         logger.error("Playwright not installed. Run: pip install playwright && playwright install")
-        update_job_status(job_id, JobStatus.failed, logs=[
+        await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=[
             {"timestamp": datetime.utcnow().isoformat(), "message": "Playwright not installed"}
         ])
         return
     
-    job = get_publish_job(job_id)
+    job = await asyncio.to_thread(get_publish_job, job_id)
     if not job:
         logger.error(f"Job {job_id} not found")
         return
     
     if not job.session_id:
         logger.error(f"Job {job_id} has no session_id")
-        update_job_status(job_id, JobStatus.failed, logs=[
+        await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=[
             {"timestamp": datetime.utcnow().isoformat(), "message": "No session_id provided"}
         ])
         return
     
     # Get and decrypt session cookie
-    session = get_session(job.session_id)
+    session = await asyncio.to_thread(get_session, job.session_id)
     if not session:
         logger.error(f"Session {job.session_id} not found")
-        update_job_status(job_id, JobStatus.failed, logs=[
+        await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=[
             {"timestamp": datetime.utcnow().isoformat(), "message": "Session not found"}
         ])
         return
     
     try:
-        cookie_value = decrypt_blob(session.encrypted_cookie)
+        cookie_value = await asyncio.to_thread(decrypt_blob, session.encrypted_cookie)
     except Exception as e:
         logger.error(f"Failed to decrypt cookie: {e}")
-        update_job_status(job_id, JobStatus.failed, logs=[
+        await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=[
             {"timestamp": datetime.utcnow().isoformat(), "message": "Failed to decrypt cookie"}
         ])
         return
     
     # Start job
     logs = []
-    update_job_status(job_id, JobStatus.running, logs=logs)
+    await asyncio.to_thread(update_job_status, job_id, JobStatus.running, logs=logs)
     
-    async with async_playwright() as p:
-        # Get Chromium path from Nix (fix for Replit NixOS)
-        import subprocess
-        try:
-            chromium_path = subprocess.check_output(['which', 'chromium']).decode().strip()
-            browser = await p.chromium.launch(
-                executable_path=chromium_path,
-                headless=headless,
-                args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-            )
-        except:
-            # Fallback to Playwright's bundled browser
-            browser = await p.chromium.launch(headless=headless)
-        context = await browser.new_context()
-        
-        # Add cookie to context
-        try:
-            await context.add_cookies([{
-                "name": "_vinted_fr_session",
-                "value": cookie_value,
-                "domain": ".vinted.com",
-                "path": "/"
-            }])
-            logs.append({
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": "Cookie loaded into browser context"
-            })
-        except Exception as e:
+    # Leased from the warm browser pool: no Chromium launch per job, and the
+    # account's context (cookie already loaded) is reused between jobs
+    lease = await get_browser_pool(headless).acquire()
+    keep_context = False
+    try:
+        context = await lease.bind(hashlib.sha256(cookie_value.encode()).hexdigest()[:16])
+        if context is not None:
             logs.append({
                 "timestamp": datetime.utcnow().isoformat(),
-                "message": f"Failed to add cookie: {e}"
+                "message": "Reusing warm browser context"
             })
-            await browser.close()
-            update_job_status(job_id, JobStatus.failed, logs=logs)
-            return
+        else:
+            context = await lease.browser.new_context()
+            lease.context = context
+            await install_resource_policy(context)
+        
+            # Add cookie to context
+            try:
+                await context.add_cookies([{
+                    "name": "_vinted_fr_session",
+                    "value": cookie_value,
+                    "domain": ".vinted.com",
+                    "path": "/"
+                }])
+                logs.append({
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "message": "Cookie loaded into browser context"
+                })
+            except Exception as e:
+                logs.append({
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "message": f"Failed to add cookie: {e}"
+                })
+                await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=logs)
+                return
         
         page = await context.new_page()
         
@@ -134,32 +158,30 @@ async def run_playwright_job(job_id: str, headless: bool = True):
                     "message": "[WARN] CAPTCHA detected - automation blocked",
                     "level": "warning"
                 })
-                update_job_status(job_id, JobStatus.blocked, logs=logs, screenshot_path=screenshot_path)
+                await asyncio.to_thread(update_job_status, job_id, JobStatus.blocked, logs=logs, screenshot_path=screenshot_path)
                 
                 # Send Telegram notification
                 try:
                     from backend.monitoring.telegram_notifier import TelegramNotifier
                     notifier = TelegramNotifier()
                     caption = f"🚨 CAPTCHA Detected!\n\nJob ID: {job_id}\nStatus: Blocked\n\nManual intervention may be required to continue."
-                    await asyncio.to_thread(notifier.send_photo, photo_path=screenshot_path, caption=caption)
+                    await notifier.send_photo_async(photo_path=screenshot_path, caption=caption)
                 except Exception as e:
                     logger.error(f"Failed to send Telegram notification for CAPTCHA: {e}")
 
-                await browser.close()
                 logger.warning(f"Job {job_id} blocked by CAPTCHA")
                 return
             
             # Get listing details for the job
             from backend.db import get_listing
-            listing = get_listing(job.item_id)
+            listing = await asyncio.to_thread(get_listing, job.item_id)
             if not listing:
                 logs.append({
                     "timestamp": datetime.utcnow().isoformat(),
                     "message": f"Listing with ID {job.item_id} not found for job {job_id}",
                     "level": "error"
                 })
-                update_job_status(job_id, JobStatus.failed, logs=logs)
-                await browser.close()
+                await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=logs)
                 return
 
             # Continue with automation based on job mode
@@ -171,7 +193,7 @@ async def run_playwright_job(job_id: str, headless: bool = True):
                 })
                 screenshot_path = f"backend/data/screenshots/{job_id}_preview.png"
                 await page.screenshot(path=screenshot_path)
-                update_job_status(job_id, JobStatus.completed, logs=logs, screenshot_path=screenshot_path)
+                await asyncio.to_thread(update_job_status, job_id, JobStatus.completed, logs=logs, screenshot_path=screenshot_path)
             
             elif job.mode == "automated":
                 logs.append({
@@ -185,8 +207,10 @@ async def run_playwright_job(job_id: str, headless: bool = True):
 
                 # 2. Upload photos
                 # Vinted's upload is a complex dropzone. We target the hidden input element.
+                # Photos are downsized first so the browser uploads fewer bytes
+                from backend.core.vinted_client import prepare_upload_files
                 photo_paths = [os.path.abspath(p) for p in listing.photos]
-                await page.set_input_files("input[type='file']", photo_paths)
+                await page.set_input_files("input[type='file']", await prepare_upload_files(photo_paths))
                 logs.append({"timestamp": datetime.utcnow().isoformat(), "message": f"Uploading {len(listing.photos)} photos"})
                 
                 # Wait for all photos to be uploaded and processed by Vinted
@@ -209,7 +233,7 @@ async def run_playwright_job(job_id: str, headless: bool = True):
                     category_parts = [part.strip() for part in listing.category.split('/')]
                     for part in category_parts:
                         # Click on the element containing the category part text
-                        await page.locator('div[data-testid*="catalog-tree-item"] >> text='{}''.format(part)).click()
+                        await page.locator(f"div[data-testid*='catalog-tree-item'] >> text='{part}'").click()
                         # Small delay to allow UI to update
                         await page.wait_for_timeout(500)
                     
@@ -241,8 +265,9 @@ async def run_playwright_job(job_id: str, headless: bool = True):
                     "timestamp": datetime.utcnow().isoformat(),
                     "message": f"[OK] Automated publish completed. New URL: {page.url}"
                 })
-                update_job_status(job_id, JobStatus.completed, logs=logs)
+                await asyncio.to_thread(update_job_status, job_id, JobStatus.completed, logs=logs)
             
+            keep_context = True
             logger.info(f"[OK] Job {job_id} completed successfully")
         
         except Exception as e:
@@ -253,53 +278,239 @@ async def run_playwright_job(job_id: str, headless: bool = True):
                 "message": f"Error: {str(e)}",
                 "level": "error"
             })
-            update_job_status(job_id, JobStatus.failed, logs=logs, screenshot_path=screenshot_path)
+            await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=logs, screenshot_path=screenshot_path)
             logger.error(f"Job {job_id} failed: {e}")
         
-        finally:
-            await browser.close()
+    finally:
+        await lease.release(keep_context=keep_context)
 
 
-async def worker_loop():
-    """Main worker loop - polls for jobs and executes them"""
-    logger.info("🤖 Playwright worker started")
-    
-    while True:
+class PublishWorker:
+    """
+    Long-running consumer of the PublishJob queue
+
+    - `slots` jobs run concurrently, each on a seat of the shared browser pool
+    - Queued rows are claimed with an atomic UPDATE (lease_next_publish_job),
+      so several workers can share one database
+    - Idle polling every PUBLISH_POLL_INTERVAL seconds, and wake() starts a
+      freshly queued job immediately when the worker runs in the API process
+    - stop() drains: no new leases, running jobs get PUBLISH_DRAIN_TIMEOUT
+      seconds to finish, the rest are put back in the queue
+    """
+
+    def __init__(
+        self,
+        slots: int = PUBLISH_WORKER_SLOTS,
+        headless: bool = True,
+        poll_interval: float = PUBLISH_POLL_INTERVAL
+    ):
+        self.slots = max(1, slots)
+        self.headless = headless
+        self.poll_interval = poll_interval
+        self._free = asyncio.Semaphore(self.slots)
+        self._wake = asyncio.Event()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._depth = 0
+        self._depth_checked = 0.0
+        self.stats = {
+            "leased": 0,
+            "completed": 0,
+            "failed": 0,
+            "blocked": 0,
+            "requeued": 0,
+            "duration_seconds": 0.0,
+            "wait_seconds": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._loop_task is not None and not self._loop_task.done()
+
+    async def start(self):
+        """Recover jobs orphaned by a killed worker, then start consuming"""
+        if self.running:
+            return
+        self._stopping = False
+        stale_before = datetime.utcnow() - timedelta(minutes=PUBLISH_JOB_STALE_MINUTES)
+        requeued = await asyncio.to_thread(requeue_publish_jobs, stale_before=stale_before)
+        if requeued:
+            logger.warning(f"[PUBLISH] Requeued {requeued} jobs left running by a previous worker")
+        self._loop_task = asyncio.get_running_loop().create_task(self._consume())
+        logger.info(f"[PUBLISH] Worker started ({self.slots} slots, headless={self.headless})")
+
+    def wake(self):
+        """Check the queue now instead of at the next poll"""
+        self._wake.set()
+
+    async def _consume(self):
+        while not self._stopping:
+            await self._free.acquire()
+            try:
+                leased = await self._lease()
+            except Exception as e:
+                self._free.release()
+                logger.error(f"[ERROR] Publish worker failed to lease a job: {e}")
+                await asyncio.sleep(PUBLISH_ERROR_BACKOFF)
+                continue
+
+            if leased is None:
+                self._free.release()
+                await self._refresh_depth()
+                self._wake.clear()
+                if not self._stopping:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                continue
+
+            job_id, due_at = leased
+            wait = max(0.0, (datetime.utcnow() - due_at).total_seconds())
+            self.stats["leased"] += 1
+            self.stats["wait_seconds"] += wait
+            publish_job_wait_seconds.observe(wait)
+            logger.info(f"[PUBLISH] Leased job {job_id} (waited {wait:.1f}s)")
+            self._running[job_id] = asyncio.get_running_loop().create_task(self._execute(job_id))
+            await self._refresh_depth()
+
+    async def _lease(self):
+        """Claim a job; a claim racing with stop() is handed back to the queue"""
+        claim = asyncio.ensure_future(asyncio.to_thread(lease_next_publish_job))
         try:
-            from sqlmodel import select
-            from backend.db import get_db_session
-            from backend.models import PublishJob
-            
-            # Check for queued jobs
-            with get_db_session() as db:
-                job = db.exec(
-                    select(PublishJob)
-                    .where(PublishJob.status == JobStatus.queued)
-                    .order_by(PublishJob.created_at)
-                ).first()
-                
-                if job:
-                    logger.info(f"[INFO] Processing job {job.job_id}")
-                    await run_playwright_job(job.job_id, headless=HEADLESS)
-            
-            # Sleep before next check
-            await asyncio.sleep(5)
-        
-        except KeyboardInterrupt:
-            logger.info("Worker stopped by user")
-            break
+            return await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            leased = await claim
+            if leased is not None:
+                await asyncio.to_thread(requeue_publish_jobs, [leased[0]])
+            raise
+
+    async def _refresh_depth(self):
+        """Queue depth gauge, refreshed at most every PUBLISH_DEPTH_INTERVAL seconds"""
+        now = time.monotonic()
+        if now - self._depth_checked < PUBLISH_DEPTH_INTERVAL:
+            track_publish_queue(self._depth, len(self._running))
+            return
+        self._depth_checked = now
+        try:
+            self._depth, _ = await asyncio.to_thread(get_publish_queue_depth)
+        except Exception as e:
+            logger.error(f"[ERROR] Failed to read publish queue depth: {e}")
+        track_publish_queue(self._depth, len(self._running))
+
+    async def _execute(self, job_id: str):
+        started = time.monotonic()
+        status = "failed"
+        try:
+            await run_playwright_job(job_id, headless=self.headless)
+            job = await asyncio.to_thread(get_publish_job, job_id)
+            if job is not None:
+                status = job.status.value if hasattr(job.status, "value") else str(job.status)
+        except asyncio.CancelledError:
+            # Drain timeout: the job goes back to the queue for the next worker
+            status = "requeued"
+            await asyncio.to_thread(requeue_publish_jobs, [job_id])
+            logger.warning(f"[PUBLISH] Job {job_id} interrupted by shutdown, requeued")
+            raise
         except Exception as e:
-            logger.error(f"Worker error: {e}")
-            await asyncio.sleep(10)
+            logger.error(f"Job {job_id} crashed: {e}")
+            await asyncio.to_thread(update_job_status, job_id, JobStatus.failed, logs=[
+                {"timestamp": datetime.utcnow().isoformat(), "message": f"Worker error: {e}", "level": "error"}
+            ])
+        finally:
+            duration = time.monotonic() - started
+            self.stats["duration_seconds"] += duration
+            if status in self.stats:
+                self.stats[status] += 1
+            track_publish_job(status, duration)
+            self._running.pop(job_id, None)
+            self._free.release()
+            track_publish_queue(self._depth, len(self._running))
+            logger.info(f"[PUBLISH] Job {job_id} {status} in {duration:.1f}s")
+
+    async def stop(self, timeout: float = PUBLISH_DRAIN_TIMEOUT):
+        """Graceful drain: stop leasing, let running jobs finish, requeue the rest"""
+        self._stopping = True
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+
+        tasks = list(self._running.values())
+        if tasks:
+            logger.info(f"[PUBLISH] Draining {len(tasks)} running jobs (up to {timeout}s)")
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("[PUBLISH] Worker stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Worker occupancy, throughput and latency"""
+        finished = self.stats["completed"] + self.stats["failed"] + self.stats["blocked"]
+        return {
+            **self.stats,
+            "running": self.running,
+            "slots": self.slots,
+            "in_flight": sorted(self._running),
+            "queue_depth": self._depth,
+            "avg_duration_seconds": (
+                round(self.stats["duration_seconds"] / finished, 1) if finished else 0.0
+            ),
+            "avg_wait_seconds": (
+                round(self.stats["wait_seconds"] / self.stats["leased"], 2) if self.stats["leased"] else 0.0
+            ),
+        }
+
+
+# Worker running inside the API process (PUBLISH_WORKER_IN_APP)
+_worker: Optional[PublishWorker] = None
+
+
+def get_publish_worker(headless: bool = HEADLESS) -> PublishWorker:
+    """Get or create the in-process PublishWorker singleton"""
+    global _worker
+    if _worker is None:
+        _worker = PublishWorker(headless=headless)
+    return _worker
+
+
+async def worker_main(slots: int = PUBLISH_WORKER_SLOTS, headless: bool = True, metrics_port: int = 0):
+    """Standalone worker process: runs until SIGTERM/SIGINT, then drains"""
+    if metrics_port:
+        from prometheus_client import start_http_server
+        from backend.core.metrics import registry
+        start_http_server(metrics_port, registry=registry)
+        logger.info(f"[PUBLISH] Metrics on :{metrics_port}/metrics")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker = PublishWorker(slots=slots, headless=headless)
+    await worker.start()
+    try:
+        await stop.wait()
+        logger.info("[PUBLISH] Shutdown requested")
+        await worker.stop()
+    finally:
+        await shutdown_browser_pools()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Playwright Worker")
     parser.add_argument("--headless", type=int, default=1, help="Run in headless mode (1=yes, 0=no)")
+    parser.add_argument("--slots", type=int, default=PUBLISH_WORKER_SLOTS, help="Concurrent publish jobs")
+    parser.add_argument("--metrics-port", type=int, default=PUBLISH_WORKER_METRICS_PORT, help="Prometheus port (0=off)")
     args = parser.parse_args()
     
     headless_mode = bool(args.headless)
-    HEADLESS = headless_mode
     
-    logger.info(f"Starting Playwright worker (headless={headless_mode})")
-    asyncio.run(worker_loop())
+    logger.info(f"Starting Playwright worker (headless={headless_mode}, slots={args.slots})")
+    asyncio.run(worker_main(slots=args.slots, headless=headless_mode, metrics_port=args.metrics_port))
@@ -3,12 +3,12 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
-import httpx
 
 from backend.models import Session, User
 from backend.utils.crypto import encrypt_blob, decrypt_blob
 from backend.db import get_db_session
 from backend.utils.logger import logger
+from backend.core.http_clients import get_http_clients
 
 router = APIRouter(prefix="/vinted/auth", tags=["authentication"])
 
@@ -39,13 +39,14 @@ async def create_session(data: SessionCreate):
     else:
         # Try to validate by making a request to Vinted
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    "https://www.vinted.com/api/v2/users/current",
-                    headers={"Cookie": data.cookie_value},
-                    timeout=10.0
-                )
-                valid = response.status_code == 200
+            response = await get_http_clients().get("vinted").get(
+                "https://www.vinted.com/api/v2/users/current",
+                headers={"Cookie": data.cookie_value},
+                timeout=10.0,
+                # An expired cookie redirects to the (200) login page
+                follow_redirects=False
+            )
+            valid = response.status_code == 200
         except Exception as e:
             logger.error(f"Session validation failed: {e}")
             valid = False
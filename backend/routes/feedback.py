@@ -1,7 +1,7 @@
 
 from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
-from backend.utils.discord_notifier import send_discord_webhook
+from backend.utils.discord_notifier import send_discord_webhook_async
 from backend.utils.logger import logger
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
@@ -22,7 +22,7 @@ async def submit_feedback(feedback: FeedbackSubmission):
 
     try:
         logger.info(f"Received new feedback: {feedback.text[:50]}...")
-        send_discord_webhook(feedback.text)
+        await send_discord_webhook_async(feedback.text)
         return {"message": "Feedback received. Thank you!"}
     except Exception as e:
         logger.error(f"Error processing feedback: {e}")
@@ -6,7 +6,7 @@ import json
 import csv
 from io import StringIO
 
-from backend.db import get_all_listings, get_listing, get_db_session
+from backend.db import get_all_listings, get_listing, get_db_session, get_session
 from backend.models import Listing, ListingStatus
 from backend.utils.logger import logger
 
@@ -19,6 +19,7 @@ class ListingCreate(BaseModel):
     brand: Optional[str] = None
     price: float
     photos: list[str] = []
+    session_id: Optional[int] = None  # Vinted session whose user owns the listing
 
 
 @router.get("")
@@ -30,6 +31,7 @@ async def list_listings(limit: int = 100, offset: int = 0):
         "listings": [
             {
                 "id": l.id,
+                "user_id": l.user_id,
                 "title": l.title,
                 "description": l.description,
                 "brand": l.brand,
@@ -55,6 +57,7 @@ async def get_listing_by_id(listing_id: int):
     
     return {
         "id": listing.id,
+        "user_id": listing.user_id,
         "title": listing.title,
         "description": listing.description,
         "brand": listing.brand,
@@ -68,9 +71,17 @@ async def get_listing_by_id(listing_id: int):
 
 @router.post("")
 async def create_listing(data: ListingCreate):
-    """Create new listing"""
+    """Create new listing (owned by the session's user: their price drop rule applies)"""
+    user_id = None
+    if data.session_id is not None:
+        session = get_session(data.session_id)
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        user_id = session.user_id
+
     with get_db_session() as db:
         listing = Listing(
+            user_id=user_id,
             title=data.title,
             description=data.description,
             brand=data.brand,
@@ -85,6 +96,7 @@ async def create_listing(data: ListingCreate):
         
         return {
             "id": listing.id,
+            "user_id": listing.user_id,
             "title": listing.title,
             "status": listing.status
         }
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from backend.db import (
+    get_db_session,
+    get_price_drop_rules,
+    set_price_drop_rule,
+    delete_price_drop_rule,
+)
+from backend.models import User
+from backend.utils.logger import logger
+
+router = APIRouter(prefix="/price-drop-rules", tags=["listings"])
+
+
+class PriceDropRuleUpdate(BaseModel):
+    user_id: Optional[int] = None  # None = default rule (users without their own)
+    drop_percent: float = Field(ge=0, le=100)
+    min_price: float = Field(ge=0)
+    enabled: bool = True
+
+
+def _rule_dict(rule) -> dict:
+    return {
+        "user_id": rule.user_id,
+        "drop_percent": rule.drop_percent,
+        "min_price": rule.min_price,
+        "enabled": rule.enabled,
+        "updated_at": rule.updated_at
+    }
+
+
+@router.get("")
+async def list_price_drop_rules():
+    """Get the scheduled price drop rules (default rule first)"""
+    rules = get_price_drop_rules()
+    return {"rules": [_rule_dict(r) for r in rules], "total": len(rules)}
+
+
+@router.put("")
+async def put_price_drop_rule(data: PriceDropRuleUpdate):
+    """Create or replace a user's price drop rule (user_id null = default rule)"""
+    if data.user_id is not None:
+        with get_db_session() as db:
+            if not db.get(User, data.user_id):
+                raise HTTPException(status_code=404, detail="User not found")
+
+    rule = set_price_drop_rule(data.user_id, data.drop_percent, data.min_price, data.enabled)
+    logger.info(
+        f"[PRICE] Rule for {'default' if rule.user_id is None else f'user {rule.user_id}'}: "
+        f"-{rule.drop_percent}% floor {rule.min_price} ({'enabled' if rule.enabled else 'disabled'})"
+    )
+    return _rule_dict(rule)
+
+
+@router.delete("")
+async def remove_price_drop_rule(user_id: Optional[int] = None):
+    """Remove a user's rule: their listings fall back to the default rule"""
+    if not delete_price_drop_rule(user_id):
+        raise HTTPException(status_code=404, detail="Rule not found")
+    return {"ok": True, "user_id": user_id}
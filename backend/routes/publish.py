@@ -6,6 +6,7 @@ from datetime import datetime
 from backend.db import queue_publish_job, get_publish_job, get_db_session, update_job_status
 from backend.models import PublishJob, JobStatus
 from backend.utils.logger import logger
+from backend.playwright_worker import get_publish_worker
 from sqlmodel import select
 
 router = APIRouter(prefix="/vinted/publish", tags=["publish"])
@@ -29,6 +30,7 @@ async def queue_job(data: QueueJobRequest):
     )
     
     logger.info(f"[INFO] Publish job {job.job_id} queued (mode: {data.mode})")
+    get_publish_worker().wake()
     
     return {
         "job_id": job.job_id,
@@ -125,6 +127,7 @@ async def retry_job(job_id: str):
         raise HTTPException(status_code=400, detail="Only failed or cancelled jobs can be retried")
     
     update_job_status(job_id, JobStatus.queued)
+    get_publish_worker().wake()
     
     logger.info(f"[PROCESS] Job {job_id} queued for retry")
     
@@ -146,7 +149,8 @@ async def run_job(job_id: str):
     if job.status != JobStatus.queued:
         raise HTTPException(status_code=400, detail="Only queued jobs can be run manually")
     
-    update_job_status(job_id, JobStatus.running)
+    # The worker leases it (queued -> running) on wake-up
+    get_publish_worker().wake()
     
     logger.info(f"▶️ Job {job_id} started manually")
     
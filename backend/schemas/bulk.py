@@ -34,6 +34,7 @@ class DraftItem(BaseModel):
     brand: str
     size: str
     photos: List[str]  # URLs or temp_ids
+    thumbnails: List[str] = Field(default_factory=list)  # Resized variant URLs (list views)
     status: str = "draft"  # draft, ready, published, failed
     confidence: float = 0.8  # Default value for legacy drafts
     created_at: datetime
@@ -87,6 +87,7 @@ class ListingPrepareResponse(BaseModel):
     vinted_draft_id: Optional[str] = None
     publish_mode: Optional[str] = None
     reason: Optional[str] = None
+    timeline: Optional[Dict[str, Any]] = None  # Playwright steps, for the caller's publish trace
 
 
 class ListingPublishRequest(BaseModel):
@@ -103,6 +104,7 @@ class ListingPublishResponse(BaseModel):
     listing_url: Optional[str] = None
     needs_manual: Optional[bool] = None
     reason: Optional[str] = None
+    timeline: Optional[Dict[str, Any]] = None  # Playwright steps, for the caller's publish trace
 
 
 class PublishJob(BaseModel):
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the scheduled price drop on a large listing table: the former
+ORM loop (load every listed Listing, change prices one by one, commit at
+the end) versus apply_price_drops (set-based UPDATEs in keyset chunks,
+per-user PriceDropRule)
+
+Both run on copies of the same seeded SQLite database. The script checks
+the set-based prices against a Python reference of the rules, and a probe
+thread doing small writes throughout each run reports how long other
+writers wait for the lock.
+
+Usage:
+    python -m backend.scripts.benchmark_price_drop --listings 200000
+    python -m backend.scripts.benchmark_price_drop --chunk-size 0 --skip-legacy
+"""
+import os
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_PERCENT = 5.0
+DEFAULT_MIN_PRICE = 5.0
+
+
+def seed(db_path: str, listings: int, users: int, seed_value: int = 7):
+    """Listings spread over `users` owners; a rule for most users, some disabled, a default rule"""
+    rng = random.Random(seed_value)
+    conn = sqlite3.connect(db_path)
+    now = datetime.utcnow().isoformat(sep=" ")
+    conn.executemany(
+        "INSERT INTO user (id, email, created_at) VALUES (?, ?, ?)",
+        [(u, f"user{u}@example.com", now) for u in range(1, users + 1)]
+    )
+    rules = [(None, DEFAULT_PERCENT, DEFAULT_MIN_PRICE, 1)]
+    for u in range(1, users + 1):
+        roll = rng.random()
+        if roll < 0.7:
+            rules.append((u, rng.choice([3.0, 5.0, 10.0, 15.0]), rng.choice([2.0, 5.0, 10.0]), 1))
+        elif roll < 0.8:
+            rules.append((u, 10.0, 5.0, 0))
+        # else: no rule of their own, the default one applies
+    conn.executemany(
+        "INSERT INTO price_drop_rule (user_id, drop_percent, min_price, enabled, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        [rule + (now, now) for rule in rules]
+    )
+    statuses = ["listed"] * 7 + ["sold", "draft", "archived"]
+    conn.executemany(
+        "INSERT INTO listing (user_id, title, description, price, status, photos, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, '[]', ?, ?)",
+        (
+            (
+                rng.randint(1, users) if rng.random() > 0.05 else None,
+                f"Item {i}", f"Description of item {i}",
+                round(rng.uniform(1, 120), 2), rng.choice(statuses), now, now
+            )
+            for i in range(listings)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+
+def expected_prices(db_path: str) -> Dict[int, float]:
+    """New price of every listing the rules should change (Python reference)"""
+    conn = sqlite3.connect(db_path)
+    rules = {
+        user_id: (percent, floor, enabled)
+        for user_id, percent, floor, enabled in conn.execute(
+            "SELECT user_id, drop_percent, min_price, enabled FROM price_drop_rule"
+        )
+    }
+    default = rules.get(None, (DEFAULT_PERCENT, DEFAULT_MIN_PRICE, 1))
+    expected = {}
+    for listing_id, user_id, price in conn.execute(
+        "SELECT id, user_id, price FROM listing WHERE status = 'listed'"
+    ):
+        percent, floor, enabled = rules.get(user_id, default) if user_id is not None else default
+        if not enabled or percent <= 0 or price <= floor:
+            continue
+        expected[listing_id] = max(round(price * (1 - percent / 100), 2), floor)
+    conn.close()
+    return expected
+
+
+class LockProbe:
+    """Small write transactions in a loop; records how long each waited for the lock"""
+
+    def __init__(self, db_path: str, interval: float = 0.01):
+        self.db_path = db_path
+        self.interval = interval
+        self.waits: List[float] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        conn = sqlite3.connect(self.db_path, timeout=120, isolation_level=None)
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("UPDATE user SET email = email WHERE id = 1")
+            conn.execute("COMMIT")
+            self.waits.append(time.perf_counter() - started)
+            time.sleep(self.interval)
+        conn.close()
+
+    def __enter__(self) -> "LockProbe":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def max_wait(self) -> float:
+        return max(self.waits, default=0.0)
+
+
+def legacy_price_drop() -> int:
+    """The former price_drop_job body: flat 5%, per-row ORM updates, one commit"""
+    from sqlmodel import select
+    from backend.db import get_db_session
+    from backend.models import Listing, ListingStatus
+
+    with get_db_session() as db:
+        listings = db.exec(select(Listing).where(Listing.status == ListingStatus.listed)).all()
+        changed = 0
+        for listing in listings:
+            new_price = round(listing.price * (1 - 0.05), 2)
+            if new_price >= 5.0:
+                listing.price = new_price
+                listing.updated_at = datetime.utcnow()
+                db.add(listing)
+                changed += 1
+        db.commit()
+    return changed
+
+
+def use_database(db_path: str):
+    """Point backend.db at another SQLite file"""
+    import backend.db as db
+    from sqlmodel import create_engine
+
+    db.engine.dispose()
+    db.engine = create_engine(f"sqlite:///{db_path}", echo=False)
+
+
+def timed(func, *args) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the set-based price drop on a large listing table")
+    parser.add_argument("--listings", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="0 = one UPDATE for the whole table")
+    parser.add_argument("--chunk-pause-ms", type=int, default=50, help="Pause between chunks")
+    parser.add_argument("--skip-legacy", action="store_true", help="Do not run the former ORM loop")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="price_drop_bench_")
+    # Before the backend import: backend.db builds its engine at import time
+    os.environ["VINTEDBOT_DATABASE_URL"] = f"sqlite:///{workdir}/base.db"
+    from loguru import logger
+    import backend.db as db
+    logger.remove()
+
+    try:
+        db.create_tables()
+        base_db = f"{workdir}/base.db"
+        started = time.perf_counter()
+        seed(base_db, args.listings, args.users)
+        print(f"[SETUP] {args.listings} listings, {args.users} users seeded in {time.perf_counter() - started:.1f}s")
+        expected = expected_prices(base_db)
+
+        if not args.skip_legacy:
+            legacy_db = f"{workdir}/legacy.db"
+            shutil.copy(base_db, legacy_db)
+            use_database(legacy_db)
+            with LockProbe(legacy_db) as probe:
+                changed, seconds = timed(legacy_price_drop)
+            print(f"[LEGACY] {changed} listings changed in {seconds:.2f}s, "
+                  f"other writers waited up to {probe.max_wait * 1000:.0f}ms")
+
+        set_db = f"{workdir}/set_based.db"
+        shutil.copy(base_db, set_db)
+        use_database(set_db)
+        with LockProbe(set_db) as probe:
+            result, seconds = timed(
+                db.apply_price_drops, DEFAULT_PERCENT, DEFAULT_MIN_PRICE, args.chunk_size, args.chunk_pause_ms / 1000
+            )
+        print(f"[SET] {result['dropped']}/{result['listed']} listings dropped in {result['chunks']} chunks, "
+              f"{seconds:.2f}s, other writers waited up to {probe.max_wait * 1000:.0f}ms")
+
+        conn = sqlite3.connect(set_db)
+        actual = dict(conn.execute(
+            "SELECT id, price FROM listing WHERE id IN (SELECT value FROM json_each(?))",
+            (str(result["changed_ids"]),)
+        ))
+        conn.close()
+        same_ids = set(actual) == set(expected)
+        mismatched = sum(1 for i, price in actual.items() if abs(price - expected.get(i, -1)) > 0.011)
+        print(f"[CHECK] Changed ids {'match' if same_ids else 'DIFFER from'} the rules, "
+              f"{mismatched} prices off by more than a cent")
+        if not same_ids or mismatched:
+            raise SystemExit(1)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+CPU benchmark for background removal: per-call rembg.remove() (the old
+request path, which builds a new ONNX session on every call) versus the
+persistent-session BackgroundRemovalWorker
+
+Usage:
+    python -m backend.scripts.benchmark_rembg --images 20
+    python -m backend.scripts.benchmark_rembg --dir backend/data/temp_photos --images 50
+"""
+import os
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+from typing import List
+
+from PIL import Image, ImageDraw
+
+
+def make_sample_images(target_dir: Path, count: int, source_dir: str = None) -> List[str]:
+    """Copy real photos from source_dir, or draw synthetic product shots"""
+    paths = []
+
+    if source_dir:
+        sources = sorted(
+            p for p in Path(source_dir).rglob("*")
+            if p.suffix.lower() in ('.jpg', '.jpeg', '.png')
+        )[:count]
+        for i, src in enumerate(sources):
+            dst = target_dir / f"sample_{i}{src.suffix.lower()}"
+            shutil.copy(src, dst)
+            paths.append(str(dst))
+
+    for i in range(len(paths), count):
+        img = Image.new('RGB', (1024, 1024), (235, 235, 235))
+        draw = ImageDraw.Draw(img)
+        draw.rectangle((300, 200, 724, 850), fill=(40 + i % 200, 60, 120))
+        draw.ellipse((420, 120, 604, 300), fill=(200, 160, 130))
+        path = target_dir / f"sample_{i}.jpg"
+        img.save(path, quality=90)
+        paths.append(str(path))
+
+    return paths
+
+
+def bench_per_call(paths: List[str]) -> float:
+    """Old path: rembg.remove() without a session, one image at a time"""
+    from rembg import remove
+
+    started = time.perf_counter()
+    for path in paths:
+        with open(path, 'rb') as f:
+            remove(f.read())
+    return time.perf_counter() - started
+
+
+async def bench_worker(paths: List[str], batch_size: int, threads: int) -> dict:
+    """New path: one shared session, queued and drained in batches"""
+    from backend.services.background_removal import BackgroundRemovalWorker
+
+    worker = BackgroundRemovalWorker(batch_size=batch_size, intra_op_threads=threads)
+
+    load_started = time.perf_counter()
+    await worker.start()
+    load_seconds = time.perf_counter() - load_started
+
+    started = time.perf_counter()
+    job_id = await worker.submit("benchmark", paths)
+    results = await worker.wait(job_id)
+    elapsed = time.perf_counter() - started
+
+    await worker.stop()
+    return {
+        "load_seconds": load_seconds,
+        "elapsed": elapsed,
+        "failed": len(results["failed"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rembg per-call vs persistent worker")
+    parser.add_argument("--images", type=int, default=20, help="Number of images")
+    parser.add_argument("--dir", default=None, help="Optional directory of real photos to sample")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 2, help="ONNX intra-op threads")
+    parser.add_argument("--skip-per-call", action="store_true", help="Only run the worker benchmark")
+    args = parser.parse_args()
+
+    try:
+        import rembg  # noqa: F401
+    except ImportError:
+        print("[ERROR] rembg not installed. Install with: pip install rembg")
+        return
+
+    from backend.settings import settings
+
+    # The worker only accepts uploaded photos: samples go under temp_photos
+    upload_root = Path(settings.DATA_DIR) / "temp_photos"
+    upload_root.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix="rembg_bench_", dir=upload_root))
+    try:
+        print(f"\n[BENCH] {args.images} images, batch={args.batch_size}, threads={args.threads}")
+
+        if not args.skip_per_call:
+            (work_dir / "per_call").mkdir()
+            paths = make_sample_images(work_dir / "per_call", args.images, args.dir)
+            per_call = bench_per_call(paths)
+            print(f"[PER-CALL] {per_call:.2f}s -> {len(paths) / per_call:.2f} images/s")
+
+        (work_dir / "worker").mkdir()
+        paths = make_sample_images(work_dir / "worker", args.images, args.dir)
+        worker = asyncio.run(bench_worker(paths, args.batch_size, args.threads))
+        print(f"[WORKER] model load {worker['load_seconds']:.2f}s (once), "
+              f"{worker['elapsed']:.2f}s -> {len(paths) / worker['elapsed']:.2f} images/s "
+              f"({worker['failed']} failed)")
+
+        if not args.skip_per_call:
+            print(f"[RESULT] Speedup: {per_call / worker['elapsed']:.1f}x")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the Playwright request interception policy
+(backend/core/resource_policy.py) against a recorded HAR replay: the same
+pages are loaded with and without the policy, time to `networkidle` and
+transferred bytes are compared, without touching Vinted
+
+Usage:
+    # 1. Record once (live, optionally logged in with a session cookie)
+    python -m backend.scripts.benchmark_route_policy record --har vinted.har \\
+        --url https://www.vinted.com --url https://www.vinted.com/items/new --cookie "<_vinted_fr_session>"
+
+    # 2. Replay offline, as often as needed
+    python -m backend.scripts.benchmark_route_policy replay --har vinted.har --runs 5
+"""
+import time
+import asyncio
+import argparse
+import statistics
+from typing import Dict, List
+
+
+async def record(har: str, urls: List[str], cookie: str = None):
+    from playwright.async_api import async_playwright
+    from backend.core.browser_pool import chromium_launch_kwargs
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**chromium_launch_kwargs(True))
+        context = await browser.new_context(record_har_path=har)
+        if cookie:
+            await context.add_cookies([{
+                "name": "_vinted_fr_session",
+                "value": cookie,
+                "domain": ".vinted.com",
+                "path": "/"
+            }])
+        page = await context.new_page()
+        for url in urls:
+            await page.goto(url, wait_until="networkidle", timeout=60000)
+            print(f"[RECORD] {url}")
+        await context.close()  # writes the HAR
+        await browser.close()
+    print(f"[OK] HAR saved to {har}")
+
+
+async def load_pages(browser, har: str, urls: List[str], with_policy: bool) -> Dict[str, float]:
+    """One pass over the pages in a fresh context served from the HAR"""
+    from backend.core.resource_policy import ResourcePolicy
+
+    context = await browser.new_context()
+    # Registered first: the policy (registered last) sees requests first and
+    # falls back to the HAR for what it lets through
+    await context.route_from_har(har, not_found="abort")
+    if with_policy:
+        await ResourcePolicy().install(context)
+
+    transferred = []
+
+    async def count(request):
+        try:
+            sizes = await request.sizes()
+            transferred.append(sizes["responseBodySize"] + sizes["responseHeadersSize"])
+        except Exception:
+            pass
+
+    context.on("requestfinished", lambda request: asyncio.ensure_future(count(request)))
+
+    page = await context.new_page()
+    started = time.perf_counter()
+    for url in urls:
+        await page.goto(url, wait_until="networkidle", timeout=60000)
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0.2)  # let the last sizes() calls land
+    await context.close()
+    return {"seconds": elapsed, "bytes": sum(transferred), "requests": len(transferred)}
+
+
+async def replay(har: str, urls: List[str], runs: int):
+    from playwright.async_api import async_playwright
+    from backend.core.browser_pool import chromium_launch_kwargs
+
+    if not urls:
+        import json
+        with open(har, encoding="utf-8") as f:
+            entries = json.load(f)["log"]["entries"]
+        urls = list(dict.fromkeys(
+            e["request"]["url"] for e in entries
+            if e["response"].get("content", {}).get("mimeType", "").startswith("text/html")
+        ))
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(**chromium_launch_kwargs(True))
+        results = {}
+        for label, with_policy in (("NO POLICY", False), ("POLICY", True)):
+            passes = [await load_pages(browser, har, urls, with_policy) for _ in range(runs)]
+            results[label] = {
+                "seconds": statistics.median(r["seconds"] for r in passes),
+                "bytes": statistics.median(r["bytes"] for r in passes),
+                "requests": statistics.median(r["requests"] for r in passes),
+            }
+            r = results[label]
+            print(f"[{label}] {len(urls)} pages: {r['seconds']:.2f}s to networkidle, "
+                  f"{r['requests']:.0f} requests, {r['bytes'] / 1024:.0f} KB (median of {runs})")
+        await browser.close()
+
+    before, after = results["NO POLICY"], results["POLICY"]
+    print(f"[RESULT] Time: {before['seconds'] / max(after['seconds'], 1e-6):.1f}x faster, "
+          f"bandwidth: -{(1 - after['bytes'] / max(before['bytes'], 1)) * 100:.0f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the request interception policy on a HAR replay")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("--har", required=True)
+    parser.add_argument("--url", action="append", default=[], help="Page to load (repeatable)")
+    parser.add_argument("--cookie", default=None, help="Session cookie value (record mode)")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        if not args.url:
+            parser.error("record needs at least one --url")
+        asyncio.run(record(args.har, args.url, args.cookie))
+    else:
+        asyncio.run(replay(args.har, args.url, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Benchmark of VintedSyncService.pull_changes against a local HTTP stand-in
+of the Vinted API: full mode (one detail call per listing) versus delta
+mode (listing pages + stored fingerprints, details only for what changed)
+
+Both modes run on copies of the same database after the same remote edits;
+the script checks they end with identical drafts and reports remote calls,
+wall time, and the time those calls take at the service's 10 req/min pace.
+
+Usage:
+    python -m backend.scripts.benchmark_sync_delta --listings 2000 --changed 20
+    python -m backend.scripts.benchmark_sync_delta --fixtures items.json --rtt-ms 80
+
+--fixtures is a JSON list of listing items as recorded from
+/api/v2/users/{id}/items pages (merged); without it, synthetic items are
+generated. --rtt-ms adds a per-request delay to mimic the network.
+"""
+import json
+import time
+import random
+import shutil
+import asyncio
+import argparse
+import tempfile
+import threading
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+USER_ID = "42"
+# Vinted member id of the account: a different number space from USER_ID
+VINTED_MEMBER_ID = "9001"
+
+
+class VintedStandIn:
+    """
+    Serves listing pages and listing details from in-memory items
+
+    Pages are served for the authenticated account (/items) and for its
+    member id (/users/{VINTED_MEMBER_ID}/items); any other user id is a 404,
+    like on Vinted.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]], rtt_ms: int = 0):
+        self.items = {str(item["id"]): item for item in items}
+        self.rtt = rtt_ms / 1000
+        self.calls = {"pages": 0, "details": 0}
+        self._server = None
+
+    def start(self) -> str:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if stand_in.rtt:
+                    time.sleep(stand_in.rtt)
+                url = urlsplit(self.path)
+                parts = url.path.strip("/").split("/")
+                if parts[-1] == "items":
+                    if parts[-2] != "v2" and parts[-3:-1] != ["users", VINTED_MEMBER_ID]:
+                        return self._json(404, {"code": 404, "message": "Unknown user"})
+                    stand_in.calls["pages"] += 1
+                    query = parse_qs(url.query)
+                    page = int(query.get("page", ["1"])[0])
+                    per_page = int(query.get("per_page", ["20"])[0])
+                    items = list(stand_in.items.values())[(page - 1) * per_page:page * per_page]
+                    # Listing pages carry a summary: no description
+                    body = {"items": [{k: v for k, v in i.items() if k != "description"} for i in items]}
+                    return self._json(200, body)
+                stand_in.calls["details"] += 1
+                item = stand_in.items.get(parts[-1])
+                if item is None:
+                    return self._json(404, {"code": 404})
+                return self._json(200, {"item": item})
+
+            def _json(self, status: int, body: Dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"http://127.0.0.1:{self._server.server_port}/api/v2"
+
+    def stop(self):
+        self._server.shutdown()
+
+    def reset_calls(self):
+        self.calls = {"pages": 0, "details": 0}
+
+
+def synthetic_items(count: int) -> List[Dict[str, Any]]:
+    brands = ["Nike", "Zara", "Levi's", "Adidas", "H&M"]
+    return [
+        {
+            "id": 1000000 + i,
+            "title": f"Item {i}",
+            "description": f"Description of item {i}",
+            "price": {"amount": f"{10 + i % 90}.0", "currency_code": "EUR"},
+            "status": "Très bon état",
+            "brand_title": brands[i % len(brands)],
+            "size_title": "M",
+            "color": "Noir",
+        }
+        for i in range(count)
+    ]
+
+
+def seed_store(db_path: str, items: List[Dict[str, Any]]):
+    """One published draft per remote item, in sync with it"""
+    from backend.core.storage import SQLiteStore
+
+    store = SQLiteStore(db_path)
+    with store.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO drafts (id, user_id, title, description, price, brand, size, color, item_json, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'published')
+        """, [
+            (
+                f"draft-{item['id']}", USER_ID, item["title"], item.get("description"),
+                float(item["price"]["amount"] if isinstance(item["price"], dict) else item["price"]),
+                item.get("brand_title"), item.get("size_title"), item.get("color"),
+                json.dumps({"vinted_id": str(item["id"]), "condition": item.get("status")})
+            )
+            for item in items
+        ])
+        conn.commit()
+
+
+def edit_remote(stand_in: VintedStandIn, changed: int, seed: int = 7) -> List[str]:
+    """Change the price or title of `changed` remote listings"""
+    rng = random.Random(seed)
+    ids = rng.sample(sorted(stand_in.items), min(changed, len(stand_in.items)))
+    for n, vinted_id in enumerate(ids):
+        item = stand_in.items[vinted_id]
+        if n % 2:
+            item["title"] = item["title"] + " (new)"
+        else:
+            item["price"] = {"amount": "99.0", "currency_code": "EUR"}
+    return ids
+
+
+async def run_pull(db_path: str, base_url: str, mode: str) -> Dict[str, Any]:
+    import backend.core.vinted_sync_service as sync
+    from backend.core.session import VintedSession
+    from backend.core.storage import SQLiteStore
+    from backend.core.vinted_api_client import VintedAPIClient
+    from backend.core.smart_rate_limiter import SmartRateLimiter
+
+    store = SQLiteStore(db_path)
+    sync.get_store = lambda: store
+    sync.get_vinted_session = lambda user_id: VintedSession(cookie="bench", user_agent="bench", user_id=USER_ID)
+    VintedAPIClient.API_BASE = base_url
+
+    service = sync.VintedSyncService(int(USER_ID))
+    # Measure the sync itself, not the pacing (reported separately)
+    service.rate_limiter = SmartRateLimiter(
+        max_requests_per_minute=10 ** 9, max_requests_per_hour=10 ** 9, max_requests_per_day=10 ** 9,
+        adaptive=False, randomize_delays=False
+    )
+    service.rate_limiter.base_delay = 0
+
+    started = time.perf_counter()
+    result = await service.pull_changes(mode=mode)
+    elapsed = time.perf_counter() - started
+    if result.errors:
+        raise SystemExit(f"[ERROR] {mode} pull failed: {result.errors[:3]}")
+    return {"seconds": elapsed, "calls": result.remote_calls, "changes": result.pulled_changes}
+
+
+def drafts_snapshot(db_path: str) -> List[tuple]:
+    from backend.core.storage import SQLiteStore
+
+    with SQLiteStore(db_path).get_connection() as conn:
+        return [tuple(r) for r in conn.execute(
+            "SELECT id, title, description, price, brand, size, color, item_json FROM drafts ORDER BY id"
+        )]
+
+
+def report(label: str, run: Dict[str, Any], calls: Dict[str, int], pace_per_minute: int):
+    paced = run["calls"] * 60 / pace_per_minute
+    print(f"[{label}] {run['calls']} remote calls ({calls['pages']} pages, {calls['details']} details), "
+          f"{run['changes']} changes, {run['seconds']:.2f}s wall, ~{paced / 60:.0f} min at {pace_per_minute} req/min")
+
+
+def main():
+    from loguru import logger
+
+    parser = argparse.ArgumentParser(description="Benchmark full vs delta Vinted listing sync on a local stand-in")
+    parser.add_argument("--listings", type=int, default=2000)
+    parser.add_argument("--changed", type=int, default=20, help="Remote listings edited between syncs")
+    parser.add_argument("--fixtures", default=None, help="JSON list of recorded listing items")
+    parser.add_argument("--rtt-ms", type=int, default=0)
+    parser.add_argument("--pace", type=int, default=10, help="Requests per minute of the sync rate limiter")
+    args = parser.parse_args()
+
+    # Imported first: the backend modules configure loguru on import
+    import backend.core.vinted_sync_service  # noqa: F401
+    logger.remove()
+
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            items = json.load(f)
+    else:
+        items = synthetic_items(args.listings)
+
+    workdir = tempfile.mkdtemp(prefix="sync_bench_")
+    stand_in = VintedStandIn(deepcopy(items), rtt_ms=args.rtt_ms)
+    base_url = stand_in.start()
+    try:
+        base_db = f"{workdir}/base.db"
+        seed_store(base_db, items)
+
+        # First delta sync records the fingerprints (fetches everything once)
+        asyncio.run(run_pull(base_db, base_url, "delta"))
+        stand_in.reset_calls()
+
+        edited = edit_remote(stand_in, args.changed)
+        print(f"[SETUP] {len(items)} listings, {len(edited)} edited remotely, rtt {args.rtt_ms}ms")
+
+        results = {}
+        for mode in ("full", "delta"):
+            db = f"{workdir}/{mode}.db"
+            shutil.copy(base_db, db)
+            results[mode] = asyncio.run(run_pull(db, base_url, mode))
+            report(mode.upper(), results[mode], stand_in.calls, args.pace)
+            stand_in.reset_calls()
+
+        same = drafts_snapshot(f"{workdir}/full.db") == drafts_snapshot(f"{workdir}/delta.db")
+        print(f"[CHECK] Drafts after full and delta syncs {'match' if same else 'DIFFER'}")
+
+        full, delta = results["full"], results["delta"]
+        print(f"[RESULT] Remote calls: {full['calls']} -> {delta['calls']} "
+              f"({full['calls'] / max(delta['calls'], 1):.0f}x fewer), "
+              f"wall time: {full['seconds'] / max(delta['seconds'], 1e-6):.1f}x faster")
+        if not same:
+            raise SystemExit(1)
+    finally:
+        stand_in.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
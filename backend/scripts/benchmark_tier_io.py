@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the R2 tier backend against a local S3 stand-in:
+blocking boto3 calls made inline (the old code path) versus
+CloudflareR2Storage on its bounded executor with batch upload/delete
+
+Also reports the worst event-loop stall seen by a 5ms ticker during each
+run, which is what the API workers actually feel.
+
+Usage:
+    pip install "moto[server]"
+    python -m backend.scripts.benchmark_tier_io --objects 500 --size-kb 300
+    python -m backend.scripts.benchmark_tier_io --endpoint http://localhost:9000  # MinIO
+
+--rtt-ms adds an artificial per-request delay on both paths, to mimic the
+network round-trip to a real provider (a local server answers in ~1ms).
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from typing import List
+
+
+@contextmanager
+def s3_endpoint(endpoint: str = None, port: int = 5055):
+    """
+    Yield an S3 endpoint URL: the given one, or a moto server started in a
+    separate process (so it does not compete with the client for the GIL)
+    """
+    if endpoint:
+        yield endpoint
+        return
+
+    try:
+        import moto.server  # noqa: F401
+    except ImportError:
+        raise SystemExit("[ERROR] moto not installed. Install with: pip install \"moto[server]\"")
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-H", "127.0.0.1", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    endpoint = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(endpoint, timeout=0.2)
+                break
+            except urllib.error.HTTPError:
+                break
+            except OSError:
+                time.sleep(0.1)
+        yield endpoint
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def add_rtt(client, rtt_ms: int):
+    """Delay every request by rtt_ms (emulated network latency)"""
+    if rtt_ms:
+        client.meta.events.register("before-send.s3.*", lambda **kwargs: time.sleep(rtt_ms / 1000))
+
+
+class LoopLagProbe:
+    """Measure the longest event-loop stall while a benchmark runs"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _tick(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, time.perf_counter() - started - self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._tick())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc):
+        # Let the ticker observe a stall that lasted until the very end
+        await asyncio.sleep(self.interval * 2)
+        self._task.cancel()
+
+
+async def bench_inline(client, bucket: str, ids: List[str], data: bytes) -> dict:
+    """Old path: blocking boto3 calls inside async code, one at a time"""
+    async with LoopLagProbe() as probe:
+        started = time.perf_counter()
+        for photo_id in ids:
+            client.put_object(Bucket=bucket, Key=f"hot/{photo_id}.jpg", Body=data, ContentType="image/jpeg")
+        upload = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for photo_id in ids:
+            client.delete_object(Bucket=bucket, Key=f"hot/{photo_id}.jpg")
+        delete = time.perf_counter() - started
+    return {"upload": upload, "delete": delete, "max_lag": probe.max_lag}
+
+
+async def bench_executor(storage, ids: List[str], data: bytes) -> dict:
+    """New path: bounded executor + upload_many / delete_many"""
+    async with LoopLagProbe() as probe:
+        started = time.perf_counter()
+        uploaded = await storage.upload_many({photo_id: data for photo_id in ids})
+        upload = time.perf_counter() - started
+
+        started = time.perf_counter()
+        deleted = await storage.delete_many(ids)
+        delete = time.perf_counter() - started
+    return {
+        "upload": upload,
+        "delete": delete,
+        "max_lag": probe.max_lag,
+        "failed": len(uploaded["failed"]) + len(deleted["failed"]),
+    }
+
+
+def report(name: str, result: dict, count: int, size_kb: int):
+    mb = count * size_kb / 1024
+    print(f"[{name}] upload {result['upload']:.2f}s ({count / result['upload']:.0f} obj/s, "
+          f"{mb / result['upload']:.1f} MB/s), delete {result['delete']:.2f}s "
+          f"({count / result['delete']:.0f} obj/s), worst loop stall {result['max_lag'] * 1000:.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark R2 tier I/O: inline boto3 vs bounded executor")
+    parser.add_argument("--objects", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=int, default=20, help="Emulated per-request latency")
+    parser.add_argument("--endpoint", default=None, help="Existing S3 endpoint (MinIO); default: moto server")
+    parser.add_argument("--bucket", default="vintedbot-bench")
+    parser.add_argument("--moto-port", type=int, default=5055)
+    args = parser.parse_args()
+
+    import boto3
+
+    with s3_endpoint(args.endpoint, args.moto_port) as endpoint:
+        os.environ.setdefault("R2_ACCESS_KEY_ID", "testing")
+        os.environ.setdefault("R2_SECRET_ACCESS_KEY", "testing")
+        os.environ["R2_ENDPOINT_URL"] = endpoint
+        os.environ["R2_BUCKET_NAME"] = args.bucket
+
+        from backend.storage.tier2_r2 import CloudflareR2Storage, R2_IO_THREADS
+
+        storage = CloudflareR2Storage()
+        add_rtt(storage.client, args.rtt_ms)
+
+        plain_client = boto3.client(
+            "s3",
+            endpoint_url=endpoint,
+            aws_access_key_id=os.environ["R2_ACCESS_KEY_ID"],
+            aws_secret_access_key=os.environ["R2_SECRET_ACCESS_KEY"],
+            region_name="us-east-1"
+        )
+        try:
+            plain_client.create_bucket(Bucket=args.bucket)
+        except plain_client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+        add_rtt(plain_client, args.rtt_ms)
+
+        data = os.urandom(args.size_kb * 1024)
+        ids = [f"bench-{i:06d}" for i in range(args.objects)]
+
+        print(f"\n[BENCH] {args.objects} objects x {args.size_kb}KB, rtt={args.rtt_ms}ms, "
+              f"R2_IO_THREADS={R2_IO_THREADS}, endpoint={endpoint}")
+
+        inline = asyncio.run(bench_inline(plain_client, args.bucket, ids, data))
+        report("INLINE", inline, args.objects, args.size_kb)
+
+        pooled = asyncio.run(bench_executor(storage, ids, data))
+        report("EXECUTOR", pooled, args.objects, args.size_kb)
+        if pooled["failed"]:
+            print(f"[WARN] {pooled['failed']} operations failed")
+
+        print(f"[RESULT] Upload speedup: {inline['upload'] / pooled['upload']:.1f}x, "
+              f"delete speedup: {inline['delete'] / pooled['delete']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Background removal worker (rembg)
+Keeps a single rembg/ONNX session alive for the whole process and feeds it
+queued images in batches from a dedicated worker loop, instead of paying the
+model load on every `rembg.remove()` call. Only uploaded photos are accepted
+and results are written to the derivative cache, never over the original
+"""
+import os
+import uuid
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from backend.services.image_pipeline import image_jobs, prune_image_jobs
+from backend.services.derivative_cache import get_derivative_cache
+from backend.services.photo_edits import allowed_photo_file
+
+REMBG_MODEL = os.getenv("REMBG_MODEL", "u2net")
+REMBG_BATCH_SIZE = int(os.getenv("REMBG_BATCH_SIZE", "8"))
+# ONNX intra-op threads for the shared session (rembg reads OMP_NUM_THREADS)
+REMBG_INTRA_OP_THREADS = int(os.getenv("REMBG_INTRA_OP_THREADS", str(os.cpu_count() or 2)))
+REMBG_PRELOAD = os.getenv("REMBG_PRELOAD", "false").lower() == "true"
+
+
+def rembg_available() -> bool:
+    """Check whether the optional rembg dependency is installed"""
+    try:
+        import rembg  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# Derivative cache key of a rembg render (output is always PNG)
+REMBG_OPERATIONS = [{"op": "remove_background", "mode": "auto"}]
+
+
+class BackgroundRemovalWorker:
+    """
+    Single-session rembg worker
+
+    - One ONNX session, loaded once when the worker starts
+    - Images are queued and drained in batches of REMBG_BATCH_SIZE
+    - Inference runs in a thread (onnxruntime releases the GIL), so the
+      event loop stays responsive
+    - Each submission is tracked as a job in `image_jobs` for progress
+    """
+
+    def __init__(
+        self,
+        model_name: str = REMBG_MODEL,
+        batch_size: int = REMBG_BATCH_SIZE,
+        intra_op_threads: int = REMBG_INTRA_OP_THREADS
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.intra_op_threads = intra_op_threads
+        self.session = None
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._remove = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        # Batch handed to the inference thread (failed on stop)
+        self._batch: List[Dict[str, Any]] = []
+        self.stats = {
+            "images_processed": 0,
+            "images_failed": 0,
+            "batches": 0,
+            "busy_seconds": 0.0,
+            "model_load_seconds": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _load_session(self):
+        """Create the shared rembg session (blocking, done once)"""
+        os.environ["OMP_NUM_THREADS"] = str(self.intra_op_threads)
+        from rembg import new_session, remove
+
+        started = datetime.utcnow()
+        self.session = new_session(self.model_name)
+        self._remove = remove
+        self.stats["model_load_seconds"] = (datetime.utcnow() - started).total_seconds()
+        print(f"[REMBG] Session '{self.model_name}' loaded in {self.stats['model_load_seconds']:.2f}s "
+              f"({self.intra_op_threads} intra-op threads)")
+
+    async def start(self):
+        """Load the model and start consuming the queue"""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.running:
+                return
+            if self.session is None:
+                await asyncio.to_thread(self._load_session)
+            self.queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker loop; images not processed yet fail their job"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending, self._batch = self._batch, []
+        while self.queue is not None and not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        stopped_jobs = set()
+        for item in pending:
+            self._record(item["job_id"], {"ok": False, "result": {"path": item["path"], "error": "Worker stopped"}})
+            stopped_jobs.add(item["job_id"])
+        for job_id in stopped_jobs:
+            job = image_jobs.get(job_id)
+            if job is not None:
+                job.update(status="failed", error="Background removal worker stopped")
+
+    def remove_file(self, path: str) -> bytes:
+        """Remove the background of one uploaded photo with the shared session (blocking)"""
+        if not allowed_photo_file(path):
+            raise FileNotFoundError("File not found")
+
+        with open(path, 'rb') as input_file:
+            input_data = input_file.read()
+
+        return self._remove(input_data, session=self.session)
+
+    def _process_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run a whole batch in one thread hop"""
+        outcomes = []
+        for item in batch:
+            try:
+                outcomes.append({"ok": True, "data": self.remove_file(item["path"])})
+            except Exception as e:
+                outcomes.append({"ok": False, "result": {"path": item["path"], "error": str(e)}})
+        return outcomes
+
+    async def _store(self, path: str, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Write a rembg output to the derivative cache (the original is untouched)"""
+        if not outcome["ok"]:
+            return outcome
+        try:
+            derivative = await get_derivative_cache().store(path, REMBG_OPERATIONS, outcome["data"], ".png")
+        except Exception as e:
+            return {"ok": False, "result": {"path": path, "error": str(e)}}
+        return {"ok": True, "result": {
+            "path": derivative,
+            "original": path,
+            "operation": "remove_background",
+            "mode": "auto",
+            "method": "rembg_ai"
+        }}
+
+    async def _run(self):
+        """Worker loop: drain up to batch_size queued images per iteration"""
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            self._batch = list(batch)
+            started = datetime.utcnow()
+            outcomes = await asyncio.to_thread(self._process_batch, batch)
+            self.stats["busy_seconds"] += (datetime.utcnow() - started).total_seconds()
+            self.stats["batches"] += 1
+
+            for item, outcome in zip(batch, outcomes):
+                stored = await self._store(item["path"], outcome)
+                self._batch.remove(item)
+                self._record(item["job_id"], stored)
+                self.queue.task_done()
+
+    def _record(self, job_id: str, outcome: Dict[str, Any]):
+        """Update job progress after one image"""
+        job = image_jobs.get(job_id)
+        if job is None:
+            return
+
+        if job["status"] == "queued":
+            job["status"] = "processing"
+            job["started_at"] = datetime.utcnow()
+
+        if outcome["ok"]:
+            job["results"]["success"].append(outcome["result"])
+            self.stats["images_processed"] += 1
+        else:
+            job["results"]["failed"].append(outcome["result"])
+            job["failed"] += 1
+            self.stats["images_failed"] += 1
+            print(f"[ERROR] Failed to remove background from {outcome['result']['path']}: {outcome['result']['error']}")
+
+        job["processed"] += 1
+        job["progress_percent"] = round(job["processed"] / job["total"] * 100, 1)
+
+        if job["processed"] >= job["total"]:
+            job["status"] = "completed"
+            job["completed_at"] = datetime.utcnow()
+            done = job.pop("_done", None)
+            if done and not done.done():
+                done.set_result(job["results"])
+
+    async def submit(self, user_id: str, image_paths: List[str]) -> str:
+        """Queue images for background removal and return the job id"""
+        await self.start()
+
+        prune_image_jobs()
+        job_id = str(uuid.uuid4())[:8]
+        image_jobs[job_id] = {
+            "job_id": job_id,
+            "user_id": user_id,
+            "status": "queued",
+            "operations": ["remove_background"],
+            "total": len(image_paths),
+            "processed": 0,
+            "failed": 0,
+            "progress_percent": 0.0,
+            "results": {"success": [], "failed": [], "total": len(image_paths)},
+            "error": None,
+            "created_at": datetime.utcnow(),
+            "started_at": None,
+            "completed_at": None,
+            "_done": asyncio.get_running_loop().create_future(),
+        }
+
+        if not image_paths:
+            image_jobs[job_id].update(status="completed", progress_percent=100.0, completed_at=datetime.utcnow())
+            image_jobs[job_id].pop("_done")
+            return job_id
+
+        for path in image_paths:
+            self.queue.put_nowait({"job_id": job_id, "path": path})
+
+        return job_id
+
+    async def wait(self, job_id: str) -> Dict[str, Any]:
+        """Wait until a job is finished and return its results"""
+        job = image_jobs[job_id]
+        done = job.get("_done")
+        if done is not None:
+            await done
+        return job["results"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Worker throughput and queue depth"""
+        stats = dict(self.stats)
+        stats["queue_depth"] = self.queue.qsize() if self.queue else 0
+        stats["running"] = self.running
+        stats["model"] = self.model_name
+        stats["images_per_second"] = (
+            round(stats["images_processed"] / stats["busy_seconds"], 2)
+            if stats["busy_seconds"] else 0.0
+        )
+        return stats
+
+
+# Global instance
+_worker: Optional[BackgroundRemovalWorker] = None
+
+
+def get_background_removal_worker() -> BackgroundRemovalWorker:
+    """Get or create the background removal worker singleton"""
+    global _worker
+    if _worker is None:
+        _worker = BackgroundRemovalWorker()
+    return _worker
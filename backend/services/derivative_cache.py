@@ -0,0 +1,228 @@
+"""
+Derivative rendering cache for edited photos
+Renders (original, operation list) pairs lazily and stores the result on disk
+under a content-addressed key, so repeat renders are a file lookup and a
+re-edit costs exactly one render from the untouched original
+"""
+import os
+import json
+import uuid
+import asyncio
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.settings import settings
+from backend.services.image_pipeline import IMAGE_SAVE_QUALITY, render_image, run_in_pool
+
+DERIVATIVE_CACHE_MAX_MB = int(os.getenv("DERIVATIVE_CACHE_MAX_MB", "2048"))
+
+
+def operations_fingerprint(operations: List[Dict[str, Any]]) -> str:
+    """Stable hash of an operation list (key order independent)"""
+    canonical = json.dumps(operations, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    """SHA256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DerivativeCache:
+    """
+    Size-capped, content-addressed store of rendered derivatives
+
+    - Key: sha256(original content hash + operation list fingerprint + suffix)
+    - Files live flat under root as {key}{ext}
+    - LRU eviction by an in-memory index rebuilt from mtimes at startup;
+      hits refresh the file mtime so the order survives restarts
+    - Concurrent requests for the same key share one render
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = DERIVATIVE_CACHE_MAX_MB * 1024 * 1024):
+        self.root = Path(root or f"{settings.DATA_DIR}/derivatives")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # path -> (mtime_ns, size, sha256), avoids re-hashing unchanged originals
+        self._hash_cache: Dict[str, Tuple[int, int, str]] = {}
+        self.stats = {"hits": 0, "misses": 0, "renders": 0, "evictions": 0}
+
+    # ------------------------------------------------------------------ index
+
+    def _load_index(self):
+        """Build the LRU index from the files already on disk (oldest first)"""
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((name, size) for _, name, size in entries)
+        self._total_bytes = sum(size for _, _, size in entries)
+
+    @property
+    def index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            self._load_index()
+        return self._index
+
+    def _touch(self, name: str):
+        self.index.move_to_end(name)
+        try:
+            os.utime(self.root / name)
+        except OSError:
+            pass
+
+    def _add(self, name: str):
+        size = (self.root / name).stat().st_size
+        self._total_bytes += size - self.index.get(name, 0)
+        self.index[name] = size
+        self.index.move_to_end(name)
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used derivatives until under max_bytes"""
+        while self._total_bytes > self.max_bytes and len(self.index) > 1:
+            name, size = self.index.popitem(last=False)
+            try:
+                (self.root / name).unlink()
+            except FileNotFoundError:
+                pass
+            self._total_bytes -= size
+            self.stats["evictions"] += 1
+
+    # ------------------------------------------------------------------ keys
+
+    async def original_hash(self, path: str) -> str:
+        """Content hash of an original, cached by (mtime, size)"""
+        st = os.stat(path)
+        cached = self._hash_cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        sha = await asyncio.to_thread(file_sha256, path)
+        self._hash_cache[path] = (st.st_mtime_ns, st.st_size, sha)
+        return sha
+
+    @staticmethod
+    def key_for(original_sha: str, operations: List[Dict[str, Any]], suffix: str = "") -> str:
+        return hashlib.sha256(
+            f"{original_sha}:{operations_fingerprint(operations)}:{suffix}".encode("utf-8")
+        ).hexdigest()
+
+    # ------------------------------------------------------------------ render
+
+    async def get_or_render(
+        self,
+        original_path: str,
+        operations: List[Dict[str, Any]],
+        ext: Optional[str] = None,
+        quality: Optional[int] = None
+    ) -> str:
+        """
+        Return the path of the rendered derivative, rendering it if needed
+
+        Args:
+            original_path: Untouched original on disk
+            operations: Ordered operation list (empty -> the original itself)
+            ext: Output extension (defaults to the original's)
+            quality: Encoder quality (defaults to IMAGE_SAVE_QUALITY)
+
+        Returns:
+            Filesystem path of the derivative
+        """
+        if not operations and not ext:
+            return original_path
+
+        ext = (ext or os.path.splitext(original_path)[1] or ".jpg").lower()
+        quality = quality or IMAGE_SAVE_QUALITY
+        key = self.key_for(await self.original_hash(original_path), operations, f"{ext}:{quality}")
+        name = f"{key}{ext}"
+        dest = self.root / name
+
+        if name in self.index and dest.exists():
+            self.stats["hits"] += 1
+            self._touch(name)
+            return str(dest)
+
+        if name in self._inflight:
+            await self._inflight[name]
+            return str(dest)
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            await run_in_pool(render_image, original_path, operations, str(dest), quality)
+            self.stats["renders"] += 1
+            self._add(name)
+            future.set_result(str(dest))
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve the exception so waiters-less futures don't warn
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(name, None)
+
+        return str(dest)
+
+    async def store(
+        self,
+        original_path: str,
+        operations: List[Dict[str, Any]],
+        data: bytes,
+        ext: str
+    ) -> str:
+        """
+        Add a derivative rendered outside the image pool (e.g. rembg output)
+        under the key of (original, operations) and return its path
+        """
+        ext = ext.lower()
+        key = self.key_for(await self.original_hash(original_path), operations, ext)
+        name = f"{key}{ext}"
+        dest = self.root / name
+
+        def write():
+            tmp = self.root / f"{name}.{uuid.uuid4().hex[:8]}.tmp"
+            try:
+                tmp.write_bytes(data)
+                os.replace(tmp, dest)
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+
+        await asyncio.to_thread(write)
+        self._add(name)
+        return str(dest)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self.index),
+            "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 1) if lookups else 0.0,
+        }
+
+
+# Global instance
+_cache: Optional[DerivativeCache] = None
+
+
+def get_derivative_cache() -> DerivativeCache:
+    """Get or create the DerivativeCache singleton"""
+    global _cache
+    if _cache is None:
+        _cache = DerivativeCache()
+    return _cache
@@ -0,0 +1,409 @@
+"""
+Image operation pipeline for bulk photo editing
+Applies an ordered chain of edits (crop -> rotate -> adjust -> watermark) with a
+single decode and a single encode per image, on a shared process pool so that
+CPU-heavy Pillow work never runs on the event loop
+"""
+import os
+import uuid
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from PIL import Image, ImageChops, ImageDraw, ImageEnhance, ImageFont
+
+# Worker processes for image jobs (defaults to one per core)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(os.cpu_count() or 2)))
+IMAGE_SAVE_QUALITY = int(os.getenv("IMAGE_SAVE_QUALITY", "95"))
+# Finished jobs stay pollable this long, and at most this many jobs are kept
+IMAGE_JOB_TTL_SECONDS = int(os.getenv("IMAGE_JOB_TTL_SECONDS", "3600"))
+IMAGE_JOBS_MAX = int(os.getenv("IMAGE_JOBS_MAX", "1000"))
+
+# Lossless transposes for right-angle rotations (clockwise angle -> transpose)
+_RIGHT_ANGLE_TRANSPOSES = {
+    90: Image.Transpose.ROTATE_270,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_90,
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+# In-memory job registry (same model as bulk_jobs in bulk.py)
+image_jobs: Dict[str, Dict[str, Any]] = {}
+# Running job tasks: the event loop only keeps weak references to tasks
+_job_tasks: Set[asyncio.Task] = set()
+
+
+# ============================================================================
+# OPERATIONS
+# ============================================================================
+
+def apply_crop(img: Image.Image, op: Dict[str, Any]) -> Image.Image:
+    """Crop to (x, y, width, height); fails if the area exceeds the image"""
+    x, y, width, height = op["x"], op["y"], op["width"], op["height"]
+    img_width, img_height = img.size
+    if x + width > img_width or y + height > img_height:
+        raise ValueError(f"Crop area exceeds image dimensions ({img_width}x{img_height})")
+    return img.crop((x, y, x + width, y + height))
+
+
+def apply_rotate(img: Image.Image, op: Dict[str, Any]) -> Image.Image:
+    """Rotate clockwise by op['angle'] degrees, expanding the canvas"""
+    angle = op["angle"] % 360
+    if angle == 0:
+        return img
+    if angle in _RIGHT_ANGLE_TRANSPOSES:
+        return img.transpose(_RIGHT_ANGLE_TRANSPOSES[angle])
+    return img.rotate(-angle, expand=True, resample=Image.BICUBIC)
+
+
+def apply_adjust(img: Image.Image, op: Dict[str, Any]) -> Image.Image:
+    """Apply brightness, contrast and optional saturation factors"""
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGB')
+
+    brightness = op.get("brightness", 1.0)
+    contrast = op.get("contrast", 1.0)
+    saturation = op.get("saturation")
+
+    if brightness != 1.0:
+        img = ImageEnhance.Brightness(img).enhance(brightness)
+    if contrast != 1.0:
+        img = ImageEnhance.Contrast(img).enhance(contrast)
+    if saturation is not None and saturation != 1.0:
+        img = ImageEnhance.Color(img).enhance(saturation)
+    return img
+
+
+@lru_cache(maxsize=16)
+def _load_font(font_size: int):
+    """Load the watermark font once per size and worker process"""
+    for candidate in ("arial.ttf", "C:\\Windows\\Fonts\\arial.ttf"):
+        try:
+            return ImageFont.truetype(candidate, font_size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def apply_watermark(img: Image.Image, op: Dict[str, Any]) -> Image.Image:
+    """Draw semi-transparent text with a drop shadow at op['position']"""
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+
+    text = op["text"]
+    overlay = Image.new('RGBA', img.size, (255, 255, 255, 0))
+    draw = ImageDraw.Draw(overlay)
+    font = _load_font(op.get("font_size", 24))
+
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    margin = 20
+    positions = {
+        "top-left": (margin, margin),
+        "top-right": (img.width - text_width - margin, margin),
+        "bottom-left": (margin, img.height - text_height - margin),
+        "bottom-right": (img.width - text_width - margin, img.height - text_height - margin),
+        "center": ((img.width - text_width) // 2, (img.height - text_height) // 2),
+    }
+    position = positions.get(op.get("position", "bottom-right"), positions["bottom-right"])
+
+    opacity = int(op.get("opacity", 0.5) * 255)
+    shadow_offset = 2
+    draw.text((position[0] + shadow_offset, position[1] + shadow_offset),
+              text, font=font, fill=(0, 0, 0, opacity // 2))
+    draw.text(position, text, font=font, fill=(255, 255, 255, opacity))
+
+    return Image.alpha_composite(img, overlay)
+
+
+def apply_background(img: Image.Image, op: Dict[str, Any]) -> Image.Image:
+    """
+    Simple background cleanup: 'white' flattens transparency onto white,
+    'transparent' makes near-white pixels (all channels > threshold) transparent
+    """
+    mode = op.get("mode", "white")
+    if mode == "white":
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGBA')
+            white_bg = Image.new('RGB', img.size, (255, 255, 255))
+            white_bg.paste(img, mask=img.split()[3])
+            return white_bg
+        return img.convert('RGB')
+    if mode == "transparent":
+        threshold = op.get("threshold", 240)
+        img = img.convert('RGBA')
+        r, g, b, alpha = img.split()
+        near_white = ImageChops.darker(ImageChops.darker(r, g), b).point(lambda v: 0 if v > threshold else 255)
+        img.putalpha(ImageChops.darker(alpha, near_white))
+        return img
+    raise ValueError(f"Invalid background mode: {mode}")
+
+
+def resize_target(size, width: int):
+    """Target size for a max-width downscale (aspect kept, never upscales)"""
+    img_width, img_height = size
+    if width >= img_width:
+        return img_width, img_height
+    return width, max(1, round(img_height * width / img_width))
+
+
+def apply_resize(img: Image.Image, op: Dict[str, Any]) -> Image.Image:
+    """Downscale to op['width'] pixels wide, keeping the aspect ratio"""
+    target = resize_target(img.size, op["width"])
+    if target == img.size:
+        return img
+    return img.resize(target, Image.LANCZOS)
+
+
+OPERATIONS: Dict[str, Callable[[Image.Image, Dict[str, Any]], Image.Image]] = {
+    "crop": apply_crop,
+    "rotate": apply_rotate,
+    "adjust": apply_adjust,
+    "watermark": apply_watermark,
+    "resize": apply_resize,
+    "background": apply_background,
+}
+
+
+def apply_operations(img: Image.Image, operations: List[Dict[str, Any]]) -> Image.Image:
+    """
+    Apply an ordered chain of operations to a decoded image (no I/O)
+
+    Args:
+        img: Decoded PIL image
+        operations: List of {"op": name, ...params} dicts, applied in order
+
+    Returns:
+        Edited image
+    """
+    for op in operations:
+        handler = OPERATIONS.get(op.get("op"))
+        if handler is None:
+            raise ValueError(f"Unknown image operation: {op.get('op')}")
+        img = handler(img, op)
+    return img
+
+
+def prepare_for_format(img: Image.Image, fmt: Optional[str]) -> Image.Image:
+    """Convert the image mode so it can be encoded in the target format"""
+    if fmt in ("JPEG", "JPG") and img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def render_image(
+    src_path: str,
+    operations: List[Dict[str, Any]],
+    dest_path: Optional[str] = None,
+    quality: int = IMAGE_SAVE_QUALITY
+) -> Dict[str, Any]:
+    """
+    Decode an image once, apply the whole chain and encode it once
+
+    Writes to dest_path (in place when omitted) through a temp file and an
+    atomic rename. Runs inside a pool worker, so it only takes and returns
+    picklable values.
+    """
+    if not os.path.exists(src_path):
+        raise FileNotFoundError("File not found")
+    dest_path = dest_path or src_path
+
+    with Image.open(src_path) as src:
+        original_size = src.size
+        if operations and operations[0]["op"] == "resize" and src.format == "JPEG":
+            # Let libjpeg downscale while decoding (DCT scaling), the resize
+            # op then only finishes the last step
+            src.draft(src.mode, resize_target(src.size, operations[0]["width"]))
+        src.load()
+        # Encode by extension, like a plain img.save(path) would
+        fmt = Image.registered_extensions().get(os.path.splitext(dest_path)[1].lower(), src.format)
+        img = apply_operations(src, operations)
+
+    img = prepare_for_format(img, fmt)
+    tmp_path = f"{dest_path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        img.save(tmp_path, format=fmt, quality=quality, optimize=True)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        "path": dest_path,
+        "operations": [op["op"] for op in operations],
+        "original_size": f"{original_size[0]}x{original_size[1]}",
+        "new_size": f"{img.size[0]}x{img.size[1]}",
+    }
+
+
+# ============================================================================
+# PROCESS POOL
+# ============================================================================
+
+def _init_worker():
+    """Pool worker setup: spawned workers don't inherit the HEIC opener registered at startup"""
+    try:
+        from pillow_heif import register_heif_opener
+        register_heif_opener()
+    except Exception:
+        pass
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Get or create the shared image process pool"""
+    global _pool
+    if _pool is None:
+        # spawn: never fork the (multi-threaded) API process
+        _pool = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    return _pool
+
+
+def shutdown_pool():
+    """Shut down the shared pool (called from the app lifespan)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def run_in_pool(fn: Callable[..., Any], *args) -> Any:
+    """Run a picklable function on the shared image pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_pool(), fn, *args)
+
+
+async def run_chain(
+    image_paths: List[str],
+    operations: List[Dict[str, Any]],
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    handler: Optional[Callable[[str, List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]] = None
+) -> Dict[str, Any]:
+    """
+    Run an operation chain over many images concurrently
+
+    Args:
+        image_paths: Images to edit
+        operations: Ordered operation chain
+        on_progress: Optional callback invoked with the results after each image
+        handler: Per-image coroutine (defaults to an in-place render on the pool)
+
+    Returns:
+        {"success": [...], "failed": [...], "total": n}
+    """
+    if handler is None:
+        async def handler(path: str, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+            return await run_in_pool(render_image, path, ops)
+
+    results = {
+        "success": [],
+        "failed": [],
+        "total": len(image_paths)
+    }
+
+    async def run_one(path: str):
+        try:
+            results["success"].append(await handler(path, operations))
+        except Exception as e:
+            results["failed"].append({"path": path, "error": str(e)})
+            print(f"[ERROR] Image chain failed for {path}: {e}")
+        if on_progress:
+            on_progress(results)
+
+    await asyncio.gather(*(run_one(path) for path in image_paths))
+    return results
+
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+def prune_image_jobs(now: Optional[datetime] = None) -> int:
+    """
+    Drop finished jobs older than IMAGE_JOB_TTL_SECONDS, then the oldest
+    finished ones while the registry holds more than IMAGE_JOBS_MAX jobs
+    (running jobs are never dropped)
+
+    Returns:
+        Number of jobs removed
+    """
+    now = now or datetime.utcnow()
+    finished = sorted(
+        (job for job in image_jobs.values() if job["completed_at"] is not None),
+        key=lambda job: job["completed_at"]
+    )
+    expired = [job for job in finished if (now - job["completed_at"]).total_seconds() > IMAGE_JOB_TTL_SECONDS]
+    excess = len(image_jobs) - len(expired) - IMAGE_JOBS_MAX
+    if excess > 0:
+        expired += finished[len(expired):len(expired) + excess]
+    for job in expired:
+        image_jobs.pop(job["job_id"], None)
+    return len(expired)
+
+
+def create_image_job(
+    user_id: str,
+    image_paths: List[str],
+    operations: List[Dict[str, Any]],
+    handler: Optional[Callable[[str, List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]] = None
+) -> str:
+    """Register an image job and start it in the background"""
+    prune_image_jobs()
+    job_id = str(uuid.uuid4())[:8]
+    image_jobs[job_id] = {
+        "job_id": job_id,
+        "user_id": user_id,
+        "status": "queued",
+        "operations": [op["op"] for op in operations],
+        "total": len(image_paths),
+        "processed": 0,
+        "failed": 0,
+        "progress_percent": 0.0,
+        "results": None,
+        "error": None,
+        "created_at": datetime.utcnow(),
+        "started_at": None,
+        "completed_at": None,
+    }
+    task = asyncio.create_task(process_image_job(job_id, image_paths, operations, handler))
+    _job_tasks.add(task)
+    task.add_done_callback(_job_tasks.discard)
+    return job_id
+
+
+async def process_image_job(
+    job_id: str,
+    image_paths: List[str],
+    operations: List[Dict[str, Any]],
+    handler: Optional[Callable[[str, List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]] = None
+):
+    """Background task: run the chain and keep progress up to date"""
+    job = image_jobs[job_id]
+    job["status"] = "processing"
+    job["started_at"] = datetime.utcnow()
+
+    def on_progress(results: Dict[str, Any]):
+        done = len(results["success"]) + len(results["failed"])
+        job["processed"] = done
+        job["failed"] = len(results["failed"])
+        job["progress_percent"] = round(done / job["total"] * 100, 1) if job["total"] else 100.0
+
+    try:
+        job["results"] = await run_chain(image_paths, operations, on_progress=on_progress, handler=handler)
+        job["status"] = "completed"
+        print(f"[IMAGE] Job {job_id} completed: {job['processed'] - job['failed']}/{job['total']} images")
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+        print(f"[ERROR] Image job {job_id} failed: {e}")
+    finally:
+        job["completed_at"] = datetime.utcnow()
@@ -0,0 +1,250 @@
+"""
+Non-destructive photo edits
+Edits are stored as an ordered operation list per photo and owner
+(photo_edits table, keyed by user_id + photo_key) and never touch the
+original file; the edited image is a derivative rendered
+lazily through the DerivativeCache
+"""
+import os
+import hashlib
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote, urlencode
+
+from backend.core.storage import get_store
+from backend.settings import settings
+from backend.services.derivative_cache import get_derivative_cache, operations_fingerprint
+
+# Thumbnail variant served to the draft grid
+THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", "320"))
+THUMBNAIL_FORMAT = os.getenv("THUMBNAIL_FORMAT", "webp")
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+# Allowed variant widths: requested widths are rounded up to one of these so
+# the number of cached variants per photo stays bounded
+VARIANT_WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+VARIANT_FORMATS = {"webp": ".webp", "jpeg": ".jpg", "png": ".png"}
+
+
+def photo_key(photo_path: str) -> str:
+    """
+    Location-independent key of a photo
+
+    "backend/data/temp_photos/x/photo_000.jpg", "/data/temp_photos/x/photo_000.jpg"
+    and "/temp_photos/x/photo_000.jpg" all map to "temp_photos/x/photo_000.jpg"
+    """
+    normalized = photo_path.replace("\\", "/")
+    marker = normalized.find("temp_photos/")
+    if marker != -1:
+        return normalized[marker:]
+    return os.path.normpath(normalized)
+
+
+def photo_file(photo_path: str) -> str:
+    """Filesystem path of a photo URL or path (without resolving fallbacks)"""
+    key = photo_key(photo_path)
+    if key.startswith("temp_photos/"):
+        return os.path.join(settings.DATA_DIR, key)
+    return photo_path
+
+
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".heic", ".heif")
+
+
+def allowed_photo_file(photo_path: str, derivatives: bool = False) -> Optional[str]:
+    """
+    Real path of a photo file a client reference may point at, else None
+
+    Only image files under DATA_DIR/temp_photos (the upload folders) are
+    accepted, plus rendered derivatives when `derivatives` is set. References
+    come from requests: the database, logs or session files must never be
+    reachable through them.
+    """
+    resolved = os.path.realpath(photo_path)
+    roots = [os.path.realpath(f"{settings.DATA_DIR}/temp_photos")]
+    if derivatives:
+        roots.append(os.path.realpath(get_derivative_cache().root))
+    if not resolved.lower().endswith(PHOTO_EXTENSIONS):
+        return None
+    if not any(resolved.startswith(root + os.sep) for root in roots):
+        return None
+    return resolved if os.path.isfile(resolved) else None
+
+
+def photo_version(photo_path: str, operations: List[Dict[str, Any]]) -> str:
+    """
+    Short version of what a photo URL renders to: the edit list plus the
+    identity (mtime, size) of the original. Any change yields a new URL, so
+    versioned URLs can be cached as immutable.
+    """
+    try:
+        st = os.stat(photo_file(photo_path))
+        identity = f"{st.st_mtime_ns}:{st.st_size}"
+    except OSError:
+        identity = ""
+    return hashlib.sha256(
+        f"{operations_fingerprint(operations)}:{identity}".encode("utf-8")
+    ).hexdigest()[:12]
+
+
+def variant_width(width: int) -> int:
+    """Round a requested width up to the nearest allowed variant width"""
+    for allowed in VARIANT_WIDTHS:
+        if width <= allowed:
+            return allowed
+    return VARIANT_WIDTHS[-1]
+
+
+def get_edits(photo_path: str, user_id: Optional[str]) -> List[Dict[str, Any]]:
+    """Current edit operations of a photo by its owner (none without an owner)"""
+    if not user_id:
+        return []
+    return get_store().get_photo_edits(user_id, photo_key(photo_path))
+
+
+def set_edits(photo_path: str, operations: List[Dict[str, Any]], user_id: str):
+    """Replace a user's edit list of a photo (empty list reverts to the original)"""
+    get_store().set_photo_edits(user_id, photo_key(photo_path), operations)
+
+
+def append_edits(photo_path: str, operations: List[Dict[str, Any]], user_id: str) -> List[Dict[str, Any]]:
+    """Append operations to a user's edit list of a photo and return the full list"""
+    edits = get_edits(photo_path, user_id) + list(operations)
+    set_edits(photo_path, edits, user_id)
+    return edits
+
+
+async def render_edited(photo_path: str, operations: List[Dict[str, Any]]) -> str:
+    """Path of the edited version of a photo (the original when unedited)"""
+    return await get_derivative_cache().get_or_render(photo_path, operations)
+
+
+async def render_edited_paths(photo_paths: List[str], user_id: Optional[str]) -> List[str]:
+    """
+    Map resolved photo paths to their edited derivatives (used by publishing)
+
+    Only the draft owner's edits apply. Edit lists are read with a single
+    query; unedited photos pass through.
+    """
+    edits = load_edits(photo_paths, user_id)
+    rendered = []
+    for path in photo_paths:
+        operations = edits.get(photo_key(path))
+        rendered.append(await render_edited(path, operations) if operations else path)
+    return rendered
+
+
+def load_edits(photo_urls: List[str], user_id: Optional[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """A user's edit lists of many photos in one query, keyed by photo_key"""
+    if not user_id:
+        return {}
+    return get_store().get_photo_edits_many(user_id, [photo_key(u) for u in photo_urls])
+
+
+def photo_url(
+    url: str,
+    operations: List[Dict[str, Any]],
+    width: Optional[int] = None,
+    fmt: Optional[str] = None,
+    user_id: Optional[str] = None
+) -> str:
+    """Versioned /images/photo URL of a photo (optionally a resized variant)"""
+    params = {"path": url}
+    if user_id and operations:
+        # Whose edits to render (the endpoint is public, like /temp_photos)
+        params["u"] = user_id
+    if width:
+        params["w"] = variant_width(width)
+    if fmt:
+        params["fmt"] = fmt
+    params["v"] = photo_version(url, operations)
+    return f"/images/photo?{urlencode(params, quote_via=quote, safe='/')}"
+
+
+def edited_photo_urls(
+    photo_urls: List[str],
+    user_id: Optional[str],
+    edits: Optional[Dict[str, List[Dict[str, Any]]]] = None
+) -> List[str]:
+    """
+    Point frontend photo URLs of edited photos at the derivative endpoint
+
+    Unedited photos keep their static URL. The version parameter changes
+    with the edit list, so browsers never show a stale render.
+    """
+    if edits is None:
+        edits = load_edits(photo_urls, user_id)
+    if not edits:
+        return photo_urls
+
+    urls = []
+    for url in photo_urls:
+        operations = edits.get(photo_key(url))
+        urls.append(photo_url(url, operations, user_id=user_id) if operations else url)
+    return urls
+
+
+def thumbnail_urls(
+    photo_urls: List[str],
+    user_id: Optional[str],
+    edits: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+    width: int = THUMBNAIL_WIDTH,
+    fmt: str = THUMBNAIL_FORMAT
+) -> List[str]:
+    """Versioned thumbnail variant URLs (edits applied) for a list of photos"""
+    if edits is None:
+        edits = load_edits(photo_urls, user_id)
+    return [photo_url(url, edits.get(photo_key(url), []), width, fmt, user_id) for url in photo_urls]
+
+
+async def render_variant(
+    photo_path: str,
+    operations: List[Dict[str, Any]],
+    width: Optional[int] = None,
+    fmt: Optional[str] = None
+) -> str:
+    """
+    Path of a photo with edits applied, optionally resized/re-encoded
+
+    Args:
+        photo_path: Resolved original on disk
+        operations: Edit list to apply (see get_edits)
+        width: Max width (rounded up to VARIANT_WIDTHS)
+        fmt: Output format key of VARIANT_FORMATS
+    """
+    if not width and not fmt:
+        return await render_edited(photo_path, operations)
+
+    if width:
+        operations = operations + [{"op": "resize", "width": variant_width(width)}]
+    return await get_derivative_cache().get_or_render(
+        photo_path,
+        operations,
+        ext=VARIANT_FORMATS[fmt] if fmt else None,
+        quality=THUMBNAIL_QUALITY
+    )
+
+
+def make_edit_handler(user_id: str):
+    """
+    Per-image handler for image_pipeline.run_chain: record the operations
+    and render the resulting derivative once (the original is untouched)
+    """
+    async def handler(path: str, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        if not allowed_photo_file(path):
+            raise FileNotFoundError("File not found")
+
+        edits = append_edits(path, operations, user_id=user_id)
+        try:
+            derivative = await render_edited(path, edits)
+        except Exception:
+            # Roll back so a failing op is not stored in the photo's history
+            set_edits(path, edits[:len(edits) - len(operations)], user_id)
+            raise
+
+        return {
+            "path": path,
+            "derivative": derivative,
+            "operations": [op["op"] for op in edits],
+            "version": photo_version(path, edits),
+        }
+
+    return handler
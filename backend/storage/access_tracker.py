@@ -0,0 +1,153 @@
+"""
+Write-behind last-access tracking
+Photo reads only record the access time in memory; a background loop
+writes the accumulated times to photo_metadata in one batched UPDATE, so
+reads never take the SQLite writer lock
+"""
+import os
+import asyncio
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from loguru import logger
+
+# Seconds between two flushes to the DB
+ACCESS_FLUSH_SECONDS = int(os.getenv("ACCESS_FLUSH_SECONDS", "60"))
+# A photo whose access was written less than this long ago is not written
+# again (the 90-day archive rule only needs day resolution)
+ACCESS_RESOLUTION_SECONDS = int(os.getenv("ACCESS_RESOLUTION_SECONDS", "3600"))
+# Photos remembered for debouncing (oldest forgotten first)
+ACCESS_DEBOUNCE_MAX_ENTRIES = int(os.getenv("ACCESS_DEBOUNCE_MAX_ENTRIES", "100000"))
+
+
+class AccessTracker:
+    """
+    In-memory accumulator of photo access times
+
+    - touch() is O(1), never touches the DB
+    - per photo, only the latest access time is kept until the next flush
+    - photos flushed less than `resolution` ago are debounced
+    - flush() never moves last_access_date backwards
+    """
+
+    def __init__(
+        self,
+        flush_interval: int = ACCESS_FLUSH_SECONDS,
+        resolution: int = ACCESS_RESOLUTION_SECONDS,
+        max_entries: int = ACCESS_DEBOUNCE_MAX_ENTRIES
+    ):
+        self.flush_interval = flush_interval
+        self.resolution = timedelta(seconds=resolution)
+        self.max_entries = max_entries
+        self._pending: Dict[str, datetime] = {}
+        # photo_id -> access time last written, for debouncing
+        self._written: "OrderedDict[str, datetime]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"touches": 0, "debounced": 0, "flushes": 0, "rows_written": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def touch(self, photo_id: str, when: Optional[datetime] = None):
+        """Record an access to a photo (starts the flush loop if needed)"""
+        when = when or datetime.utcnow()
+        self.stats["touches"] += 1
+
+        written = self._written.get(photo_id)
+        if written is not None and when - written < self.resolution:
+            self.stats["debounced"] += 1
+            return
+
+        pending = self._pending.get(photo_id)
+        if pending is None or when > pending:
+            self._pending[photo_id] = when
+
+        if not self.running:
+            self.start()
+
+    def start(self):
+        """Start the periodic flush loop (requires a running event loop)"""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"[ERROR] Access time flush failed: {e}")
+
+    def _write(self, batch: Dict[str, datetime]) -> int:
+        """One transaction, one statement (blocking)"""
+        from backend.core.storage import get_store
+
+        rows = [(when.isoformat(), photo_id, when.isoformat()) for photo_id, when in batch.items()]
+        with get_store().get_connection() as conn:
+            cursor = conn.executemany(
+                """
+                UPDATE photo_metadata SET last_access_date = ?
+                WHERE photo_id = ? AND (last_access_date IS NULL OR last_access_date < ?)
+                """,
+                rows
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    async def flush(self) -> int:
+        """
+        Write all pending access times in one batched UPDATE
+
+        Returns:
+            Number of rows updated
+        """
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, {}
+        try:
+            written = await asyncio.to_thread(self._write, batch)
+        except Exception:
+            # Put the batch back, keeping any newer access recorded meanwhile
+            for photo_id, when in batch.items():
+                if when > self._pending.get(photo_id, when - self.resolution):
+                    self._pending[photo_id] = when
+            raise
+
+        for photo_id, when in batch.items():
+            self._written[photo_id] = when
+            self._written.move_to_end(photo_id)
+        while len(self._written) > self.max_entries:
+            self._written.popitem(last=False)
+
+        self.stats["flushes"] += 1
+        self.stats["rows_written"] += written
+        logger.debug(f"[ACCESS] Flushed {len(batch)} access times ({written} rows updated)")
+        return written
+
+    async def stop(self):
+        """Stop the loop and flush what is left (called on shutdown)"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "pending": len(self._pending), "running": self.running}
+
+
+# Global instance
+_tracker: Optional[AccessTracker] = None
+
+
+def get_access_tracker() -> AccessTracker:
+    """Get or create the AccessTracker singleton"""
+    global _tracker
+    if _tracker is None:
+        _tracker = AccessTracker()
+    return _tracker
@@ -1,11 +1,131 @@
 """
 Image Compression
 Réduit la taille des images de 50-70% tout en préservant la qualité
+
+Le décodage et le resize Pillow tournent sur le process pool partagé de
+backend/services/image_pipeline.py : une grosse photo ne bloque plus la
+boucle d'événements (ni les autres requêtes)
 """
-from PIL import Image
+from PIL import Image, ImageOps
 import io
+import asyncio
+from typing import Any, Dict, Iterable, List, Tuple
 from loguru import logger
 
+# Tag EXIF Orientation
+ORIENTATION_TAG = 0x0112
+
+
+# ============================================================================
+# WORKER FUNCTIONS (process pool: picklable arguments and results only)
+# ============================================================================
+
+def compress_image(
+    image_data: bytes,
+    quality: int = 85,
+    max_width: int = 2000,
+    max_height: int = 2000,
+    format: str = 'JPEG',
+    draft: bool = False
+) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Decode, resize and re-encode one image (blocking, raises on failure)
+
+    Returns:
+        (compressed_data, {"original_dims", "new_dims", "drafted"})
+    """
+    img = Image.open(io.BytesIO(image_data))
+    original_dims = f"{img.width}x{img.height}"
+    drafted = False
+
+    # Orientation EXIF 5-8 : les pixels stockés sont tournés d'un quart de tour
+    quarter_turn = img.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8)
+    if draft and img.format == 'JPEG':
+        # libjpeg réduit pendant le décodage (DCT scaling 1/2, 1/4, 1/8) ;
+        # la taille obtenue reste >= la cible, le LANCZOS finit le travail
+        box = (max_height, max_width) if quarter_turn else (max_width, max_height)
+        if img.width > box[0] or img.height > box[1]:
+            drafted = img.draft(img.mode, box) is not None
+
+    # 1. Orientation : le ré-encodage perd le tag EXIF, on tourne les pixels
+    img = ImageOps.exif_transpose(img)
+
+    # 2. Resize si nécessaire
+    if img.width > max_width or img.height > max_height:
+        img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
+
+    # 3. Convert to RGB if needed (pour JPEG)
+    if format == 'JPEG' and img.mode in ('RGBA', 'P', 'LA'):
+        # Créer background blanc pour transparence
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[3])
+        img = background
+
+    elif img.mode not in ('RGB', 'L'):  # L = grayscale
+        img = img.convert('RGB')
+
+    # 4. Compress
+    output = io.BytesIO()
+
+    if format == 'JPEG':
+        img.save(
+            output,
+            format='JPEG',
+            quality=quality,
+            optimize=True,
+            progressive=True  # Progressive JPEG pour meilleure compression
+        )
+    elif format == 'WEBP':
+        # WebP est 25-35% plus petit que JPEG
+        img.save(
+            output,
+            format='WEBP',
+            quality=quality,
+            method=6  # Compression maximale
+        )
+    else:
+        # Fallback
+        img.save(output, format=format, optimize=True)
+
+    return output.getvalue(), {
+        "original_dims": original_dims,
+        "new_dims": f"{img.width}x{img.height}",
+        "drafted": drafted,
+    }
+
+
+def read_image_info(image_data: bytes) -> Dict[str, Any]:
+    """Header-only read of an image (blocking)"""
+    img = Image.open(io.BytesIO(image_data))
+    return {
+        'width': img.width,
+        'height': img.height,
+        'format': img.format,
+        'mode': img.mode,
+        'size_bytes': len(image_data)
+    }
+
+
+def check_image(image_data: bytes) -> Tuple[bool, str]:
+    """Integrity and size checks of an image (blocking)"""
+    img = Image.open(io.BytesIO(image_data))
+    img.verify()  # Verify integrity
+
+    # Check format
+    if img.format not in ['JPEG', 'PNG', 'WEBP', 'GIF']:
+        return (False, f"Unsupported format: {img.format}")
+
+    # Check size
+    if img.width < 100 or img.height < 100:
+        return (False, "Image too small (min 100x100)")
+
+    if img.width > 10000 or img.height > 10000:
+        return (False, "Image too large (max 10000x10000)")
+
+    return (True, "")
+
 
 class ImageCompressor:
     """
@@ -16,7 +136,11 @@ class ImageCompressor:
     - Compression JPEG quality 85 (optimal quality/size)
     - Conversion RGB (RGBA -> RGB)
     - Optimize=True pour compression maximale
+    - Mode draft : réduction JPEG au décodage (Image.draft) pour les grosses photos
     - Économie moyenne: 50-70% de la taille
+
+    Le travail CPU tourne sur le process pool partagé (IMAGE_WORKERS), les
+    lectures d'en-tête sur un thread.
     """
 
     async def compress(
@@ -25,7 +149,8 @@ class ImageCompressor:
         quality: int = 85,
         max_width: int = 2000,
         max_height: int = 2000,
-        format: str = 'JPEG'
+        format: str = 'JPEG',
+        draft: bool = False
     ) -> bytes:
         """
         Compresse image tout en préservant qualité
@@ -36,79 +161,95 @@ class ImageCompressor:
             max_width: Largeur maximale (resize si dépassé)
             max_height: Hauteur maximale (resize si dépassé)
             format: Format de sortie (JPEG, WEBP)
+            draft: Réduire les JPEG pendant le décodage (plus rapide)
 
         Returns:
             Données binaires de l'image compressée
         """
+        from backend.services.image_pipeline import run_in_pool
+
         try:
-            # 1. Load image
-            img = Image.open(io.BytesIO(image_data))
-
-            original_size = len(image_data)
-            original_dims = f"{img.width}x{img.height}"
-
-            logger.debug(f"[PHOTO] Original image: {original_dims}, {original_size} bytes")
-
-            # 2. Resize si nécessaire
-            if img.width > max_width or img.height > max_height:
-                img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                logger.debug(f"📏 Resized to {img.width}x{img.height}")
-
-            # 3. Convert to RGB if needed (pour JPEG)
-            if format == 'JPEG' and img.mode in ('RGBA', 'P', 'LA'):
-                # Créer background blanc pour transparence
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[3] if img.mode == 'RGBA' else None)
-                img = background
-
-                logger.debug(f"[BRAND] Converted {img.mode} -> RGB")
-
-            elif img.mode not in ('RGB', 'L'):  # L = grayscale
-                img = img.convert('RGB')
-
-            # 4. Compress
-            output = io.BytesIO()
-
-            if format == 'JPEG':
-                img.save(
-                    output,
-                    format='JPEG',
-                    quality=quality,
-                    optimize=True,
-                    progressive=True  # Progressive JPEG pour meilleure compression
-                )
-            elif format == 'WEBP':
-                # WebP est 25-35% plus petit que JPEG
-                img.save(
-                    output,
-                    format='WEBP',
-                    quality=quality,
-                    method=6  # Compression maximale
-                )
-            else:
-                # Fallback
-                img.save(output, format=format, optimize=True)
-
-            compressed_data = output.getvalue()
-            compressed_size = len(compressed_data)
-
-            # Calculate compression ratio
-            compression_ratio = (1 - compressed_size / original_size) * 100
-
-            logger.info(
-                f"[OK] Compressed: {original_size} -> {compressed_size} bytes "
-                f"({compression_ratio:.1f}% reduction)"
+            compressed_data, info = await run_in_pool(
+                compress_image, image_data, quality, max_width, max_height, format, draft
             )
-
-            return compressed_data
-
         except Exception as e:
             logger.error(f"[ERROR] Compression failed: {e}")
             # Return original if compression fails
             return image_data
 
+        self._log_result(image_data, compressed_data, info)
+        return compressed_data
+
+    async def compress_many(
+        self,
+        images: Iterable[bytes],
+        quality: int = 85,
+        max_width: int = 2000,
+        max_height: int = 2000,
+        format: str = 'JPEG',
+        draft: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Compresse plusieurs images en parallèle sur le process pool
+
+        Contrairement à compress(), un échec ne renvoie pas l'original : il
+        est rapporté pour l'image concernée, les autres aboutissent.
+
+        Returns:
+            Un résultat par image, dans l'ordre d'entrée :
+            {"ok": True, "data": bytes, "original_size", "compressed_size"}
+            ou {"ok": False, "data": None, "error": str, "original_size"}
+        """
+        from backend.services.image_pipeline import run_in_pool
+
+        images = list(images)
+        outcomes = await asyncio.gather(
+            *(
+                run_in_pool(compress_image, data, quality, max_width, max_height, format, draft)
+                for data in images
+            ),
+            return_exceptions=True
+        )
+
+        results: List[Dict[str, Any]] = []
+        for data, outcome in zip(images, outcomes):
+            if isinstance(outcome, BaseException):
+                results.append({
+                    "ok": False,
+                    "data": None,
+                    "error": str(outcome) or type(outcome).__name__,
+                    "original_size": len(data),
+                })
+                continue
+            compressed_data, _ = outcome
+            results.append({
+                "ok": True,
+                "data": compressed_data,
+                "original_size": len(data),
+                "compressed_size": len(compressed_data),
+            })
+
+        failed = sum(1 for r in results if not r["ok"])
+        logger.info(f"[OK] Compressed batch: {len(results) - failed}/{len(results)} images ({failed} failed)")
+        return results
+
+    @staticmethod
+    def _log_result(image_data: bytes, compressed_data: bytes, info: Dict[str, Any]):
+        original_size = len(image_data)
+        compressed_size = len(compressed_data)
+
+        # Calculate compression ratio
+        compression_ratio = (1 - compressed_size / original_size) * 100 if original_size else 0.0
+
+        logger.debug(
+            f"[PHOTO] {info['original_dims']} -> {info['new_dims']}"
+            f"{' (draft)' if info['drafted'] else ''}"
+        )
+        logger.info(
+            f"[OK] Compressed: {original_size} -> {compressed_size} bytes "
+            f"({compression_ratio:.1f}% reduction)"
+        )
+
     async def compress_webp(
         self,
         image_data: bytes,
@@ -147,15 +288,7 @@ class ImageCompressor:
             Dict avec width, height, format, mode, size
         """
         try:
-            img = Image.open(io.BytesIO(image_data))
-
-            return {
-                'width': img.width,
-                'height': img.height,
-                'format': img.format,
-                'mode': img.mode,
-                'size_bytes': len(image_data)
-            }
+            return await asyncio.to_thread(read_image_info, image_data)
 
         except Exception as e:
             logger.error(f"[ERROR] Failed to get image info: {e}")
@@ -172,21 +305,7 @@ class ImageCompressor:
             (is_valid, error_message)
         """
         try:
-            img = Image.open(io.BytesIO(image_data))
-            img.verify()  # Verify integrity
-
-            # Check format
-            if img.format not in ['JPEG', 'PNG', 'WEBP', 'GIF']:
-                return (False, f"Unsupported format: {img.format}")
-
-            # Check size
-            if img.width < 100 or img.height < 100:
-                return (False, "Image too small (min 100x100)")
-
-            if img.width > 10000 or img.height > 10000:
-                return (False, "Image too large (max 10000x10000)")
-
-            return (True, "")
+            return await asyncio.to_thread(check_image, image_data)
 
         except Exception as e:
             return (False, f"Invalid image: {str(e)}")
@@ -0,0 +1,68 @@
+"""
+Bounded executors for the blocking object-storage SDKs
+boto3 (R2) and b2sdk (B2) are synchronous: every call runs on a per-backend
+thread pool so a network round-trip never blocks the event loop, and the
+pool size caps the number of concurrent requests sent to each provider
+"""
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, TypeVar
+
+# Concurrent requests per backend (also used as HTTP connection pool size)
+STORAGE_IO_THREADS = int(os.getenv("STORAGE_IO_THREADS", "16"))
+
+T = TypeVar("T")
+
+
+class BlockingIOExecutor:
+    """
+    Dedicated thread pool for one storage backend
+
+    Usage:
+        io = BlockingIOExecutor("r2")
+        await io.run(client.put_object, Bucket=..., Key=..., Body=...)
+    """
+
+    def __init__(self, name: str, max_workers: int = STORAGE_IO_THREADS):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"{name}-io"
+        )
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking call on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self):
+        """Stop the pool (pending calls are cancelled)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_batch(
+    items: Iterable[str],
+    fn: Callable[[str], Awaitable[Any]]
+) -> Dict[str, List[Any]]:
+    """
+    Run an async operation for many photo ids concurrently
+
+    Concurrency is bounded by the backend's executor, so this can be called
+    with thousands of ids.
+
+    Returns:
+        {"success": [photo_id, ...], "failed": [{"photo_id", "error"}, ...]}
+    """
+    items = list(items)
+    outcomes = await asyncio.gather(*(fn(item) for item in items), return_exceptions=True)
+
+    results = {"success": [], "failed": []}
+    for item, outcome in zip(items, outcomes):
+        if isinstance(outcome, BaseException):
+            results["failed"].append({"photo_id": item, "error": str(outcome)})
+        else:
+            results["success"].append(item)
+    return results
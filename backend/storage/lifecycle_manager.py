@@ -3,11 +3,19 @@ Storage Lifecycle Manager
 Déplace automatiquement les photos entre tiers selon leur utilisation
 Exécuté quotidiennement via cron job
 """
+import os
+import time
+import asyncio
 from datetime import datetime, timedelta
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional
 from loguru import logger
 
-from .storage_manager import StorageManager, StorageTier, PhotoMetadata
+from .storage_manager import StorageManager
+
+# Photo ids fetched per keyset page (also the delete batch size)
+LIFECYCLE_BATCH_SIZE = int(os.getenv("LIFECYCLE_BATCH_SIZE", "500"))
+# Delete batches running at the same time
+LIFECYCLE_CONCURRENCY = int(os.getenv("LIFECYCLE_CONCURRENCY", "4"))
 
 
 class StorageLifecycleManager:
@@ -21,19 +29,200 @@ class StorageLifecycleManager:
     4. HOT sans accès 90j -> COLD
     5. COLD > 365j -> Suppression
 
+    Chaque règle est une requête SQL qui ne renvoie que les photos dues,
+    paginée par keyset sur (colonne de date, photo_id) et servie par les
+    index composites de photo_metadata. Le coût d'un run dépend donc du
+    nombre de photos dues, pas du nombre total de photos.
+
     Exécuté: Quotidiennement à 3h du matin (cron job)
     """
 
-    def __init__(self, storage_manager: StorageManager):
+    def __init__(
+        self,
+        storage_manager: StorageManager,
+        batch_size: int = LIFECYCLE_BATCH_SIZE,
+        concurrency: int = LIFECYCLE_CONCURRENCY
+    ):
         """
         Initialize lifecycle manager
 
         Args:
             storage_manager: StorageManager instance
+            batch_size: Photos per keyset page / delete batch
+            concurrency: Delete batches in flight
         """
         self.storage = storage_manager
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def _rules(self, now: datetime) -> List[Dict[str, Any]]:
+        """
+        Lifecycle rules, in execution order
+
+        Each rule selects due photos with `where` (+ `params`) and pages
+        through them ordered by (`sort_column`, photo_id).
+        """
+        return [
+            {
+                "name": "temp_expired",
+                "stat": "temp_deleted",
+                "label": "Deleting expired TEMP photos",
+                "action": "delete",
+                "where": "tier = 'temp' AND scheduled_deletion < ?",
+                "params": [now.isoformat()],
+                "sort_column": "scheduled_deletion",
+            },
+            {
+                "name": "published_expired",
+                "stat": "published_deleted",
+                "label": "Deleting published photos (7+ days)",
+                "action": "delete",
+                "where": "published_to_vinted = 1 AND scheduled_deletion < ?",
+                "params": [now.isoformat()],
+                "sort_column": "scheduled_deletion",
+            },
+            {
+                "name": "promote_to_hot",
+                "stat": "promoted_to_hot",
+                "label": "Promoting TEMP -> HOT (non-published drafts)",
+                "action": "promote",
+                "where": "tier = 'temp' AND upload_date < ? AND published_to_vinted = 0",
+                "params": [(now - timedelta(hours=48)).isoformat()],
+                "sort_column": "upload_date",
+            },
+            {
+                "name": "archive_to_cold",
+                "stat": "archived_to_cold",
+                "label": "Archiving HOT -> COLD (90+ days without access)",
+                "action": "archive",
+                "where": "tier = 'hot' AND last_access_date < ?",
+                "params": [(now - timedelta(days=90)).isoformat()],
+                "sort_column": "last_access_date",
+            },
+            {
+                "name": "cold_expired",
+                "stat": "old_deleted",
+                "label": "Deleting old COLD photos (365+ days)",
+                "action": "delete",
+                "where": "tier = 'cold' AND upload_date < ?",
+                "params": [(now - timedelta(days=365)).isoformat()],
+                "sort_column": "upload_date",
+            },
+        ]
+
+    def _iter_due(self, rule: Dict[str, Any]) -> Iterator[List[Dict[str, str]]]:
+        """
+        Yield pages of due photos ({photo_id, tier}) with keyset pagination
+
+        Rows acted upon leave the result set (deleted or moved), and the
+        keyset cursor never revisits them, so pages stay cheap to the end.
+        """
+        from backend.core.storage import get_store
+
+        column = rule["sort_column"]
+        cursor_key: Optional[tuple] = None
+
+        while True:
+            sql = f"SELECT photo_id, tier, {column} AS sort_key FROM photo_metadata WHERE {rule['where']}"
+            params = list(rule["params"])
+            if cursor_key is not None:
+                sql += f" AND ({column}, photo_id) > (?, ?)"
+                params.extend(cursor_key)
+            sql += f" ORDER BY {column}, photo_id LIMIT ?"
+            params.append(self.batch_size)
+
+            with get_store().get_connection() as conn:
+                rows = conn.execute(sql, params).fetchall()
+
+            if not rows:
+                return
+            yield [{"photo_id": row["photo_id"], "tier": row["tier"]} for row in rows]
+
+            if len(rows) < self.batch_size:
+                return
+            cursor_key = (rows[-1]["sort_key"], rows[-1]["photo_id"])
+
+    async def _run_delete(self, rule: Dict[str, Any], step: Dict[str, Any]):
+        """Delete due photos in concurrent batches (bounded by self.concurrency)"""
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+
+        async def delete_batch(rows: List[Dict[str, str]]):
+            try:
+                result = await self.storage.delete_photos([row["photo_id"] for row in rows])
+                step["done"] += len(result["success"])
+                step["failed"] += len(result["failed"])
+                step["reclaimed"] = step.get("reclaimed", 0) + result["reclaimed"]
+            except Exception as e:
+                logger.error(f"[ERROR] Lifecycle {rule['name']} batch failed: {e}")
+                step["failed"] += len(rows)
+            finally:
+                slots.release()
+
+        for rows in self._iter_due(rule):
+            step["due"] += len(rows)
+            await slots.acquire()
+            task = asyncio.create_task(delete_batch(rows))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def _run_migration(self, rule: Dict[str, Any], step: Dict[str, Any]):
+        """Stream due photo ids into the tier migration engine"""
+        def due_ids():
+            for rows in self._iter_due(rule):
+                step["due"] += len(rows)
+                for row in rows:
+                    yield row["photo_id"]
+
+        if rule["action"] == "promote":
+            result = await self.storage.promote_many(due_ids())
+        else:
+            result = await self.storage.archive_many(due_ids())
+
+        step["done"] = result["migrated"]
+        step["failed"] = len(result["failed"])
+        step["bytes"] = result["bytes"]
+
+    async def plan(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Dry run: what the lifecycle would do right now, without touching
+        anything (one COUNT/SUM query per rule)
+
+        Counts are per rule against the current state: a photo matched by
+        an earlier step (e.g. an expired TEMP photo) is also counted by a
+        later one it would no longer reach during a real run.
+
+        Returns:
+            {"dry_run": True, "generated_at": ..., "steps": {name: {...}}}
+        """
+        from backend.core.storage import get_store
+
+        now = now or datetime.utcnow()
+        steps = {}
+        with get_store().get_connection() as conn:
+            for rule in self._rules(now):
+                row = conn.execute(
+                    f"SELECT COUNT(*) AS due, COALESCE(SUM(compressed_size_bytes), 0) AS bytes "
+                    f"FROM photo_metadata WHERE {rule['where']}",
+                    rule["params"]
+                ).fetchone()
+                steps[rule["name"]] = {
+                    "label": rule["label"],
+                    "action": rule["action"],
+                    "due": row["due"],
+                    "bytes": row["bytes"],
+                }
+
+        return {
+            "dry_run": True,
+            "generated_at": now.isoformat(),
+            "steps": steps,
+        }
 
-    async def run_daily_lifecycle(self):
+    async def run_daily_lifecycle(self, dry_run: bool = False) -> Dict[str, Any]:
         """
         Job quotidien de lifecycle
 
@@ -43,92 +232,60 @@ class StorageLifecycleManager:
         3. Promouvoir TEMP -> HOT si draft reste
         4. Archiver HOT -> COLD si 90j sans accès
         5. Supprimer COLD > 365j
+
+        Args:
+            dry_run: Only return the plan (counts per step), change nothing
+
+        Returns:
+            Stats dict: one counter per action plus per-step metrics in "steps"
         """
+        if dry_run:
+            return await self.plan()
+
         logger.info("[PROCESS] Starting storage lifecycle job")
 
         now = datetime.utcnow()
+        started = time.monotonic()
+
+        # Blob deletes left over by a previous run (failed or interrupted)
+        pending_reclaimed = await self.storage.reclaim_pending()
 
         # Stats
-        stats = {
+        stats: Dict[str, Any] = {
             'temp_deleted': 0,
             'published_deleted': 0,
             'promoted_to_hot': 0,
             'archived_to_cold': 0,
-            'old_deleted': 0
+            'old_deleted': 0,
+            'pending_reclaimed': pending_reclaimed,
+            'steps': {}
         }
 
-        # 1. Supprimer photos TEMP expirées
-        logger.info("[INFO] Step 1: Deleting expired TEMP photos")
-        temp_photos = await self._get_photos_by_tier(StorageTier.TEMP)
-
-        for photo in temp_photos:
-            if photo.scheduled_deletion and photo.scheduled_deletion < now:
-                logger.info(f"🗑️ Deleting expired TEMP photo: {photo.photo_id}")
-                await self.storage.delete_photo(photo.photo_id)
-                stats['temp_deleted'] += 1
-
-        # 2. Supprimer photos publiées expirées (7j après publication)
-        logger.info("[INFO] Step 2: Deleting published photos (7+ days)")
-        published_photos = await self._get_published_photos()
-
-        for photo in published_photos:
-            if photo.scheduled_deletion and photo.scheduled_deletion < now:
-                logger.info(
-                    f"🗑️ Deleting published photo: {photo.photo_id} "
-                    f"(published {(now - photo.published_date).days} days ago)"
-                )
-                await self.storage.delete_photo(photo.photo_id)
-                stats['published_deleted'] += 1
-
-        # 3. Promouvoir TEMP -> HOT (drafts non publiés)
-        logger.info("[INFO] Step 3: Promoting TEMP -> HOT (non-published drafts)")
-        temp_old = await self._get_photos_older_than(
-            StorageTier.TEMP,
-            hours=48
-        )
+        for index, rule in enumerate(self._rules(now), start=1):
+            logger.info(f"[INFO] Step {index}: {rule['label']}")
 
-        for photo in temp_old:
-            if not photo.published_to_vinted:
-                logger.info(
-                    f"⬆️ Promoting to HOT storage: {photo.photo_id} "
-                    f"(draft_id: {photo.draft_id})"
-                )
-                await self.storage.promote_to_hot_storage(photo.photo_id)
-                stats['promoted_to_hot'] += 1
-
-        # 4. Archiver HOT -> COLD (90j sans accès)
-        logger.info("[INFO] Step 4: Archiving HOT -> COLD (90+ days without access)")
-        hot_old = await self._get_photos_not_accessed_for(
-            StorageTier.HOT,
-            days=90
-        )
+            step = {"due": 0, "done": 0, "failed": 0}
+            step_started = time.monotonic()
 
-        for photo in hot_old:
-            logger.info(
-                f"[PACKAGE] Archiving to COLD storage: {photo.photo_id} "
-                f"(last accessed {(now - photo.last_accessed).days} days ago)"
-            )
-            await self.storage.archive_to_cold_storage(photo.photo_id)
-            stats['archived_to_cold'] += 1
-
-        # 5. Supprimer COLD > 365j
-        logger.info("[INFO] Step 5: Deleting old COLD photos (365+ days)")
-        cold_old = await self._get_photos_older_than(
-            StorageTier.COLD,
-            days=365
-        )
+            if rule["action"] == "delete":
+                await self._run_delete(rule, step)
+            else:
+                await self._run_migration(rule, step)
+
+            step["seconds"] = round(time.monotonic() - step_started, 2)
+            stats[rule["stat"]] = step["done"]
+            stats["steps"][rule["name"]] = step
 
-        for photo in cold_old:
             logger.info(
-                f"🗑️ Deleting old COLD photo: {photo.photo_id} "
-                f"(uploaded {(now - photo.upload_date).days} days ago)"
+                f"[OK] Step {index} done: {step['done']}/{step['due']} "
+                f"({step['failed']} failed) in {step['seconds']}s"
             )
-            await self.storage.delete_photo(photo.photo_id)
-            stats['old_deleted'] += 1
+
+        stats["seconds"] = round(time.monotonic() - started, 2)
 
         # Log summary
         logger.info(
-            f"[OK] Storage lifecycle job completed\n"
+            f"[OK] Storage lifecycle job completed in {stats['seconds']}s\n"
             f"   - TEMP deleted: {stats['temp_deleted']}\n"
             f"   - Published deleted: {stats['published_deleted']}\n"
             f"   - Promoted to HOT: {stats['promoted_to_hot']}\n"
@@ -137,192 +294,3 @@ class StorageLifecycleManager:
         )
 
         return stats
-
-    async def _get_photos_by_tier(self, tier: StorageTier) -> List[PhotoMetadata]:
-        """
-        Récupère toutes les photos d'un tier
-
-        Args:
-            tier: Tier de stockage
-
-        Returns:
-            Liste de PhotoMetadata
-        """
-        from backend.core.storage import get_store
-
-        store = get_store()
-        with store.get_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT * FROM photo_metadata WHERE tier = ?
-            """, (tier.value,))
-
-            rows = cursor.fetchall()
-
-            photos = []
-            for row in rows:
-                photo = PhotoMetadata(
-                    photo_id=row['photo_id'],
-                    user_id=row['user_id'],
-                    draft_id=row['draft_id'],
-                    tier=StorageTier(row['tier']),
-                    original_filename=row['original_filename'],
-                    size_bytes=row['size_bytes'],
-                    compressed_size_bytes=row['compressed_size_bytes'],
-                    upload_date=datetime.fromisoformat(row['upload_date']) if row['upload_date'] else None,
-                    last_accessed=datetime.fromisoformat(row['last_accessed']) if row['last_accessed'] else None,
-                    published_to_vinted=bool(row['published_to_vinted']),
-                    published_date=datetime.fromisoformat(row['published_date']) if row['published_date'] else None,
-                    scheduled_deletion=datetime.fromisoformat(row['scheduled_deletion']) if row['scheduled_deletion'] else None
-                )
-                photos.append(photo)
-
-            return photos
-
-    async def _get_published_photos(self) -> List[PhotoMetadata]:
-        """
-        Récupère toutes les photos publiées
-
-        Returns:
-            Liste de PhotoMetadata
-        """
-        from backend.core.storage import get_store
-
-        store = get_store()
-        with store.get_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT * FROM photo_metadata
-                WHERE published_to_vinted = 1
-            """)
-
-            rows = cursor.fetchall()
-
-            photos = []
-            for row in rows:
-                photo = PhotoMetadata(
-                    photo_id=row['photo_id'],
-                    user_id=row['user_id'],
-                    draft_id=row['draft_id'],
-                    tier=StorageTier(row['tier']),
-                    original_filename=row['original_filename'],
-                    size_bytes=row['size_bytes'],
-                    compressed_size_bytes=row['compressed_size_bytes'],
-                    upload_date=datetime.fromisoformat(row['upload_date']) if row['upload_date'] else None,
-                    last_accessed=datetime.fromisoformat(row['last_accessed']) if row['last_accessed'] else None,
-                    published_to_vinted=bool(row['published_to_vinted']),
-                    published_date=datetime.fromisoformat(row['published_date']) if row['published_date'] else None,
-                    scheduled_deletion=datetime.fromisoformat(row['scheduled_deletion']) if row['scheduled_deletion'] else None
-                )
-                photos.append(photo)
-
-            return photos
-
-    async def _get_photos_older_than(
-        self,
-        tier: StorageTier,
-        hours: int = None,
-        days: int = None
-    ) -> List[PhotoMetadata]:
-        """
-        Récupère photos plus vieilles que X
-
-        Args:
-            tier: Tier de stockage
-            hours: Nombre d'heures (optionnel)
-            days: Nombre de jours (optionnel)
-
-        Returns:
-            Liste de PhotoMetadata
-        """
-        if hours:
-            threshold = datetime.utcnow() - timedelta(hours=hours)
-        elif days:
-            threshold = datetime.utcnow() - timedelta(days=days)
-        else:
-            return []
-
-        from backend.core.storage import get_store
-
-        store = get_store()
-        with store.get_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT * FROM photo_metadata
-                WHERE tier = ? AND upload_date < ?
-            """, (tier.value, threshold.isoformat()))
-
-            rows = cursor.fetchall()
-
-            photos = []
-            for row in rows:
-                photo = PhotoMetadata(
-                    photo_id=row['photo_id'],
-                    user_id=row['user_id'],
-                    draft_id=row['draft_id'],
-                    tier=StorageTier(row['tier']),
-                    original_filename=row['original_filename'],
-                    size_bytes=row['size_bytes'],
-                    compressed_size_bytes=row['compressed_size_bytes'],
-                    upload_date=datetime.fromisoformat(row['upload_date']) if row['upload_date'] else None,
-                    last_accessed=datetime.fromisoformat(row['last_accessed']) if row['last_accessed'] else None,
-                    published_to_vinted=bool(row['published_to_vinted']),
-                    published_date=datetime.fromisoformat(row['published_date']) if row['published_date'] else None,
-                    scheduled_deletion=datetime.fromisoformat(row['scheduled_deletion']) if row['scheduled_deletion'] else None
-                )
-                photos.append(photo)
-
-            return photos
-
-    async def _get_photos_not_accessed_for(
-        self,
-        tier: StorageTier,
-        days: int
-    ) -> List[PhotoMetadata]:
-        """
-        Récupère photos non accédées depuis X jours
-
-        Args:
-            tier: Tier de stockage
-            days: Nombre de jours
-
-        Returns:
-            Liste de PhotoMetadata
-        """
-        threshold = datetime.utcnow() - timedelta(days=days)
-
-        from backend.core.storage import get_store
-
-        store = get_store()
-        with store.get_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT * FROM photo_metadata
-                WHERE tier = ? AND last_accessed < ?
-            """, (tier.value, threshold.isoformat()))
-
-            rows = cursor.fetchall()
-
-            photos = []
-            for row in rows:
-                photo = PhotoMetadata(
-                    photo_id=row['photo_id'],
-                    user_id=row['user_id'],
-                    draft_id=row['draft_id'],
-                    tier=StorageTier(row['tier']),
-                    original_filename=row['original_filename'],
-                    size_bytes=row['size_bytes'],
-                    compressed_size_bytes=row['compressed_size_bytes'],
-                    upload_date=datetime.fromisoformat(row['upload_date']) if row['upload_date'] else None,
-                    last_accessed=datetime.fromisoformat(row['last_accessed']) if row['last_accessed'] else None,
-                    published_to_vinted=bool(row['published_to_vinted']),
-                    published_date=datetime.fromisoformat(row['published_date']) if row['published_date'] else None,
-                    scheduled_deletion=datetime.fromisoformat(row['scheduled_deletion']) if row['scheduled_deletion'] else None
-                )
-                photos.append(photo)
-
-            return photos
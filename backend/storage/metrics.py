@@ -45,7 +45,7 @@ class StorageMetrics:
                 "savings_vs_all_hot": 14.63
             }
         """
-        from backend.core.storage import get_store
+        from .usage import read_usage
 
         stats = {
             'temp_count': 0,
@@ -58,43 +58,25 @@ class StorageMetrics:
             'total_size_gb': 0.0
         }
 
-        store = get_store()
-        with store.get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Stats par tier
-            for tier in ['temp', 'hot', 'cold']:
-                cursor.execute("""
-                    SELECT
-                        COUNT(*) as count,
-                        SUM(compressed_size_bytes) as total_bytes
-                    FROM photo_metadata
-                    WHERE tier = ?
-                """, (tier,))
-
-                row = cursor.fetchone()
-
-                if row and row['count']:
-                    count = row['count']
-                    total_bytes = row['total_bytes'] or 0
-                    total_gb = total_bytes / (1024 ** 3)  # Bytes to GB
-
-                    stats[f'{tier}_count'] = count
-                    stats[f'{tier}_size_gb'] = round(total_gb, 3)
-
-            # Totaux
-            stats['total_count'] = (
-                stats['temp_count'] +
-                stats['hot_count'] +
-                stats['cold_count']
-            )
-
-            stats['total_size_gb'] = round(
-                stats['temp_size_gb'] +
-                stats['hot_size_gb'] +
-                stats['cold_size_gb'],
-                3
-            )
+        # Compteurs maintenus par triggers (storage_usage) : lecture O(1)
+        # Taille = octets réellement stockés (un blob partagé compte une fois)
+        for tier, row in read_usage().items():
+            stats[f'{tier}_count'] = row['photo_count']
+            stats[f'{tier}_size_gb'] = round(row['stored_bytes'] / (1024 ** 3), 3)  # Bytes to GB
+
+        # Totaux
+        stats['total_count'] = (
+            stats['temp_count'] +
+            stats['hot_count'] +
+            stats['cold_count']
+        )
+
+        stats['total_size_gb'] = round(
+            stats['temp_size_gb'] +
+            stats['hot_size_gb'] +
+            stats['cold_size_gb'],
+            3
+        )
 
         # Coûts
         stats['monthly_cost_estimate'] = await self.estimate_monthly_cost(stats)
@@ -244,7 +226,7 @@ class StorageMetrics:
                 "by_tier": {...}
             }
         """
-        from backend.core.storage import get_store
+        from .usage import read_usage
 
         usage = {
             'total_photos': 0,
@@ -252,38 +234,99 @@ class StorageMetrics:
             'by_tier': {}
         }
 
+        # Compteurs par utilisateur (storage_usage) : lecture O(1)
+        for tier, row in read_usage(user_id).items():
+            if row['photo_count']:
+                total_gb = row['logical_bytes'] / (1024 ** 3)
+
+                usage['by_tier'][tier] = {
+                    'count': row['photo_count'],
+                    'size_gb': round(total_gb, 3)
+                }
+
+                usage['total_photos'] += row['photo_count']
+                usage['total_size_gb'] += total_gb
+
+        usage['total_size_gb'] = round(usage['total_size_gb'], 3)
+
+        return usage
+
+    async def get_dedup_metrics(self) -> Dict[str, Any]:
+        """
+        Déduplication du stockage (blobs adressés par contenu)
+
+        Returns:
+            {
+                "photos": 1200,
+                "blobs": 950,
+                "shared_blobs": 120,
+                "logical_bytes": ...,   # somme des tailles de toutes les photos
+                "stored_bytes": ...,    # octets réellement stockés
+                "bytes_saved": ...,
+                "saved_gb": 0.3,
+                "dedup_ratio": 1.26
+            }
+        """
+        from backend.core.storage import get_store
+
         store = get_store()
         with store.get_connection() as conn:
             cursor = conn.cursor()
 
-            # Stats par tier
-            for tier in ['temp', 'hot', 'cold']:
-                cursor.execute("""
-                    SELECT
-                        COUNT(*) as count,
-                        SUM(compressed_size_bytes) as total_bytes
-                    FROM photo_metadata
-                    WHERE user_id = ? AND tier = ?
-                """, (user_id, tier))
-
-                row = cursor.fetchone()
-
-                if row and row['count']:
-                    count = row['count']
-                    total_bytes = row['total_bytes'] or 0
-                    total_gb = total_bytes / (1024 ** 3)
+            cursor.execute("""
+                SELECT
+                    COUNT(*) as photos,
+                    COALESCE(SUM(compressed_size_bytes), 0) as logical_bytes,
+                    COALESCE(SUM(CASE WHEN content_hash IS NULL THEN compressed_size_bytes ELSE 0 END), 0) as legacy_bytes,
+                    SUM(CASE WHEN content_hash IS NULL THEN 1 ELSE 0 END) as legacy_photos
+                FROM photo_metadata
+            """)
+            photos = cursor.fetchone()
 
-                    usage['by_tier'][tier] = {
-                        'count': count,
-                        'size_gb': round(total_gb, 3)
-                    }
+            cursor.execute("""
+                SELECT
+                    COUNT(*) as blobs,
+                    SUM(CASE WHEN refcount > 1 THEN 1 ELSE 0 END) as shared_blobs,
+                    COALESCE(SUM(size_bytes), 0) as blob_bytes
+                FROM photo_blobs
+                WHERE refcount > 0
+            """)
+            blobs = cursor.fetchone()
+
+        logical_bytes = photos['logical_bytes']
+        stored_bytes = photos['legacy_bytes'] + blobs['blob_bytes']
+        bytes_saved = logical_bytes - stored_bytes
+
+        return {
+            'photos': photos['photos'],
+            'blobs': blobs['blobs'] + (photos['legacy_photos'] or 0),
+            'shared_blobs': blobs['shared_blobs'] or 0,
+            'logical_bytes': logical_bytes,
+            'stored_bytes': stored_bytes,
+            'bytes_saved': bytes_saved,
+            'saved_gb': round(bytes_saved / (1024 ** 3), 3),
+            'dedup_ratio': round(logical_bytes / stored_bytes, 2) if stored_bytes else 1.0
+        }
 
-                    usage['total_photos'] += count
-                    usage['total_size_gb'] += total_gb
+    def get_read_cache_metrics(self) -> Dict[str, Any]:
+        """
+        Métriques du cache disque des lectures HOT/COLD
 
-            usage['total_size_gb'] = round(usage['total_size_gb'], 3)
+        Returns:
+            {
+                "hits": 420, "misses": 80, "coalesced": 3, "hit_rate": 83.5,
+                "bytes_served": ..., "bytes_fetched": ...,
+                "egress_saved_gb": 0.12, "entries": 80, "size_mb": 24.1, ...,
+                "url_cache": {"hits", "misses", "expired", "evictions", "entries", "hit_rate"}
+            }
+        """
+        from .read_cache import get_tier_read_cache
+        from .url_cache import get_url_cache
 
-        return usage
+        stats = get_tier_read_cache().get_stats()
+        stats['egress_saved_gb'] = round(stats['bytes_served'] / (1024 ** 3), 3)
+        stats['url_cache'] = get_url_cache().get_stats()
+        return stats
 
     async def get_optimization_recommendations(self) -> list[str]:
         """
@@ -0,0 +1,371 @@
+"""
+Tier Migration Engine
+Déplace des photos entre tiers (TEMP -> HOT, HOT -> COLD) en streaming,
+en parallèle et sous budget, sans jamais charger un objet entier en mémoire
+
+Ordre crash-safe pour chaque photo :
+1. Copie vers le tier cible (fichier disque -> multipart upload)
+2. Vérification de la taille côté cible
+3. Commit metadata par batch + entrée dans le journal `tier_migrations`
+4. Suppression de la source par batch, puis nettoyage du journal
+
+Les objets migrés sont les blobs (clé = hash du contenu, ou id photo pour
+les photos antérieures à la déduplication) : un blob partagé par plusieurs
+photos est copié une seule fois et toutes ses photos changent de tier
+ensemble.
+
+Une reprise après crash est idempotente :
+- crash avant le commit -> la photo est encore dans le tier source en DB,
+  elle est recopiée (écrasement) au prochain run
+- crash après le commit -> le journal liste les sources à supprimer,
+  traitées au début du prochain run
+"""
+import os
+import time
+import asyncio
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+from loguru import logger
+
+from .storage_manager import StorageManager, StorageTier
+
+MIGRATION_CONCURRENCY = int(os.getenv("MIGRATION_CONCURRENCY", "16"))
+# Upload budget in bytes/second across all migrations (0 = unlimited)
+MIGRATION_BYTES_PER_SECOND = int(os.getenv("MIGRATION_MB_PER_SECOND", "50")) * 1024 * 1024
+MIGRATION_COMMIT_BATCH = int(os.getenv("MIGRATION_COMMIT_BATCH", "200"))
+MIGRATION_SPOOL_DIR = os.getenv("MIGRATION_SPOOL_DIR") or tempfile.gettempdir()
+
+# Metadata lookups are chunked to stay under SQLite's variable limit
+_ID_CHUNK = 500
+
+
+class ByteRateLimiter:
+    """
+    Token bucket shared by all migration workers
+
+    acquire(n) waits until n bytes fit in the budget; a single object larger
+    than one second of budget is let through once the bucket is full.
+    """
+
+    def __init__(self, bytes_per_second: int):
+        self.rate = bytes_per_second
+        self.tokens = float(bytes_per_second)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, size: int):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                needed = min(size, self.rate)
+                if self.tokens >= needed:
+                    self.tokens -= needed
+                    return
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+
+
+class TierMigrator:
+    """
+    Migre des photos d'un tier à l'autre
+
+    Usage:
+        migrator = TierMigrator(storage_manager)
+        stats = await migrator.migrate(photo_ids, StorageTier.HOT, StorageTier.COLD)
+    """
+
+    def __init__(
+        self,
+        storage: StorageManager,
+        concurrency: int = MIGRATION_CONCURRENCY,
+        bytes_per_second: int = MIGRATION_BYTES_PER_SECOND,
+        commit_batch: int = MIGRATION_COMMIT_BATCH,
+        spool_dir: str = MIGRATION_SPOOL_DIR
+    ):
+        self.storage = storage
+        self.concurrency = concurrency
+        self.limiter = ByteRateLimiter(bytes_per_second)
+        self.commit_batch = commit_batch
+        self.spool_dir = spool_dir
+
+    def _tier(self, tier: StorageTier):
+        return self.storage.get_tier_storage(tier)
+
+    # ------------------------------------------------------------------ DB
+
+    @staticmethod
+    def _object_keys(photo_ids: List[str], tier: StorageTier) -> Dict[str, str]:
+        """
+        Object keys of the photos whose metadata still says `tier` (one query)
+
+        Returns:
+            {photo_id: object_key}
+        """
+        from backend.core.storage import get_store
+
+        placeholders = ",".join("?" * len(photo_ids))
+        with get_store().get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT photo_id, COALESCE(content_hash, photo_id) AS object_key FROM photo_metadata "
+                f"WHERE tier = ? AND photo_id IN ({placeholders})",
+                [tier.value, *photo_ids]
+            ).fetchall()
+        return {row["photo_id"]: row["object_key"] for row in rows}
+
+    @staticmethod
+    def _commit(keys: List[str], source: StorageTier, target: StorageTier) -> Tuple[List[str], int]:
+        """
+        Switch a batch of objects (blob + every photo sharing it) to the
+        target tier and journal their pending source deletes, in one
+        transaction
+
+        Returns:
+            (objects actually switched, photos switched)
+        """
+        from backend.core.storage import get_store
+
+        now = datetime.utcnow().isoformat()
+        # Promoted photos are kept: no more automatic deletion
+        clear_deletion = target == StorageTier.HOT
+        update_sql = f"""
+            UPDATE photo_metadata
+            SET tier = ?, {'scheduled_deletion = NULL, ' if clear_deletion else ''}updated_at = ?
+            WHERE (content_hash = ? OR (content_hash IS NULL AND photo_id = ?)) AND tier = ?
+        """
+
+        committed = []
+        photos = 0
+        with get_store().get_connection() as conn:
+            for key in keys:
+                switched = conn.execute(update_sql, (target.value, now, key, key, source.value)).rowcount
+                conn.execute(
+                    "UPDATE photo_blobs SET tier = ?, updated_at = ? WHERE content_hash = ? AND tier = ?",
+                    (target.value, now, key, source.value)
+                )
+                if switched:
+                    committed.append(key)
+                    photos += switched
+            conn.executemany(
+                "INSERT OR REPLACE INTO tier_migrations (photo_id, source_tier, target_tier) VALUES (?, ?, ?)",
+                [(key, source.value, target.value) for key in committed]
+            )
+            conn.commit()
+        return committed, photos
+
+    @staticmethod
+    def _pending_deletes() -> Dict[StorageTier, List[str]]:
+        """Journal entries left by a previous run (committed, source not yet deleted)"""
+        from backend.core.storage import get_store
+
+        with get_store().get_connection() as conn:
+            rows = conn.execute("SELECT photo_id, source_tier FROM tier_migrations").fetchall()
+
+        pending: Dict[StorageTier, List[str]] = {}
+        for row in rows:
+            pending.setdefault(StorageTier(row["source_tier"]), []).append(row["photo_id"])
+        return pending
+
+    @staticmethod
+    def _live_in_source(keys: List[str], source: StorageTier) -> List[str]:
+        """Journaled objects that a blob or photo row references in the source tier again"""
+        from backend.core.storage import get_store
+
+        placeholders = ",".join("?" * len(keys))
+        with get_store().get_connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT content_hash AS object_key FROM photo_blobs
+                WHERE tier = ? AND content_hash IN ({placeholders})
+                UNION
+                SELECT COALESCE(content_hash, photo_id) FROM photo_metadata
+                WHERE tier = ? AND COALESCE(content_hash, photo_id) IN ({placeholders})
+                """,
+                [source.value, *keys, source.value, *keys]
+            ).fetchall()
+        return [row["object_key"] for row in rows]
+
+    @staticmethod
+    def _clear_journal(photo_ids: List[str]):
+        from backend.core.storage import get_store
+
+        with get_store().get_connection() as conn:
+            conn.executemany(
+                "DELETE FROM tier_migrations WHERE photo_id = ?",
+                [(photo_id,) for photo_id in photo_ids]
+            )
+            conn.commit()
+
+    # ------------------------------------------------------------------ steps
+
+    async def _delete_sources(self, keys: List[str], source: StorageTier) -> int:
+        """Delete committed sources and clear their journal entries"""
+        if not keys:
+            return 0
+        result = await self._tier(source).delete_many(keys)
+        for failure in result["failed"]:
+            # Stays in the journal, retried on the next run
+            logger.warning(f"[WARN] Source delete failed for {failure['photo_id']}: {failure['error']}")
+        self._clear_journal(result["success"])
+        return len(result["success"])
+
+    async def resume(self) -> int:
+        """Finish source deletes journaled by an interrupted run"""
+        resumed = 0
+        for source, keys in self._pending_deletes().items():
+            logger.info(f"[PROCESS] Resuming {len(keys)} pending {source.value} deletes")
+            for i in range(0, len(keys), self.commit_batch):
+                batch = keys[i:i + self.commit_batch]
+                # Moved back (or re-uploaded) since the journal was written:
+                # the source copy is live again and must be kept
+                live = set(self._live_in_source(batch, source))
+                if live:
+                    logger.warning(f"[WARN] Keeping {len(live)} journaled {source.value} objects still in use")
+                    self._clear_journal(list(live))
+                resumed += await self._delete_sources([k for k in batch if k not in live], source)
+        return resumed
+
+    async def _copy(self, key: str, source: StorageTier, target: StorageTier) -> int:
+        """
+        Stream one object to the target tier and verify it
+
+        Returns:
+            Bytes copied
+        """
+        source_tier = self._tier(source)
+        target_tier = self._tier(target)
+
+        spool_path = None
+        if hasattr(source_tier, "path_for"):
+            # Local source: upload straight from its file
+            file_path = str(source_tier.path_for(key))
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"Object {key} not found in {source.value} storage")
+        else:
+            # Remote source: spool to disk, never to memory
+            fd, spool_path = tempfile.mkstemp(prefix=f"migrate_{key[:16]}_", dir=self.spool_dir)
+            os.close(fd)
+            file_path = spool_path
+
+        try:
+            if spool_path:
+                await source_tier.download_to_file(key, spool_path)
+
+            size = os.path.getsize(file_path)
+            await self.limiter.acquire(size)
+            await target_tier.upload_file(key, file_path)
+
+            copied_size = await target_tier.get_size(key)
+            if copied_size != size:
+                raise IOError(f"Size mismatch after copy ({copied_size} != {size} bytes)")
+            return size
+        finally:
+            if spool_path and os.path.exists(spool_path):
+                os.remove(spool_path)
+
+    async def migrate(
+        self,
+        photo_ids: Iterable[str],
+        source: StorageTier,
+        target: StorageTier
+    ) -> Dict[str, Any]:
+        """
+        Migrate photos from `source` to `target`
+
+        Photos whose metadata is no longer in `source` are skipped, so the
+        same id list can be replayed safely. Photos sharing a blob are
+        migrated together, with a single copy.
+
+        Args:
+            photo_ids: Photos to migrate
+            source: Current tier
+            target: Destination tier
+
+        Returns:
+            Stats dict (migrated objects, photos, skipped, failed, bytes,
+            seconds, resumed)
+        """
+        started = time.monotonic()
+        stats = {
+            "migrated": 0,
+            "photos": 0,
+            "skipped": 0,
+            "failed": [],
+            "bytes": 0,
+            "resumed": await self.resume(),
+        }
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        copied: List[str] = []
+        commit_lock = asyncio.Lock()
+
+        async def flush():
+            """Commit the copied batch, then delete its sources"""
+            async with commit_lock:
+                batch = copied[:]
+                copied.clear()
+                if not batch:
+                    return
+                committed, photos = self._commit(batch, source, target)
+                stats["migrated"] += len(committed)
+                stats["photos"] += photos
+                stats["skipped"] += len(batch) - len(committed)
+                await self._delete_sources(committed, source)
+
+        async def worker():
+            while True:
+                key = await queue.get()
+                try:
+                    if key is None:
+                        return
+                    size = await self._copy(key, source, target)
+                    stats["bytes"] += size
+                    copied.append(key)
+                    if len(copied) >= self.commit_batch:
+                        await flush()
+                except Exception as e:
+                    logger.error(f"[ERROR] Migration {source.value} -> {target.value} failed for {key}: {e}")
+                    stats["failed"].append({"photo_id": key, "error": str(e)})
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            chunk: List[str] = []
+            queued = set()
+
+            async def feed(ids: List[str]):
+                keys = self._object_keys(ids, source)
+                stats["skipped"] += len(ids) - len(keys)
+                for photo_id in ids:
+                    key = keys.get(photo_id)
+                    if key is not None and key not in queued:
+                        queued.add(key)
+                        await queue.put(key)
+
+            for photo_id in photo_ids:
+                chunk.append(photo_id)
+                if len(chunk) >= _ID_CHUNK:
+                    await feed(chunk)
+                    chunk = []
+            if chunk:
+                await feed(chunk)
+
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await flush()
+
+        stats["seconds"] = round(time.monotonic() - started, 2)
+        logger.info(
+            f"[OK] Migrated {stats['migrated']} objects ({stats['photos']} photos) {source.value} -> {target.value} "
+            f"({stats['bytes'] / (1024 * 1024):.1f} MB in {stats['seconds']}s, "
+            f"{len(stats['failed'])} failed, {stats['skipped']} skipped)"
+        )
+        return stats
@@ -0,0 +1,224 @@
+"""
+Local read-through cache for the remote tiers
+Les lectures HOT (R2) et COLD (B2) passent par un cache disque borné : une
+photo relue (republication, éditions, ré-analyse IA) coûte une lecture de
+fichier local au lieu d'un aller-retour réseau facturé en egress
+"""
+import os
+import uuid
+import asyncio
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from loguru import logger
+
+from backend.settings import settings
+
+TIER_CACHE_MAX_MB = int(os.getenv("TIER_CACHE_MAX_MB", "1024"))
+TIER_CACHE_DIR = os.getenv("TIER_CACHE_DIR")
+
+
+class TierReadCache:
+    """
+    Size-capped LRU disk cache of tier objects
+
+    - Key: object key (blob content hash, or photo id for pre-dedup
+      photos) + content hash, so changed bytes never serve stale data,
+      photos sharing a blob share one entry, and a tier migration (same
+      bytes) keeps it
+    - Atomic fills (temp file + os.replace): a crash never leaves a
+      truncated entry
+    - Concurrent misses on the same key share one remote download
+    - LRU index rebuilt from mtimes at startup; hits refresh the mtime
+    """
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = TIER_CACHE_MAX_MB * 1024 * 1024):
+        self.root = Path(root or TIER_CACHE_DIR or f"{settings.DATA_DIR}/tier_cache")
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._by_photo: Dict[str, str] = {}
+        self._total_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "fill_errors": 0,
+            "bytes_served": 0,
+            "bytes_fetched": 0,
+        }
+
+    # ------------------------------------------------------------------ index
+
+    def _load_index(self):
+        """Build the LRU index from the files already on disk (oldest first)"""
+        entries = []
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(".tmp"):
+                    # Fill interrupted by a crash
+                    os.unlink(entry.path)
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, entry.name, st.st_size))
+        entries.sort()
+        self._index = OrderedDict((name, size) for _, name, size in entries)
+        self._by_photo = {name.split(".", 1)[0]: name for name in self._index}
+        self._total_bytes = sum(size for _, _, size in entries)
+
+    @property
+    def index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            self._load_index()
+        return self._index
+
+    @staticmethod
+    def key_for(photo_id: str, content_hash: Optional[str]) -> str:
+        return f"{photo_id}.{(content_hash or 'nohash')[:16]}"
+
+    def _remove(self, name: str):
+        size = self.index.pop(name, None)
+        if size is None:
+            return
+        self._total_bytes -= size
+        photo_id = name.split(".", 1)[0]
+        if self._by_photo.get(photo_id) == name:
+            del self._by_photo[photo_id]
+        try:
+            (self.root / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _add(self, name: str, size: int):
+        photo_id = name.split(".", 1)[0]
+        previous = self._by_photo.get(photo_id)
+        if previous and previous != name:
+            # Older content of the same photo
+            self._remove(previous)
+        self._total_bytes += size - self.index.get(name, 0)
+        self.index[name] = size
+        self.index.move_to_end(name)
+        self._by_photo[photo_id] = name
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes"""
+        while self._total_bytes > self.max_bytes and self.index:
+            name = next(iter(self.index))
+            self._remove(name)
+            self.stats["evictions"] += 1
+
+    # ------------------------------------------------------------------ I/O
+
+    def _read(self, name: str) -> bytes:
+        path = self.root / name
+        data = path.read_bytes()
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+    def _write(self, name: str, data: bytes):
+        """Atomic fill: readers see the whole file or nothing"""
+        tmp = self.root / f"{name}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self.root / name)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+    async def get(
+        self,
+        photo_id: str,
+        content_hash: Optional[str],
+        fetch: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        Return a photo's bytes, from disk if cached, otherwise via `fetch`
+
+        Args:
+            photo_id: Object key of the photo in its tier
+            content_hash: SHA256 of the stored bytes (None for legacy rows)
+            fetch: Coroutine function downloading the object from its tier
+
+        Returns:
+            Données binaires de la photo
+        """
+        name = self.key_for(photo_id, content_hash)
+
+        if name in self.index:
+            try:
+                data = await asyncio.to_thread(self._read, name)
+                self.stats["hits"] += 1
+                self.stats["bytes_served"] += len(data)
+                self.index.move_to_end(name)
+                return data
+            except FileNotFoundError:
+                # Removed behind our back: refill
+                self._remove(name)
+
+        if name in self._inflight:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(self._inflight[name])
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[name] = future
+        try:
+            data = await fetch()
+            self.stats["bytes_fetched"] += len(data)
+            future.set_result(data)
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieve the exception so waiter-less futures don't warn
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(name, None)
+
+        if len(data) <= self.max_bytes:
+            try:
+                await asyncio.to_thread(self._write, name, data)
+                self._add(name, len(data))
+            except OSError as e:
+                # A full or read-only disk must not fail the read itself
+                self.stats["fill_errors"] += 1
+                logger.warning(f"[WARN] Tier cache fill failed for {photo_id}: {e}")
+
+        return data
+
+    def invalidate(self, photo_ids: Iterable[str]):
+        """Forget deleted objects (by object key)"""
+        for photo_id in photo_ids:
+            name = self._by_photo.get(photo_id)
+            if name:
+                self._remove(name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "entries": len(self.index),
+            "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+            "max_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 1) if lookups else 0.0,
+        }
+
+
+# Global instance
+_cache: Optional[TierReadCache] = None
+
+
+def get_tier_read_cache() -> TierReadCache:
+    """Get or create the TierReadCache singleton"""
+    global _cache
+    if _cache is None:
+        _cache = TierReadCache()
+    return _cache
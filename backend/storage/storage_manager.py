@@ -9,12 +9,19 @@ Gère le cycle de vie complet des photos :
 5. Après 365j -> suppression définitive
 """
 from enum import Enum
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Any, Dict, Iterable, Optional, List, Tuple
 from dataclasses import dataclass, asdict
 import uuid
+import asyncio
+import functools
 from loguru import logger
 
+from .access_tracker import get_access_tracker
+from .read_cache import get_tier_read_cache
+from .url_cache import get_url_cache
+
 
 class StorageTier(Enum):
     """Tiers de stockage"""
@@ -30,26 +37,40 @@ class PhotoMetadata:
     user_id: str
     draft_id: Optional[str]
     tier: StorageTier
-    original_filename: str
-    size_bytes: int
+    original_filename: Optional[str]
+    file_size_bytes: int
     compressed_size_bytes: int
     upload_date: datetime
-    last_accessed: datetime
+    last_access_date: datetime
     published_to_vinted: bool
     published_date: Optional[datetime]
     scheduled_deletion: Optional[datetime]
+    content_hash: Optional[str] = None  # SHA256 of the stored (compressed) bytes
+
+    @property
+    def object_key(self) -> str:
+        """Clé de l'objet dans les tiers : le blob partagé, ou l'id photo (photos antérieures à la déduplication)"""
+        return self.content_hash or self.photo_id
 
     def to_dict(self):
         """Convert to dict for JSON serialization"""
         data = asdict(self)
         data['tier'] = self.tier.value
         data['upload_date'] = self.upload_date.isoformat() if self.upload_date else None
-        data['last_accessed'] = self.last_accessed.isoformat() if self.last_accessed else None
+        data['last_access_date'] = self.last_access_date.isoformat() if self.last_access_date else None
         data['published_date'] = self.published_date.isoformat() if self.published_date else None
         data['scheduled_deletion'] = self.scheduled_deletion.isoformat() if self.scheduled_deletion else None
         return data
 
 
+# Sérialise les changements du registre de blobs (nouveau blob / blob libéré),
+# pour qu'un upload ne partage jamais un blob en cours de suppression
+_blob_lock = asyncio.Lock()
+
+# Photo ids per metadata query (SQLite variable limit)
+_ID_CHUNK = 500
+
+
 class StorageManager:
     """
     Gestionnaire central de stockage multi-tier
@@ -93,8 +114,9 @@ class StorageManager:
 
         Workflow :
         1. Compression image (50% size reduction)
-        2. Upload vers Fly.io Volumes
-        3. Création metadata
+        2. Upload vers Fly.io Volumes, sauf si le même contenu est déjà
+           stocké (blob partagé, quel que soit son tier)
+        3. Création metadata (+1 référence sur le blob)
         4. Schedule suppression automatique (48h)
 
         Args:
@@ -106,6 +128,8 @@ class StorageManager:
         Returns:
             PhotoMetadata avec toutes les infos
         """
+        from backend.core.media import sha256_of
+
         photo_id = str(uuid.uuid4())
 
         logger.info(f"📤 Uploading photo {photo_id} for user {user_id}")
@@ -116,34 +140,45 @@ class StorageManager:
             file_data,
             quality=85,
             max_width=2000,
-            max_height=2000
+            max_height=2000,
+            draft=True
         )
 
         compression_ratio = (1 - len(compressed_data) / len(file_data)) * 100
         logger.info(f"[OK] Compressed: {len(compressed_data)} bytes ({compression_ratio:.1f}% reduction)")
 
-        # 2. Upload TIER 1
-        await self.tier1.upload(photo_id, compressed_data)
-        logger.info(f"[OK] Uploaded to TIER 1 (temp)")
-
-        # 3. Metadata
-        metadata = PhotoMetadata(
-            photo_id=photo_id,
-            user_id=user_id,
-            draft_id=draft_id,
-            tier=StorageTier.TEMP,
-            original_filename=filename,
-            size_bytes=len(file_data),
-            compressed_size_bytes=len(compressed_data),
-            upload_date=datetime.utcnow(),
-            last_accessed=datetime.utcnow(),
-            published_to_vinted=False,
-            published_date=None,
-            scheduled_deletion=datetime.utcnow() + timedelta(hours=48)
-        )
+        content_hash = sha256_of(compressed_data)
+
+        async with _blob_lock:
+            # 2. Upload TIER 1 (contenu nouveau uniquement)
+            blob = self._get_blob(content_hash)
+            if blob:
+                tier = StorageTier(blob["tier"])
+                logger.info(f"[OK] Same content already stored in {tier.value}, sharing blob {content_hash[:12]}")
+            else:
+                tier = StorageTier.TEMP
+                await self.tier1.upload(content_hash, compressed_data)
+                logger.info(f"[OK] Uploaded to TIER 1 (temp)")
+
+            # 3. Metadata
+            metadata = PhotoMetadata(
+                photo_id=photo_id,
+                user_id=user_id,
+                draft_id=draft_id,
+                tier=tier,
+                original_filename=filename,
+                file_size_bytes=len(file_data),
+                compressed_size_bytes=len(compressed_data),
+                upload_date=datetime.utcnow(),
+                last_access_date=datetime.utcnow(),
+                published_to_vinted=False,
+                published_date=None,
+                scheduled_deletion=datetime.utcnow() + timedelta(hours=48),
+                content_hash=content_hash
+            )
 
-        # 4. Sauvegarder metadata en DB
-        await self._save_metadata(metadata)
+            # 4. Sauvegarder metadata en DB
+            await self._save_metadata(metadata)
 
         logger.info(f"[OK] Photo {photo_id} uploaded successfully (scheduled deletion: 48h)")
 
@@ -183,33 +218,16 @@ class StorageManager:
         Args:
             photo_id: ID de la photo à promouvoir
         """
-        metadata = await self._get_metadata(photo_id)
-
-        if not metadata:
-            logger.warning(f"Photo {photo_id} not found")
-            return
-
-        if metadata.tier != StorageTier.TEMP:
-            logger.info(f"Photo {photo_id} already in {metadata.tier.value}, skipping")
-            return
-
         logger.info(f"⬆️ Promoting photo {photo_id} from TEMP to HOT storage")
 
-        # 1. Télécharger depuis TIER 1
-        photo_data = await self.tier1.download(photo_id)
-
-        # 2. Upload vers TIER 2 (R2)
-        await self.tier2.upload(photo_id, photo_data)
-
-        # 3. Supprimer de TIER 1
-        await self.tier1.delete(photo_id)
-
-        # 4. Update metadata
-        metadata.tier = StorageTier.HOT
-        metadata.scheduled_deletion = None  # Plus de suppression auto
-        await self._save_metadata(metadata)
+        stats = await self.promote_many([photo_id])
 
-        logger.info(f"[OK] Photo {photo_id} promoted to HOT storage (R2)")
+        if stats["skipped"]:
+            logger.info(f"Photo {photo_id} not found in TEMP, skipping")
+        elif stats["failed"]:
+            raise RuntimeError(stats["failed"][0]["error"])
+        else:
+            logger.info(f"[OK] Photo {photo_id} promoted to HOT storage (R2)")
 
     async def archive_to_cold_storage(self, photo_id: str):
         """
@@ -221,32 +239,39 @@ class StorageManager:
         Args:
             photo_id: ID de la photo à archiver
         """
-        metadata = await self._get_metadata(photo_id)
+        logger.info(f"[PACKAGE] Archiving photo {photo_id} from HOT to COLD storage")
 
-        if not metadata:
-            logger.warning(f"Photo {photo_id} not found")
-            return
+        stats = await self.archive_many([photo_id])
 
-        if metadata.tier != StorageTier.HOT:
+        if stats["skipped"]:
             logger.info(f"Photo {photo_id} not in HOT tier, skipping")
-            return
+        elif stats["failed"]:
+            raise RuntimeError(stats["failed"][0]["error"])
+        else:
+            logger.info(f"[OK] Photo {photo_id} archived to COLD storage (B2)")
 
-        logger.info(f"[PACKAGE] Archiving photo {photo_id} from HOT to COLD storage")
+    async def promote_many(self, photo_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Promotion batch TEMP -> HOT via le moteur de migration
+        (streaming, concurrent, copy -> verify -> commit -> delete)
 
-        # 1. Télécharger depuis TIER 2
-        photo_data = await self.tier2.download(photo_id)
+        Returns:
+            Stats de migration
+        """
+        from .migration import TierMigrator
 
-        # 2. Upload vers TIER 3 (B2)
-        await self.tier3.upload(photo_id, photo_data)
+        return await TierMigrator(self).migrate(photo_ids, StorageTier.TEMP, StorageTier.HOT)
 
-        # 3. Supprimer de TIER 2
-        await self.tier2.delete(photo_id)
+    async def archive_many(self, photo_ids: Iterable[str]) -> Dict[str, Any]:
+        """
+        Archivage batch HOT -> COLD via le moteur de migration
 
-        # 4. Update metadata
-        metadata.tier = StorageTier.COLD
-        await self._save_metadata(metadata)
+        Returns:
+            Stats de migration
+        """
+        from .migration import TierMigrator
 
-        logger.info(f"[OK] Photo {photo_id} archived to COLD storage (B2)")
+        return await TierMigrator(self).migrate(photo_ids, StorageTier.HOT, StorageTier.COLD)
 
     async def get_photo_url(self, photo_id: str) -> str:
         """
@@ -264,17 +289,65 @@ class StorageManager:
         if not metadata:
             raise ValueError(f"Photo {photo_id} not found")
 
-        # Update last_accessed
-        metadata.last_accessed = datetime.utcnow()
-        await self._save_metadata(metadata)
+        # Write-behind: recorded in memory, flushed in batch (no DB write here)
+        get_access_tracker().touch(photo_id)
+
+        return await self._url_for(metadata.tier, metadata.object_key)
+
+    async def get_photo_urls(self, photo_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        URLs de plusieurs photos (ex: une page de drafts)
+
+        Une seule requête metadata par tranche de 500 photos, URLs servies
+        par le cache d'URLs.
+
+        Args:
+            photo_ids: IDs des photos
+
+        Returns:
+            {photo_id: url} (les photos introuvables sont absentes)
+        """
+        from backend.core.storage import get_store
+
+        photo_ids = list(dict.fromkeys(photo_ids))
+        rows = []
+        with get_store().get_connection() as conn:
+            for i in range(0, len(photo_ids), _ID_CHUNK):
+                chunk = photo_ids[i:i + _ID_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows.extend(conn.execute(
+                    f"SELECT photo_id, tier, content_hash FROM photo_metadata WHERE photo_id IN ({placeholders})",
+                    chunk
+                ).fetchall())
+
+        tracker = get_access_tracker()
+        urls = {}
+        for row in rows:
+            tracker.touch(row["photo_id"])
+            urls[row["photo_id"]] = await self._url_for(
+                StorageTier(row["tier"]), row["content_hash"] or row["photo_id"]
+            )
+        return urls
+
+    async def _url_for(self, tier: StorageTier, key: str) -> str:
+        """URL of an object in a tier, via the URL cache"""
+        cache = get_url_cache()
+        url = cache.get(tier.value, key)
+        if url is not None:
+            return url
 
         # Return CDN URL selon tier
-        if metadata.tier == StorageTier.TEMP:
-            return await self.tier1.get_url(photo_id)
-        elif metadata.tier == StorageTier.HOT:
-            return await self.tier2.get_cdn_url(photo_id)
+        expires_in = None
+        if tier == StorageTier.TEMP:
+            url = await self.tier1.get_url(key)
+        elif tier == StorageTier.HOT:
+            url = await self.tier2.get_cdn_url(key)
+            expires_in = self.tier2.url_expires_in
         else:  # COLD
-            return await self.tier3.get_url(photo_id)
+            url = await self.tier3.get_url(key)
+
+        cache.put(tier.value, key, url, expires_in)
+        return url
 
     async def get_photo_data(self, photo_id: str) -> bytes:
         """
@@ -291,45 +364,221 @@ class StorageManager:
         if not metadata:
             raise ValueError(f"Photo {photo_id} not found")
 
-        # Update last_accessed
-        metadata.last_accessed = datetime.utcnow()
-        await self._save_metadata(metadata)
+        # Write-behind: recorded in memory, flushed in batch (no DB write here)
+        get_access_tracker().touch(photo_id)
 
-        # Download selon tier
+        # Download selon tier (HOT/COLD via le cache disque local)
         if metadata.tier == StorageTier.TEMP:
-            return await self.tier1.download(photo_id)
-        elif metadata.tier == StorageTier.HOT:
-            return await self.tier2.download(photo_id)
-        else:  # COLD
-            return await self.tier3.download(photo_id)
+            return await self.tier1.download(metadata.object_key)
+
+        tier = self.get_tier_storage(metadata.tier)
+        return await get_tier_read_cache().get(
+            metadata.object_key,
+            metadata.content_hash,
+            functools.partial(tier.download, metadata.object_key)
+        )
 
     async def delete_photo(self, photo_id: str):
         """
         Suppression définitive d'une photo
 
+        L'objet n'est supprimé du tier que si aucune autre photo ne
+        partage son blob.
+
         Args:
             photo_id: ID de la photo à supprimer
         """
-        metadata = await self._get_metadata(photo_id)
+        result = await self.delete_photos([photo_id])
 
-        if not metadata:
+        if not result["success"]:
             logger.warning(f"Photo {photo_id} not found for deletion")
             return
 
-        logger.info(f"🗑️ Deleting photo {photo_id} from {metadata.tier.value} storage")
+        logger.info(f"[OK] Photo {photo_id} deleted")
 
-        # Supprimer du tier approprié
-        if metadata.tier == StorageTier.TEMP:
-            await self.tier1.delete(photo_id)
-        elif metadata.tier == StorageTier.HOT:
-            await self.tier2.delete(photo_id)
-        else:  # COLD
-            await self.tier3.delete(photo_id)
+    def get_tier_storage(self, tier: StorageTier):
+        """Backend object of a tier (LocalStorage, CloudflareR2Storage, BackblazeB2Storage)"""
+        return {
+            StorageTier.TEMP: self.tier1,
+            StorageTier.HOT: self.tier2,
+            StorageTier.COLD: self.tier3,
+        }[tier]
 
-        # Supprimer metadata
-        await self._delete_metadata(photo_id)
+    async def delete_photos(self, photo_ids: List[str]) -> Dict[str, Any]:
+        """
+        Suppression batch de photos
 
-        logger.info(f"[OK] Photo {photo_id} deleted")
+        Les metadata sont supprimées et les refcounts des blobs décrémentés
+        en une transaction ; seuls les blobs qui tombent à zéro référence
+        sont supprimés des tiers. Ces suppressions sont journalisées
+        (`blob_deletions`) et rejouées par reclaim_pending() si elles
+        échouent.
+
+        Args:
+            photo_ids: IDs des photos (tous tiers confondus)
+
+        Returns:
+            {"success": [photo_id, ...], "failed": [], "reclaimed": nombre d'objets supprimés}
+        """
+        deleted: List[str] = []
+        released: List[Tuple[str, str]] = []
+
+        async with _blob_lock:
+            for i in range(0, len(photo_ids), _ID_CHUNK):
+                chunk_deleted, chunk_released = self._release_photos(photo_ids[i:i + _ID_CHUNK])
+                deleted.extend(chunk_deleted)
+                released.extend(chunk_released)
+            # TEMP objects are removed under the lock: an upload of the same
+            # content could otherwise recreate the file in between
+            reclaimed = await self._reclaim([entry for entry in released if entry[1] == StorageTier.TEMP.value])
+
+        reclaimed += await self._reclaim([entry for entry in released if entry[1] != StorageTier.TEMP.value])
+
+        logger.info(f"🗑️ Deleted {len(deleted)} photos ({reclaimed} objects reclaimed, "
+                    f"{len(deleted) - len(released)} still shared)")
+        return {"success": deleted, "failed": [], "reclaimed": reclaimed}
+
+    @staticmethod
+    def _release_photos(photo_ids: List[str]) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """
+        Supprime les metadata et libère leurs références, en une transaction
+
+        Returns:
+            (photos supprimées, objets à supprimer [(object_key, tier)] déjà journalisés)
+        """
+        from backend.core.storage import get_store
+
+        placeholders = ",".join("?" * len(photo_ids))
+        with get_store().get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT photo_id, tier, content_hash FROM photo_metadata WHERE photo_id IN ({placeholders})",
+                photo_ids
+            ).fetchall()
+            if not rows:
+                return [], []
+
+            deleted = [row["photo_id"] for row in rows]
+            conn.execute(
+                f"DELETE FROM photo_metadata WHERE photo_id IN ({','.join('?' * len(deleted))})",
+                deleted
+            )
+
+            # Photos antérieures à la déduplication : objet propre à la photo
+            released = [(row["photo_id"], row["tier"]) for row in rows if not row["content_hash"]]
+
+            references = Counter(row["content_hash"] for row in rows if row["content_hash"])
+            if references:
+                hashes = list(references)
+                hash_placeholders = ",".join("?" * len(hashes))
+                conn.executemany(
+                    "UPDATE photo_blobs SET refcount = refcount - ?, updated_at = CURRENT_TIMESTAMP WHERE content_hash = ?",
+                    [(count, content_hash) for content_hash, count in references.items()]
+                )
+                unreferenced = conn.execute(
+                    f"SELECT content_hash, tier FROM photo_blobs WHERE refcount <= 0 AND content_hash IN ({hash_placeholders})",
+                    hashes
+                ).fetchall()
+                conn.execute(
+                    f"DELETE FROM photo_blobs WHERE refcount <= 0 AND content_hash IN ({hash_placeholders})",
+                    hashes
+                )
+                released.extend((row["content_hash"], row["tier"]) for row in unreferenced)
+
+            conn.executemany(
+                "INSERT OR IGNORE INTO blob_deletions (object_key, tier) VALUES (?, ?)",
+                released
+            )
+            conn.commit()
+
+        return deleted, released
+
+    async def _reclaim(self, entries: List[Tuple[str, str]]) -> int:
+        """
+        Supprime des tiers les objets journalisés et nettoie le journal
+
+        Un objet stocké à nouveau dans le même tier depuis (même contenu
+        ré-uploadé puis promu) est conservé.
+
+        Returns:
+            Nombre d'objets supprimés
+        """
+        if not entries:
+            return 0
+
+        from backend.core.storage import get_store
+
+        keys = list({key for key, _ in entries})
+        with get_store().get_connection() as conn:
+            live = {
+                (row["content_hash"], row["tier"])
+                for row in conn.execute(
+                    f"SELECT content_hash, tier FROM photo_blobs WHERE content_hash IN ({','.join('?' * len(keys))})",
+                    keys
+                ).fetchall()
+            }
+
+        done = [entry for entry in entries if entry in live]
+        by_tier: Dict[str, List[str]] = {}
+        for key, tier in entries:
+            if (key, tier) not in live:
+                by_tier.setdefault(tier, []).append(key)
+
+        reclaimed = 0
+        for tier, tier_keys in by_tier.items():
+            result = await self.get_tier_storage(StorageTier(tier)).delete_many(tier_keys)
+            for failure in result["failed"]:
+                # Stays in the journal, retried by reclaim_pending()
+                logger.warning(f"[WARN] Blob delete failed for {failure['photo_id']} ({tier}): {failure['error']}")
+            done.extend((key, tier) for key in result["success"])
+            reclaimed += len(result["success"])
+
+        get_tier_read_cache().invalidate(key for key, _ in done)
+        get_url_cache().invalidate(key for key, _ in done)
+        with get_store().get_connection() as conn:
+            conn.executemany(
+                "DELETE FROM blob_deletions WHERE object_key = ? AND tier = ?",
+                done
+            )
+            conn.commit()
+        return reclaimed
+
+    async def reclaim_pending(self) -> int:
+        """
+        Rejoue les suppressions de blobs journalisées (delete échoué, crash)
+
+        Returns:
+            Nombre d'objets supprimés
+        """
+        from backend.core.storage import get_store
+
+        with get_store().get_connection() as conn:
+            entries = [
+                (row["object_key"], row["tier"])
+                for row in conn.execute("SELECT object_key, tier FROM blob_deletions").fetchall()
+            ]
+
+        reclaimed = 0
+        for i in range(0, len(entries), _ID_CHUNK):
+            chunk = entries[i:i + _ID_CHUNK]
+            async with _blob_lock:
+                reclaimed += await self._reclaim([entry for entry in chunk if entry[1] == StorageTier.TEMP.value])
+            reclaimed += await self._reclaim([entry for entry in chunk if entry[1] != StorageTier.TEMP.value])
+
+        if entries:
+            logger.info(f"[OK] Reclaimed {reclaimed}/{len(entries)} pending blob deletes")
+        return reclaimed
+
+    @staticmethod
+    def _get_blob(content_hash: str) -> Optional[Dict[str, Any]]:
+        """Blob encore référencé pour ce contenu, s'il existe"""
+        from backend.core.storage import get_store
+
+        with get_store().get_connection() as conn:
+            row = conn.execute(
+                "SELECT content_hash, tier, size_bytes, refcount FROM photo_blobs WHERE content_hash = ? AND refcount > 0",
+                (content_hash,)
+            ).fetchone()
+        return dict(row) if row else None
 
     async def get_photos_by_draft(self, draft_id: str) -> List[PhotoMetadata]:
         """
@@ -356,15 +605,20 @@ class StorageManager:
             user_id TEXT NOT NULL,
             draft_id TEXT,
             tier TEXT NOT NULL,
-            original_filename TEXT,
-            size_bytes INTEGER,
-            compressed_size_bytes INTEGER,
+            file_size_bytes INTEGER NOT NULL,
+            compressed_size_bytes INTEGER NOT NULL,
             upload_date TEXT,
-            last_accessed TEXT,
+            last_access_date TEXT,
+            scheduled_deletion TEXT,
             published_to_vinted INTEGER DEFAULT 0,
             published_date TEXT,
-            scheduled_deletion TEXT
+            content_hash TEXT,
+            ...
         )
+        (voir backend/core/storage.py)
+
+        Une nouvelle photo ajoute une référence à son blob (créé au
+        besoin) dans la même transaction, et prend le tier du blob.
         """
         # TODO: Implémenter avec SQLite
         from backend.core.storage import get_store
@@ -373,25 +627,51 @@ class StorageManager:
         with store.get_connection() as conn:
             cursor = conn.cursor()
 
+            cursor.execute("SELECT 1 FROM photo_metadata WHERE photo_id = ?", (metadata.photo_id,))
+            if cursor.fetchone() is None and metadata.content_hash:
+                cursor.execute("""
+                    INSERT INTO photo_blobs (content_hash, tier, size_bytes, refcount)
+                    VALUES (?, ?, ?, 1)
+                    ON CONFLICT(content_hash) DO UPDATE SET
+                        refcount = refcount + 1, updated_at = CURRENT_TIMESTAMP
+                """, (metadata.content_hash, metadata.tier.value, metadata.compressed_size_bytes))
+                cursor.execute("SELECT tier FROM photo_blobs WHERE content_hash = ?", (metadata.content_hash,))
+                metadata.tier = StorageTier(cursor.fetchone()["tier"])
+
+            # Upsert (not REPLACE): an UPDATE keeps the storage_usage triggers exact
             cursor.execute("""
-                INSERT OR REPLACE INTO photo_metadata (
-                    photo_id, user_id, draft_id, tier, original_filename,
-                    size_bytes, compressed_size_bytes, upload_date, last_accessed,
-                    published_to_vinted, published_date, scheduled_deletion
+                INSERT INTO photo_metadata (
+                    photo_id, user_id, draft_id, tier,
+                    file_size_bytes, compressed_size_bytes, upload_date, last_access_date,
+                    published_to_vinted, published_date, scheduled_deletion, content_hash
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(photo_id) DO UPDATE SET
+                    user_id = excluded.user_id,
+                    draft_id = excluded.draft_id,
+                    tier = excluded.tier,
+                    file_size_bytes = excluded.file_size_bytes,
+                    compressed_size_bytes = excluded.compressed_size_bytes,
+                    upload_date = excluded.upload_date,
+                    last_access_date = COALESCE(MAX(last_access_date, excluded.last_access_date),
+                                                last_access_date, excluded.last_access_date),
+                    published_to_vinted = excluded.published_to_vinted,
+                    published_date = excluded.published_date,
+                    scheduled_deletion = excluded.scheduled_deletion,
+                    content_hash = excluded.content_hash,
+                    updated_at = CURRENT_TIMESTAMP
             """, (
                 metadata.photo_id,
                 metadata.user_id,
                 metadata.draft_id,
                 metadata.tier.value,
-                metadata.original_filename,
-                metadata.size_bytes,
+                metadata.file_size_bytes,
                 metadata.compressed_size_bytes,
                 metadata.upload_date.isoformat() if metadata.upload_date else None,
-                metadata.last_accessed.isoformat() if metadata.last_accessed else None,
+                metadata.last_access_date.isoformat() if metadata.last_access_date else None,
                 1 if metadata.published_to_vinted else 0,
                 metadata.published_date.isoformat() if metadata.published_date else None,
-                metadata.scheduled_deletion.isoformat() if metadata.scheduled_deletion else None
+                metadata.scheduled_deletion.isoformat() if metadata.scheduled_deletion else None,
+                metadata.content_hash
             ))
             conn.commit()
 
@@ -418,26 +698,13 @@ class StorageManager:
                 user_id=row['user_id'],
                 draft_id=row['draft_id'],
                 tier=StorageTier(row['tier']),
-                original_filename=row['original_filename'],
-                size_bytes=row['size_bytes'],
+                original_filename=None,
+                file_size_bytes=row['file_size_bytes'],
                 compressed_size_bytes=row['compressed_size_bytes'],
                 upload_date=datetime.fromisoformat(row['upload_date']) if row['upload_date'] else None,
-                last_accessed=datetime.fromisoformat(row['last_accessed']) if row['last_accessed'] else None,
+                last_access_date=datetime.fromisoformat(row['last_access_date']) if row['last_access_date'] else None,
                 published_to_vinted=bool(row['published_to_vinted']),
                 published_date=datetime.fromisoformat(row['published_date']) if row['published_date'] else None,
-                scheduled_deletion=datetime.fromisoformat(row['scheduled_deletion']) if row['scheduled_deletion'] else None
+                scheduled_deletion=datetime.fromisoformat(row['scheduled_deletion']) if row['scheduled_deletion'] else None,
+                content_hash=row['content_hash']
             )
-
-    async def _delete_metadata(self, photo_id: str):
-        """Supprime metadata de DB"""
-        # TODO: Implémenter avec SQLite
-        from backend.core.storage import get_store
-
-        store = get_store()
-        with store.get_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                DELETE FROM photo_metadata WHERE photo_id = ?
-            """, (photo_id,))
-            conn.commit()
@@ -105,6 +105,52 @@ class TestImageCompressor:
         compressed_img = Image.open(io.BytesIO(compressed_data))
         assert compressed_img.mode == 'RGB'
 
+    @pytest.mark.asyncio
+    async def test_compress_many_keeps_order_and_reports_errors(self):
+        """Test batch : ordre d'entrée conservé, erreur par image, mode draft"""
+        from PIL import Image
+        import io
+
+        compressor = ImageCompressor()
+
+        img_bytes = io.BytesIO()
+        Image.new('RGB', (4000, 3000), color='red').save(img_bytes, format='JPEG', quality=95)
+        large = img_bytes.getvalue()
+
+        results = await compressor.compress_many(
+            [large, b"not an image", jpeg_bytes('blue')],
+            max_width=1000,
+            max_height=1000,
+            draft=True
+        )
+
+        assert [r["ok"] for r in results] == [True, False, True]
+        assert results[1]["error"]
+        assert Image.open(io.BytesIO(results[0]["data"])).size == (1000, 750)
+        assert Image.open(io.BytesIO(results[2]["data"])).size == (100, 100)
+
+    @pytest.mark.asyncio
+    async def test_compress_applies_exif_orientation(self):
+        """Test photo de téléphone (Orientation=6) : les pixels sont tournés avant le resize"""
+        from PIL import Image
+        import io
+
+        compressor = ImageCompressor()
+
+        # Capteur paysage 4000x3000, affichée en portrait grâce au tag EXIF
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        img_bytes = io.BytesIO()
+        Image.new('RGB', (4000, 3000), color='red').save(img_bytes, format='JPEG', exif=exif)
+
+        results = await compressor.compress_many(
+            [img_bytes.getvalue()], max_width=1000, max_height=1000, draft=True
+        )
+
+        compressed_img = Image.open(io.BytesIO(results[0]["data"]))
+        assert compressed_img.size == (750, 1000)
+        assert compressed_img.getexif().get(0x0112, 1) == 1
+
 
 class TestStorageManager:
     """Tests pour le gestionnaire de stockage"""
@@ -186,8 +232,9 @@ class TestStorageTiers:
             await tier1.upload(photo_id, test_data)
 
             # Vérifier que le fichier existe
-            file_path = tier1.base_path / f"{photo_id}.jpg"
+            file_path = tier1.path_for(photo_id)
             assert file_path.exists()
+            assert file_path.parent.parent.parent == tier1.base_path  # ab/cd/<id>.jpg
 
             # Download
             downloaded_data = await tier1.download(photo_id)
@@ -199,10 +246,47 @@ class TestStorageTiers:
 
         finally:
             # Cleanup au cas où
-            file_path = tier1.base_path / f"{photo_id}.jpg"
+            file_path = tier1.path_for(photo_id)
             if file_path.exists():
                 file_path.unlink()
 
+    @pytest.mark.asyncio
+    async def test_tier1_index_tracks_writes_and_moves_flat_files(self, tmp_path):
+        """Test que l'index suit les écritures et range les fichiers à plat dans leur shard"""
+        from backend.storage.tier1_local import LocalStorage
+
+        (tmp_path / "legacy.jpg").write_bytes(b"x" * 10)
+        tier1 = LocalStorage(str(tmp_path))
+
+        assert await tier1.download("legacy") == b"x" * 10
+        await tier1.upload("new", b"y" * 5)
+        assert sorted(await tier1.list_all()) == ["legacy", "new"]
+        assert await tier1.get_total_size() == 15
+        assert not (tmp_path / "legacy.jpg").exists()
+
+        await tier1.delete_many(["legacy"])
+        assert await tier1.list_all() == ["new"]
+        assert await tier1.get_total_size() == 5
+
+    @pytest.mark.asyncio
+    async def test_tier1_scan_keeps_recent_tmp_files(self, tmp_path):
+        """Test que le scan ne supprime que les .tmp anciens (pas les écritures en cours)"""
+        from backend.storage.tier1_local import LocalStorage, LOCAL_TMP_GRACE_SECONDS
+
+        tier1 = LocalStorage(str(tmp_path))
+        shard = tmp_path / tier1.shard_of("photo")
+        shard.mkdir(parents=True)
+        in_progress = shard / "photo.jpg.aaaa1111.tmp"
+        leftover = shard / "photo.jpg.bbbb2222.tmp"
+        in_progress.write_bytes(b"partial")
+        leftover.write_bytes(b"partial")
+        old = datetime.now().timestamp() - LOCAL_TMP_GRACE_SECONDS - 60
+        os.utime(leftover, (old, old))
+
+        assert await tier1.list_all() == []
+        assert in_progress.exists()
+        assert not leftover.exists()
+
 
 class TestLifecycleRules:
     """Tests pour les règles de lifecycle"""
@@ -257,6 +341,197 @@ class TestLifecycleRules:
         assert time_until_deletion.days == 7
 
 
+@pytest.fixture
+def db_storage_manager(tmp_path, monkeypatch):
+    """StorageManager sur une DB et un TIER 1 temporaires"""
+    import backend.core.storage as core_storage
+    from backend.storage.tier1_local import LocalStorage
+
+    monkeypatch.setattr(core_storage, "_store", core_storage.SQLiteStore(str(tmp_path / "test.db")))
+    manager = StorageManager()
+    manager.tier1 = LocalStorage(str(tmp_path / "temp"))
+    return manager
+
+
+def jpeg_bytes(color: str) -> bytes:
+    from PIL import Image
+    import io
+
+    img_bytes = io.BytesIO()
+    Image.new('RGB', (100, 100), color=color).save(img_bytes, format='JPEG')
+    return img_bytes.getvalue()
+
+
+class TestBlobStore:
+    """Tests pour la déduplication (blobs adressés par contenu, refcount)"""
+
+    @pytest.mark.asyncio
+    async def test_same_content_is_stored_once_and_reclaimed_at_zero(self, db_storage_manager):
+        """Test qu'un contenu uploadé deux fois n'est stocké qu'une fois et supprimé à la dernière référence"""
+        storage_manager = db_storage_manager
+
+        first = await storage_manager.upload_photo("user1", jpeg_bytes('blue'), "a.jpg")
+        second = await storage_manager.upload_photo("user1", jpeg_bytes('blue'), "b.jpg")
+
+        assert first.photo_id != second.photo_id
+        assert first.content_hash == second.content_hash
+        assert len(await storage_manager.tier1.list_all()) == 1
+
+        result = await storage_manager.delete_photos([first.photo_id])
+        assert result["reclaimed"] == 0
+        assert await storage_manager.get_photo_data(second.photo_id)
+
+        result = await storage_manager.delete_photos([second.photo_id])
+        assert result["reclaimed"] == 1
+        assert await storage_manager.tier1.list_all() == []
+
+
+class TestPhotoURLs:
+    """Tests pour le cache d'URLs et le batch get_photo_urls"""
+
+    @pytest.mark.asyncio
+    async def test_photo_urls_batch_and_cache(self, db_storage_manager):
+        """Test du batch get_photo_urls et de l'expiration des URLs signées"""
+        from backend.storage.url_cache import PhotoURLCache
+
+        storage_manager = db_storage_manager
+        first = await storage_manager.upload_photo("user1", jpeg_bytes('blue'), "a.jpg")
+        second = await storage_manager.upload_photo("user1", jpeg_bytes('red'), "b.jpg")
+
+        urls = await storage_manager.get_photo_urls([first.photo_id, "unknown", second.photo_id])
+        assert set(urls) == {first.photo_id, second.photo_id}
+        assert urls[first.photo_id] == await storage_manager.get_photo_url(first.photo_id)
+
+        cache = PhotoURLCache(margin=60)
+        cache.put("hot", "k1", "https://signed", expires_in=30)   # trop court pour la marge
+        cache.put("hot", "k2", "https://signed", expires_in=3600)
+        cache.put("temp", "k3", "/api/storage/photos/k3")
+        assert cache.get("hot", "k1") is None
+        assert cache.get("hot", "k2") == "https://signed"
+        assert cache.get("cold", "k2") is None
+        cache.invalidate(["k2", "k3"])
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestStorageUsage:
+    """Tests pour les compteurs d'usage maintenus par triggers"""
+
+    @pytest.mark.asyncio
+    async def test_counters_follow_writes_and_reconcile_finds_drift(self, db_storage_manager):
+        """Test que les compteurs suivent insert / changement de tier / delete"""
+        from backend.core.storage import get_store
+        from backend.storage.usage import read_usage, reconcile_usage
+
+        storage_manager = db_storage_manager
+        first = await storage_manager.upload_photo("user1", jpeg_bytes('red'), "a.jpg")
+        await storage_manager.upload_photo("user1", jpeg_bytes('red'), "b.jpg")
+        await storage_manager.upload_photo("user2", jpeg_bytes('green'), "c.jpg")
+
+        usage = read_usage()
+        assert usage["temp"]["photo_count"] == 3
+        assert usage["temp"]["logical_bytes"] > usage["temp"]["stored_bytes"]  # blob partagé
+        assert read_usage("user1")["temp"]["photo_count"] == 2
+
+        with get_store().get_connection() as conn:
+            conn.execute("UPDATE photo_metadata SET tier = 'hot' WHERE photo_id = ?", (first.photo_id,))
+            conn.commit()
+        assert read_usage("user1")["hot"]["photo_count"] == 1
+
+        await storage_manager.delete_photos([first.photo_id])
+        assert read_usage("user1")["hot"]["photo_count"] == 0
+        assert reconcile_usage()["drift"] == []
+
+        with get_store().get_connection() as conn:
+            conn.execute("UPDATE storage_usage SET photo_count = 99 WHERE user_id = 'user2'")
+            conn.commit()
+        report = reconcile_usage(fix=True)
+        assert len(report["drift"]) == 1 and report["fixed"]
+        assert read_usage("user2")["temp"]["photo_count"] == 1
+
+
+class TestTierMigration:
+    """Tests pour la reprise des suppressions journalisées par TierMigrator"""
+
+    @pytest.mark.asyncio
+    async def test_resume_keeps_objects_back_in_the_source_tier(self, db_storage_manager):
+        """Test qu'une source de nouveau référencée n'est pas supprimée à la reprise"""
+        from backend.core.storage import get_store
+        from backend.storage.migration import TierMigrator
+
+        storage_manager = db_storage_manager
+        moved = await storage_manager.upload_photo("user1", jpeg_bytes('red'), "a.jpg")
+        back = await storage_manager.upload_photo("user1", jpeg_bytes('green'), "b.jpg")
+
+        # Run interrompu : les deux objets journalisés, seul le premier a vraiment quitté TEMP
+        with get_store().get_connection() as conn:
+            conn.execute("UPDATE photo_metadata SET tier = 'hot' WHERE photo_id = ?", (moved.photo_id,))
+            conn.execute("UPDATE photo_blobs SET tier = 'hot' WHERE content_hash = ?", (moved.content_hash,))
+            conn.executemany(
+                "INSERT INTO tier_migrations (photo_id, source_tier, target_tier) VALUES (?, 'temp', 'hot')",
+                [(moved.content_hash,), (back.content_hash,)]
+            )
+            conn.commit()
+
+        assert await TierMigrator(storage_manager).resume() == 1
+        assert await storage_manager.tier1.list_all() == [back.content_hash]
+        assert await storage_manager.get_photo_data(back.photo_id)
+        with get_store().get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM tier_migrations").fetchone()[0] == 0
+
+
+class TestTierReadCache:
+    """Tests pour le cache disque des lectures HOT/COLD"""
+
+    @pytest.mark.asyncio
+    async def test_repeat_read_is_local_and_fills_are_shared(self):
+        """Test qu'une relecture ne retélécharge pas et que les miss concurrents sont fusionnés"""
+        from backend.storage.read_cache import TierReadCache
+
+        downloads = 0
+
+        async def fetch():
+            nonlocal downloads
+            downloads += 1
+            await asyncio.sleep(0.01)
+            return b"photo bytes"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TierReadCache(root=tmp, max_bytes=1024)
+
+            results = await asyncio.gather(*(cache.get("p1", "abc", fetch) for _ in range(5)))
+            assert results == [b"photo bytes"] * 5
+            assert downloads == 1
+
+            assert await cache.get("p1", "abc", fetch) == b"photo bytes"
+            assert downloads == 1
+            assert cache.get_stats()["hits"] == 1
+
+            # Nouveau contenu -> nouvelle clé, l'ancienne entrée est remplacée
+            await cache.get("p1", "def", fetch)
+            assert downloads == 2
+            assert cache.get_stats()["entries"] == 1
+
+            cache.invalidate(["p1"])
+            assert cache.get_stats()["entries"] == 0
+            assert not any(name.startswith("p1.") for name in os.listdir(tmp))
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_respects_size_cap(self):
+        """Test que le cache reste sous sa taille max (LRU)"""
+        from backend.storage.read_cache import TierReadCache
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = TierReadCache(root=tmp, max_bytes=250)
+
+            for photo_id in ("a", "b", "c"):
+                await cache.get(photo_id, None, lambda: asyncio.sleep(0, result=b"x" * 100))
+
+            stats = cache.get_stats()
+            assert stats["entries"] == 2
+            assert stats["evictions"] == 1
+            assert "a.nohash" not in cache.index
+
+
 class TestCostCalculations:
     """Tests pour les calculs de coûts"""
 
@@ -3,9 +3,19 @@ TIER 1: Local Storage (Fly.io Volumes)
 Stockage temporaire gratuit pour photos en attente (24-48h)
 """
 import os
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 from loguru import logger
 
+# Leftover .tmp files older than this are removed by the index scan (younger
+# ones may be writes in progress)
+LOCAL_TMP_GRACE_SECONDS = int(os.getenv("LOCAL_TMP_GRACE_SECONDS", "3600"))
+
 
 class LocalStorage:
     """
@@ -16,7 +26,14 @@ class LocalStorage:
     - Temporaire (24-48h)
     - Utilisé pour photos en attente d'analyse IA
 
-    Path: /app/backend/data/photos/temp/
+    Path: /app/backend/data/photos/temp/ab/cd/<photo_id>.jpg
+
+    - Répertoires shardés par hash (256 x 256) : aucun répertoire ne
+      grossit avec le nombre de photos
+    - I/O disque sur threads, écritures atomiques (tmp + os.replace)
+    - Index en mémoire photo_id -> taille, construit une fois par scandir
+      puis tenu à jour à chaque écriture/suppression : list_all() et
+      get_total_size() ne parcourent plus le disque
     """
 
     def __init__(self, base_path: str = "/app/backend/data/photos/temp"):
@@ -29,8 +46,131 @@ class LocalStorage:
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
 
+        self._index: Optional[Dict[str, int]] = None
+        self._total_bytes = 0
+        # Changes made while the index is being built, replayed on top of it
+        self._journal: Optional[List[Tuple[str, Optional[int]]]] = None
+        self._index_lock = asyncio.Lock()
+
         logger.info(f"[OK] LocalStorage initialized at {self.base_path}")
 
+    # ------------------------------------------------------------------ layout
+
+    @staticmethod
+    def shard_of(photo_id: str) -> str:
+        """Two-level shard directory of a photo ("ab/cd")"""
+        digest = hashlib.md5(photo_id.encode("utf-8")).hexdigest()
+        return f"{digest[:2]}/{digest[2:4]}"
+
+    def path_for(self, photo_id: str) -> Path:
+        """Filesystem path of a photo"""
+        path = self.base_path / self.shard_of(photo_id) / f"{photo_id}.jpg"
+        if not path.exists():
+            # Written before sharding and not moved yet
+            legacy = self.base_path / f"{photo_id}.jpg"
+            if legacy.exists():
+                return legacy
+        return path
+
+    # ------------------------------------------------------------------ index
+
+    def _record(self, photo_id: str, size: Optional[int]):
+        """Apply one write (size) or delete (None) to the index"""
+        if self._journal is not None:
+            self._journal.append((photo_id, size))
+        if self._index is None:
+            return
+        self._total_bytes -= self._index.pop(photo_id, 0)
+        if size is not None:
+            self._index[photo_id] = size
+            self._total_bytes += size
+
+    def _scan(self) -> Dict[str, int]:
+        """
+        One pass over the shards (blocking)
+
+        Flat files from the pre-sharding layout are moved into their shard,
+        leftovers of interrupted writes (.tmp older than
+        LOCAL_TMP_GRACE_SECONDS) are removed.
+        """
+        index: Dict[str, int] = {}
+        tmp_cutoff = time.time() - LOCAL_TMP_GRACE_SECONDS
+        with os.scandir(self.base_path) as top:
+            for entry in top:
+                if entry.is_file():
+                    if entry.name.endswith(".jpg"):
+                        photo_id = entry.name[:-4]
+                        target = self.base_path / self.shard_of(photo_id) / entry.name
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        os.replace(entry.path, target)
+                        index[photo_id] = target.stat().st_size
+                    continue
+                with os.scandir(entry.path) as level1:
+                    for shard in level1:
+                        if not shard.is_dir():
+                            continue
+                        with os.scandir(shard.path) as files:
+                            for f in files:
+                                if f.name.endswith(".tmp"):
+                                    try:
+                                        if f.stat().st_mtime < tmp_cutoff:
+                                            os.unlink(f.path)
+                                    except FileNotFoundError:
+                                        # Write finished (renamed) meanwhile
+                                        continue
+                                elif f.name.endswith(".jpg"):
+                                    try:
+                                        index[f.name[:-4]] = f.stat().st_size
+                                    except FileNotFoundError:
+                                        # Deleted during the scan
+                                        continue
+        return index
+
+    async def _ensure_index(self) -> Dict[str, int]:
+        """Build the index on first use (off the event loop)"""
+        if self._index is not None:
+            return self._index
+        async with self._index_lock:
+            if self._index is None:
+                self._journal = []
+                try:
+                    index = await asyncio.to_thread(self._scan)
+                    self._index = index
+                    self._total_bytes = sum(index.values())
+                    journal, self._journal = self._journal, None
+                    for photo_id, size in journal:
+                        self._record(photo_id, size)
+                finally:
+                    self._journal = None
+                logger.info(
+                    f"[OK] LocalStorage index built: {len(self._index)} photos, "
+                    f"{self._total_bytes / (1024 * 1024):.1f} MB"
+                )
+        return self._index
+
+    # ------------------------------------------------------------------ I/O
+
+    def _write(self, photo_id: str, data: bytes):
+        """Atomic write into the photo's shard (blocking)"""
+        path = self.base_path / self.shard_of(photo_id) / f"{photo_id}.jpg"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.parent / f"{path.name}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        return path
+
+    def _unlink(self, photo_id: str) -> bool:
+        """Remove a photo file (blocking); False if it did not exist"""
+        try:
+            self.path_for(photo_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
+
     async def upload(self, photo_id: str, data: bytes):
         """
         Upload photo to local storage
@@ -39,10 +179,8 @@ class LocalStorage:
             photo_id: Unique photo identifier
             data: Binary photo data
         """
-        file_path = self.base_path / f"{photo_id}.jpg"
-
-        # Write to disk
-        file_path.write_bytes(data)
+        file_path = await asyncio.to_thread(self._write, photo_id, data)
+        self._record(photo_id, len(data))
 
         logger.debug(f"📁 Saved to local: {file_path} ({len(data)} bytes)")
 
@@ -56,13 +194,13 @@ class LocalStorage:
         Returns:
             Binary photo data
         """
-        file_path = self.base_path / f"{photo_id}.jpg"
+        file_path = self.path_for(photo_id)
 
-        if not file_path.exists():
+        try:
+            data = await asyncio.to_thread(file_path.read_bytes)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Photo {photo_id} not found in local storage")
 
-        data = file_path.read_bytes()
-
         logger.debug(f"📁 Loaded from local: {file_path} ({len(data)} bytes)")
 
         return data
@@ -74,13 +212,69 @@ class LocalStorage:
         Args:
             photo_id: Unique photo identifier
         """
-        file_path = self.base_path / f"{photo_id}.jpg"
-
-        if file_path.exists():
-            file_path.unlink()
-            logger.debug(f"🗑️ Deleted from local: {file_path}")
+        if await asyncio.to_thread(self._unlink, photo_id):
+            logger.debug(f"🗑️ Deleted from local: {photo_id}")
         else:
             logger.warning(f"Photo {photo_id} not found for deletion")
+        self._record(photo_id, None)
+
+    async def upload_file(self, photo_id: str, file_path: str):
+        """
+        Copy a file into local storage
+
+        Args:
+            photo_id: Unique photo identifier
+            file_path: Source file
+        """
+        def copy() -> int:
+            target = self.base_path / self.shard_of(photo_id) / f"{photo_id}.jpg"
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.parent / f"{target.name}.{uuid.uuid4().hex[:8]}.tmp"
+            try:
+                shutil.copyfile(file_path, tmp)
+                os.replace(tmp, target)
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+            return target.stat().st_size
+
+        self._record(photo_id, await asyncio.to_thread(copy))
+
+    async def download_to_file(self, photo_id: str, file_path: str):
+        """
+        Copy a photo out of local storage
+
+        Args:
+            photo_id: Unique photo identifier
+            file_path: Destination file
+        """
+        source = self.path_for(photo_id)
+        try:
+            await asyncio.to_thread(shutil.copyfile, source, file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Photo {photo_id} not found in local storage")
+
+    async def delete_many(self, photo_ids: Iterable[str]) -> Dict[str, List]:
+        """
+        Delete many photos (missing files count as deleted)
+
+        Returns:
+            {"success": [photo_id, ...], "failed": [{"photo_id", "error"}, ...]}
+        """
+        def unlink_all(ids: List[str]) -> Dict[str, List]:
+            results = {"success": [], "failed": []}
+            for photo_id in ids:
+                try:
+                    self._unlink(photo_id)
+                    results["success"].append(photo_id)
+                except OSError as e:
+                    results["failed"].append({"photo_id": photo_id, "error": str(e)})
+            return results
+
+        results = await asyncio.to_thread(unlink_all, list(photo_ids))
+        for photo_id in results["success"]:
+            self._record(photo_id, None)
+        return results
 
     async def get_url(self, photo_id: str) -> str:
         """
@@ -109,8 +303,9 @@ class LocalStorage:
         Returns:
             True if exists, False otherwise
         """
-        file_path = self.base_path / f"{photo_id}.jpg"
-        return file_path.exists()
+        if self._index is not None:
+            return photo_id in self._index
+        return self.path_for(photo_id).exists()
 
     async def get_size(self, photo_id: str) -> int:
         """
@@ -122,13 +317,14 @@ class LocalStorage:
         Returns:
             Size in bytes
         """
-        file_path = self.base_path / f"{photo_id}.jpg"
+        if self._index is not None:
+            return self._index.get(photo_id, 0)
 
-        if not file_path.exists():
+        try:
+            return self.path_for(photo_id).stat().st_size
+        except FileNotFoundError:
             return 0
 
-        return file_path.stat().st_size
-
     async def list_all(self) -> list[str]:
         """
         List all photo IDs in local storage
@@ -136,13 +332,7 @@ class LocalStorage:
         Returns:
             List of photo IDs
         """
-        photos = []
-
-        for file in self.base_path.glob("*.jpg"):
-            photo_id = file.stem  # Filename without extension
-            photos.append(photo_id)
-
-        return photos
+        return list(await self._ensure_index())
 
     async def get_total_size(self) -> int:
         """
@@ -151,9 +341,5 @@ class LocalStorage:
         Returns:
             Total size in bytes
         """
-        total = 0
-
-        for file in self.base_path.glob("*.jpg"):
-            total += file.stat().st_size
-
-        return total
+        await self._ensure_index()
+        return self._total_bytes
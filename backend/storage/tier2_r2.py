@@ -3,11 +3,32 @@ TIER 2: Cloudflare R2 (HOT Storage)
 Stockage cloud pour drafts actifs non publiés (< 90 jours)
 """
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 import os
+import asyncio
+from typing import Dict, Iterable, List
 from loguru import logger
 
+from .io_executor import BlockingIOExecutor, STORAGE_IO_THREADS, run_batch
+
+# Concurrent R2 requests (thread pool size == HTTP connection pool size)
+R2_IO_THREADS = int(os.getenv("R2_IO_THREADS", str(STORAGE_IO_THREADS)))
+R2_CONNECT_TIMEOUT = int(os.getenv("R2_CONNECT_TIMEOUT", "5"))
+R2_READ_TIMEOUT = int(os.getenv("R2_READ_TIMEOUT", "60"))
+# Lifetime of presigned URLs (only used without a CDN / public URL)
+R2_PRESIGNED_URL_SECONDS = int(os.getenv("R2_PRESIGNED_URL_SECONDS", "3600"))
+# DeleteObjects accepts at most 1000 keys per request
+R2_DELETE_BATCH = 1000
+
+# Multipart transfers for file-based uploads/downloads (large objects)
+R2_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4
+)
+
 
 class CloudflareR2Storage:
     """
@@ -21,6 +42,10 @@ class CloudflareR2Storage:
     - Drafts non publiés
     - Photos accédées fréquemment
     - Storage < 90 jours
+
+    boto3 is blocking: every request runs on a dedicated bounded thread
+    pool (R2_IO_THREADS) whose size matches the HTTP connection pool, so
+    the event loop never waits on the network.
     """
 
     def __init__(self):
@@ -48,9 +73,17 @@ class CloudflareR2Storage:
             endpoint_url=endpoint_url,
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
-            config=Config(signature_version='s3v4'),
+            config=Config(
+                signature_version='s3v4',
+                max_pool_connections=R2_IO_THREADS,
+                connect_timeout=R2_CONNECT_TIMEOUT,
+                read_timeout=R2_READ_TIMEOUT,
+                retries={'max_attempts': 5, 'mode': 'adaptive'},
+                tcp_keepalive=True
+            ),
             region_name='auto'
         )
+        self._io = BlockingIOExecutor("r2", max_workers=R2_IO_THREADS)
 
         self.bucket_name = os.getenv('R2_BUCKET_NAME', 'vintedbot-photos')
         self.cdn_domain = os.getenv('R2_CDN_DOMAIN')  # Ex: photos.vintedbot.app
@@ -72,7 +105,8 @@ class CloudflareR2Storage:
         key = f"hot/{photo_id}.jpg"
 
         try:
-            self.client.put_object(
+            await self._io.run(
+                self.client.put_object,
                 Bucket=self.bucket_name,
                 Key=key,
                 Body=data,
@@ -90,6 +124,12 @@ class CloudflareR2Storage:
             logger.error(f"[ERROR] R2 upload failed: {e}")
             raise
 
+    def _get_object_bytes(self, key: str) -> bytes:
+        """GET + body read in the same worker thread (blocking)"""
+        response = self.client.get_object(Bucket=self.bucket_name, Key=key)
+        with response['Body'] as body:
+            return body.read()
+
     async def download(self, photo_id: str) -> bytes:
         """
         Download photo from R2
@@ -106,12 +146,7 @@ class CloudflareR2Storage:
         key = f"hot/{photo_id}.jpg"
 
         try:
-            response = self.client.get_object(
-                Bucket=self.bucket_name,
-                Key=key
-            )
-
-            data = response['Body'].read()
+            data = await self._io.run(self._get_object_bytes, key)
 
             logger.debug(f"☁️ Downloaded from R2: {key} ({len(data)} bytes)")
 
@@ -137,7 +172,8 @@ class CloudflareR2Storage:
         key = f"hot/{photo_id}.jpg"
 
         try:
-            self.client.delete_object(
+            await self._io.run(
+                self.client.delete_object,
                 Bucket=self.bucket_name,
                 Key=key
             )
@@ -148,6 +184,134 @@ class CloudflareR2Storage:
             logger.error(f"[ERROR] R2 delete failed: {e}")
             raise
 
+    async def upload_file(self, photo_id: str, file_path: str):
+        """
+        Upload a photo from disk (streamed, multipart above 8MB)
+
+        Args:
+            photo_id: Unique photo identifier
+            file_path: Local file to upload
+        """
+        if not self.client:
+            raise RuntimeError("R2 client not initialized")
+
+        key = f"hot/{photo_id}.jpg"
+
+        try:
+            await self._io.run(
+                self.client.upload_file,
+                file_path,
+                self.bucket_name,
+                key,
+                ExtraArgs={
+                    'ContentType': 'image/jpeg',
+                    'CacheControl': 'public, max-age=31536000',
+                    'Metadata': {'photo_id': photo_id, 'tier': 'hot'}
+                },
+                Config=R2_TRANSFER_CONFIG
+            )
+
+            logger.debug(f"☁️ Uploaded file to R2: {key}")
+
+        except ClientError as e:
+            logger.error(f"[ERROR] R2 upload failed: {e}")
+            raise
+
+    async def download_to_file(self, photo_id: str, file_path: str):
+        """
+        Download a photo straight to disk without buffering it in memory
+
+        Args:
+            photo_id: Unique photo identifier
+            file_path: Destination file
+        """
+        if not self.client:
+            raise RuntimeError("R2 client not initialized")
+
+        key = f"hot/{photo_id}.jpg"
+
+        try:
+            await self._io.run(
+                self.client.download_file,
+                self.bucket_name,
+                key,
+                file_path,
+                Config=R2_TRANSFER_CONFIG
+            )
+
+            logger.debug(f"☁️ Downloaded from R2 to {file_path}: {key}")
+
+        except ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey'):
+                raise FileNotFoundError(f"Photo {photo_id} not found in R2")
+            logger.error(f"[ERROR] R2 download failed: {e}")
+            raise
+
+    async def upload_many(self, photos: Dict[str, bytes]) -> Dict[str, List]:
+        """
+        Upload many photos concurrently (bounded by R2_IO_THREADS)
+
+        Args:
+            photos: {photo_id: data}
+
+        Returns:
+            {"success": [photo_id, ...], "failed": [{"photo_id", "error"}, ...]}
+        """
+        return await run_batch(photos, lambda photo_id: self.upload(photo_id, photos[photo_id]))
+
+    async def delete_many(self, photo_ids: Iterable[str]) -> Dict[str, List]:
+        """
+        Delete many photos with DeleteObjects (1000 keys per request,
+        requests sent concurrently)
+
+        Args:
+            photo_ids: Photo identifiers
+
+        Returns:
+            {"success": [photo_id, ...], "failed": [{"photo_id", "error"}, ...]}
+        """
+        if not self.client:
+            raise RuntimeError("R2 client not initialized")
+
+        photo_ids = list(photo_ids)
+        chunks = [photo_ids[i:i + R2_DELETE_BATCH] for i in range(0, len(photo_ids), R2_DELETE_BATCH)]
+
+        async def delete_chunk(chunk: List[str]) -> Dict[str, str]:
+            response = await self._io.run(
+                self.client.delete_objects,
+                Bucket=self.bucket_name,
+                Delete={
+                    'Objects': [{'Key': f"hot/{photo_id}.jpg"} for photo_id in chunk],
+                    'Quiet': True
+                }
+            )
+            # Quiet mode only reports failures
+            return {
+                error['Key'][len("hot/"):-len(".jpg")]: error.get('Message', error.get('Code', 'error'))
+                for error in response.get('Errors', [])
+            }
+
+        results = {"success": [], "failed": []}
+        outcomes = await asyncio.gather(*(delete_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        for chunk, outcome in zip(chunks, outcomes):
+            for photo_id in chunk:
+                if isinstance(outcome, BaseException):
+                    results["failed"].append({"photo_id": photo_id, "error": str(outcome)})
+                elif photo_id in outcome:
+                    results["failed"].append({"photo_id": photo_id, "error": outcome[photo_id]})
+                else:
+                    results["success"].append(photo_id)
+
+        logger.debug(f"🗑️ Deleted {len(results['success'])} objects from R2 ({len(results['failed'])} failed)")
+        return results
+
+    @property
+    def url_expires_in(self):
+        """Lifetime of the URLs returned by get_cdn_url() (None = permanent)"""
+        if self.cdn_domain or self.public_url:
+            return None
+        return R2_PRESIGNED_URL_SECONDS
+
     async def get_cdn_url(self, photo_id: str) -> str:
         """
         Get CDN URL for photo
@@ -165,16 +329,16 @@ class CloudflareR2Storage:
             # R2 public URL (fallback)
             return f"{self.public_url}/hot/{photo_id}.jpg"
         else:
-            # Generate presigned URL (last resort, expires in 1h)
+            # Generate presigned URL (last resort, expires in R2_PRESIGNED_URL_SECONDS)
             return await self.get_presigned_url(photo_id)
 
-    async def get_presigned_url(self, photo_id: str, expiration: int = 3600) -> str:
+    async def get_presigned_url(self, photo_id: str, expiration: int = R2_PRESIGNED_URL_SECONDS) -> str:
         """
         Generate presigned URL for temporary access
 
         Args:
             photo_id: Unique photo identifier
-            expiration: URL expiration in seconds (default 1h)
+            expiration: URL expiration in seconds (default R2_PRESIGNED_URL_SECONDS)
 
         Returns:
             Presigned URL
@@ -216,7 +380,8 @@ class CloudflareR2Storage:
         key = f"hot/{photo_id}.jpg"
 
         try:
-            self.client.head_object(
+            await self._io.run(
+                self.client.head_object,
                 Bucket=self.bucket_name,
                 Key=key
             )
@@ -240,7 +405,8 @@ class CloudflareR2Storage:
         key = f"hot/{photo_id}.jpg"
 
         try:
-            response = self.client.head_object(
+            response = await self._io.run(
+                self.client.head_object,
                 Bucket=self.bucket_name,
                 Key=key
             )
@@ -2,11 +2,29 @@
 TIER 3: Backblaze B2 (COLD Storage)
 Stockage archive pour photos rarement accédées (> 90 jours)
 """
-from b2sdk.v2 import InMemoryAccountInfo, B2Api
+from b2sdk.v2 import InMemoryAccountInfo, B2Api, B2HttpApiConfig
 from b2sdk.v2.exception import NonExistentBucket, FileNotPresent
+import io
 import os
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Iterable, List
 from loguru import logger
 
+from .io_executor import BlockingIOExecutor, STORAGE_IO_THREADS, run_batch
+
+# Concurrent B2 requests (thread pool size == HTTP connection pool size)
+B2_IO_THREADS = int(os.getenv("B2_IO_THREADS", str(STORAGE_IO_THREADS)))
+
+
+def _pooled_session() -> requests.Session:
+    """requests session whose connection pool fits B2_IO_THREADS workers"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=B2_IO_THREADS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 
 class BackblazeB2Storage:
     """
@@ -20,6 +38,9 @@ class BackblazeB2Storage:
     - Photos > 90 jours sans accès
     - Archives long terme
     - Backup
+
+    b2sdk is blocking: every request runs on a dedicated bounded thread
+    pool (B2_IO_THREADS) sized like the HTTP connection pool.
     """
 
     def __init__(self):
@@ -42,7 +63,11 @@ class BackblazeB2Storage:
 
         try:
             info = InMemoryAccountInfo()
-            self.b2_api = B2Api(info)
+            self.b2_api = B2Api(
+                info,
+                api_config=B2HttpApiConfig(http_session_factory=_pooled_session),
+                max_upload_workers=B2_IO_THREADS
+            )
 
             self.b2_api.authorize_account(
                 'production',
@@ -53,6 +78,8 @@ class BackblazeB2Storage:
             bucket_name = os.getenv('B2_BUCKET_NAME', 'vintedbot-archive')
             self.bucket = self.b2_api.get_bucket_by_name(bucket_name)
 
+            self._io = BlockingIOExecutor("b2", max_workers=B2_IO_THREADS)
+
             logger.info(f"[OK] BackblazeB2Storage initialized (bucket: {bucket_name})")
 
         except Exception as e:
@@ -74,7 +101,8 @@ class BackblazeB2Storage:
         file_name = f"cold/{photo_id}.jpg"
 
         try:
-            self.bucket.upload_bytes(
+            await self._io.run(
+                self.bucket.upload_bytes,
                 data,
                 file_name,
                 content_type='image/jpeg',
@@ -90,6 +118,18 @@ class BackblazeB2Storage:
             logger.error(f"[ERROR] B2 upload failed: {e}")
             raise
 
+    def _download_bytes(self, file_name: str) -> bytes:
+        """Download + read in the same worker thread (blocking)"""
+        downloaded_file = self.bucket.download_file_by_name(file_name)
+        buffer = io.BytesIO()
+        downloaded_file.save(buffer)
+        return buffer.getvalue()
+
+    def _delete_file(self, file_name: str):
+        """Look up the file version and delete it (blocking)"""
+        file_version = self.bucket.get_file_info_by_name(file_name)
+        self.b2_api.delete_file_version(file_version.id_, file_name)
+
     async def download(self, photo_id: str) -> bytes:
         """
         Download photo from B2
@@ -106,13 +146,7 @@ class BackblazeB2Storage:
         file_name = f"cold/{photo_id}.jpg"
 
         try:
-            downloaded_file = self.bucket.download_file_by_name(file_name)
-
-            # Read file content
-            import io
-            buffer = io.BytesIO()
-            downloaded_file.save(buffer)
-            data = buffer.getvalue()
+            data = await self._io.run(self._download_bytes, file_name)
 
             logger.debug(f"❄️ Downloaded from B2: {file_name} ({len(data)} bytes)")
 
@@ -137,14 +171,7 @@ class BackblazeB2Storage:
         file_name = f"cold/{photo_id}.jpg"
 
         try:
-            # Get file info first
-            file_version = self.bucket.get_file_info_by_name(file_name)
-
-            # Delete file version
-            self.b2_api.delete_file_version(
-                file_version.id_,
-                file_name
-            )
+            await self._io.run(self._delete_file, file_name)
 
             logger.debug(f"🗑️ Deleted from B2: {file_name}")
 
@@ -154,6 +181,87 @@ class BackblazeB2Storage:
             logger.error(f"[ERROR] B2 delete failed: {e}")
             raise
 
+    async def upload_file(self, photo_id: str, file_path: str):
+        """
+        Upload a photo from disk (streamed, large files split into parts)
+
+        Args:
+            photo_id: Unique photo identifier
+            file_path: Local file to upload
+        """
+        if not self.bucket:
+            raise RuntimeError("B2 bucket not initialized")
+
+        file_name = f"cold/{photo_id}.jpg"
+
+        try:
+            await self._io.run(
+                self.bucket.upload_local_file,
+                local_file=file_path,
+                file_name=file_name,
+                content_type='image/jpeg',
+                file_infos={
+                    'photo_id': photo_id,
+                    'tier': 'cold'
+                }
+            )
+
+            logger.debug(f"❄️ Uploaded file to B2: {file_name}")
+
+        except Exception as e:
+            logger.error(f"[ERROR] B2 upload failed: {e}")
+            raise
+
+    async def download_to_file(self, photo_id: str, file_path: str):
+        """
+        Download a photo straight to disk without buffering it in memory
+
+        Args:
+            photo_id: Unique photo identifier
+            file_path: Destination file
+        """
+        if not self.bucket:
+            raise RuntimeError("B2 bucket not initialized")
+
+        file_name = f"cold/{photo_id}.jpg"
+
+        try:
+            await self._io.run(
+                lambda: self.bucket.download_file_by_name(file_name).save_to(file_path)
+            )
+
+            logger.debug(f"❄️ Downloaded from B2 to {file_path}: {file_name}")
+
+        except FileNotPresent:
+            raise FileNotFoundError(f"Photo {photo_id} not found in B2")
+        except Exception as e:
+            logger.error(f"[ERROR] B2 download failed: {e}")
+            raise
+
+    async def upload_many(self, photos: Dict[str, bytes]) -> Dict[str, List]:
+        """
+        Upload many photos concurrently (bounded by B2_IO_THREADS)
+
+        Args:
+            photos: {photo_id: data}
+
+        Returns:
+            {"success": [photo_id, ...], "failed": [{"photo_id", "error"}, ...]}
+        """
+        return await run_batch(photos, lambda photo_id: self.upload(photo_id, photos[photo_id]))
+
+    async def delete_many(self, photo_ids: Iterable[str]) -> Dict[str, List]:
+        """
+        Delete many photos concurrently (B2 has no bulk delete call)
+
+        Args:
+            photo_ids: Photo identifiers
+
+        Returns:
+            {"success": [photo_id, ...], "failed": [{"photo_id", "error"}, ...]}
+        """
+        return await run_batch(photo_ids, self.delete)
+
     async def get_url(self, photo_id: str) -> str:
         """
         Get download URL for photo
@@ -174,7 +282,7 @@ class BackblazeB2Storage:
 
         try:
             # Get download URL (includes auth)
-            download_url = self.bucket.get_download_url(file_name)
+            download_url = await self._io.run(self.bucket.get_download_url, file_name)
 
             return download_url
 
@@ -198,7 +306,7 @@ class BackblazeB2Storage:
         file_name = f"cold/{photo_id}.jpg"
 
         try:
-            self.bucket.get_file_info_by_name(file_name)
+            await self._io.run(self.bucket.get_file_info_by_name, file_name)
             return True
         except FileNotPresent:
             return False
@@ -221,7 +329,7 @@ class BackblazeB2Storage:
         file_name = f"cold/{photo_id}.jpg"
 
         try:
-            file_info = self.bucket.get_file_info_by_name(file_name)
+            file_info = await self._io.run(self.bucket.get_file_info_by_name, file_name)
             return file_info.size
         except FileNotPresent:
             return 0
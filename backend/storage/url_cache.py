@@ -0,0 +1,106 @@
+"""
+In-process cache of photo URLs
+Une page de drafts affiche des centaines de photos : les URLs (presigned
+R2 signées, URLs CDN, endpoints TEMP) sont gardées en mémoire par
+(tier, clé d'objet) au lieu d'être reconstruites / re-signées à chaque rendu
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+URL_CACHE_MAX_ENTRIES = int(os.getenv("URL_CACHE_MAX_ENTRIES", "50000"))
+# A signed URL is dropped this long before it expires, so a page rendered
+# from the cache never hands out a URL that dies while the user views it
+URL_CACHE_EXPIRY_MARGIN_SECONDS = int(os.getenv("URL_CACHE_EXPIRY_MARGIN_SECONDS", "600"))
+
+
+class PhotoURLCache:
+    """
+    LRU of photo URLs keyed by (tier, object key)
+
+    - The tier is part of the key: after a migration the old entry is
+      simply never looked up again
+    - URLs without expiry (CDN, public, TEMP) live until evicted
+    - Signed URLs are served until `expires_in - margin` seconds after
+      they were signed; URLs too short-lived for the margin are not cached
+    """
+
+    def __init__(
+        self,
+        max_entries: int = URL_CACHE_MAX_ENTRIES,
+        margin: int = URL_CACHE_EXPIRY_MARGIN_SECONDS
+    ):
+        self.max_entries = max_entries
+        self.margin = margin
+        # (tier, key) -> (url, deadline on the monotonic clock or None)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, Optional[float]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, tier: str, key: str) -> Optional[str]:
+        """Cached URL, or None if absent or too close to expiry"""
+        entry = self._entries.get((tier, key))
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        url, deadline = entry
+        if deadline is not None and time.monotonic() >= deadline:
+            del self._entries[(tier, key)]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end((tier, key))
+        self.stats["hits"] += 1
+        return url
+
+    def put(self, tier: str, key: str, url: str, expires_in: Optional[int] = None):
+        """
+        Cache a URL
+
+        Args:
+            tier: Tier the URL points to
+            key: Object key in that tier
+            url: URL to cache
+            expires_in: Signature lifetime in seconds (None = never expires)
+        """
+        deadline = None
+        if expires_in is not None:
+            if expires_in <= self.margin:
+                return
+            deadline = time.monotonic() + expires_in - self.margin
+
+        self._entries[(tier, key)] = (url, deadline)
+        self._entries.move_to_end((tier, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, keys: Iterable[str]):
+        """Forget deleted objects (by object key, in every tier)"""
+        keys = set(keys)
+        if not keys:
+            return
+        for entry in [entry for entry in self._entries if entry[1] in keys]:
+            del self._entries[entry]
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self.stats["hits"] / lookups * 100, 1) if lookups else 0.0,
+        }
+
+
+# Global instance
+_cache: Optional[PhotoURLCache] = None
+
+
+def get_url_cache() -> PhotoURLCache:
+    """Get or create the PhotoURLCache singleton"""
+    global _cache
+    if _cache is None:
+        _cache = PhotoURLCache()
+    return _cache
@@ -0,0 +1,107 @@
+"""
+Storage usage counters
+Lecture O(1) de l'usage par utilisateur et par tier depuis `storage_usage`,
+maintenu par triggers SQLite dans la même transaction que chaque écriture
+de photo_metadata / photo_blobs (voir backend/core/storage.py)
+
+Le job de réconciliation compare les compteurs à un scan complet et
+rapporte (et corrige) toute dérive.
+"""
+import time
+from typing import Any, Dict, List
+from loguru import logger
+
+TIERS = ("temp", "hot", "cold")
+USAGE_FIELDS = ("photo_count", "logical_bytes", "stored_bytes")
+
+# Pseudo user of the all-users rows
+ALL_USERS = "*"
+
+
+def read_usage(user_id: str = ALL_USERS) -> Dict[str, Dict[str, int]]:
+    """
+    Counters of one user (or of all users), per tier
+
+    Returns:
+        {"temp": {"photo_count", "logical_bytes", "stored_bytes"}, "hot": {...}, "cold": {...}}
+    """
+    from backend.core.storage import get_store
+
+    usage = {tier: {field: 0 for field in USAGE_FIELDS} for tier in TIERS}
+    with get_store().get_connection() as conn:
+        rows = conn.execute(
+            "SELECT tier, photo_count, logical_bytes, stored_bytes FROM storage_usage WHERE user_id = ?",
+            (str(user_id),)
+        ).fetchall()
+    for row in rows:
+        usage[row["tier"]] = {field: row[field] for field in USAGE_FIELDS}
+    return usage
+
+
+def reconcile_usage(fix: bool = True) -> Dict[str, Any]:
+    """
+    Vérifie les compteurs contre un scan complet de photo_metadata/photo_blobs
+
+    Args:
+        fix: Réécrire les compteurs depuis le scan si une dérive est trouvée
+
+    Returns:
+        {"rows_checked": 42, "drift": [{user_id, tier, field, counter, actual}], "fixed": bool, "seconds": 0.8}
+    """
+    from backend.core.storage import get_store, STORAGE_USAGE_REBUILD, STORAGE_USAGE_SCAN
+
+    started = time.monotonic()
+    drift: List[Dict[str, Any]] = []
+
+    with get_store().get_connection() as conn:
+        # One read transaction: counters and scan see the same snapshot
+        conn.execute("BEGIN")
+        counters = {
+            (row["user_id"], row["tier"]): row
+            for row in conn.execute(
+                "SELECT user_id, tier, photo_count, logical_bytes, stored_bytes FROM storage_usage"
+            ).fetchall()
+        }
+        actual = {
+            (row["user_id"], row["tier"]): row
+            for row in conn.execute(STORAGE_USAGE_SCAN).fetchall()
+        }
+
+        for key in sorted(set(counters) | set(actual)):
+            counter_row = counters.get(key)
+            actual_row = actual.get(key)
+            for field in USAGE_FIELDS:
+                counter_value = counter_row[field] if counter_row else 0
+                actual_value = (actual_row[field] or 0) if actual_row else 0
+                if counter_value != actual_value:
+                    drift.append({
+                        "user_id": key[0],
+                        "tier": key[1],
+                        "field": field,
+                        "counter": counter_value,
+                        "actual": actual_value,
+                    })
+
+        fixed = False
+        if drift and fix:
+            for statement in STORAGE_USAGE_REBUILD:
+                conn.execute(statement)
+            fixed = True
+        conn.commit()
+
+    report = {
+        "rows_checked": len(set(counters) | set(actual)),
+        "drift": drift,
+        "fixed": fixed,
+        "seconds": round(time.monotonic() - started, 2),
+    }
+
+    if drift:
+        logger.warning(
+            f"[WARN] Storage usage drift on {len(drift)} counters "
+            f"({'rebuilt' if fixed else 'not fixed'}): {drift[:5]}"
+        )
+    else:
+        logger.info(f"[OK] Storage usage counters consistent ({report['rows_checked']} rows, {report['seconds']}s)")
+    return report
+
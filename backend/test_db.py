@@ -0,0 +1,109 @@
+"""
+Tests de la baisse de prix planifiée : chaque annonce suit la règle de son
+propriétaire (ou la règle par défaut), et de la file des PublishJob
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import SQLModel, create_engine, select
+
+import backend.db as db
+from backend.models import JobStatus, Listing, ListingStatus, PublishJob, User
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """backend.db sur une base SQLite temporaire"""
+    engine = create_engine(f"sqlite:///{tmp_path}/db.sqlite", echo=False)
+    monkeypatch.setattr(db, "engine", engine)
+    SQLModel.metadata.create_all(engine)
+    yield
+    engine.dispose()
+
+
+def add_listing(user_id, price, status=ListingStatus.listed) -> int:
+    with db.get_db_session() as session:
+        listing = Listing(user_id=user_id, title="Item", description="", price=price, status=status)
+        session.add(listing)
+        session.commit()
+        return listing.id
+
+
+def prices() -> dict:
+    with db.get_db_session() as session:
+        return {l.id: l.price for l in session.exec(select(Listing)).all()}
+
+
+def test_two_users_follow_their_own_rules(database):
+    """Deux utilisateurs, deux règles ; sans propriétaire -> règle par défaut"""
+    with db.get_db_session() as session:
+        alice, bob = User(email="alice@example.com"), User(email="bob@example.com")
+        session.add_all([alice, bob])
+        session.commit()
+        alice_id, bob_id = alice.id, bob.id
+
+    db.set_price_drop_rule(alice_id, drop_percent=10, min_price=8)
+    db.set_price_drop_rule(bob_id, drop_percent=20, min_price=3)
+    db.set_price_drop_rule(None, drop_percent=50, min_price=1)
+
+    alice_item = add_listing(alice_id, 20.0)
+    alice_floor = add_listing(alice_id, 8.5)
+    bob_item = add_listing(bob_id, 20.0)
+    bob_sold = add_listing(bob_id, 20.0, ListingStatus.sold)
+    orphan = add_listing(None, 20.0)
+
+    result = db.apply_price_drops(default_percent=5, default_min_price=5, chunk_size=2, chunk_pause=0)
+
+    after = prices()
+    assert after[alice_item] == 18.0
+    assert after[alice_floor] == 8.0  # 7.65 sous le plancher de 8
+    assert after[bob_item] == 16.0
+    assert after[bob_sold] == 20.0
+    assert after[orphan] == 10.0
+    assert sorted(result["changed_ids"]) == sorted([alice_item, alice_floor, bob_item, orphan])
+    assert result["listed"] == 4
+
+    # Règle désactivée pour Bob, règle supprimée pour Alice (-> défaut)
+    db.set_price_drop_rule(bob_id, drop_percent=20, min_price=3, enabled=False)
+    assert db.delete_price_drop_rule(alice_id)
+    db.apply_price_drops(default_percent=5, default_min_price=5, chunk_size=0, chunk_pause=0)
+
+    after = prices()
+    assert after[alice_item] == 9.0
+    assert after[bob_item] == 16.0
+    assert [r.user_id for r in db.get_price_drop_rules()] == [None, bob_id]
+
+
+def test_concurrent_leases_claim_distinct_jobs(database):
+    """Deux workers qui prennent un job en même temps n'obtiennent jamais le même"""
+    queued = {db.queue_publish_job(item_id=i, session_id=None, mode="manual").job_id for i in range(4)}
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leased = list(pool.map(lambda _: db.lease_next_publish_job(), range(4)))
+
+    assert all(r is not None for r in leased)
+    assert {job_id for job_id, _ in leased} == queued
+    assert db.lease_next_publish_job() is None
+    assert {db.get_publish_job(j).status for j in queued} == {JobStatus.running}
+
+
+def test_requeue_stale_running_jobs(database):
+    """Au démarrage, seuls les jobs running oubliés depuis trop longtemps repartent en file"""
+    stale, fresh, done = (db.queue_publish_job(item_id=i, session_id=None, mode="manual").job_id for i in range(3))
+    with db.get_db_session() as session:
+        for job in session.exec(select(PublishJob)).all():
+            job.status = JobStatus.completed if job.job_id == done else JobStatus.running
+            if job.job_id in (stale, done):
+                job.updated_at = datetime.utcnow() - timedelta(hours=2)
+            session.add(job)
+        session.commit()
+
+    assert db.requeue_publish_jobs(stale_before=datetime.utcnow() - timedelta(minutes=30)) == 1
+    assert db.get_publish_job(stale).status == JobStatus.queued
+    assert db.get_publish_job(fresh).status == JobStatus.running
+    assert db.get_publish_job(done).status == JobStatus.completed
+
+    # Jobs interrompus par un arrêt du worker : requeue explicite
+    assert db.requeue_publish_jobs([fresh]) == 1
+    assert db.lease_next_publish_job()[0] == stale
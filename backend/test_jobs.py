@@ -0,0 +1,62 @@
+"""
+Tests de inbox_sync_job : sessions synchronisées en parallèle (bornées), délai
+par session, validation sautée si récente, horodatages écrits en un seul lot
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import backend.jobs as jobs
+
+
+@pytest.mark.asyncio
+async def test_inbox_sync_job(monkeypatch):
+    now = datetime.utcnow()
+    sessions = [
+        (1, "ok", None),
+        (2, "recent", now - timedelta(minutes=10)),   # validée il y a 10 min : pas revalidée
+        (3, "slow", None),                            # dépasse le délai par session
+        (4, "expired", None),                         # cookie refusé par Vinted
+        (5, "stale", now - timedelta(hours=3)),
+        (6, "ok2", None),
+    ]
+    validated_cookies = []
+    mark_calls = []
+    active = {"now": 0, "max": 0}
+
+    async def validate_session_cookie(cookie):
+        validated_cookies.append(cookie)
+        return cookie != "expired"
+
+    async def fetch_inbox(cookie):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        try:
+            await asyncio.sleep(5 if cookie == "slow" else 0.05)
+        finally:
+            active["now"] -= 1
+        return [{"id": 1}, {"id": 2}]
+
+    monkeypatch.setattr(jobs, "get_sessions_for_sync", lambda: sessions)
+    monkeypatch.setattr(jobs, "mark_sessions_validated", lambda ids, at: mark_calls.append(sorted(ids)))
+    monkeypatch.setattr(jobs, "validate_session_cookie", validate_session_cookie)
+    monkeypatch.setattr(jobs, "fetch_inbox", fetch_inbox)
+    monkeypatch.setattr("backend.utils.crypto.decrypt_blob", lambda blob: blob)
+    monkeypatch.setattr(jobs, "INBOX_SYNC_CONCURRENCY", 2)
+    monkeypatch.setattr(jobs, "INBOX_SYNC_SESSION_TIMEOUT", 0.5)
+
+    report = await asyncio.wait_for(jobs.inbox_sync_job(), timeout=5)
+
+    # Deux sessions à la fois, jamais plus
+    assert active["max"] == 2
+    # La session lente est coupée au bout du délai, sans bloquer les autres
+    assert report["by_status"] == {"synced": 4, "timeout": 1, "invalid": 1}
+    assert next(r for r in report["slowest"] if r["session_id"] == 3)["seconds"] < 1
+    # Validation sautée pour la session validée récemment
+    assert sorted(validated_cookies) == ["expired", "ok", "ok2", "slow", "stale"]
+    assert report["validation_skipped"] == 1
+    # Un seul lot d'horodatages : seulement les sessions validées et synchronisées
+    assert mark_calls == [[1, 5, 6]]
+    assert report["validated"] == 3
+    assert report["conversations"] == 8
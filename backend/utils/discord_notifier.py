@@ -3,6 +3,20 @@ import os
 import requests
 from loguru import logger
 
+def _feedback_payload(feedback_text: str) -> dict:
+    return {
+        "embeds": [
+            {
+                "title": "New Bot Feedback Received! [START]",
+                "description": feedback_text,
+                "color": 5814783, # Hex color #58b9ff
+                "footer": {
+                    "text": f"VintedBot Feedback System"
+                }
+            }
+        ]
+    }
+
 def send_discord_webhook(feedback_text: str):
     """
     Sends a feedback message to a Discord webhook.
@@ -16,21 +30,30 @@ def send_discord_webhook(feedback_text: str):
         return
 
     try:
-        payload = {
-            "embeds": [
-                {
-                    "title": "New Bot Feedback Received! [START]",
-                    "description": feedback_text,
-                    "color": 5814783, # Hex color #58b9ff
-                    "footer": {
-                        "text": f"VintedBot Feedback System"
-                    }
-                }
-            ]
-        }
+        payload = _feedback_payload(feedback_text)
         response = requests.post(webhook_url, json=payload, timeout=10)
         response.raise_for_status()
         logger.info("Successfully sent feedback to Discord.")
     except requests.exceptions.RequestException as e:
         logger.error(f"Failed to send feedback to Discord: {e}")
 
+async def send_discord_webhook_async(feedback_text: str):
+    """
+    send_discord_webhook over the shared "discord" keep-alive pool,
+    for request handlers (does not block the event loop).
+
+    Args:
+        feedback_text: The text of the feedback from the user.
+    """
+    webhook_url = os.getenv("DISCORD_WEBHOOK_URL")
+    if not webhook_url:
+        logger.warning("DISCORD_WEBHOOK_URL is not set. Skipping feedback notification.")
+        return
+
+    try:
+        from backend.core.http_clients import get_http_clients
+        response = await get_http_clients().get("discord").post(webhook_url, json=_feedback_payload(feedback_text))
+        response.raise_for_status()
+        logger.info("Successfully sent feedback to Discord.")
+    except Exception as e:
+        logger.error(f"Failed to send feedback to Discord: {e}")
@@ -1,8 +1,8 @@
 import os
-import httpx
 from typing import List, Dict, Optional
 from datetime import datetime
 from backend.utils.logger import logger
+from backend.core.http_clients import get_http_clients
 
 MOCK_MODE = os.getenv("MOCK_MODE", "true").lower() == "true"
 VINTED_BASE_URL = "https://www.vinted.com/api/v2"
@@ -32,20 +32,21 @@ async def fetch_inbox(cookie: str, limit: int = 50) -> List[Dict]:
     
     # Real implementation
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{VINTED_BASE_URL}/inbox/conversations",
-                headers={"Cookie": cookie},
-                params={"per_page": limit},
-                timeout=15.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("conversations", [])
-            else:
-                logger.error(f"Fetch inbox failed: {response.status_code}")
-                return []
+        client = get_http_clients().get("vinted")
+        response = await client.get(
+            f"{VINTED_BASE_URL}/inbox/conversations",
+            headers={"Cookie": cookie},
+            params={"per_page": limit},
+            timeout=15.0,
+            follow_redirects=False
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("conversations", [])
+        else:
+            logger.error(f"Fetch inbox failed: {response.status_code}")
+            return []
     
     except Exception as e:
         logger.error(f"Fetch inbox error: {e}")
@@ -74,20 +75,21 @@ async def fetch_thread_messages(cookie: str, thread_id: str, page: int = 1) -> L
     
     # Real implementation
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{VINTED_BASE_URL}/inbox/conversations/{thread_id}/messages",
-                headers={"Cookie": cookie},
-                params={"page": page},
-                timeout=15.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("messages", [])
-            else:
-                logger.error(f"Fetch thread messages failed: {response.status_code}")
-                return []
+        client = get_http_clients().get("vinted")
+        response = await client.get(
+            f"{VINTED_BASE_URL}/inbox/conversations/{thread_id}/messages",
+            headers={"Cookie": cookie},
+            params={"page": page},
+            timeout=15.0,
+            follow_redirects=False
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("messages", [])
+        else:
+            logger.error(f"Fetch thread messages failed: {response.status_code}")
+            return []
     
     except Exception as e:
         logger.error(f"Fetch thread messages error: {e}")
@@ -126,13 +128,14 @@ async def validate_session_cookie(cookie: str) -> bool:
         return True
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{VINTED_BASE_URL}/users/current",
-                headers={"Cookie": cookie},
-                timeout=10.0
-            )
-            return response.status_code == 200
+        client = get_http_clients().get("vinted")
+        response = await client.get(
+            f"{VINTED_BASE_URL}/users/current",
+            headers={"Cookie": cookie},
+            timeout=10.0,
+            follow_redirects=False
+        )
+        return response.status_code == 200
     
     except Exception as e:
         logger.error(f"Cookie validation error: {e}")
@@ -295,6 +295,13 @@ export const ordersAPI = {
       responseType: 'blob'  // Important for file download
     }),
 
+  // Export orders as CSV, JSONL or Parquet (streamed)
+  exportOrders: (params: { format: 'csv' | 'jsonl' | 'parquet'; status?: string; from_date?: string; to_date?: string }) =>
+    apiClient.get('/orders/export', {
+      params,
+      responseType: 'blob'
+    }),
+
   // Send bulk feedback to multiple orders (Dotb feature)
   sendBulkFeedback: (data: {
     order_ids: string[];
@@ -363,6 +370,30 @@ export const imagesAPI = {
   }) =>
     apiClient.post('/images/bulk/remove-background', data),
 
+  // Apply an ordered chain of edits in one background job (single decode/encode per image)
+  runPipeline: (data: {
+    image_paths: string[];
+    operations: Array<{ op: 'crop' | 'rotate' | 'adjust' | 'watermark'; [key: string]: unknown }>;
+  }) =>
+    apiClient.post('/images/pipeline', data),
+
+  // Poll progress of a background image job
+  getJob: (jobId: string) =>
+    apiClient.get(`/images/jobs/${jobId}`),
+
+  // Non-destructive edits (operation list per photo, original untouched)
+  getEdits: (path: string) =>
+    apiClient.get('/images/edits', { params: { path } }),
+
+  setEdits: (path: string, operations: Array<{ op: string; [key: string]: unknown }>) =>
+    apiClient.put('/images/edits', { path, operations }),
+
+  undoEdit: (path: string) =>
+    apiClient.post('/images/edits/undo', null, { params: { path } }),
+
+  resetEdits: (path: string) =>
+    apiClient.delete('/images/edits', { params: { path } }),
+
   // Get predefined image editing presets
   getPresets: () =>
     apiClient.get('/images/presets'),
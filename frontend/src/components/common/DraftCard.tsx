@@ -63,7 +63,7 @@ export default function DraftCard({ draft, onPublish, onDelete, isSelected, onTo
             </div>
           )}
           <ImageCarousel
-            images={draft.photos}
+            images={draft.thumbnails?.length ? draft.thumbnails : draft.photos}
             alt={draft.title}
             className="w-full"
             showThumbnails={true}
@@ -45,6 +45,7 @@ export interface Draft {
   brand: string;
   size: string;
   photos: string[];
+  thumbnails?: string[];
   status: string;
   confidence?: number;
   created_at: string;